@@ -11,6 +11,8 @@ from openmdao.lib.casehandlers.caseset import CaseArray, CaseSet, caseiter_to_ca
 from openmdao.lib.casehandlers.csvcase import CSVCaseIterator, CSVCaseRecorder
 from openmdao.lib.casehandlers.dbcase import DBCaseIterator, DBCaseRecorder, \
                                              case_db_to_dict
+from openmdao.lib.casehandlers.bincase import BinCaseIterator, BinCaseRecorder, \
+                                              case_bin_to_dict, list_bin_vars
 from openmdao.lib.casehandlers.dumpcase import DumpCaseRecorder
 from openmdao.lib.casehandlers.listcase import ListCaseRecorder, \
                                                ListCaseIterator
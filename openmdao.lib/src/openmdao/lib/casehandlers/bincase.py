@@ -0,0 +1,391 @@
+"""A CaseRecorder and CaseIterator that store the cases in a columnar binary
+file that is read back using a memory map.
+
+The file starts with an 8 byte magic string, followed by any number of
+chunks that are appended as the cases are recorded. Each chunk holds
+a group of consecutive cases that have the same variables, and begins with
+an 8 byte length followed by a pickled header describing the chunk. The data
+for the chunk follows the header, starting on an 8 byte boundary. Each
+variable whose values are floats, ints, bools or plain numpy arrays of a
+fixed, unstructured dtype and shape is stored as a single contiguous column
+of raw data, so it can be viewed directly as a numpy array without reading
+the rest of the file. The other values, along with the label, uuid, etc.
+of each case, are pickled together at the end of the chunk.
+"""
+
+import os
+import struct
+from cPickle import dumps, loads, HIGHEST_PROTOCOL
+
+from numpy import ndarray, array, zeros, memmap, concatenate, uint8, \
+                  float64, dtype as np_dtype
+
+# pylint: disable-msg=E0611,F0401
+from openmdao.main.interfaces import implements, ICaseRecorder, ICaseIterator
+from openmdao.main.case import Case, _Missing
+
+_MAGIC = 'OMCASES\x01'
+_LEN = struct.Struct('<Q')
+
+_scalar_dtypes = {
+    float: np_dtype(float).str,
+    float64: np_dtype(float).str,
+    int: np_dtype(int).str,
+    bool: np_dtype(bool).str,
+}
+
+def _column_kind(value):
+    """Return a tuple of the form (dtype, shape) describing the column
+    that can hold the given value, where shape is None for a Python scalar.
+    Returns None if the value has to be pickled, or _Missing if the value is
+    _Missing and will fit in any column.
+    """
+    if value is _Missing:
+        return _Missing
+    dtype = _scalar_dtypes.get(type(value))
+    if dtype is not None:
+        return (dtype, None)
+    # Subclasses such as matrix and structured dtypes don't survive a round
+    # trip through a raw column, so they are pickled.
+    if type(value) is ndarray and value.dtype.fields is None \
+       and not value.dtype.hasobject:
+        return (value.dtype.str, value.shape)
+    return None
+
+def _read_chunks(filename):
+    """Return a list of the headers of the chunks in the given file, with
+    the file offset of the chunk data added to each header as 'start'.
+    """
+    chunks = []
+    with open(filename, 'rb') as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise RuntimeError("'%s' is not a binary case file" % filename)
+        while True:
+            data = f.read(_LEN.size)
+            if not data:
+                break
+            header = loads(f.read(_LEN.unpack(data)[0]))
+            start = f.tell()
+            start += -start % 8
+            header['start'] = start
+            chunks.append(header)
+            f.seek(start + header['size'])
+    return chunks
+
+def _column_view(buf, chunk, col):
+    """Return a numpy array of the values of the given fixed column of
+    the given chunk, using the memory mapped file *buf*.
+    """
+    dtype = np_dtype(col['dtype'])
+    shape = (chunk['count'],) + (col['shape'] or ())
+    start = chunk['start'] + col['offset']
+    nbytes = dtype.itemsize * chunk['count']
+    for n in shape[1:]:
+        nbytes *= n
+    return buf[start:start+nbytes].view(dtype).reshape(shape)
+
+def _map_file(filename):
+    """Return a read-only uint8 memory map of the given file."""
+    return memmap(filename, dtype=uint8, mode='r')
+
+
+class BinCaseIterator(object):
+    """An iterator that returns :class:`Case` objects from a file written
+    by a :class:`BinCaseRecorder`.
+    """
+
+    implements(ICaseIterator)
+
+    def __init__(self, filename='cases.bin'):
+        self.filename = filename
+
+    def __iter__(self):
+        return self._next_case()
+
+    def _next_case(self):
+        """ Generator which returns Cases one at a time. """
+        chunks = _read_chunks(self.filename)
+        if not chunks:
+            return
+        buf = _map_file(self.filename)
+        for chunk in chunks:
+            start = chunk['start']
+            extras = chunk['extras']
+            extras = loads(buf[start+extras[0]:start+extras[0]+extras[1]].tostring())
+            objects = extras['objects']
+            columns = []
+            for col in chunk['columns']:
+                if col['dtype'] is None:
+                    columns.append((col, objects[col['name']], None))
+                else:
+                    columns.append((col, _column_view(buf, chunk, col),
+                                    set(chunk['missing'].get(col['name'], ()))))
+            for row in range(chunk['count']):
+                inputs = []
+                outputs = []
+                for col, values, missing in columns:
+                    if missing is None:
+                        value = values[row]
+                    elif row in missing:
+                        value = _Missing
+                    elif col['shape'] is None:
+                        value = values[row].item()
+                    else:
+                        value = array(values[row])
+                    if col['iotype'] == 'in':
+                        inputs.append((col['name'], value))
+                    else:
+                        outputs.append((col['name'], value))
+                yield Case(inputs=inputs, outputs=outputs,
+                           label=extras['label'][row],
+                           case_uuid=extras['uuid'][row],
+                           parent_uuid=extras['parent_uuid'][row],
+                           msg=extras['msg'][row],
+                           retries=extras['retries'][row],
+                           max_retries=extras['max_retries'][row])
+
+
+class BinCaseRecorder(object):
+    """Records Cases to a columnar binary file that can be read back with a
+    :class:`BinCaseIterator` or :func:`case_bin_to_dict`.
+
+    Cases are written in chunks of up to *chunk_size* cases. A new chunk is
+    started early whenever a Case has different variables than the previous
+    one, or has a value that doesn't fit in the column used for that
+    variable in the current chunk. Buffered Cases are written when the
+    chunk is full, or when *flush*, *close* or *get_iterator* is called.
+
+    If *append* is True, Cases are added to the end of an existing file.
+    Only one recorder should write to a file at a time.
+    """
+
+    implements(ICaseRecorder)
+
+    def __init__(self, filename='cases.bin', append=False, chunk_size=1000):
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self._closed = False
+        self._reset()
+
+        if append and os.path.exists(filename):
+            with open(filename, 'rb') as f:
+                if f.read(len(_MAGIC)) != _MAGIC:
+                    raise RuntimeError("'%s' is not a binary case file" % filename)
+        else:
+            with open(filename, 'wb') as f:
+                f.write(_MAGIC)
+
+    def _reset(self):
+        """Start a new, empty chunk."""
+        self._keys = None
+        self._kinds = None
+        self._values = None
+        self._extras = dict([(name,[]) for name in
+                             ['label','uuid','parent_uuid','msg',
+                              'retries','max_retries']])
+        self._count = 0
+
+    def record(self, case):
+        """Record the given Case."""
+        if self._closed:
+            raise RuntimeError('Attempt to record on closed recorder')
+
+        items = [(name, 'in', value) for name,value in case.items(iotype='in')]
+        items.extend([(name, 'out', value) for name,value in case.items(iotype='out')])
+        keys = [(name, iotype) for name,iotype,value in items]
+        kinds = [_column_kind(value) for name,iotype,value in items]
+
+        if self._keys is not None:
+            if keys != self._keys:
+                self.flush()
+            else:
+                for i, kind in enumerate(kinds):
+                    current = self._kinds[i]
+                    if kind is _Missing or current is None or kind == current:
+                        continue
+                    if current is _Missing:
+                        self._kinds[i] = kind
+                    else:  # value won't fit in the current column
+                        self.flush()
+                        break
+
+        if self._keys is None:
+            self._keys = keys
+            self._kinds = kinds
+            self._values = [[] for item in items]
+
+        for i, (name, iotype, value) in enumerate(items):
+            if isinstance(value, ndarray):
+                value = value.copy()
+            self._values[i].append(value)
+
+        extras = self._extras
+        extras['label'].append(case.label)
+        extras['uuid'].append(case.uuid)
+        extras['parent_uuid'].append(case.parent_uuid)
+        extras['msg'].append(case.msg)
+        extras['retries'].append(case.retries)
+        extras['max_retries'].append(case.max_retries)
+        self._count += 1
+
+        if self._count >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Write any buffered Cases to the file as a new chunk."""
+        if not self._count:
+            return
+
+        count = self._count
+        columns = []
+        blocks = []
+        missing = {}
+        objects = {}
+        offset = 0
+        for (name, iotype), kind, values in zip(self._keys, self._kinds,
+                                                self._values):
+            col = { 'name': name, 'iotype': iotype,
+                    'dtype': None, 'shape': None, 'offset': None }
+            columns.append(col)
+            if kind is None or kind is _Missing:
+                objects[name] = values
+                continue
+            dtype, shape = kind
+            col['dtype'] = dtype
+            col['shape'] = shape
+            col['offset'] = offset
+
+            rows = [i for i,value in enumerate(values) if value is _Missing]
+            if rows:
+                missing[name] = rows
+                fill = zeros(shape or (), dtype=dtype)
+                values = [fill if value is _Missing else value for value in values]
+            data = array(values, dtype=dtype).tostring()
+            data += '\0' * (-len(data) % 8)
+            blocks.append(data)
+            offset += len(data)
+
+        self._extras['objects'] = objects
+        extras = dumps(self._extras, HIGHEST_PROTOCOL)
+        header = dumps({ 'count': count, 'columns': columns,
+                         'missing': missing,
+                         'errors': [i for i,msg in enumerate(self._extras['msg']) if msg],
+                         'extras': (offset, len(extras)),
+                         'size': offset + len(extras) }, HIGHEST_PROTOCOL)
+
+        with open(self.filename, 'r+b') as f:
+            f.seek(0, os.SEEK_END)
+            f.write(_LEN.pack(len(header)))
+            f.write(header)
+            f.write('\0' * (-f.tell() % 8))
+            for data in blocks:
+                f.write(data)
+            f.write(extras)
+        self._reset()
+
+    def close(self):
+        """Write any buffered Cases. Note that a closed recorder can't
+        record any more Cases."""
+        self.flush()
+        self._closed = True
+
+    def get_iterator(self):
+        """Return a BinCaseIterator that reads our file."""
+        self.flush()
+        return BinCaseIterator(self.filename)
+
+
+def list_bin_vars(filename):
+    """
+    Return the set of the names of the variables found in the specified
+    binary case file.
+
+    filename: str
+        The name of the binary case file.
+    """
+    names = set()
+    for chunk in _read_chunks(filename):
+        names.update([col['name'] for col in chunk['columns']])
+    return names
+
+def case_bin_to_dict(filename, varnames, include_errors=False):
+    """
+    Retrieve the values of specified variables from a binary case file.
+
+    Returns a dict containing the values for each entry, keyed on
+    variable name. The values of a variable that has a fixed dtype and shape
+    in every case are returned as a numpy array with one entry per case,
+    which is a view of the memory mapped file where possible. The values of
+    other variables are returned in a list.
+
+    Only data from cases containing ALL of the specified variables will
+    be returned so that all data values with the same index will correspond
+    to the same case.
+
+    filename: str
+        The name of the binary case file.
+
+    varnames: list[str]
+        Iterator of names of variables to be retrieved.
+
+    include_errors: bool (optional) [False]
+        If True, include data from cases that reported an error.
+
+    """
+    parts = dict([(name,[]) for name in varnames])
+    chunks = _read_chunks(filename)
+    buf = _map_file(filename) if chunks else None
+
+    for chunk in chunks:
+        cols = dict([(col['name'],col) for col in chunk['columns']])
+        if not all([name in cols for name in parts]):
+            continue  # cases don't contain a complete set of specified vars,
+                      # so skip them to avoid data mismatches
+        skip = set()
+        if not include_errors:
+            skip.update(chunk['errors'])
+        extras = None
+        for name in parts:
+            if cols[name]['dtype'] is None:
+                if extras is None:
+                    start = chunk['start'] + chunk['extras'][0]
+                    extras = loads(buf[start:start+chunk['extras'][1]].tostring())
+                skip.update([i for i,value in enumerate(extras['objects'][name])
+                             if value is _Missing])
+            else:
+                skip.update(chunk['missing'].get(name, ()))
+
+        rows = None
+        if skip:
+            rows = [i for i in range(chunk['count']) if i not in skip]
+            if not rows:
+                continue
+        for name, lst in parts.items():
+            col = cols[name]
+            if col['dtype'] is None:
+                values = extras['objects'][name]
+                if rows is not None:
+                    values = [values[i] for i in rows]
+            else:
+                values = _column_view(buf, chunk, col)
+                if rows is not None:
+                    values = values[rows]
+            lst.append(values)
+
+    vardict = {}
+    for name, lst in parts.items():
+        if len(lst) == 1 and isinstance(lst[0], ndarray):
+            vardict[name] = lst[0]
+        elif lst and all([isinstance(values, ndarray) for values in lst]) \
+                 and len(set([values.shape[1:] for values in lst])) == 1:
+            vardict[name] = concatenate(lst)
+        else:
+            vardict[name] = []
+            for values in lst:
+                if isinstance(values, ndarray):
+                    vardict[name].extend([array(value) if value.shape else value.item()
+                                          for value in values])
+                else:
+                    vardict[name].extend(values)
+    return vardict
+
@@ -8,13 +8,55 @@ import uuid
 from cPickle import dumps, loads, HIGHEST_PROTOCOL, UnpicklingError
 from optparse import OptionParser
 
+from numpy import ndarray, frombuffer, dtype as np_dtype
+
 # pylint: disable-msg=E0611,F0401
 from openmdao.main.interfaces import implements, ICaseRecorder, ICaseIterator
 from openmdao.main.case import Case
 
 _casetable_attrs = set(['id','uuid','parent','label','msg','retries', \
                         'model_id','timeEnter'])
-_vartable_attrs = set(['var_id','name','case_id','sense','value'])
+_vartable_attrs = set(['var_id','name','case_id','sense','value','dtype','shape'])
+
+def _encode_value(value):
+    """Return a tuple of the form (value, dtype, shape) for storing the
+    given value in the casevars table. Plain numpy arrays of numbers or
+    strings are stored as their raw data buffer along with their dtype and
+    shape. Other values, including structured arrays and ndarray subclasses,
+    are pickled.
+    """
+    if isinstance(value, (float,int,str)):
+        return (value, None, None)
+    if type(value) is ndarray and value.dtype.fields is None \
+       and not value.dtype.hasobject:
+        return (sqlite3.Binary(value.tostring()), value.dtype.str,
+                ','.join([str(n) for n in value.shape]))
+    return (sqlite3.Binary(dumps(value,HIGHEST_PROTOCOL)), None, None)
+
+def _decode_value(vname, case, value, dtype, shape):
+    """Return the value of the named variable of the given case from the
+    given value, dtype and shape columns of the casevars table.
+    """
+    if dtype is not None:
+        shape = tuple([int(n) for n in shape.split(',')]) if shape else ()
+        return frombuffer(str(value), dtype=np_dtype(str(dtype))).reshape(shape).copy()
+    if not isinstance(value, (float,int,str)):
+        try:
+            return loads(str(value))
+        except UnpicklingError as err:
+            raise UnpicklingError("can't unpickle value '%s' for case '%s' from database: %s" %
+                                  (vname, case, str(err)))
+    return value
+
+def _array_columns(connection):
+    """Return the columns to select along with value to get the dtype and
+    shape of each variable. Databases written before arrays were stored in
+    raw form don't have those columns.
+    """
+    cols = [row[1] for row in connection.execute("PRAGMA table_info(casevars)")]
+    if 'dtype' in cols:
+        return 'dtype,shape'
+    return 'NULL,NULL'
 
 def _query_split(query):
     """Return a tuple of lhs, relation, rhs after splitting on 
@@ -81,7 +123,8 @@ class DBCaseIterator(object):
         casecur = self._connection.cursor()
         casecur.execute(' '.join(sql))
           
-        sql = ['SELECT var_id,name,case_id,sense,value from casevars WHERE case_id=%s']
+        sql = ['SELECT var_id,name,case_id,sense,value,%s from casevars WHERE case_id=%%s' %
+               _array_columns(self._connection)]
         if self.selectors is not None:
             for sel in self.selectors:
                 rhs,rel,lhs = _query_split(sel)
@@ -94,13 +137,8 @@ class DBCaseIterator(object):
             varcur.execute(combined % cid)
             inputs = []
             outputs = []
-            for var_id, vname, case_id, sense, value in varcur:
-                if not isinstance(value, (float,int,str)):
-                    try:
-                        value = loads(str(value))
-                    except UnpicklingError as err:
-                        raise UnpicklingError("can't unpickle value '%s' for case '%s' from database: %s" %
-                                              (vname, cname, str(err)))
+            for var_id, vname, case_id, sense, value, dtype, shape in varcur:
+                value = _decode_value(vname, text_id, value, dtype, shape)
                 if sense=='i':
                     inputs.append((vname, value))
                 else:
@@ -113,14 +151,26 @@ class DBCaseIterator(object):
 
 class DBCaseRecorder(object):
     """Records Cases to a relational DB (sqlite). Values other than floats,
-    ints or strings are pickled and are opaque to SQL queries.
+    ints, strings or numpy arrays are pickled and are opaque to SQL queries.
+    Numpy arrays are stored as raw data along with their dtype and shape.
+    
+    Cases are written to the DB in batches of *buffer_size* cases, with a
+    commit after each batch.  The default of 1 writes each Case as soon as
+    it's recorded. Larger values are much faster when recording a large 
+    number of Cases, but buffered Cases are not visible to other DB
+    connections until they're written, either when the buffer fills up, or
+    when *flush*, *close* or *get_iterator* is called.
     """
     
     implements(ICaseRecorder)
     
-    def __init__(self, dbfile=':memory:', model_id='', append=False):
+    def __init__(self, dbfile=':memory:', model_id='', append=False, 
+                 buffer_size=1):
         self.dbfile = dbfile  # this creates the connection
         self.model_id = model_id
+        self.buffer_size = buffer_size
+        self._cases = []
+        self._casevars = []
         
         if append:
             exstr = 'if not exists'
@@ -145,8 +195,20 @@ class DBCaseRecorder(object):
          name TEXT,
          case_id INTEGER,
          sense TEXT,
-         value BLOB
+         value BLOB,
+         dtype TEXT,
+         shape TEXT
          )""" % exstr)
+        
+        if append and _array_columns(self._connection) == 'NULL,NULL':
+            self._connection.execute("alter table casevars add column dtype TEXT")
+            self._connection.execute("alter table casevars add column shape TEXT")
+        
+        self._connection.execute("""create index if not exists 
+                                    casevars_name_case on casevars(name, case_id)""")
+        self._connection.execute("""create index if not exists 
+                                    casevars_case on casevars(case_id)""")
+        self._connection.commit()
 
     @property
     def dbfile(self):
@@ -167,35 +229,46 @@ class DBCaseRecorder(object):
         if self._connection is None:
             raise RuntimeError('Attempt to record on closed recorder')
 
-        cur = self._connection.cursor()
-        
-        cur.execute("""insert into cases(id,uuid,parent,label,msg,retries,model_id,timeEnter) 
-                           values (?,?,?,?,?,?,?,DATETIME('NOW'))""", 
-                                     (None, case.uuid, case.parent_uuid, case.label,
-                                      case.msg or '', case.retries, 
-                                      self.model_id))
-        case_id = cur.lastrowid
-        # insert the inputs and outputs into the vars table.  Pickle them if they're not one of the
-        # built-in types int, float, or str.
+        # vars refer to their case by its position in the buffer until
+        # the case ids are assigned in flush()
+        case_id = len(self._cases)
+        self._cases.append((case_id, case.uuid, case.parent_uuid, case.label,
+                            case.msg or '', case.retries, self.model_id))
         
+        casevars = self._casevars
         for name,value in case.items(iotype='in'):
-            if isinstance(value, (float,int,str)):
-                v = (None, name, case_id, 'i', value)
-            else:
-                v = (None, name, case_id, 'i', sqlite3.Binary(dumps(value,HIGHEST_PROTOCOL)))
-            cur.execute("insert into casevars(var_id,name,case_id,sense,value) values(?,?,?,?,?)", 
-                        v)
+            value, dtype, shape = _encode_value(value)
+            casevars.append((name, case_id, 'i', value, dtype, shape))
         for name,value in case.items(iotype='out'):
-            if isinstance(value, (float,int,str)):
-                v = (None, name, case_id, 'o', value)
-            else:
-                v = (None, name, case_id, 'o', sqlite3.Binary(dumps(value,HIGHEST_PROTOCOL)))
-            cur.execute("insert into casevars(var_id,name,case_id,sense,value) values(?,?,?,?,?)", 
-                        v)
+            value, dtype, shape = _encode_value(value)
+            casevars.append((name, case_id, 'o', value, dtype, shape))
+            
+        if len(self._cases) >= self.buffer_size:
+            self.flush()
+            
+    def flush(self):
+        """Write any buffered Cases to the DB and commit."""
+        if self._connection is None or not self._cases:
+            return
+        cur = self._connection.cursor()
+        
+        # lock the DB before finding the first free case id, since other 
+        # recorders may be appending to it
+        cur.execute("begin immediate")
+        start = (cur.execute("select max(id) from cases").fetchone()[0] or 0) + 1
+        cur.executemany("""insert into cases(id,uuid,parent,label,msg,retries,model_id,timeEnter) 
+                           values (?,?,?,?,?,?,?,DATETIME('NOW'))""", 
+                        [(start+case[0],)+case[1:] for case in self._cases])
+        cur.executemany("""insert into casevars(name,case_id,sense,value,dtype,shape) 
+                           values(?,?,?,?,?,?)""", 
+                        [(var[0], start+var[1])+var[2:] for var in self._casevars])
         self._connection.commit()
+        self._cases = []
+        self._casevars = []
     
     def close(self):
         """Commit and close DB connection if not using ``:memory:``."""
+        self.flush()
         if self._connection is not None and self._dbfile != ':memory:':
             self._connection.commit()
             self._connection.close()
@@ -203,6 +276,7 @@ class DBCaseRecorder(object):
 
     def get_iterator(self):
         """Return a DBCaseIterator that points to our current DB."""
+        self.flush()
         return DBCaseIterator(dbfile=self._dbfile, connection=self._connection)
 
 
@@ -265,44 +339,35 @@ def case_db_to_dict(dbname, varnames, case_sql='', var_sql='', include_errors=Fa
     if qlist:
         sql.append("WHERE %s" % ' AND '.join(qlist))
         
-    casecur = connection.cursor()
-    casecur.execute(' '.join(sql))
-    
-    sql = ["SELECT name, value from casevars WHERE case_id=%s"]
-    vars_added = False
-    for i,name in enumerate(vardict.keys()):
-        if i==0:
-            sql.append("AND (")
-        else:
-            sql.append("OR")
-        sql.append("name='%s'" % name)
-        vars_added = True
-    if vars_added: sql.append(")")
-    
+    # get the vars for all of the selected cases with a single query,
+    # in case order
+    sql = ["SELECT case_id, name, value, %s FROM casevars WHERE case_id IN (%s)" %
+           (_array_columns(connection), ' '.join(sql))]
+    if vardict:
+        sql.append("AND name IN (%s)" % ','.join(["'%s'" % name for name in vardict]))
     if var_sql:
         sql.append(" AND %s" % var_sql)
-    combined = ' '.join(sql)
+    sql.append("ORDER BY case_id")
     
     varcur = connection.cursor()
+    varcur.execute(' '.join(sql))
     
-    for case_id in casecur:
-        casedict = {}
-        varcur.execute(combined % case_id)
-        for vname, value in varcur:
-            if not isinstance(value, (float,int,str)):
-                try:
-                    value = loads(str(value))
-                except UnpicklingError as err:
-                    raise UnpicklingError("can't unpickle value '%s' from database: %s" %
-                                          (vname, str(err)))
-            casedict[vname] = value
-        
+    def _add_case(casedict):
         if len(casedict) != len(vardict):
-            continue   # case doesn't contain a complete set of specified vars, so skip it to avoid data mismatches
-        
+            return   # case doesn't contain a complete set of specified vars, so skip it to avoid data mismatches
         for name, value in casedict.items():
             vardict[name].append(value)
             
+    casedict = {}
+    last_id = None
+    for case_id, vname, value, dtype, shape in varcur:
+        if case_id != last_id:
+            _add_case(casedict)
+            casedict = {}
+            last_id = case_id
+        casedict[vname] = _decode_value(vname, case_id, value, dtype, shape)
+    _add_case(casedict)
+            
     return vardict
 
 
@@ -0,0 +1,194 @@
+"""
+Test for BinCaseRecorder and BinCaseIterator.
+"""
+
+import os
+import tempfile
+import shutil
+import unittest
+
+from numpy import array, ndarray, memmap, matrix
+
+from openmdao.main.api import Case
+from openmdao.main.case import _Missing
+from openmdao.main.caseiter import caseiter_to_dict
+from openmdao.lib.casehandlers.api import BinCaseRecorder, BinCaseIterator, \
+                                          case_bin_to_dict, list_bin_vars
+
+
+class BinCaseRecorderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tdir, 'cases.bin')
+
+    def tearDown(self):
+        shutil.rmtree(self.tdir)
+
+    def _make_cases(self, count, start=0):
+        cases = []
+        for i in range(start, start+count):
+            inputs = [('comp1.x', float(i)), ('comp1.n', i),
+                      ('comp1.flag', i % 2 == 0)]
+            outputs = [('comp1.y', array([i, 2.*i, 3.*i])),
+                       ('comp1.s', 'case %d' % i)]
+            cases.append(Case(inputs=inputs, outputs=outputs,
+                              label='case%d' % i))
+        return cases
+
+    def test_inout(self):
+        recorder = BinCaseRecorder(self.filename, chunk_size=4)
+        cases = self._make_cases(10)
+        for case in cases:
+            recorder.record(case)
+        recorder.close()
+        self.assertRaises(RuntimeError, recorder.record, cases[0])
+
+        newcases = list(BinCaseIterator(self.filename))
+        self.assertEqual(len(newcases), 10)
+        for case, newcase in zip(cases, newcases):
+            self.assertEqual(newcase.label, case.label)
+            self.assertEqual(newcase.uuid, case.uuid)
+            self.assertEqual(newcase.keys(iotype='in'), case.keys(iotype='in'))
+            self.assertEqual(newcase.keys(iotype='out'), case.keys(iotype='out'))
+            for name in ['comp1.x', 'comp1.n', 'comp1.flag', 'comp1.s']:
+                self.assertEqual(newcase[name], case[name])
+                self.assertEqual(type(newcase[name]), type(case[name]))
+            self.assertTrue(all(newcase['comp1.y'] == case['comp1.y']))
+
+        self.assertEqual(list_bin_vars(self.filename),
+                         set(['comp1.x', 'comp1.n', 'comp1.flag',
+                              'comp1.y', 'comp1.s']))
+
+    def test_to_dict(self):
+        recorder = BinCaseRecorder(self.filename)
+        for case in self._make_cases(10):
+            recorder.record(case)
+        recorder.close()
+
+        varnames = ['comp1.x', 'comp1.y', 'comp1.s']
+        vardict = case_bin_to_dict(self.filename, varnames)
+        self.assertTrue(isinstance(vardict['comp1.x'], memmap))
+        self.assertEqual(list(vardict['comp1.x']), range(10))
+        self.assertEqual(vardict['comp1.y'].shape, (10,3))
+        self.assertEqual(list(vardict['comp1.y'][:,1]), range(0,20,2))
+        self.assertEqual(vardict['comp1.s'], ['case %d' % i for i in range(10)])
+
+        # same values as caseiter_to_dict
+        itdict = caseiter_to_dict(BinCaseIterator(self.filename), varnames)
+        self.assertEqual(list(vardict['comp1.x']), itdict['comp1.x'])
+        self.assertEqual(vardict['comp1.s'], itdict['comp1.s'])
+
+        vardict = case_bin_to_dict(self.filename, ['comp1.x', 'comp1.z'])
+        self.assertEqual(vardict['comp1.x'], [])
+
+    def test_errors(self):
+        recorder = BinCaseRecorder(self.filename, chunk_size=3)
+        cases = self._make_cases(6)
+        cases[1]['comp1.y'] = _Missing
+        cases[1].msg = 'failed'
+        cases[4].msg = 'failed too'
+        for case in cases:
+            recorder.record(case)
+        recorder.close()
+
+        vardict = case_bin_to_dict(self.filename, ['comp1.x', 'comp1.y'])
+        self.assertEqual(list(vardict['comp1.x']), [0., 2., 3., 5.])
+        self.assertEqual(list(vardict['comp1.y'][:,0]), [0., 2., 3., 5.])
+
+        # case 1 is still missing comp1.y
+        vardict = case_bin_to_dict(self.filename, ['comp1.x', 'comp1.y'],
+                                   include_errors=True)
+        self.assertEqual(list(vardict['comp1.x']), [0., 2., 3., 4., 5.])
+        vardict = case_bin_to_dict(self.filename, ['comp1.x'],
+                                   include_errors=True)
+        self.assertEqual(list(vardict['comp1.x']), range(6))
+
+        newcases = list(BinCaseIterator(self.filename))
+        self.assertEqual(newcases[1]['comp1.y'], _Missing)
+        self.assertEqual(newcases[1].msg, 'failed')
+        self.assertEqual(newcases[4].msg, 'failed too')
+
+    def test_changing_vars(self):
+        recorder = BinCaseRecorder(self.filename)
+        cases = self._make_cases(3)
+        # different variables, a different array shape and a value that
+        # has to be pickled all start new chunks
+        cases.append(Case(inputs=[('comp1.x', 3.)], label='case3'))
+        cases.extend(self._make_cases(2, 4))
+        cases[-1]['comp1.y'] = array([1., 2.])
+        cases.append(Case(inputs=[('comp1.x', 'six')], label='case6'))
+        for case in cases:
+            recorder.record(case)
+        recorder.flush()
+
+        newcases = list(recorder.get_iterator())
+        self.assertEqual([case.label for case in newcases],
+                         ['case%d' % i for i in range(7)])
+        self.assertEqual(newcases[3].keys(), ['comp1.x'])
+        self.assertEqual(list(newcases[5]['comp1.y']), [1., 2.])
+        self.assertEqual(newcases[6]['comp1.x'], 'six')
+
+        vardict = case_bin_to_dict(self.filename, ['comp1.x'])
+        self.assertEqual(vardict['comp1.x'], [0., 1., 2., 3., 4., 5., 'six'])
+        vardict = case_bin_to_dict(self.filename, ['comp1.y'])
+        self.assertTrue(isinstance(vardict['comp1.y'], list))
+        self.assertEqual(len(vardict['comp1.y']), 5)
+        self.assertEqual(list(vardict['comp1.y'][4]), [1., 2.])
+
+    def test_pickled_arrays(self):
+        # structured arrays and ndarray subclasses are pickled
+        recorder = BinCaseRecorder(self.filename)
+        dt = [('a', 'i4'), ('b', 'f8')]
+        for i in range(3):
+            rec = array([(i, 2.*i), (i+1, 3.*i)], dtype=dt)
+            mat = matrix([[i, 1.], [2., 3.]])
+            recorder.record(Case(inputs=[('comp1.rec', rec)],
+                                 outputs=[('comp1.mat', mat)],
+                                 label='case%d' % i))
+        recorder.close()
+
+        newcases = list(BinCaseIterator(self.filename))
+        self.assertEqual(len(newcases), 3)
+        for i, case in enumerate(newcases):
+            rec = case['comp1.rec']
+            self.assertEqual(rec.dtype, dt)
+            self.assertEqual(list(rec['a']), [i, i+1])
+            self.assertEqual(list(rec['b']), [2.*i, 3.*i])
+            mat = case['comp1.mat']
+            self.assertTrue(isinstance(mat, matrix))
+            self.assertTrue((mat == matrix([[i, 1.], [2., 3.]])).all())
+
+        vardict = case_bin_to_dict(self.filename, ['comp1.rec', 'comp1.mat'])
+        self.assertEqual(len(vardict['comp1.rec']), 3)
+        self.assertTrue(isinstance(vardict['comp1.mat'][2], matrix))
+
+    def test_append(self):
+        recorder = BinCaseRecorder(self.filename)
+        for case in self._make_cases(5):
+            recorder.record(case)
+        recorder.close()
+
+        recorder = BinCaseRecorder(self.filename, append=True)
+        for case in self._make_cases(5, 5):
+            recorder.record(case)
+        recorder.close()
+
+        vardict = case_bin_to_dict(self.filename, ['comp1.n', 'comp1.y'])
+        self.assertTrue(isinstance(vardict['comp1.n'], ndarray))
+        self.assertEqual(list(vardict['comp1.n']), range(10))
+        self.assertEqual(vardict['comp1.y'].shape, (10,3))
+
+        recorder = BinCaseRecorder(self.filename)
+        recorder.close()
+        self.assertEqual(list(BinCaseIterator(self.filename)), [])
+
+        with open(self.filename, 'wb') as f:
+            f.write('not a case file')
+        self.assertRaises(RuntimeError, BinCaseRecorder, self.filename,
+                          append=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
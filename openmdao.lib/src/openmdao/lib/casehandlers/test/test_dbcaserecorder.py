@@ -11,6 +11,11 @@ import logging
 import shutil
 import copy
 
+import sqlite3
+from cPickle import UnpicklingError
+
+from numpy import array, dtype, matrix
+
 from openmdao.main.api import Component, Assembly, Case, set_as_top
 from openmdao.test.execcomp import ExecComp
 from openmdao.lib.casehandlers.api import DBCaseIterator, ListCaseIterator, \
@@ -180,6 +185,75 @@ class DBCaseRecorderTestCase(unittest.TestCase):
             self.assertEqual(case['unicode'], u'Unicode String')
             self.assertEqual(case['list'], ['Hello', 'world'])
 
+    def test_arrays(self):
+        recorder = DBCaseRecorder()
+        for i in range(5):
+            inputs = [('comp1.x', array([[1., 2.], [3., 4.]])*i),
+                      ('comp1.n', array([i, 2*i], dtype='int32')),
+                      ('comp1.s', array(i))]
+            recorder.record(Case(inputs=inputs, outputs=[('comp1.z', i)]))
+        for i,case in enumerate(recorder.get_iterator()):
+            self.assertEqual(case['comp1.x'].shape, (2,2))
+            self.assertEqual(case['comp1.x'][1,0], 3.*i)
+            self.assertEqual(case['comp1.n'].dtype, dtype('int32'))
+            self.assertEqual(list(case['comp1.n']), [i, 2*i])
+            self.assertEqual(case['comp1.s'].shape, ())
+            self.assertEqual(case['comp1.s'], i)
+
+    def test_pickled_arrays(self):
+        # structured arrays and ndarray subclasses are pickled
+        recorder = DBCaseRecorder()
+        dt = [('a', 'i4'), ('b', 'f8')]
+        rec = array([(1, 2.), (3, 4.)], dtype=dt)
+        mat = matrix([[1., 2.], [3., 4.]])
+        recorder.record(Case(inputs=[('comp1.rec', rec), ('comp1.mat', mat)],
+                             label='case1'))
+        for case in recorder.get_iterator():
+            self.assertEqual(case['comp1.rec'].dtype, dt)
+            self.assertEqual(list(case['comp1.rec']['a']), [1, 3])
+            self.assertEqual(list(case['comp1.rec']['b']), [2., 4.])
+            self.assertTrue(isinstance(case['comp1.mat'], matrix))
+            self.assertTrue((case['comp1.mat'] == mat).all())
+
+        recorder._connection.execute("UPDATE casevars SET value=? WHERE name=?",
+                                     (sqlite3.Binary('xyzzy'), 'comp1.mat'))
+        try:
+            list(recorder.get_iterator())
+        except UnpicklingError as err:
+            self.assertTrue(str(err).startswith(
+                "can't unpickle value 'comp1.mat' for case '%s' from database:"
+                % case.uuid))
+        else:
+            self.fail('UnpicklingError expected')
+
+    def test_buffered(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            dfile = os.path.join(tmpdir, 'junk.db')
+            recorder = DBCaseRecorder(dfile, buffer_size=4)
+            other = DBCaseRecorder(dfile, append=True)
+            for i in range(10):
+                recorder.record(Case(inputs=[('comp1.x', i), ('comp1.y', i*2.)]))
+                other.record(Case(inputs=[('comp1.x', -i), ('comp1.y', -i*2.)]))
+
+            # the last 2 cases haven't been written yet
+            varinfo = case_db_to_dict(dfile, ['comp1.x', 'comp1.y'])
+            self.assertEqual(sorted(varinfo['comp1.x']),
+                             sorted(range(8)+range(0,-10,-1)))
+
+            recorder.close()
+            other.close()
+            varinfo = case_db_to_dict(dfile, ['comp1.x', 'comp1.y'])
+            self.assertEqual(sorted(varinfo['comp1.x']),
+                             sorted(range(10)+range(0,-10,-1)))
+            for x, y in zip(varinfo['comp1.x'], varinfo['comp1.y']):
+                self.assertEqual(y, x*2.)
+        finally:
+            try:
+                shutil.rmtree(tmpdir)
+            except OSError:
+                logging.error("problem removing directory %s" % tmpdir)
+
     def test_close(self):
         # :memory: can be used after close.
         recorder = DBCaseRecorder()
@@ -1,5 +1,11 @@
 """ Metamodel provides basic Meta Modeling capability."""
 
+import logging
+try:
+    from numpy import asarray, empty, can_cast, promote_types
+except ImportError as err:
+    logging.warn("In %s: %r" % (__file__, err))
+
 # pylint: disable-msg=E0611,F0401
 from enthought.traits.trait_base import not_none
 from enthought.traits.has_traits import _clone_trait
@@ -8,13 +14,81 @@ from openmdao.main.api import Component, Case
 from openmdao.lib.datatypes.api import Slot, ListStr, Event, \
      List, Str, Dict, Bool
 from openmdao.main.interfaces import IComponent, ISurrogate, ICaseRecorder, \
-     ICaseIterator
+     ICaseIterator, IIncrementalSurrogate
 from openmdao.main.uncertain_distributions import UncertainDistribution, \
                                                   NormalDistribution
 from openmdao.main.mp_support import has_interface
 
 _missing = object()
 
+
+class _History(object):
+    """Training data for one side of the training cases of a MetaModel,
+    with an entry per training point. Numeric values are kept in a numpy
+    array that grows by doubling, so adding a point doesn't copy the ones
+    already there. Values that don't fit in a numeric array are kept in a
+    list instead.
+    """
+    
+    def __init__(self):
+        self._data = None
+        self._len = 0
+        
+    def __len__(self):
+        return self._len
+    
+    def set(self, row, value):
+        """Sets the value for the training point at index `row`, which may be
+        one past the last point to add a new one."""
+        if not isinstance(self._data, list):
+            try:
+                val = asarray(value)
+            except (TypeError, ValueError):
+                val = None
+            if val is not None and val.dtype.kind in 'biuf' and \
+               (self._data is None or val.shape == self._data.shape[1:]):
+                self._set_array(row, val)
+                return
+            if self._data is None:
+                self._data = []
+            else:
+                self._data = self._data[:self._len].tolist()
+        if row == self._len:
+            self._data.append(value)
+            self._len += 1
+        else:
+            self._data[row] = value
+        
+    def _set_array(self, row, val):
+        data = self._data
+        if data is None:
+            data = empty((8,)+val.shape, dtype=val.dtype)
+        elif not can_cast(val.dtype, data.dtype):
+            data = data.astype(promote_types(val.dtype, data.dtype))
+        if row == len(data):
+            grown = empty((2*len(data),)+data.shape[1:], dtype=data.dtype)
+            grown[:row] = data[:row]
+            data = grown
+        data[row] = val
+        self._data = data
+        self._len = max(self._len, row+1)
+            
+    def values(self, start=0, cols=None):
+        """Returns a copy of the values from the training point at index
+        `start` on. If `cols` is given, only those columns of each value are
+        included."""
+        if self._data is None:
+            return []
+        rows = self._data[start:self._len]
+        if isinstance(rows, list):
+            if cols is None:
+                return rows
+            return [[inputs[i] for i in cols] for inputs in rows]
+        if cols is None:
+            return rows.copy()
+        return rows[:, cols]
+    
+
 class MetaModel(Component):
     
     # pylint: disable-msg=E1101
@@ -67,11 +141,10 @@ class MetaModel(Component):
         self._current_model_traitnames = set()
         self._surrogate_info = {}
         self._surrogate_input_names = []
-        self._training_input_history = []
-        self._const_inputs = {} # dict of constant training inputs indices and their values
         self._train = False
         self._new_train_data = False
-        self._failed_training_msgs = []
+        self._train_row = None # training point index of the current training case
+        self._clear_training_data()
      
         # the following line will work for classes that inherit from MetaModel
         # as long as they declare their traits in the class body and not in
@@ -85,14 +158,53 @@ class MetaModel(Component):
         self._new_train_data = True
     
     def _reset_training_data_fired(self):
-        self._training_input_history = []
-        self._const_inputs = {}
-        self._failed_training_msgs = []
+        self._clear_training_data()
         
         # remove output history from surrogate_info
         for name, tup in self._surrogate_info.items():
             surrogate, output_history = tup
-            self._surrogate_info[name] = (surrogate, [])
+            self._surrogate_info[name] = (surrogate, _History())
+            
+    def _clear_training_data(self):
+        self._training_input_history = _History()
+        self._training_rows = {} # training point index for each set of inputs
+        self._num_training_cases = 0
+        self._const_inputs = {} # dict of constant training inputs indices and their values
+        self._failed_training_msgs = []
+        
+        # what the surrogates were last trained on
+        self._num_trained = 0
+        self._trained_const_inputs = None
+        self._retrain = False
+        
+    def _add_training_inputs(self, inputs):
+        """Adds a training case with the given inputs, updates the constant
+        inputs, and returns the index of the training point for the case.
+        A case with the same inputs as an earlier one replaces its training
+        point, so the surrogates are never given duplicate points.
+        """
+        self._num_training_cases += 1
+        if self._num_training_cases == 1:
+            self._const_inputs = dict(enumerate(inputs))
+        else:
+            # only the inputs that have been constant so far are checked
+            for i, val in self._const_inputs.items():
+                if val != inputs[i]:
+                    del self._const_inputs[i]
+        
+        try:
+            key = tuple(inputs)
+            row = self._training_rows.get(key)
+        except TypeError: # unhashable inputs, e.g., arrays
+            key = row = None
+        if row is None:
+            row = len(self._training_input_history)
+            if key is not None:
+                self._training_rows[key] = row
+        elif row < self._num_trained:
+            self._retrain = True
+        self._training_input_history.set(row, inputs)
+        return row
             
     def _warm_start_data_changed(self, oldval, newval): 
         self.reset_training_data = True
@@ -112,7 +224,7 @@ class MetaModel(Component):
                                          'found as an input in one of the cases provided '
                                          'for warm_start_data.' % var_name, ValueError)
             #print "inputs", inputs
-            self._training_input_history.append(inputs)                  
+            row = self._add_training_inputs(inputs)
             
             for output_name in self.list_outputs_from_model():
                 #grab value from case data
@@ -124,7 +236,7 @@ class MetaModel(Component):
                                          'in one of the cases provided for '
                                          'warm_start_data' % var_name, ValueError) 
                 else: # save to training output history   
-                    self._surrogate_info[output_name][1].append(val)
+                    self._surrogate_info[output_name][1].set(row, val)
 
         self._new_train_data = True        
         
@@ -149,14 +261,14 @@ class MetaModel(Component):
                 else:    
                     self._failed_training_msgs.append(str(err))
             else: #if no exceptions are generated, save the data
-                self._training_input_history.append(inputs)
+                self._train_row = self._add_training_inputs(inputs)
                 self.update_outputs_from_model()
                 case_outputs = []
                 
                 for name, tup in self._surrogate_info.items():
                     surrogate, output_history = tup
                     case_outputs.append(('.'.join([self.name,name]), 
-                                         output_history[-1]))
+                                         getattr(self.model, name)))
                 # save the case, making sure to add out name to the local input name since
                 # this Case is scoped to our parent Assembly
                 case_inputs = [('.'.join([self.name,name]),val) for name,val in zip(self._surrogate_input_names, inputs)]
@@ -167,36 +279,13 @@ class MetaModel(Component):
         else:
             #print '%s predicting' % self.get_pathname()
             if self._new_train_data: 
-                if len(self._training_input_history) < 2:
+                if self._num_training_cases < 2:
                     self.raise_exception("ERROR: need at least 2 training points!", 
                                          RuntimeError)
                     
-                # figure out if we have any constant training inputs
-                tcases = self._training_input_history
-                in_hist = tcases[0][:]
-                # start off assuming every input is constant
-                idxlist = range(len(in_hist))
-                self._const_inputs = dict(zip(idxlist, in_hist))
-                for i in idxlist:
-                    val = in_hist[i]
-                    for case in range(1, len(tcases)):
-                        if val != tcases[case][i]:
-                            del self._const_inputs[i]
-                            break
-                  
-                if len(self._const_inputs) == len(in_hist):
+                if len(self._const_inputs) == len(self._surrogate_input_names):
                     self.raise_exception("ERROR: all training inputs are constant.")
-                elif len(self._const_inputs) > 0:
-                    # some inputs are constant, so we have to remove them from the training set
-                    training_input_history = []
-                    for inputs in self._training_input_history:
-                        training_input_history.append([val for i,val in enumerate(inputs) 
-                                                       if i not in self._const_inputs])
-                else:
-                    training_input_history = self._training_input_history
-                for name,tup in self._surrogate_info.items(): 
-                    surrogate, output_history = tup  
-                    surrogate.train(training_input_history, output_history)
+                self._train_surrogates()
                     
                 self._new_train_data = False
                 
@@ -216,6 +305,42 @@ class MetaModel(Component):
                 # copy output to boudary
                 setattr(self, name, surrogate.predict(inputs))
             
+    def _train_surrogates(self):
+        """Trains the surrogates on the training points added since they were
+        last trained. Constant inputs are removed from the training set. A
+        surrogate is trained on all of the points if it doesn't support
+        IIncrementalSurrogate, if the constant inputs have changed, or if a
+        point it was trained on has been replaced.
+        """
+        const_inputs = set(self._const_inputs)
+        cols = [i for i in range(len(self._surrogate_input_names))
+                if i not in const_inputs]
+        npoints = len(self._training_input_history)
+        
+        start = self._num_trained
+        if self._retrain or const_inputs != self._trained_const_inputs:
+            start = 0
+        elif start == npoints:
+            return
+        
+        # if training fails part way, start over next time
+        self._retrain = True
+        X = self._training_input_history.values(start, cols)
+        X_all = None
+        for name,tup in self._surrogate_info.items(): 
+            surrogate, output_history = tup  
+            if start and has_interface(surrogate, IIncrementalSurrogate):
+                surrogate.add_training_points(X, output_history.values(start))
+            else:
+                if X_all is None:
+                    X_all = self._training_input_history.values(0, cols) \
+                            if start else X
+                surrogate.train(X_all, output_history.values())
+                
+        self._num_trained = npoints
+        self._trained_const_inputs = const_inputs
+        self._retrain = False
+            
     def _post_run (self):
         self._train = False
         super(MetaModel, self)._post_run()
@@ -249,9 +374,8 @@ class MetaModel(Component):
 
         new_model_traitnames = set()
         self._surrogate_input_names = []
-        self._training_input_history = []
         self._surrogate_info = {}
-        self._failed_training_msgs = []
+        self._clear_training_data()
         
         # remove traits promoted from the old model
         for name in self._current_model_traitnames:
@@ -298,7 +422,7 @@ class MetaModel(Component):
                     trait_type = surrogate.get_uncertain_value(1.0).__class__
                     self.add(name, Slot(trait_type, iotype='out', desc=trait.desc))
                     
-                    self._surrogate_info[name] = (surrogate.__class__(*args,**kwargs), []) # (surrogate,output_history)
+                    self._surrogate_info[name] = (surrogate.__class__(*args,**kwargs), _History()) # (surrogate,output_history)
                     new_model_traitnames.add(name)
                     setattr(self, name, surrogate.get_uncertain_value(getattr(newmodel,name)))
                     
@@ -331,7 +455,7 @@ class MetaModel(Component):
             out = getattr(self.model, name)
             setattr(self, name, self._surrogate_info[name][0].get_uncertain_value(out))
             if self._train:
-                self._surrogate_info[name][1].append(out) # save to training output history
+                self._surrogate_info[name][1].set(self._train_row, out) # save to training output history
 
     def list_inputs_to_model(self):
         """Return the list of names of public inputs that correspond 
@@ -1,13 +1,109 @@
 """ Pareto Filter -- finds non-dominated cases. """
 
+import logging
+try:
+    from numpy import array, asarray, lexsort, minimum, zeros, ones, \
+                      empty, arange, inf, newaxis, tril, nonzero, \
+                      all as np_all, any as np_any
+except ImportError as err:
+    logging.warn("In %s: %r" % (__file__, err))
+
 # pylint: disable-msg=E0611,F0401
-from openmdao.main.datatypes.api import Slot, List, ListStr
+from openmdao.main.datatypes.api import Slot, List, ListStr, Bool
 from openmdao.lib.casehandlers.api import CaseSet, caseiter_to_caseset
 
 from openmdao.main.component import Component
 from openmdao.main.interfaces import ICaseIterator
 from openmdao.lib.casehandlers.api import ListCaseIterator
+from openmdao.util.decorators import stub_if_missing_deps
+
+
+_BLOCK_SIZE = 256
+
+def find_nondominated(y):
+    """Returns a boolean array that is True for each row of the 2D array `y`
+    that is not dominated by any other row. Smaller is better in every
+    column. A row is dominated by a different row that is no larger in
+    every column, so identical rows don't dominate each other.
+    
+    The rows are sorted lexicographically first, so a row can only be
+    dominated by rows that come before it. For one or two columns a single
+    sweep over the sorted rows is enough. For more columns the sorted rows
+    are taken in blocks, and each block is compared against the
+    non-dominated rows found so far and then against itself.
+    """
+    y = asarray(y, dtype=float)
+    n, m = y.shape
+    nondom = zeros(n, dtype=bool)
+    if n == 0:
+        return nondom
+    
+    order = lexsort(y.T[::-1])
+    ys = y[order]
+    
+    # groups of identical rows are adjacent after sorting
+    first = ones(n, dtype=bool)
+    first[1:] = np_any(ys[1:] != ys[:-1], axis=1)
+    group = first.cumsum() - 1
+    
+    if m <= 2:
+        # a group is dominated if any earlier group is no larger in the
+        # last column, since earlier groups are no larger in the first
+        last = ys[first, -1]
+        best = empty(len(last))
+        best[0] = inf
+        best[1:] = minimum.accumulate(last)[:-1]
+        if m == 1:
+            best[1:] = -inf  # every later group is larger
+        nondom[order] = (best > last)[group]
+    else:
+        reps = ys[first]
+        keep = zeros(len(reps), dtype=bool)
+        front = empty((0, m))
+        for start in range(0, len(reps), _BLOCK_SIZE):
+            block = reps[start:start+_BLOCK_SIZE]
+            # dom[i,j] is True if front row j dominates block row i
+            dom = np_all(front[newaxis,:,:] <= block[:,newaxis,:], axis=2)
+            idxs = arange(start, start+len(block))[~np_any(dom, axis=1)]
+            block = reps[idxs]
+            # rows in the block can only be dominated by earlier rows in it,
+            # and any row that dominates a dominated row dominates it too
+            dom = np_all(block[newaxis,:,:] <= block[:,newaxis,:], axis=2)
+            dom = tril(dom, -1)
+            keep[idxs[~np_any(dom, axis=1)]] = True
+            front = reps[keep]
+        nondom[order] = keep[group]
+    return nondom
 
+def nondominated_ranks(y):
+    """Returns an integer array containing the number of the non-dominated
+    front that each row of the 2D array `y` belongs to. Front 0 is the set of
+    non-dominated rows, front 1 is the set of rows that are non-dominated
+    once front 0 is removed, and so on.
+    """
+    y = asarray(y, dtype=float)
+    ranks = zeros(len(y), dtype=int)
+    remaining = arange(len(y))
+    rank = 0
+    while len(remaining):
+        nondom = find_nondominated(y[remaining])
+        ranks[remaining[nondom]] = rank
+        remaining = remaining[~nondom]
+        rank += 1
+    return ranks
+
+
+def _subset(case_set, idxs):
+    """Returns a new CaseSet containing the cases at the given indices of
+    `case_set`, in the same order, without creating any Case objects.
+    """
+    values = [case_set._values[i] for i in idxs]
+    subset = case_set._make_case_set(set(values))
+    subset._values = values
+    return subset
+
+
+@stub_if_missing_deps('numpy')
 class ParetoFilter(Component):
     """Takes a set of cases and filters out the subset of cases which are
     pareto optimal. Assumes that smaller values for model responses are
@@ -28,21 +124,17 @@ class ParetoFilter(Component):
                      desc="CaseSet with the cases to be filtered to "
                      "find the pareto optimal subset.")
     
+    rank_fronts = Bool(False, iotype="in",
+                       desc="If True, sort all of the cases into successive "
+                            "non-dominated fronts in pareto_fronts.")
+    
     pareto_set = Slot(CaseSet, iotype="out", 
                         desc="Resulting collection of pareto optimal cases.",copy="shallow")
     dominated_set = Slot(CaseSet, iotype="out",
                            desc="Resulting collection of dominated cases.",copy="shallow")
-    
-    def _is_dominated(self, y1, y2):
-        """Tests to see if the point y1 is dominated by the point y2. 
-        True if y1 is dominated by y2, False otherwise.
-        """
-        if y1 == y2:
-            return False
-        for a,b in zip(y1, y2): 
-            if a<b: return False
-
-        return True
+    pareto_fronts = List(Slot(CaseSet), value=[], iotype="out", copy="shallow",
+                         desc="If rank_fronts is True, a list of the "
+                              "non-dominated fronts, starting with pareto_set.")
     
     def execute(self):
         """Finds and removes pareto optimal points in the given case set.
@@ -57,35 +149,29 @@ class ParetoFilter(Component):
             else: 
                 case_sets.append(ci)
         
-        y_list = []
         if len(case_sets) > 1: 
             case_set = case_sets[0].union(*case_sets[1:])
         else: 
             case_set = case_sets[0]
-        criteria_count = len(self.criteria)
         
         try: 
             # need to transpose the list of outputs
-            y_list = zip(*[case_set[crit] for crit in self.criteria]) 
+            y = array([case_set[crit] for crit in self.criteria], dtype=float).T
         except KeyError: 
             self.raise_exception('no cases provided had all of the outputs '
                  'matching the provided criteria, %s'%self.criteria, ValueError)
-            
-        y_temp = list(y_list)
         
-        self.dominated_set = CaseSet()
-        self.pareto_set = CaseSet() #TODO: need a way to copy casesets
-
-        for point1, case in zip(y_list, iter(case_set)):
-            dominated = False
-            for point2 in y_temp:
-                if self._is_dominated(point1, point2):
-                    self.dominated_set.record(case)
-                    y_temp.remove(point1)
-                    dominated = True
-                    break
-            if not dominated: 
-                self.pareto_set.record(case)
+        if self.rank_fronts:
+            ranks = nondominated_ranks(y)
+            self.pareto_fronts = [_subset(case_set, nonzero(ranks == rank)[0]) 
+                                  for rank in range(ranks.max()+1)]
+            nondom = ranks == 0
+        else:
+            self.pareto_fronts = []
+            nondom = find_nondominated(y)
+        
+        self.pareto_set = _subset(case_set, nonzero(nondom)[0])
+        self.dominated_set = _subset(case_set, nonzero(~nondom)[0])
      
 if __name__ == "__main__": # pragma: no cover  
     
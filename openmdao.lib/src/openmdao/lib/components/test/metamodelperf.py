@@ -0,0 +1,64 @@
+"""
+Measure the time a MetaModel takes in an adaptive sampling loop, where one
+training point is added per iteration and the outputs are predicted after
+each one.
+"""
+
+import random
+import sys
+import time
+
+from openmdao.lib.components.metamodel import MetaModel
+from openmdao.lib.datatypes.api import Float
+from openmdao.lib.surrogatemodels.kriging_surrogate import KrigingSurrogate
+from openmdao.lib.surrogatemodels.response_surface import ResponseSurface
+from openmdao.main.api import Component
+
+
+class Quadratic(Component):
+    """ Sum of the squares of three inputs. """
+
+    x1 = Float(0., iotype='in')
+    x2 = Float(0., iotype='in')
+    x3 = Float(0., iotype='in')
+    y = Float(0., iotype='out')
+
+    def execute(self):
+        self.y = self.x1**2 + 2.*self.x2**2 + 3.*self.x3**2
+
+
+def run_loop(surrogate, npoints, args=None):
+    """ Add `npoints` training points one at a time, predicting after
+    each one. """
+    metamodel = MetaModel()
+    metamodel.surrogate = {'default': surrogate}
+    if args:
+        metamodel.surrogate_args = {'default': args}
+    metamodel.model = Quadratic()
+
+    random.seed(10)
+    start = time.time()
+    for i in range(npoints):
+        for name in ('x1', 'x2', 'x3'):
+            setattr(metamodel, name, random.uniform(-1., 1.))
+        metamodel.train_next = True
+        metamodel.run()
+        if i > 0:
+            metamodel.run()
+    return time.time() - start
+
+
+def main():
+    """ Time the loop for each surrogate. """
+    npoints = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    print 'ResponseSurface, %d points:  %10.4f sec' % \
+          (npoints, run_loop(ResponseSurface(), npoints))
+    nkrig = npoints/5
+    print 'KrigingSurrogate, %d points: %10.4f sec' % \
+          (nkrig, run_loop(KrigingSurrogate(), nkrig))
+    print 'same, fixed thetas:         %10.4f sec' % \
+          run_loop(KrigingSurrogate(), nkrig, {'update_thetas': False})
+
+
+if __name__ == '__main__':
+    main()
@@ -6,7 +6,8 @@ from enthought.traits.api import HasTraits
 
 from openmdao.lib.datatypes.api import Float
 from openmdao.main.api import Assembly, Component, set_as_top, Case
-from openmdao.main.interfaces import implements, ICaseRecorder
+from openmdao.main.interfaces import implements, ICaseRecorder, \
+                                     IIncrementalSurrogate
 
 from openmdao.main.uncertain_distributions import NormalDistribution
 
@@ -14,6 +15,7 @@ from openmdao.lib.casehandlers.api import ListCaseIterator
 from openmdao.lib.components.metamodel import MetaModel
 from openmdao.lib.surrogatemodels.kriging_surrogate import KrigingSurrogate
 from openmdao.lib.surrogatemodels.logistic_regression import LogisticRegression
+from openmdao.lib.surrogatemodels.response_surface import ResponseSurface
 
 from openmdao.util.testutil import assert_rel_error
 
@@ -26,6 +28,34 @@ class DumbRecorder(HasTraits):
         pass
 
 
+class LookupSurrogate(object):
+    """Predicts the output of the closest training point, and keeps track
+    of how it was trained."""
+    implements(IIncrementalSurrogate)
+    
+    def __init__(self):
+        self.X = []
+        self.Y = []
+        self.calls = []
+        
+    def get_uncertain_value(self, value):
+        return value
+    
+    def train(self, X, Y):
+        self.calls.append(('train', len(X)))
+        self.X = [list(x) for x in X]
+        self.Y = list(Y)
+        
+    def add_training_points(self, X, Y):
+        self.calls.append(('add', len(X)))
+        self.X.extend([list(x) for x in X])
+        self.Y.extend(Y)
+        
+    def predict(self, new_x):
+        dists = [sum([(a-b)**2 for a, b in zip(x, new_x)]) for x in self.X]
+        return self.Y[dists.index(min(dists))]
+
+
 class Simple(Component):
     
     a = Float(iotype='in')
@@ -410,7 +440,7 @@ class MetaModelTestCase(unittest.TestCase):
         s.mm.reset_training_data = True
         self.assertEqual(len(s.mm._training_input_history), 0)
         for name, tup in s.mm._surrogate_info.items():
-            self.assertEqual(s.mm._surrogate_info[name][1],[])
+            self.assertEqual(len(s.mm._surrogate_info[name][1]), 0)
 
         #all meta model inputs should remain at their current values
         self.assertEqual(s.mm.x, 10)
@@ -434,6 +464,73 @@ class MetaModelTestCase(unittest.TestCase):
         
         s.run()
         
+    def _train(self, metamodel, points):
+        for a, b in points:
+            metamodel.a = a
+            metamodel.b = b
+            metamodel.train_next = True
+            metamodel.run()
+        metamodel.run()
+        
+    def test_incremental_training(self):
+        metamodel = MetaModel()
+        metamodel.surrogate = {'default':LookupSurrogate()}
+        metamodel.model = Simple()
+        surrogate = metamodel._surrogate_info['c'][0]
+        
+        # b is constant at first, so it is left out of the training set
+        self._train(metamodel, [(1., 2.), (2., 2.)])
+        self.assertEqual(surrogate.calls, [('train', 2)])
+        self.assertEqual(surrogate.X, [[1.], [2.]])
+        
+        self._train(metamodel, [(3., 2.)])
+        self.assertEqual(surrogate.calls[1:], [('add', 1)])
+        self.assertEqual(surrogate.X, [[1.], [2.], [3.]])
+        
+        # once b varies, the surrogate is trained on all the points
+        self._train(metamodel, [(4., 5.)])
+        self.assertEqual(surrogate.calls[2:], [('train', 4)])
+        self.assertEqual(surrogate.X[3], [4., 5.])
+        self.assertEqual(metamodel.c, 9.)
+        
+        # nothing new, so no training
+        metamodel.run()
+        self.assertEqual(len(surrogate.calls), 3)
+        
+    def test_duplicate_points(self):
+        metamodel = MetaModel()
+        metamodel.surrogate = {'default':LookupSurrogate()}
+        metamodel.model = Simple()
+        surrogate = metamodel._surrogate_info['d'][0]
+        
+        self._train(metamodel, [(1., 2.), (2., 3.), (2., 3.)])
+        self.assertEqual(surrogate.calls, [('train', 2)])
+        self.assertEqual(metamodel._num_training_cases, 3)
+        self.assertEqual(len(metamodel._training_input_history), 2)
+        
+        # new outputs for a trained point replace the old ones
+        metamodel.model.execute = lambda: setattr(metamodel.model, 'd', 42.)
+        self._train(metamodel, [(1., 2.)])
+        self.assertEqual(surrogate.calls[1:], [('train', 2)])
+        self.assertEqual(surrogate.Y, [42., -1.])
+        self.assertEqual(metamodel.d, 42.)
+        
+    def test_incremental_response_surface(self):
+        metamodel = MetaModel()
+        metamodel.surrogate = {'default':ResponseSurface()}
+        metamodel.model = Simple()
+        
+        points = [(a, b) for a in (1., 2., 3.) for b in (-1., 0., 1., 4.)]
+        self._train(metamodel, points[:6])
+        self._train(metamodel, points[6:])
+        
+        for a, b in [(1.5, 0.5), (2.5, 3.)]:
+            metamodel.a = a
+            metamodel.b = b
+            metamodel.run()
+            assert_rel_error(self, metamodel.c, a+b, 1e-6)
+            assert_rel_error(self, metamodel.d, a-b, 1e-6)
+        
         
 if __name__ == "__main__":
     unittest.main()
@@ -63,6 +63,45 @@ class ParetoFilterTests(unittest.TestCase):
         self.assertEqual((1, 2, 2, 3, 3, 3),x_dom)
         self.assertEqual((3, 2, 3, 1, 2, 3),y_dom)
         
+    def test_3d_filter(self):
+        pf = ParetoFilter()
+        points = [(1,2,3),(3,2,1),(2,2,2),(1,2,4),(2,3,3),(1,1,4),(3,3,3)]
+        cases = [Case(outputs=[("x",x),("y",y),("z",z)]) for x,y,z in points]
+        pf.case_sets = [ListCaseIterator(cases),]
+        pf.criteria = ['x','y','z']
+        pf.execute()
+
+        p = [(case['x'],case['y'],case['z']) for case in pf.pareto_set]
+        dom = [(case['x'],case['y'],case['z']) for case in pf.dominated_set]
+
+        self.assertEqual([(1,2,3),(3,2,1),(2,2,2),(1,1,4)],p)
+        self.assertEqual([(1,2,4),(2,3,3),(3,3,3)],dom)
+        self.assertEqual([],pf.pareto_fronts)
+
+    def test_rank_fronts(self):
+        pf = ParetoFilter()
+        x = [1,1,1,2,2,2,3,3,3]
+        y = [1,2,3,1,2,3,1,2,3]
+        cases = []
+        for x_0,y_0 in zip(x,y):
+            cases.append(Case(outputs=[("x",x_0),("y",y_0)]))
+
+        pf.case_sets = [ListCaseIterator(cases),]
+        pf.criteria = ['x','y']
+        pf.rank_fronts = True
+        pf.execute()
+
+        fronts = [[(case['x'],case['y']) for case in front]
+                  for front in pf.pareto_fronts]
+        self.assertEqual([[(1,1)],
+                          [(1,2),(2,1)],
+                          [(1,3),(2,2),(3,1)],
+                          [(2,3),(3,2)],
+                          [(3,3)]], fronts)
+        self.assertEqual(fronts[0],
+                         [(case['x'],case['y']) for case in pf.pareto_set])
+        self.assertEqual(8, len(pf.dominated_set))
+
     def test_bad_case_set(self): 
         pf = ParetoFilter()
         x = [1,1,2,2,2,3,3,3,]
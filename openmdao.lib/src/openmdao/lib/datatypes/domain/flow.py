@@ -1,6 +1,8 @@
 import copy
 import numpy
 
+from openmdao.lib.datatypes.domain.vector import _replicate
+
 VERTEX = 'Vertex'
 CELL_CENTER = 'CellCenter'
 _GRID_LOCATIONS = (VERTEX, CELL_CENTER)
@@ -202,7 +204,7 @@ class FlowSolution(object):
                 ghosts=None):
         """
         Construct a new :class:`FlowSolution` from data extracted from the
-        specified region.
+        specified region.  The new arrays are views of this object's data.
 
         imin, imax, jmin, jmax, kmin, kmax: int
             Specifies the region to extract neglecting ghost/rind planes.
@@ -397,105 +399,25 @@ class FlowSolution(object):
         if i == 3:
             if axis not in ('i', 'j', 'k'):
                 raise ValueError('axis must be i, j, or k')
-            return self._extend_3d(axis, delta, npoints)
+            return self._extend(axis, delta, npoints)
         elif i == 2:
             if axis not in ('i', 'j'):
                 raise ValueError('axis must be i or j')
-            return self._extend_2d(axis, delta, npoints)
+            return self._extend(axis, delta, npoints)
         elif i == 1:
             if axis != 'i':
                 raise ValueError('axis must be i')
-            return self._extend_1d(delta, npoints)
+            return self._extend(axis, delta, npoints)
         else:
             raise RuntimeError('FlowSolution is empty!')
 
-    def _extend_3d(self, axis, delta, npoints):
-        """ 3D (index space) extension. """
-        imax, jmax, kmax = self.real_shape
-        if axis == 'i':
-            new_shape = (imax + npoints, jmax, kmax)
-            indx = imax if delta > 0 else npoints
-        elif axis == 'j':
-            new_shape = (imax, jmax + npoints, kmax)
-            indx = jmax if delta > 0 else npoints
-        else:
-            new_shape = (imax, jmax, kmax + npoints)
-            indx = kmax if delta > 0 else npoints
-
-        flow = FlowSolution()
-        for arr in self._arrays:
-            new_arr = numpy.zeros(new_shape)
-            if axis == 'i':
-                if delta > 0:
-                    new_arr[0:indx, :, :] = arr
-                    for i in range(npoints):
-                        new_arr[indx+i, :, :] = arr[-1, :, :]
-                else:
-                    new_arr[indx:, :, :] = arr
-                    for i in range(npoints):
-                        new_arr[i, :, :] = arr[0, :, :]
-            elif axis == 'j':
-                if delta > 0:
-                    new_arr[:, 0:indx, :] = arr
-                    for j in range(npoints):
-                        new_arr[:, indx+j, :] = arr[:, -1, :]
-                else:
-                    new_arr[:, indx:, :] = arr
-                    for j in range(npoints):
-                        new_arr[:, j, :] = arr[:, 0, :]
-            else:
-                if delta > 0:
-                    new_arr[:, :, 0:indx] = arr
-                    for k in range(npoints):
-                        new_arr[:, :, indx+k] = arr[:, :, -1]
-                else:
-                    new_arr[:, :, indx:] = arr
-                    for k in range(npoints):
-                        new_arr[:, :, k] = arr[:, :, 0]
-            flow.add_array(self.name_of_obj(arr), new_arr)
-
-        for vector in self._vectors:
-            flow.add_vector(self.name_of_obj(vector),
-                            vector.extend(axis, delta, npoints))
-
-        flow.grid_location = self.grid_location
-        flow.ghosts = copy.copy(self._ghosts)
-        flow._copy_scalars(self)
-        return flow
-
-    def _extend_2d(self, axis, delta, npoints):
-        """ 2D (index space) extension. """
-        imax, jmax = self.real_shape
-
-        if axis == 'i':
-            new_shape = (imax + npoints, jmax)
-            indx = imax if delta > 0 else npoints
-        else:
-            new_shape = (imax, jmax + npoints)
-            indx = jmax if delta > 0 else npoints
-
+    def _extend(self, axis, delta, npoints):
+        """ Extension along `axis` for any index dimension. """
+        index = 'ijk'.index(axis)
         flow = FlowSolution()
         for arr in self._arrays:
-            new_arr = numpy.zeros(new_shape)
-            if axis == 'i':
-                if delta > 0:
-                    new_arr[0:indx, :] = arr
-                    for i in range(npoints):
-                        new_arr[indx+i, :] = arr[-1, :]
-                else:
-                    new_arr[indx:, :] = arr
-                    for i in range(npoints):
-                        new_arr[i, :] = arr[0, :]
-            else:
-                if delta > 0:
-                    new_arr[:, 0:indx] = arr
-                    for j in range(npoints):
-                        new_arr[:, indx+j] = arr[:, -1]
-                else:
-                    new_arr[:, indx:] = arr
-                    for j in range(npoints):
-                        new_arr[:, j] = arr[:, 0]
-            flow.add_array(self.name_of_obj(arr), new_arr)
+            flow.add_array(self.name_of_obj(arr),
+                           _replicate(arr, index, delta, npoints))
 
         for vector in self._vectors:
             flow.add_vector(self.name_of_obj(vector),
@@ -506,34 +428,6 @@ class FlowSolution(object):
         flow._copy_scalars(self)
         return flow
 
-    def _extend_1d(self, delta, npoints):
-        """ 1D (index space) extension. """
-        imax, = self.real_shape
-        new_shape = (imax + npoints,)
-        indx = imax if delta > 0 else npoints
-
-        flow = FlowSolution()
-        for arr in self._arrays:
-            new_arr = numpy.zeros(new_shape)
-            if delta > 0:
-                new_arr[0:indx] = arr
-                for i in range(npoints):
-                    new_arr[indx+i] = arr[-1]
-            else:
-                new_arr[indx:] = arr
-                for i in range(npoints):
-                    new_arr[i] = arr[0]
-            flow.add_array(self.name_of_obj(arr), new_arr)
-
-        for vector in self._vectors:
-            flow.add_vector(self.name_of_obj(vector),
-                            vector.extend('i', delta, npoints))
-
-        flow.grid_location = self.grid_location
-        flow.ghosts = copy.copy(self._ghosts)
-        flow._copy_scalars(self)
-        return flow
-
     def name_of_obj(self, obj):
         """ Return name of object or None if not found. """
         for name, value in self.__dict__.items():
@@ -155,7 +155,7 @@ class GridCoordinates(Vector):
                 ghosts=None):
         """
         Construct a new :class:`GridCoordinates` from data extracted from the
-        specified region.
+        specified region.  The new arrays are views of this object's data.
 
         imin, imax, jmin, jmax, kmin, kmax: int
             Specifies the region to extract neglecting ghost/rind planes.
@@ -272,7 +272,7 @@ class GridCoordinates(Vector):
     def _extrap_3d(axis, delta, npoints, arr, new_shape, normal):
         """ Return extrapolated `arr`. """
         imax, jmax, kmax = arr.shape
-        new_arr = numpy.zeros(new_shape)
+        new_arr = numpy.empty(new_shape)
 
         if axis == 'i':
             if delta > 0:
@@ -410,7 +410,7 @@ class GridCoordinates(Vector):
     def _extrap_2d(axis, delta, npoints, arr, new_shape, normal):
         """ Return extrapolated `arr`. """
         imax, jmax = arr.shape
-        new_arr = numpy.zeros(new_shape)
+        new_arr = numpy.empty(new_shape)
 
         if axis == 'i':
             if delta > 0:
@@ -489,7 +489,7 @@ class GridCoordinates(Vector):
     def _extrap_1d(delta, npoints, arr, new_shape, normal):
         """ Return extrapolated `arr`. """
         imax, = arr.shape
-        new_arr = numpy.zeros(new_shape)
+        new_arr = numpy.empty(new_shape)
 
         if delta > 0:
             v = arr[-1]
@@ -605,17 +605,17 @@ class GridCoordinates(Vector):
             if self.x is None:
                 raise AttributeError('no X coordinates')
             else:
-                self.x += delta_x
+                self.x = self.x + delta_x
 
         if delta_y:
             if self.y is None:
                 raise AttributeError('no Y coordinates')
             else:
-                self.y += delta_y
+                self.y = self.y + delta_y
 
         if delta_z:
             if self.z is None:
                 raise AttributeError('no Z coordinates')
             else:
-                self.z += delta_z
+                self.z = self.z + delta_z
 
@@ -10,7 +10,7 @@ be used with polar (2D) or cylindrical (3D) coordinates. :meth:`calculate`
 should be prepared for this.
 """
 
-from math import sqrt
+from numpy import sqrt
 
 from openmdao.units.units import PhysicalQuantity
 
@@ -43,6 +43,11 @@ def register_metric(name, cls, integrate, geometry='any'):
         :meth:`dimensionalize` is called with the accumulated value.
         It should return a :class:`PhysicalQuantity` for the dimensionalized
         value.
+        If the class also has :meth:`calculate_region`, it is used instead
+        of :meth:`calculate` to process an entire region at once. In that
+        case `loc` is a tuple of slices into the zone variable arrays and
+        `geom` is an array (or tuple of arrays for a normal) with the same
+        shape as the sliced arrays. It should return an array of values.
 
     integrate: bool
         If True, then calculated values are integrated, not averaged.
@@ -55,6 +60,16 @@ def register_metric(name, cls, integrate, geometry='any'):
     _METRICS[name] = (cls, integrate, geometry)
 
 
+def _values(arr, loc):
+    """
+    Return float value(s) of `arr` at `loc`, which may be either indices or
+    slices. Returns zero if `arr` is None.
+    """
+    if arr is None:
+        return 0.
+    return arr[loc].astype(float)
+
+
 def get_metric(name):
     """ Return ``(cls, integrate, geometry)``. """
     return _METRICS[name]
@@ -78,11 +93,13 @@ class %(cls_name)s(object):
     """ Computes %(var_name)s. """
 
     def __init__(self, zone, zone_name, reference_state):
-        self.%(var_name)s = zone.flow_solution.%(var_name)s.item
+        self.%(var_name)s = zone.flow_solution.%(var_name)s
 
     def calculate(self, loc, length):
         """ Return metric value. """
-        return self.%(var_name)s(*loc)
+        return _values(self.%(var_name)s, loc)
+
+    calculate_region = calculate
 
     def dimensionalize(self, value):
         """ Return dimensional `value`. """
@@ -111,11 +128,13 @@ class Area(object):
     def calculate(self, loc, normal):
         """ Return metric value. """
         sc1, sc2, sc3 = normal
-        sc1 *= self.aref
-        sc2 *= self.aref
-        sc3 *= self.aref
+        sc1 = sc1 * self.aref
+        sc2 = sc2 * self.aref
+        sc3 = sc3 * self.aref
         return sqrt(sc1*sc1 + sc2*sc2 + sc3*sc3)
 
+    calculate_region = calculate
+
     def dimensionalize(self, value):
         """ Return dimensional `value`. """
         return PhysicalQuantity(value, self.units)
@@ -142,6 +161,8 @@ class Length(object):
         """ Return metric value. """
         return length * self.lref
 
+    calculate_region = calculate
+
     def dimensionalize(self, value):
         """ Return dimensional `value`. """
         return PhysicalQuantity(value, self.units)
@@ -186,25 +207,27 @@ class MassFlow(object):
             self.momref = momref.value
 
         if cylindrical:
-            self.mom_c1 = None if momentum.z is None else momentum.z.item
-            self.mom_c2 = momentum.r.item
-            self.mom_c3 = momentum.t.item
+            self.mom_c1 = momentum.z
+            self.mom_c2 = momentum.r
+            self.mom_c3 = momentum.t
         else:
-            self.mom_c1 = momentum.x.item
-            self.mom_c2 = None if momentum.y is None else momentum.y.item
-            self.mom_c3 = None if momentum.z is None else momentum.z.item
+            self.mom_c1 = momentum.x
+            self.mom_c2 = momentum.y
+            self.mom_c3 = momentum.z
 
     def calculate(self, loc, normal):
         """ Return metric value. """
-        rvu = 0. if self.mom_c1 is None else self.mom_c1(*loc) * self.momref
-        rvv = 0. if self.mom_c2 is None else self.mom_c2(*loc) * self.momref
-        rvw = 0. if self.mom_c3 is None else self.mom_c3(*loc) * self.momref
+        rvu = _values(self.mom_c1, loc) * self.momref
+        rvv = _values(self.mom_c2, loc) * self.momref
+        rvw = _values(self.mom_c3, loc) * self.momref
         sc1, sc2, sc3 = normal
-        sc1 *= self.aref
-        sc2 *= self.aref
-        sc3 *= self.aref
+        sc1 = sc1 * self.aref
+        sc2 = sc2 * self.aref
+        sc3 = sc3 * self.aref
         return rvu*sc1 + rvv*sc2 + rvw*sc3
 
+    calculate_region = calculate
+
     def dimensionalize(self, value):
         """ Dimensionalize `value`. """
         return PhysicalQuantity(value, self.wref.get_unit_name())
@@ -222,15 +245,15 @@ class CorrectedMassFlow(object):
         # 'pressure' required until we can determine dimensionalized
         # static pressure from 'Q' variables.
         try:
-            self.density = flow.density.item
+            self.density = flow.density
             momentum = flow.momentum
-            self.pressure = flow.pressure.item
+            self.pressure = flow.pressure
         except AttributeError:
             vnames = ('density', 'momentum', 'pressure')
             raise AttributeError('For corrected_mass_flow, zone %s is missing'
                                  ' one or more of %s.' % (zone_name, vnames))
         try:
-            self.gam = flow.gamma.item
+            self.gam = flow.gamma
         except AttributeError:
             self.gam = None  # Use passed-in scalar gamma.
 
@@ -271,29 +294,29 @@ class CorrectedMassFlow(object):
         self.tstd = tstd.value
 
         if cylindrical:
-            self.mom_c1 = None if momentum.z is None else momentum.z.item
-            self.mom_c2 = momentum.r.item
-            self.mom_c3 = momentum.t.item
+            self.mom_c1 = momentum.z
+            self.mom_c2 = momentum.r
+            self.mom_c3 = momentum.t
         else:
-            self.mom_c1 = momentum.x.item
-            self.mom_c2 = None if momentum.y is None else momentum.y.item
-            self.mom_c3 = None if momentum.z is None else momentum.z.item
+            self.mom_c1 = momentum.x
+            self.mom_c2 = momentum.y
+            self.mom_c3 = momentum.z
 
     def calculate(self, loc, normal):
         """ Return metric value. """
-        rho = self.density(*loc) * self.rhoref
-        rvu = 0. if self.mom_c1 is None else self.mom_c1(*loc) * self.momref
-        rvv = 0. if self.mom_c2 is None else self.mom_c2(*loc) * self.momref
-        rvw = 0. if self.mom_c3 is None else self.mom_c3(*loc) * self.momref
-        ps = self.pressure(*loc) * self.pref
+        rho = _values(self.density, loc) * self.rhoref
+        rvu = _values(self.mom_c1, loc) * self.momref
+        rvv = _values(self.mom_c2, loc) * self.momref
+        rvw = _values(self.mom_c3, loc) * self.momref
+        ps = _values(self.pressure, loc) * self.pref
         if self.gam is not None:
-            gamma = self.gam(*loc)
+            gamma = _values(self.gam, loc)
         else:
             gamma = self.gamma
         sc1, sc2, sc3 = normal
-        sc1 *= self.aref
-        sc2 *= self.aref
-        sc3 *= self.aref
+        sc1 = sc1 * self.aref
+        sc2 = sc2 * self.aref
+        sc3 = sc3 * self.aref
         w = rvu*sc1 + rvv*sc2 + rvw*sc3
 
         u2 = (rvu*rvu + rvv*rvv + rvw*rvw) / (rho*rho)
@@ -306,6 +329,8 @@ class CorrectedMassFlow(object):
 
         return w * sqrt(tt/self.tstd) / (pt/self.pstd)
 
+    calculate_region = calculate
+
     def dimensionalize(self, value):
         """ Dimensionalize `value`. """
         return PhysicalQuantity(value, self.wref.get_unit_name())
@@ -321,20 +346,20 @@ class StaticPressure(object):
         cylindrical = zone.coordinate_system == CYLINDRICAL
 
         try:  # Some codes have this directly available.
-            self.pressure = flow.pressure.item
+            self.pressure = flow.pressure
         except AttributeError:
             self.pressure = None
             try:  # Look for typical Q variables.
-                self.density = flow.density.item
+                self.density = flow.density
                 momentum = flow.momentum
-                self.energy = flow.energy_stagnation_density.item
+                self.energy = flow.energy_stagnation_density
             except AttributeError:
                 vnames = ('pressure', 'density', 'momentum',
                           'energy_stagnation_density')
                 raise AttributeError('For pressure, zone %s is missing'
                                      ' one or more of %s.' % (zone_name, vnames))
         try:
-            self.gam = flow.gamma.item
+            self.gam = flow.gamma
         except AttributeError:
             self.gam = None  # Use passed-in scalar gamma.
 
@@ -376,31 +401,33 @@ class StaticPressure(object):
 
         if self.pressure is None:
             if cylindrical:
-                self.mom_c1 = None if momentum.z is None else momentum.z.item
-                self.mom_c2 = momentum.r.item
-                self.mom_c3 = momentum.t.item
+                self.mom_c1 = momentum.z
+                self.mom_c2 = momentum.r
+                self.mom_c3 = momentum.t
             else:
-                self.mom_c1 = momentum.x.item
-                self.mom_c2 = None if momentum.y is None else momentum.y.item
-                self.mom_c3 = None if momentum.z is None else momentum.z.item
+                self.mom_c1 = momentum.x
+                self.mom_c2 = momentum.y
+                self.mom_c3 = momentum.z
 
     def calculate(self, loc, geom):
         """ Return metric value. """
         if self.pressure is not None:
-            return self.pressure(*loc) * self.pref
+            return _values(self.pressure, loc) * self.pref
         else:
-            rho = self.density(*loc) * self.rhoref
-            vu = 0. if self.mom_c1 is None else self.mom_c1(*loc) * self.momref / rho
-            vv = 0. if self.mom_c2 is None else self.mom_c2(*loc) * self.momref / rho
-            vw = 0. if self.mom_c3 is None else self.mom_c3(*loc) * self.momref / rho
-            e0 = self.energy(*loc) * self.e0ref / rho
+            rho = _values(self.density, loc) * self.rhoref
+            vu = _values(self.mom_c1, loc) * self.momref / rho
+            vv = _values(self.mom_c2, loc) * self.momref / rho
+            vw = _values(self.mom_c3, loc) * self.momref / rho
+            e0 = _values(self.energy, loc) * self.e0ref / rho
             if self.gam is not None:
-                gamma = self.gam(*loc)
+                gamma = _values(self.gam, loc)
             else:
                 gamma = self.gamma
 
             return (gamma-1.) * rho * (e0 - 0.5*(vu*vu + vv*vv + vw*vw))
 
+    calculate_region = calculate
+
     def dimensionalize(self, value):
         """ Dimensionalize `value`. """
         return PhysicalQuantity(value, self.units)
@@ -416,24 +443,24 @@ class TotalPressure(object):
         cylindrical = zone.coordinate_system == CYLINDRICAL
 
         try:
-            self.density = flow.density.item
+            self.density = flow.density
             momentum = flow.momentum
         except AttributeError:
             vnames = ('density', 'momentum')
             raise AttributeError('For pressure_stagnation, zone %s is missing'
                              ' one or more of %s.' % (zone_name, vnames))
         try:
-            self.pressure = flow.pressure.item
+            self.pressure = flow.pressure
         except AttributeError:
             self.pressure = None
             try:
-                self.energy = flow.energy_stagnation_density.item
+                self.energy = flow.energy_stagnation_density
             except AttributeError:
                 vnames = ('pressure', 'energy_stagnation_density')
                 raise AttributeError('For pressure_stagnation, zone %s is missing'
                                      ' one or more of %s.' % (zone_name, vnames))
         try:
-            self.gam = flow.gamma.item
+            self.gam = flow.gamma
         except AttributeError:
             self.gam = None  # Use passed-in scalar gamma.
 
@@ -468,35 +495,37 @@ class TotalPressure(object):
             self.pref = pref.value
 
         if cylindrical:
-            self.mom_c1 = None if momentum.z is None else momentum.z.item
-            self.mom_c2 = momentum.r.item
-            self.mom_c3 = momentum.t.item
+            self.mom_c1 = momentum.z
+            self.mom_c2 = momentum.r
+            self.mom_c3 = momentum.t
         else:
-            self.mom_c1 = momentum.x.item
-            self.mom_c2 = None if momentum.y is None else momentum.y.item
-            self.mom_c3 = None if momentum.z is None else momentum.z.item
+            self.mom_c1 = momentum.x
+            self.mom_c2 = momentum.y
+            self.mom_c3 = momentum.z
 
     def calculate(self, loc, geom):
         """ Return metric value. """
-        rho = self.density(*loc) * self.rhoref
-        vu = 0. if self.mom_c1 is None else self.mom_c1(*loc) * self.momref / rho
-        vv = 0. if self.mom_c2 is None else self.mom_c2(*loc) * self.momref / rho
-        vw = 0. if self.mom_c3 is None else self.mom_c3(*loc) * self.momref / rho
+        rho = _values(self.density, loc) * self.rhoref
+        vu = _values(self.mom_c1, loc) * self.momref / rho
+        vv = _values(self.mom_c2, loc) * self.momref / rho
+        vw = _values(self.mom_c3, loc) * self.momref / rho
         if self.gam is not None:
-            gamma = self.gam(*loc)
+            gamma = _values(self.gam, loc)
         else:
             gamma = self.gamma
 
         u2 = vu*vu + vv*vv + vw*vw
         if self.pressure is not None:
-            ps = self.pressure(*loc) * self.pref
+            ps = _values(self.pressure, loc) * self.pref
         else:
-            e0 = self.energy(*loc) * self.e0ref / rho
+            e0 = _values(self.energy, loc) * self.e0ref / rho
             ps = (gamma-1.) * rho * (e0 - 0.5*u2)
         a2 = (gamma * ps) / rho
         mach2 = u2 / a2
         return ps * pow(1. + (gamma-1.)/2. * mach2, gamma/(gamma-1.))
 
+    calculate_region = calculate
+
     def dimensionalize(self, value):
         """ Dimensionalize `value`. """
         return PhysicalQuantity(value, self.units)
@@ -512,23 +541,23 @@ class StaticTemperature(object):
         cylindrical = zone.coordinate_system == CYLINDRICAL
 
         try:
-            self.density = flow.density.item
+            self.density = flow.density
         except AttributeError:
             raise AttributeError('For temperature, zone %s is missing'
                                  ' density.' % zone_name)
         try:
-            self.pressure = flow.pressure.item
+            self.pressure = flow.pressure
         except AttributeError:
             self.pressure = None
             try:  # Look for typical Q variables.
                 momentum = flow.momentum
-                self.energy = flow.energy_stagnation_density.item
+                self.energy = flow.energy_stagnation_density
             except AttributeError:
                 vnames = ('pressure', 'momentum', 'energy_stagnation_density')
                 raise AttributeError('For temperature, zone %s is missing'
                                      ' one or more of %s.' % (zone_name, vnames))
         try:
-            self.gam = flow.gamma.item
+            self.gam = flow.gamma
         except AttributeError:
             self.gam = None  # Use passed-in scalar gamma.
 
@@ -569,31 +598,33 @@ class StaticTemperature(object):
 
         if self.pressure is None:
             if cylindrical:
-                self.mom_c1 = None if momentum.z is None else momentum.z.item
-                self.mom_c2 = momentum.r.item
-                self.mom_c3 = momentum.t.item
+                self.mom_c1 = momentum.z
+                self.mom_c2 = momentum.r
+                self.mom_c3 = momentum.t
             else:
-                self.mom_c1 = momentum.x.item
-                self.mom_c2 = None if momentum.y is None else momentum.y.item
-                self.mom_c3 = None if momentum.z is None else momentum.z.item
+                self.mom_c1 = momentum.x
+                self.mom_c2 = momentum.y
+                self.mom_c3 = momentum.z
 
     def calculate(self, loc, geom):
         """ Return metric value. """
-        rho = self.density(*loc) * self.rhoref
+        rho = _values(self.density, loc) * self.rhoref
         if self.pressure is not None:
-            ps = self.pressure(*loc) * self.pref
+            ps = _values(self.pressure, loc) * self.pref
         else:
-            vu = 0. if self.mom_c1 is None else self.mom_c1(*loc) * self.momref / rho
-            vv = 0. if self.mom_c2 is None else self.mom_c2(*loc) * self.momref / rho
-            vw = 0. if self.mom_c3 is None else self.mom_c3(*loc) * self.momref / rho
-            e0 = self.energy(*loc) * self.e0ref / rho
+            vu = _values(self.mom_c1, loc) * self.momref / rho
+            vv = _values(self.mom_c2, loc) * self.momref / rho
+            vw = _values(self.mom_c3, loc) * self.momref / rho
+            e0 = _values(self.energy, loc) * self.e0ref / rho
             if self.gam is not None:
-                gamma = self.gam(*loc)
+                gamma = _values(self.gam, loc)
             else:
                 gamma = self.gamma
             ps = (gamma-1.) * rho * (e0 - 0.5*(vu*vu + vv*vv + vw*vw))
         return ps / (rho * self.rgas)
 
+    calculate_region = calculate
+
     def dimensionalize(self, value):
         """ Dimensionalize `value`. """
         return PhysicalQuantity(value, self.tref.get_unit_name())
@@ -609,24 +640,24 @@ class TotalTemperature(object):
         cylindrical = zone.coordinate_system == CYLINDRICAL
 
         try:
-            self.density = flow.density.item
+            self.density = flow.density
             momentum = flow.momentum
         except AttributeError:
             vnames = ('density', 'momentum')
             raise AttributeError('For temperature_stagnation, zone %s is missing'
                                  ' one or more of %s.' % (zone_name, vnames))
         try:
-            self.pressure = flow.pressure.item
+            self.pressure = flow.pressure
         except AttributeError:
             self.pressure = None
             try:
-                self.energy = flow.energy_stagnation_density.item
+                self.energy = flow.energy_stagnation_density
             except AttributeError:
                 vnames = ('pressure', 'energy_stagnation_density')
                 raise AttributeError('For temperature_stagnation, zone %s is'
                                      ' one or more of %s.' % (zone_name, vnames))
         try:
-            self.gam = flow.gamma.item
+            self.gam = flow.gamma
         except AttributeError:
             self.gam = None  # Use passed-in scalar gamma.
 
@@ -662,36 +693,38 @@ class TotalTemperature(object):
             self.tref = tref
 
         if cylindrical:
-            self.mom_c1 = None if momentum.z is None else momentum.z.item
-            self.mom_c2 = momentum.r.item
-            self.mom_c3 = momentum.t.item
+            self.mom_c1 = momentum.z
+            self.mom_c2 = momentum.r
+            self.mom_c3 = momentum.t
         else:
-            self.mom_c1 = momentum.x.item
-            self.mom_c2 = None if momentum.y is None else momentum.y.item
-            self.mom_c3 = None if momentum.z is None else momentum.z.item
+            self.mom_c1 = momentum.x
+            self.mom_c2 = momentum.y
+            self.mom_c3 = momentum.z
 
     def calculate(self, loc, geom):
         """ Return metric value. """
-        rho = self.density(*loc) * self.rhoref
-        vu = 0. if self.mom_c1 is None else self.mom_c1(*loc) * self.momref / rho
-        vv = 0. if self.mom_c2 is None else self.mom_c2(*loc) * self.momref / rho
-        vw = 0. if self.mom_c3 is None else self.mom_c3(*loc) * self.momref / rho
+        rho = _values(self.density, loc) * self.rhoref
+        vu = _values(self.mom_c1, loc) * self.momref / rho
+        vv = _values(self.mom_c2, loc) * self.momref / rho
+        vw = _values(self.mom_c3, loc) * self.momref / rho
         if self.gam is not None:
-            gamma = self.gam(*loc)
+            gamma = _values(self.gam, loc)
         else:
             gamma = self.gamma
 
         u2 = vu*vu + vv*vv + vw*vw
         if self.pressure is not None:
-            ps = self.pressure(*loc) * self.pref
+            ps = _values(self.pressure, loc) * self.pref
         else:
-            e0 = self.energy(*loc) * self.e0ref / rho
+            e0 = _values(self.energy, loc) * self.e0ref / rho
             ps = (gamma-1.) * rho * (e0 - 0.5*u2)
         a2 = (gamma * ps) / rho
         mach2 = u2 / a2
         ts = ps / (rho * self.rgas)
         return ts * (1. + (gamma-1.)/2. * mach2)
 
+    calculate_region = calculate
+
     def dimensionalize(self, value):
         """ Dimensionalize `value`. """
         return PhysicalQuantity(value, self.tref.get_unit_name())
@@ -705,6 +738,7 @@ class Volume(object):
     def __init__(self, zone, zone_name, reference_state):
         if reference_state is None:
             self.units = None
+            self.volref = 1.
         else:
             try:
                 lref = reference_state['length_reference']
@@ -719,6 +753,8 @@ class Volume(object):
         """ Return metric value. """
         return volume * self.volref
 
+    calculate_region = calculate
+
     def dimensionalize(self, value):
         """ Return dimensional `value`. """
         return PhysicalQuantity(value, self.units)
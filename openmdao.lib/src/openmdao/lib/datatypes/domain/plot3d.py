@@ -29,6 +29,20 @@ unformatted: bool
     If True, the data is surrounded by Fortran record length markers.
     Only meaningful if `binary`.
 
+memmap: bool
+    If True, data arrays are :class:`numpy.memmap` views of the file rather
+    than being read into memory, so only the zones actually accessed are
+    loaded.  Only meaningful if `binary`.  The maps stay valid only while
+    the file's contents do; the writers here replace their files rather than
+    overwriting them in place, so a mapped domain can be written back to the
+    files it was read from.  Truncating or rewriting such a file by other
+    means will crash the process when the mapped data is next accessed.
+
+max_workers: int
+    Maximum number of zones written concurrently.  Each zone is written to
+    its precomputed position in the file by a separate worker thread.
+    Only meaningful if `binary`.
+
 logger: Logger or None
     Used to record progress.
 
@@ -37,10 +51,16 @@ Fortran unformatted file.  When writing, zones are assumed in Cartesian
 coordinates with data located at the vertices.
 """
 
+import os
+import Queue
+import sys
+import tempfile
+
 import numpy
 
 from openmdao.util.log import NullLogger
 from openmdao.util.stream import Stream
+from openmdao.util.wrkpool import WorkerPool
 
 from openmdao.lib.datatypes.domain.domain import DomainObj
 from openmdao.lib.datatypes.domain.zone import Zone
@@ -49,7 +69,8 @@ from openmdao.lib.datatypes.domain.vector import Vector
 
 def read_plot3d_q(grid_file, q_file, multiblock=True, dim=3, blanking=False,
                   planes=False, binary=True, big_endian=False,
-                  single_precision=True, unformatted=True, logger=None):
+                  single_precision=True, unformatted=True, logger=None,
+                  memmap=False):
     """
     Returns a :class:`DomainObj` initialized from Plot3D `grid_file` and
     `q_file`.  Q variables are assigned to 'density', 'momentum', and
@@ -66,7 +87,8 @@ def read_plot3d_q(grid_file, q_file, multiblock=True, dim=3, blanking=False,
 
     domain = read_plot3d_grid(grid_file, multiblock, dim, blanking, planes,
                               binary, big_endian, single_precision,
-                              unformatted, logger)
+                              unformatted, logger, memmap)
+    memmap = memmap and binary
 
     mode = 'rb' if binary else 'r'
     with open(q_file, mode) as inp:
@@ -116,14 +138,15 @@ def read_plot3d_q(grid_file, q_file, multiblock=True, dim=3, blanking=False,
             name = domain.zone_name(zone)
             logger.debug('reading data for %s', name)
             _read_plot3d_qscalars(zone, stream, logger)
-            _read_plot3d_qvars(zone, stream, planes, logger)
+            _read_plot3d_qvars(zone, stream, planes, memmap, logger)
 
     return domain
 
 
 def read_plot3d_f(grid_file, f_file, varnames=None, multiblock=True, dim=3,
                   blanking=False, planes=False, binary=True, big_endian=False,
-                  single_precision=True, unformatted=True, logger=None):
+                  single_precision=True, unformatted=True, logger=None,
+                  memmap=False):
     """
     Returns a :class:`DomainObj` initialized from Plot3D `grid_file` and
     `f_file`.  Variables are assigned to names of the form `f_N`.
@@ -138,7 +161,8 @@ def read_plot3d_f(grid_file, f_file, varnames=None, multiblock=True, dim=3,
 
     domain = read_plot3d_grid(grid_file, multiblock, dim, blanking, planes,
                               binary, big_endian, single_precision,
-                              unformatted, logger)
+                              unformatted, logger, memmap)
+    memmap = memmap and binary
 
     mode = 'rb' if binary else 'r'
     with open(f_file, mode) as inp:
@@ -189,13 +213,14 @@ def read_plot3d_f(grid_file, f_file, varnames=None, multiblock=True, dim=3,
             name = domain.zone_name(zone)
             logger.debug('reading data for %s', name)
             _read_plot3d_fvars(zone, stream, dim, nvars, varnames, planes,
-                               logger)
+                               memmap, logger)
     return domain
 
 
 def read_plot3d_grid(grid_file, multiblock=True, dim=3, blanking=False,
                      planes=False, binary=True, big_endian=False,
-                     single_precision=True, unformatted=True, logger=None):
+                     single_precision=True, unformatted=True, logger=None,
+                     memmap=False):
     """
     Returns a :class:`DomainObj` initialized from Plot3D `grid_file`.
 
@@ -203,6 +228,7 @@ def read_plot3d_grid(grid_file, multiblock=True, dim=3, blanking=False,
         Grid filename.
     """
     logger = logger or NullLogger()
+    memmap = memmap and binary
     domain = DomainObj()
 
     mode = 'rb' if binary else 'r'
@@ -220,7 +246,7 @@ def read_plot3d_grid(grid_file, multiblock=True, dim=3, blanking=False,
             name = domain.zone_name(zone)
             logger.debug('reading coordinates for %s', name)
             _read_plot3d_coords(zone, stream, shape[i], blanking, planes,
-                                logger)
+                                memmap, logger)
     return domain
 
 
@@ -311,11 +337,9 @@ def _read_plot3d_dims(stream, dim, f_file=False):
         return (imax, jmax, kmax)
 
 
-def _read_plot3d_coords(zone, stream, shape, blanking, planes, logger):
+def _read_plot3d_coords(zone, stream, shape, blanking, planes, memmap,
+                        logger):
     """ Reads coordinates (& blanking) from given Plot3D stream. """
-    if blanking:
-        raise NotImplementedError('blanking not supported yet')
-
     if planes:
         raise NotImplementedError('planar format not supported yet')
 
@@ -323,27 +347,27 @@ def _read_plot3d_coords(zone, stream, shape, blanking, planes, logger):
 
     if stream.unformatted:
         if dim > 2:
-            total = 3 * shape[0] * shape[1] * shape[2]
+            count = shape[0] * shape[1] * shape[2]
         else:
-            total = 2 * shape[0] * shape[1]
+            count = shape[0] * shape[1]
         reclen = stream.read_recordmark()
-        expected = stream.reclen_floats(total)
+        expected = stream.reclen_floats(dim * count)
+        if blanking:
+            expected += stream.reclen_ints(count)
         if reclen != expected:
             logger.warning('unexpected coords recordlength'
                            ' %d vs. %d', reclen, expected)
 
-    zone.grid_coordinates.x = stream.read_floats(shape, order='Fortran')
-    logger.debug('    x min %g, max %g',
-                 zone.grid_coordinates.x.min(), zone.grid_coordinates.x.max())
-
-    zone.grid_coordinates.y = stream.read_floats(shape, order='Fortran')
-    logger.debug('    y min %g, max %g',
-                 zone.grid_coordinates.y.min(), zone.grid_coordinates.y.max())
-
+    grid = zone.grid_coordinates
+    grid.x = _read_floats(stream, shape, memmap, 'x', logger)
+    grid.y = _read_floats(stream, shape, memmap, 'y', logger)
     if dim > 2:
-        zone.grid_coordinates.z = stream.read_floats(shape, order='Fortran')
-        logger.debug('    z min %g, max %g',
-                     zone.grid_coordinates.z.min(), zone.grid_coordinates.z.max())
+        grid.z = _read_floats(stream, shape, memmap, 'z', logger)
+    if blanking:
+        if memmap:
+            grid.iblank = stream.map_ints(shape, order='Fortran')
+        else:
+            grid.iblank = stream.read_ints(shape, order='Fortran')
 
     if stream.unformatted:
         reclen2 = stream.read_recordmark()
@@ -363,7 +387,7 @@ def _read_plot3d_qscalars(zone, stream, logger):
     zone.flow_solution.time = time
 
 
-def _read_plot3d_qvars(zone, stream, planes, logger):
+def _read_plot3d_qvars(zone, stream, planes, memmap, logger):
     """ Reads 'density', 'momentum' and 'energy_stagnation_density'. """
     if planes:
         raise NotImplementedError('planar format not supported yet')
@@ -384,27 +408,18 @@ def _read_plot3d_qvars(zone, stream, planes, logger):
             logger.warning('unexpected Q variables recordlength'
                            ' %d vs. %d', reclen, expected)
     name = 'density'
-    arr = stream.read_floats(shape, order='Fortran')
-    logger.debug('    %s min %g, max %g', name, arr.min(), arr.max())
+    arr = _read_floats(stream, shape, memmap, name, logger)
     zone.flow_solution.add_array(name, arr)
 
     vec = Vector()
-
-    vec.x = stream.read_floats(shape, order='Fortran')
-    logger.debug('    momentum.x min %g, max %g', vec.x.min(), vec.x.max())
-
-    vec.y = stream.read_floats(shape, order='Fortran')
-    logger.debug('    momentum.y min %g, max %g', vec.y.min(), vec.y.max())
-
+    vec.x = _read_floats(stream, shape, memmap, 'momentum.x', logger)
+    vec.y = _read_floats(stream, shape, memmap, 'momentum.y', logger)
     if dim > 2:
-        vec.z = stream.read_floats(shape, order='Fortran')
-        logger.debug('    momentum.z min %g, max %g', vec.z.min(), vec.z.max())
-
+        vec.z = _read_floats(stream, shape, memmap, 'momentum.z', logger)
     zone.flow_solution.add_vector('momentum', vec)
 
     name = 'energy_stagnation_density'
-    arr = stream.read_floats(shape, order='Fortran')
-    logger.debug('    %s min %g, max %g', name, arr.min(), arr.max())
+    arr = _read_floats(stream, shape, memmap, name, logger)
     zone.flow_solution.add_array(name, arr)
 
     if stream.unformatted:
@@ -414,7 +429,8 @@ def _read_plot3d_qvars(zone, stream, planes, logger):
                            ' %d vs. %d', reclen2, reclen)
 
 
-def _read_plot3d_fvars(zone, stream, dim, nvars, varnames, planes, logger):
+def _read_plot3d_fvars(zone, stream, dim, nvars, varnames, planes, memmap,
+                       logger):
     """ Reads 'function' variables. """
     if planes:
         raise NotImplementedError('planar format not supported yet')
@@ -439,9 +455,8 @@ def _read_plot3d_fvars(zone, stream, dim, nvars, varnames, planes, logger):
             name = varnames[i]
         else:
             name = 'f_%d' % (i+1)
-        arr = stream.read_floats(shape, order='Fortran')
+        arr = _read_floats(stream, shape, memmap, name, logger)
         zone.flow_solution.add_array(name, arr)
-        logger.debug('    %s min %g, max %g', name, arr.min(), arr.max())
 
     if stream.unformatted:
         reclen2 = stream.read_recordmark()
@@ -450,9 +465,22 @@ def _read_plot3d_fvars(zone, stream, dim, nvars, varnames, planes, logger):
                            ' %d vs. %d', reclen2, reclen)
 
 
+def _read_floats(stream, shape, memmap, name, logger):
+    """
+    Returns the next `shape` floats from `stream`.  If `memmap`, the data is
+    mapped rather than read, and so isn't scanned for logging.
+    """
+    if memmap:
+        return stream.map_floats(shape, order='Fortran')
+
+    arr = stream.read_floats(shape, order='Fortran')
+    logger.debug('    %s min %g, max %g', name, arr.min(), arr.max())
+    return arr
+
+
 def write_plot3d_q(domain, grid_file, q_file, planes=False, binary=True,
                    big_endian=False, single_precision=True, unformatted=True,
-                   logger=None):
+                   logger=None, max_workers=1):
     """
     Writes `domain` to `grid_file` and `q_file` in Plot3D format.
     Requires 'density', 'momentum', and 'energy_stagnation_density' variables
@@ -496,10 +524,10 @@ def write_plot3d_q(domain, grid_file, q_file, planes=False, binary=True,
                                  % (name, missing))
     # Write grid file.
     write_plot3d_grid(domain, grid_file, planes, binary, big_endian,
-                      single_precision, unformatted, logger)
+                      single_precision, unformatted, logger, max_workers)
     # Write Q file.
     mode = 'wb' if binary else 'w'
-    with open(q_file, mode) as out:
+    with _Replacement(q_file, mode) as out:
         logger.info('writing Q file %r', q_file)
         stream = Stream(out, binary, big_endian, single_precision, False,
                         unformatted, False)
@@ -512,19 +540,22 @@ def write_plot3d_q(domain, grid_file, q_file, planes=False, binary=True,
 
         # Write zone scalars and variables.
         varnames = ('density', 'momentum', 'energy_stagnation_density')
+        tasks = []
         for zone in zones:
             if writing_domain:
                 name = domain.zone_name(zone)
             else:
                 name = 'zone'
-            logger.debug('writing data for %s', name)
-            _write_plot3d_qscalars(zone, stream, logger)
-            _write_plot3d_vars(zone, stream, varnames, planes, logger)
+            size = _zone_size(zone)
+            counts = (4, (len(zone.shape)+2) * size)
+            tasks.append(('writing data for %s' % name, _write_plot3d_qzone,
+                          zone, (varnames, planes), counts))
+        _write_plot3d_zones(stream, tasks, max_workers, logger)
 
 
 def write_plot3d_f(domain, grid_file, f_file, varnames=None, planes=False,
                    binary=True, big_endian=False, single_precision=True,
-                   unformatted=True, logger=None):
+                   unformatted=True, logger=None, max_workers=1):
     """
     Writes `domain` to `grid_file` and `f_file` in Plot3D format.
     If `varnames` is None, then all arrays and then all vectors are written.
@@ -571,10 +602,10 @@ def write_plot3d_f(domain, grid_file, f_file, varnames=None, planes=False,
                                  % (name, missing))
     # Write grid file.
     write_plot3d_grid(domain, grid_file, planes, binary, big_endian,
-                      single_precision, unformatted, logger)
+                      single_precision, unformatted, logger, max_workers)
     # Write F file.
     mode = 'wb' if binary else 'w'
-    with open(f_file, mode) as out:
+    with _Replacement(f_file, mode) as out:
         logger.info('writing F file %r', f_file)
         stream = Stream(out, binary, big_endian, single_precision, False,
                         unformatted, False)
@@ -586,18 +617,21 @@ def write_plot3d_f(domain, grid_file, f_file, varnames=None, planes=False,
         _write_plot3d_dims(domain, stream, logger, varnames)
 
         # Write zone variables.
+        tasks = []
         for zone in zones:
             if writing_domain:
                 name = domain.zone_name(zone)
             else:
                 name = 'zone'
-            logger.debug('writing data for %s', name)
-            _write_plot3d_vars(zone, stream, varnames, planes, logger)
+            counts = (_plot3d_nvars(zone, varnames) * _zone_size(zone),)
+            tasks.append(('writing data for %s' % name, _write_plot3d_vars,
+                          zone, (varnames, planes), counts))
+        _write_plot3d_zones(stream, tasks, max_workers, logger)
 
 
 def write_plot3d_grid(domain, grid_file, planes=False, binary=True,
                       big_endian=False, single_precision=True,
-                      unformatted=True, logger=None):
+                      unformatted=True, logger=None, max_workers=1):
     """
     Writes `domain` to `grid_file` in Plot3D format.
     Ghost data is not written.
@@ -620,7 +654,7 @@ def write_plot3d_grid(domain, grid_file, planes=False, binary=True,
         raise TypeError("'domain' argument must be a DomainObj or Zone")
 
     mode = 'wb' if binary else 'w'
-    with open(grid_file, mode) as out:
+    with _Replacement(grid_file, mode) as out:
         logger.info('writing grid file %r', grid_file)
         stream = Stream(out, binary, big_endian, single_precision, False,
                         unformatted, False)
@@ -632,13 +666,135 @@ def write_plot3d_grid(domain, grid_file, planes=False, binary=True,
         _write_plot3d_dims(domain, stream, logger)
 
         # Write zone coordinates.
+        tasks = []
         for zone in zones:
             if writing_domain:
                 name = domain.zone_name(zone)
             else:
                 name = 'zone'
-            logger.debug('writing coords for %s', name)
-            _write_plot3d_coords(zone, stream, planes, logger)
+            counts = (len(zone.shape) * _zone_size(zone),)
+            tasks.append(('writing coords for %s' % name, _write_plot3d_coords,
+                          zone, (planes,), counts))
+        _write_plot3d_zones(stream, tasks, max_workers, logger)
+
+
+class _Replacement(object):
+    """
+    Context manager returning a new file in the directory of `path`, which
+    is renamed to `path` on successful exit.  Any existing memory maps of
+    `path` keep viewing the old file rather than being truncated under them.
+    """
+
+    def __init__(self, path, mode):
+        self.path = path
+        self.mode = mode
+        self.file = None
+
+    def __enter__(self):
+        directory, name = os.path.split(os.path.abspath(self.path))
+        fd, tmpname = tempfile.mkstemp(prefix=name+'.', dir=directory)
+        os.close(fd)
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmpname, 0666 & ~umask)
+        self.file = open(tmpname, self.mode)
+        return self.file
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.file.close()
+        if exc_type is None:
+            if sys.platform == 'win32' and os.path.exists(self.path):
+                os.remove(self.path)
+            os.rename(self.file.name, self.path)
+        else:
+            os.remove(self.file.name)
+
+
+def _zone_size(zone):
+    """ Returns number of points in `zone`, not including ghosts. """
+    size = 1
+    for npoints in zone.shape:
+        size *= npoints
+    return size
+
+
+def _plot3d_nvars(zone, varnames):
+    """ Returns number of Plot3D variables for `varnames` of `zone`. """
+    dim = len(zone.shape)
+    flow = zone.flow_solution
+    nvars = 0
+    for name in varnames:
+        obj = getattr(flow, name)
+        nvars += dim if isinstance(obj, Vector) else 1
+    return nvars
+
+
+def _write_plot3d_zones(stream, tasks, max_workers, logger):
+    """
+    Perform zone write `tasks`, each of the form
+    ``(message, writer, zone, args, counts)``, where `counts` is the
+    number of floats in each record written.  If `stream` is binary and
+    `max_workers` > 1, then the file is extended to its final size and each
+    zone is written concurrently at its precomputed offset.
+    """
+    if not stream.binary or max_workers < 2 or len(tasks) < 2:
+        for msg, writer, zone, args, counts in tasks:
+            logger.debug(msg)
+            writer(zone, stream, *(args + (logger,)))
+        return
+
+    if stream.unformatted:
+        marks = 16 if stream.recordmark_8 else 8
+    else:
+        marks = 0
+    offset = stream.file.tell()
+    requests = []
+    for msg, writer, zone, args, counts in tasks:
+        nbytes = sum([stream.reclen_floats(count) + marks
+                      for count in counts])
+        requests.append((_write_plot3d_zone,
+                         (stream, offset, nbytes, msg, writer, zone, args,
+                          logger), {}))
+        offset += nbytes
+    stream.file.flush()
+    stream.file.truncate(offset)
+
+    # Start first set of zones, then start the next as each one completes.
+    reply_q = Queue.Queue()
+    nworkers = min(max_workers, len(requests))
+    for request in requests[:nworkers]:
+        WorkerPool.get().put(request + (reply_q,))
+    todo = requests[nworkers:]
+    errors = []
+    for i in range(len(requests)):
+        worker_q, retval, exc, trace = reply_q.get()
+        if exc is not None:
+            logger.error(trace)
+            errors.append(exc)
+        if todo:
+            worker_q.put(todo.pop(0) + (reply_q,))
+        else:
+            WorkerPool.release(worker_q)
+    if errors:
+        raise errors[0]
+
+
+def _write_plot3d_zone(stream, offset, nbytes, msg, writer, zone, args,
+                       logger):
+    """
+    Write a zone via `writer` to a new handle on the file of `stream`,
+    starting at `offset` and expecting to write `nbytes`.
+    """
+    logger.debug(msg)
+    with open(stream.file.name, 'r+b') as out:
+        out.seek(offset)
+        zone_stream = Stream(out, stream.binary, stream.big_endian,
+                             stream.single_precision, stream.integer_8,
+                             stream.unformatted, stream.recordmark_8)
+        writer(zone, zone_stream, *(args + (logger,)))
+        if out.tell() != offset + nbytes:
+            raise RuntimeError('%s: wrote %d bytes, expected %d'
+                               % (msg, out.tell() - offset, nbytes))
 
 
 def _write_plot3d_dims(domain, stream, logger, varnames=None):
@@ -744,6 +900,12 @@ def _write_plot3d_qscalars(zone, stream, logger):
                         full_record=True)
 
 
+def _write_plot3d_qzone(zone, stream, varnames, planes, logger):
+    """ Writes Q scalars and variables. """
+    _write_plot3d_qscalars(zone, stream, logger)
+    _write_plot3d_vars(zone, stream, varnames, planes, logger)
+
+
 def _write_plot3d_vars(zone, stream, varnames, planes, logger):
     """ Writes 'function' variables. """
     if planes:
@@ -752,10 +914,7 @@ def _write_plot3d_vars(zone, stream, varnames, planes, logger):
     shape = zone.shape
     dim = len(shape)
     flow = zone.flow_solution
-    nvars = 0
-    for name in varnames:
-        obj = getattr(flow, name)
-        nvars += dim if isinstance(obj, Vector) else 1
+    nvars = _plot3d_nvars(zone, varnames)
     logger.debug('    nvars %d', nvars)
 
     if stream.unformatted:
@@ -793,7 +952,10 @@ def _write_plot3d_vars(zone, stream, varnames, planes, logger):
 
 
 def _write_array(arr, ghosts, stream):
-    """ Write `arr` to `stream`, adjusting for `ghosts`. """
+    """
+    Write `arr` to `stream`, adjusting for `ghosts`.  Binary 3D data is
+    written a k-plane at a time, so only one plane is ever copied.
+    """
     shape = arr.shape
     if len(shape) > 2:
         imin = ghosts[0]
@@ -803,7 +965,13 @@ def _write_array(arr, ghosts, stream):
         imax -= ghosts[1]
         jmax -= ghosts[3]
         kmax -= ghosts[5]
-        stream.write_floats(arr[imin:imax, jmin:jmax, kmin:kmax], order='Fortran')
+        if stream.binary:
+            for k in range(kmin, kmax):
+                stream.write_floats(arr[imin:imax, jmin:jmax, k],
+                                    order='Fortran')
+        else:
+            stream.write_floats(arr[imin:imax, jmin:jmax, kmin:kmax],
+                                order='Fortran')
     else:
         imin = ghosts[0]
         jmin = ghosts[2]
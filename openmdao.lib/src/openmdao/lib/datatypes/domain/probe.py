@@ -3,7 +3,9 @@ Support for calculating one or more scalar averages across one or more
 regions in a domain.
 """
 
-from math import cos, sin, sqrt
+from itertools import product
+
+from numpy import array, cos, dot, empty, ndindex, sin, sqrt, zeros
 
 from openmdao.lib.datatypes.domain.flow import CELL_CENTER
 from openmdao.lib.datatypes.domain.zone import CYLINDRICAL
@@ -37,7 +39,9 @@ def mesh_probe(domain, regions, variables, weighting_scheme='area'):
 
     weighting_scheme: string
         Specifies how individual values are weighted. Legal values are
-        'area' for area averaging and 'mass' for mass averaging.
+        'area' for area (or volume, for a volume region) averaging and
+        'mass' for mass averaging. For a volume region, mass averaging
+        weights each cell by its density times its volume.
 
     Returns a list of metric values in the order of the `variables` list.
 
@@ -238,275 +242,83 @@ def _calc_weights(scheme, domain, regions):
         if dim == 3:
             zone_weights = _volume_weights(scheme, domain, region)
         elif dim == 2:
-            if len(region) == 7:
-                zone_weights = _surface_weights_3d(scheme, domain, region)
-            else:
-                zone_weights = _surface_weights_2d(scheme, domain, region)
+            zone_weights = _surface_weights(scheme, domain, region)
         elif dim == 1:
-            if len(region) == 7:
-                zone_weights = _curve_weights_3d(scheme, domain, region)
-            elif len(region) == 5:
-                zone_weights = _curve_weights_2d(scheme, domain, region)
-            else:
-                zone_weights = _curve_weights_1d(scheme, domain, region)
+            zone_weights = _curve_weights(scheme, domain, region)
         else:
-            zone_weights = [1.]
+            zone_weights = array([1.])
 
         zone_name = region[0]
         zone = getattr(domain, zone_name)
-        zone_weights *= zone.symmetry_instances  # Adjust for symmetry.
         if zone_name in weights:
             raise RuntimeError('Zone %r used more than once' % zone_name)
         else:
             weights[zone_name] = zone_weights
-        weight_total += sum(zone_weights)
+        # Adjust for symmetry.
+        weight_total += zone_weights.sum() * zone.symmetry_instances
 
     return (weights, weight_total)
 
 
 def _volume_weights(scheme, domain, region):
     """ Returns weights for a mesh volume. """
-    raise NotImplementedError('_volume_weights')
-
-
-def _surface_weights_3d(scheme, domain, region):
-    """ Returns 3D (index space) weights for a mesh surface. """
-    zone_name, imin, imax, jmin, jmax, kmin, kmax = region
+    zone_name = region[0]
     zone = getattr(domain, zone_name)
-    grid = zone.grid_coordinates
     flow = zone.flow_solution
-    cylindrical = zone.coordinate_system == CYLINDRICAL
     cell_center = flow.grid_location == CELL_CENTER
 
-    if cylindrical:
-        c1 = grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
-    else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = grid.z.item
+    ranges = _volume_ranges(region)
+    volumes = _cell_volumes(zone, ranges)
 
     if scheme == 'mass':
         try:
-            if cylindrical:
-                mom_c1 = flow.momentum.z.item
-                mom_c2 = flow.momentum.r.item
-                mom_c3 = flow.momentum.t.item
-            else:
-                mom_c1 = flow.momentum.x.item
-                mom_c2 = flow.momentum.y.item
-                mom_c3 = flow.momentum.z.item
+            density = flow.density
         except AttributeError:
             raise AttributeError("For mass averaging zone %s is missing"
-                                 " 'momentum'." % zone_name)
-    if imin == imax:
-        imax += 1
-        face_normal = _iface_normal
-        face_value = _iface_cell_value if cell_center else _iface_node_value
-    elif jmin == jmax:
-        jmax += 1
-        face_normal = _jface_normal
-        face_value = _jface_cell_value if cell_center else _jface_node_value
+                                 " 'density'." % zone_name)
+        offsets, scale = _CELL_SAMPLES[cell_center]
+        return _average(density, ranges, offsets, scale) * volumes
     else:
-        kmax += 1
-        face_normal = _kface_normal
-        face_value = _kface_cell_value if cell_center else _kface_node_value
-
-    weights = []
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-            for k in range(kmin, kmax):
-                sc1, sc2, sc3 = face_normal(c1, c2, c3, i, j, k, cylindrical)
-                if scheme == 'mass':
-                    loc = (i, j, k)
-                    rvu = face_value(mom_c1, loc)
-                    rvv = face_value(mom_c2, loc)
-                    rvw = face_value(mom_c3, loc)
-                    weights.append(rvu*sc1 + rvv*sc2 + rvw*sc3)
-                else:
-                    weights.append(sqrt(sc1*sc1 + sc2*sc2 + sc3*sc3))
-    return weights
+        return volumes
 
 
-def _surface_weights_2d(scheme, domain, region):
-    """ Returns 2D (index space) weights for a mesh surface. """
-    zone_name, imin, imax, jmin, jmax = region
+def _surface_weights(scheme, domain, region):
+    """ Returns weights for a mesh surface. """
+    zone_name = region[0]
     zone = getattr(domain, zone_name)
-    grid = zone.grid_coordinates
     flow = zone.flow_solution
-    cylindrical = zone.coordinate_system == CYLINDRICAL
     cell_center = flow.grid_location == CELL_CENTER
 
-    if cylindrical:
-        c1 = None if grid.z is None else grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
-    else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = None if grid.z is None else grid.z.item
+    ranges, face = _surface_ranges(region)
+    sc1, sc2, sc3 = _face_normals(zone, ranges, face)
 
     if scheme == 'mass':
         try:
-            if cylindrical:
-                mom_c1 = None if flow.momentum.z is None else flow.momentum.z.item
-                mom_c2 = flow.momentum.r.item
-                mom_c3 = flow.momentum.t.item
-            else:
-                mom_c1 = flow.momentum.x.item
-                mom_c2 = flow.momentum.y.item
-                mom_c3 = None if flow.momentum.z is None else flow.momentum.z.item
+            momentum = flow.momentum
         except AttributeError:
             raise AttributeError("For mass averaging zone %s is missing"
                                  " 'momentum'." % zone_name)
-
-    weights = []
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-                sc1, sc2, sc3 = _cell_normal(c1, c2, c3, i, j, cylindrical)
-                if scheme == 'mass':
-                    ip1 = i + 1
-                    jp1 = j + 1
-                    if cell_center:
-                        # Cell value is value.
-# FIXME: built-in ghosts
-                        rvu = 0. if mom_c1 is None else mom_c1(ip1, jp1)
-                        rvv = mom_c2(ip1, jp1)
-                        rvw = 0. if mom_c1 is None else mom_c3(ip1, jp1)
-                    else:
-                        # Average across vertices.
-                        if mom_c1 is None:
-                            rvu = 0.
-                        else:
-                            rvu = 0.25 * (mom_c1(i, j) + mom_c1(ip1, j) + \
-                                          mom_c1(i, jp1) + mom_c1(ip1, jp1))
-                        rvv = 0.25 * (mom_c2(i, j) + mom_c2(ip1, j) + \
-                                      mom_c2(i, jp1) + mom_c2(ip1, jp1))
-                        if mom_c3 is None:
-                            rvw = 0.
-                        else:
-                            rvw = 0.25 * (mom_c3(i, j) + mom_c3(ip1, j) + \
-                                          mom_c3(i, jp1) + mom_c3(ip1, jp1))
-                    weights.append(rvu*sc1 + rvv*sc2 + rvw*sc3)
-                else:
-                    weights.append(sqrt(sc1*sc1 + sc2*sc2 + sc3*sc3))
-    return weights
-
-
-def _curve_weights_3d(scheme, domain, region):
-    """ Returns 3D (index space) weights for a mesh curve. """
-    zone_name, imin, imax, jmin, jmax, kmin, kmax = region
-    zone = getattr(domain, zone_name)
-    grid = zone.grid_coordinates
-    cylindrical = zone.coordinate_system == CYLINDRICAL
-
-    if cylindrical:
-        raise NotImplementedError('curve weights for cylindrical coordinates')
+        offsets, scale = _FACE_SAMPLES[(face, cell_center)]
+        rvu, rvv, rvw = [_average(arr, ranges, offsets, scale)
+                         for arr in _components(zone, momentum)]
+        return rvu*sc1 + rvv*sc2 + rvw*sc3
     else:
-        x = grid.x.item
-        y = grid.y.item
-        z = grid.z.item
+        return sqrt(sc1*sc1 + sc2*sc2 + sc3*sc3)
 
-    if scheme == 'mass':
-        raise NotImplementedError('curve mass averaging')
-
-    along_i, along_j = False, False
-    if imin != imax:
-        along_i = True
-        jmax += 1
-        kmax += 1
-    elif jmin != jmax:
-        along_j = True
-        imax += 1
-        kmax += 1
-    else:
-        imax += 1
-        jmax += 1
-
-    weights = []
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-            for k in range(kmin, kmax):
-                if along_i:
-                    dx = x(i+1, j, k) - x(i, j, k)
-                    dy = y(i+1, j, k) - y(i, j, k)
-                    dz = z(i+1, j, k) - z(i, j, k)
-                elif along_j:
-                    dx = x(i, j+1, k) - x(i, j, k)
-                    dy = y(i, j+1, k) - y(i, j, k)
-                    dz = z(i, j+1, k) - z(i, j, k)
-                else:
-                    dx = x(i, j, k+1) - x(i, j, k)
-                    dy = y(i, j, k+1) - y(i, j, k)
-                    dz = z(i, j, k+1) - z(i, j, k)
-                weights.append(sqrt(dx*dx + dy*dy + dz*dz))
-    return weights
 
-
-def _curve_weights_2d(scheme, domain, region):
-    """ Returns 2D (index space) weights for a mesh curve. """
-    zone_name, imin, imax, jmin, jmax = region
-    zone = getattr(domain, zone_name)
-    grid = zone.grid_coordinates
-    cylindrical = zone.coordinate_system == CYLINDRICAL
-
-    if cylindrical:
-        raise NotImplementedError('curve weights for cylindrical coordinates')
-    else:
-        x = grid.x.item
-        y = grid.y.item
-        z = None if grid.z is None else grid.z.item
-
-    if scheme == 'mass':
-        raise NotImplementedError('curve mass averaging')
-
-    if imin != imax:
-        along_i = True
-        jmax += 1
-    else:
-        along_i = False
-        imax += 1
-
-    weights = []
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-                if along_i:
-                    dx = x(i+1, j) - x(i, j)
-                    dy = y(i+1, j) - y(i, j)
-                    dz = 0. if z is None else z(i+1, j) - z(i, j)
-                else:
-                    dx = x(i, j+1) - x(i, j)
-                    dy = y(i, j+1) - y(i, j)
-                    dz = 0. if z is None else z(i, j+1) - z(i, j)
-                weights.append(sqrt(dx*dx + dy*dy + dz*dz))
-    return weights
-
-
-def _curve_weights_1d(scheme, domain, region):
-    """ Returns 1D (index space) weights for a mesh curve. """
-    zone_name, imin, imax = region
+def _curve_weights(scheme, domain, region):
+    """ Returns weights for a mesh curve. """
+    zone_name = region[0]
     zone = getattr(domain, zone_name)
-    grid = zone.grid_coordinates
-    cylindrical = zone.coordinate_system == CYLINDRICAL
 
-    if cylindrical:
+    if zone.coordinate_system == CYLINDRICAL:
         raise NotImplementedError('curve weights for cylindrical coordinates')
-    else:
-        x = grid.x.item
-        y = None if grid.y is None else grid.y.item
-        z = None if grid.z is None else grid.z.item
 
     if scheme == 'mass':
         raise NotImplementedError('curve mass averaging')
 
-    weights = []
-    for i in range(imin, imax):
-        dx = x(i+1) - x(i)
-        dy = 0. if y is None else y(i+1) - y(i)
-        dz = 0. if z is None else z(i+1) - z(i)
-        weights.append(sqrt(dx*dx + dy*dy + dz*dz))
-    return weights
+    ranges, edge = _curve_ranges(region)
+    return _edge_lengths(zone, ranges, edge)
 
 
 def _calc_metric(name, domain, region, weights, reference_state):
@@ -528,19 +340,11 @@ def _calc_metric(name, domain, region, weights, reference_state):
     elif dim == 2:
         if geometry not in ('surface', 'any'):
             raise RuntimeError('metric %r not applicable to surfaces')
-        if len(region) == 7:
-            total = _surface_3d(metric, integrate, zone, region, weights)
-        else:
-            total = _surface_2d(metric, integrate, zone, region, weights)
+        total = _surface(metric, integrate, zone, region, weights)
     elif dim == 1:
         if geometry not in ('curve', 'any'):
             raise RuntimeError('metric %r not applicable to curves')
-        if len(region) == 7:
-            total = _curve_3d(metric, integrate, zone, region, weights)
-        elif len(region) == 5:
-            total = _curve_2d(metric, integrate, zone, region, weights)
-        else:
-            total = _curve_1d(metric, integrate, zone, region, weights)
+        total = _curve(metric, integrate, zone, region, weights)
     else:
         if geometry != 'any':
             raise RuntimeError('metric %r not applicable to points')
@@ -554,367 +358,89 @@ def _calc_metric(name, domain, region, weights, reference_state):
 
 def _volume(metric, integrate, zone, region, weights):
     """ Calculate metric on a volume. """
-    raise NotImplementedError('metric calculation on volume')
-''' Not implemented yet
-    zone_name, imin, imax, jmin, jmax, kmin, kmax = region
-    grid = zone.grid_coordinates
-    flow = zone.flow_solution
-    cylindrical = zone.coordinate_system == CYLINDRICAL
-    cell_center = flow.grid_location == CELL_CENTER
-
-    if cylindrical: 
-        c1 = grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
+    cell_center = zone.flow_solution.grid_location == CELL_CENTER
+    ranges = _volume_ranges(region)
+    if integrate:
+        volumes = _cell_volumes(zone, ranges)
     else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = grid.z.item
-
-    vol = None
-    weight_index = 0
-    total = 0.
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-            for k in range(kmin, kmax):
-
-# TODO: calculate volume for integrating.
-
-                if cell_center:
-# FIXME: built-in ghosts
-                    # Cell value is value.
-                    val = metric.calculate((i+1, j+1, k+1), vol)
-                else:
-                    # Average across vertices.
-                    val  = metric.calculate((i, j, k), vol)
-                    val += metric.calculate((i, j+1, k), vol)
-                    val += metric.calculate((i, j+1, k+1), vol)
-                    val += metric.calculate((i, j, k+1), vol)
-                    val += metric.calculate((i+1, j, k), vol)
-                    val += metric.calculate((i+1, j+1, k), vol)
-                    val += metric.calculate((i+1, j+1, k+1), vol)
-                    val += metric.calculate((i+1, j, k+1), vol)
-                    val *= 0.125
-
-                if integrate:
-                    total += val
-                else:
-                    weight = weights[weight_index]
-                    weight_index += 1
-                    total += val * weight
-    return total
-'''
-
-
-def _surface_3d(metric, integrate, zone, region, weights):
-    """ Calculate metric on a 3D (index space) surface. """
-    zone_name, imin, imax, jmin, jmax, kmin, kmax = region
-    grid = zone.grid_coordinates
-    flow = zone.flow_solution
-    cylindrical = zone.coordinate_system == CYLINDRICAL
-    cell_center = flow.grid_location == CELL_CENTER
-
-    if cylindrical: 
-        c1 = grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
-    else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = grid.z.item
-
-    if imin == imax: 
-        face = 'i'
-        imax += 1
-        get_normal = _iface_normal
-    elif jmin == jmax:
-        face = 'j'
-        jmax += 1 
-        get_normal = _jface_normal
-    else:
-        face = 'k'
-        kmax += 1
-        get_normal = _kface_normal
-
-    normal = None
-    weight_index = 0
-    total = 0.
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-            for k in range(kmin, kmax):
-
-                if integrate:
-                    normal = get_normal(c1, c2, c3, i, j, k, cylindrical)
-    
-                if cell_center:
-# FIXME: built-in ghosts
-                    # Average across cells sharing surface.
-                    val = metric.calculate((i+1, j+1, k+1), normal)
-                    if face == 'i':
-                        val += metric.calculate((i, j+1, k+1), normal)
-                    elif face == 'j':
-                        val += metric.calculate((i+1, j, k+1), normal)
-                    else:
-                        val += metric.calculate((i+1, j+1, k), normal)
-                    val *= 0.5
-                else:
-                    # Average across vertices.
-                    val = metric.calculate((i, j, k), normal)
-                    if face == 'i':
-                        val += metric.calculate((i, j+1, k), normal)
-                        val += metric.calculate((i, j+1, k+1), normal)
-                        val += metric.calculate((i, j, k+1), normal)
-                    elif face == 'j':
-                        val += metric.calculate((i+1, j, k), normal)
-                        val += metric.calculate((i+1, j, k+1), normal)
-                        val += metric.calculate((i, j, k+1), normal)
-                    else:
-                        val += metric.calculate((i+1, j, k), normal)
-                        val += metric.calculate((i+1, j+1, k), normal)
-                        val += metric.calculate((i, j+1, k), normal)
-                    val *= 0.25
-
-                if integrate:
-                    total += val
-                else:
-                    weight = weights[weight_index]
-                    weight_index += 1
-                    total += val * weight
-    return total
-
+        volumes = None
+    return _integrate(metric, integrate, ranges,
+                      _CELL_SAMPLES[cell_center], volumes, weights)
 
-def _surface_2d(metric, integrate, zone, region, weights):
-    """ Calculate metric on a 2D (index space) surface. """
-    zone_name, imin, imax, jmin, jmax = region
-    grid = zone.grid_coordinates
-    flow = zone.flow_solution
-    cylindrical = zone.coordinate_system == CYLINDRICAL
-    cell_center = flow.grid_location == CELL_CENTER
 
-    if cylindrical: 
-        c1 = None if grid.z is None else grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
+def _surface(metric, integrate, zone, region, weights):
+    """ Calculate metric on a surface. """
+    cell_center = zone.flow_solution.grid_location == CELL_CENTER
+    ranges, face = _surface_ranges(region)
+    if integrate:
+        normals = _face_normals(zone, ranges, face)
     else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = None if grid.z is None else grid.z.item
+        normals = None
+    return _integrate(metric, integrate, ranges,
+                      _FACE_SAMPLES[(face, cell_center)], normals, weights)
 
-    normal = None
-    weight_index = 0
-    total = 0.
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
 
-            if integrate:
-                normal = _cell_normal(c1, c2, c3, i, j, cylindrical)
-    
-            if cell_center:
-# FIXME: built-in ghosts
-                # Cell value is value.
-                val = metric.calculate((i+1, j+1), normal)
-            else:
-                # Average across vertices.
-                val  = metric.calculate((i, j), normal)
-                val += metric.calculate((i, j+1), normal)
-                val += metric.calculate((i+1, j+1), normal)
-                val += metric.calculate((i+1, j), normal)
-                val *= 0.25
-
-            if integrate:
-                total += val
-            else:
-                weight = weights[weight_index]
-                weight_index += 1
-                total += val * weight
-    return total
-
-
-def _curve_3d(metric, integrate, zone, region, weights):
-    """ Calculate metric on a 3D (index space) curve. """
-    zone_name, imin, imax, jmin, jmax, kmin, kmax = region
-    grid = zone.grid_coordinates
-    flow = zone.flow_solution
-    cylindrical = zone.coordinate_system == CYLINDRICAL
-    cell_center = flow.grid_location == CELL_CENTER
-
-    if cylindrical: 
-        c1 = grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
+def _curve(metric, integrate, zone, region, weights):
+    """ Calculate metric on a curve. """
+    cell_center = zone.flow_solution.grid_location == CELL_CENTER
+    ranges, edge = _curve_ranges(region)
+    if integrate:
+        lengths = _edge_lengths(zone, ranges, edge)
     else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = grid.z.item
-
-    if imin != imax:
-        edge = 'i'
-        jmax += 1
-        kmax += 1
-        get_length = _iedge_length
-    elif jmin != jmax:
-        edge = 'j'
-        imax += 1
-        kmax += 1
-        get_length = _jedge_length
-    else:
-        edge = 'k'
-        imax += 1
-        jmax += 1
-        get_length = _kedge_length
-
-    length = None
-    weight_index = 0
-    total = 0.
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-            for k in range(kmin, kmax):
+        lengths = None
+    return _integrate(metric, integrate, ranges,
+                      _EDGE_SAMPLES[(len(ranges), edge, cell_center)],
+                      lengths, weights)
 
-                if integrate:
-                    length = get_length(c1, c2, c3, (i, j, k), cylindrical)
-
-                if cell_center:
-# FIXME: built-in ghosts
-                    # Average across cells sharing edge.
-                    val = metric.calculate((i+1, j+1, k+1), length)
-                    if edge == 'i':
-                        val += metric.calculate((i+1, j, k+1), length)
-                        val += metric.calculate((i+1, j+1, k), length)
-                        val += metric.calculate((i+1, j, k), length)
-                    elif edge == 'j':
-                        val += metric.calculate((i, j+1, k+1), length)
-                        val += metric.calculate((i+1, j+1, k), length)
-                        val += metric.calculate((i, j+1, k), length)
-                    else:
-                        val += metric.calculate((i, j+1, k+1), length)
-                        val += metric.calculate((i+1, j, k+1), length)
-                        val += metric.calculate((i, j, k+1), length)
-                    val *= 0.25
-                else:
-                    # Average across vertices.
-                    val = metric.calculate((i, j, k), length)
-                    if edge == 'i':
-                        val += metric.calculate((i+1, j, k), length)
-                    elif edge == 'j':
-                         val +=metric.calculate((i, j+1, k), length)
-                    else:
-                         val +=metric.calculate((i, j, k+1), length)
-                    val *= 0.5
-
-                if integrate:
-                    total += val
-                else:
-                    weight = weights[weight_index]
-                    weight_index += 1
-                    total += val * weight
-    return total
-
-
-def _curve_2d(metric, integrate, zone, region, weights):
-    """ Calculate metric on a 2D (index space) curve. """
-    zone_name, imin, imax, jmin, jmax = region
-    grid = zone.grid_coordinates
-    flow = zone.flow_solution
-    cylindrical = zone.coordinate_system == CYLINDRICAL
-    cell_center = flow.grid_location == CELL_CENTER
-
-    if cylindrical: 
-        c1 = None if grid.z is None else grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
-    else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = None if grid.z is None else grid.z.item
-
-    if imin != imax:
-        edge = 'i'
-        jmax += 1
-        get_length = _iedge_length
-    else:
-        edge = 'j'
-        imax += 1
-        get_length = _jedge_length
-
-    length = None
-    weight_index = 0
-    total = 0.
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-
-            if integrate:
-                length = get_length(c1, c2, c3, (i, j), cylindrical)
-
-            if cell_center:
-# FIXME: built-in ghosts
-                # Average across cells sharing edge.
-                val = metric.calculate((i+1, j+1), length)
-                if edge == 'i':
-                    val += metric.calculate((i+1, j), length)
-                else:
-                    val += metric.calculate((i, j+1), length)
-                val *= 0.5
-            else:
-                # Average across vertices.
-                val = metric.calculate((i, j), length)
-                if edge == 'i':
-                    val += metric.calculate((i+1, j), length)
-                else:
-                    val += metric.calculate((i, j+1), length)
-                val *= 0.5
-
-            if integrate:
-                total += val
-            else:
-                weight = weights[weight_index]
-                weight_index += 1
-                total += val * weight
-    return total
-
-
-def _curve_1d(metric, integrate, zone, region, weights):
-    """ Calculate metric on a 1D (index space) curve. """
-    zone_name, imin, imax = region
-    grid = zone.grid_coordinates
-    flow = zone.flow_solution
-    cylindrical = zone.coordinate_system == CYLINDRICAL
-    cell_center = flow.grid_location == CELL_CENTER
-
-    if cylindrical:
-        c1 = None if grid.z is None else grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
-    else:
-        c1 = grid.x.item
-        c2 = None if grid.y is None else grid.y.item
-        c3 = None if grid.z is None else grid.z.item
-
-    get_length = _iedge_length
-
-    length = None
-    weight_index = 0
-    total = 0.
-    for i in range(imin, imax):
 
+def _integrate(metric, integrate, ranges, samples, geom, weights):
+    """
+    Return total of `metric` over the cells of `ranges`, either integrated
+    or weighted by `weights`. The value for a cell is the average of the
+    metric at the cell offsets in `samples`. `geom` is an array (or tuple of
+    arrays) of cell geometry, or None if not integrating.
+    If `metric` provides :meth:`calculate_region` the whole region is done
+    at once, otherwise :meth:`calculate` is called for each point.
+    """
+    offsets, scale = samples
+
+    if hasattr(metric, 'calculate_region'):
+        val = None
+        for offset in offsets:
+            value = metric.calculate_region(_slices(ranges, offset), geom)
+            val = value if val is None else val + value
+        if scale is not None:
+            val = val * scale
         if integrate:
-            length = get_length(c1, c2, c3, (i,), cylindrical)
+            return float(val.sum())
+        else:
+            return float((val * weights).sum())
 
-        if cell_center:
-# FIXME: built-in ghosts
-            # Cell value is value.
-            val = metric.calculate((i+1,), length)
+    total = 0.
+    for index in ndindex(*[hi - lo for lo, hi in ranges]):
+        if geom is None:
+            cell_geom = None
+        elif isinstance(geom, tuple):
+            cell_geom = tuple([component.item(index) for component in geom])
         else:
-            # Average across vertices.
-            val  = metric.calculate((i,), length)
-            val += metric.calculate((i+1,), length)
-            val *= 0.5
+            cell_geom = geom.item(index)
+
+        val = None
+        for offset in offsets:
+            loc = tuple([lo + i + delta for (lo, hi), i, delta
+                                        in zip(ranges, index, offset)])
+            value = metric.calculate(loc, cell_geom)
+            if val is None:
+                val = value
+            else:
+                val += value
+        if scale is not None:
+            val *= scale
 
         if integrate:
             total += val
         else:
-            weight = weights[weight_index]
-            weight_index += 1
-            total += val * weight
+            total += val * weights.item(index)
     return total
 
 
@@ -963,268 +489,303 @@ def _point(metric, zone, region):
             return metric.calculate((imin,), None)
 
 
-def _iface_normal(c1, c2, c3, i, j, k, cylindrical):
+def _volume_ranges(region):
     """
-    Return non-dimensional vector normal to I face with magnitude equal to area.
+    Return list of ``(start, stop)`` cell index ranges for a volume `region`.
     """
-# FIXME: built-in ghosts
-    jp1 = j + 1
-    kp1 = k + 1
+    zone_name, imin, imax, jmin, jmax, kmin, kmax = region
+    return [(imin, imax), (jmin, jmax), (kmin, kmax)]
 
-    # upper-left - lower-right.
-    diag_c11 = c1(i, jp1, k) - c1(i, j, kp1)
-    diag_c21 = c2(i, jp1, k) - c2(i, j, kp1)
-    diag_c31 = c3(i, jp1, k) - c3(i, j, kp1)
 
-    # upper-right - lower-left.
-    diag_c12 = c1(i, jp1, kp1) - c1(i, j, k)
-    diag_c22 = c2(i, jp1, kp1) - c2(i, j, k)
-    diag_c32 = c3(i, jp1, kp1) - c3(i, j, k)
+def _surface_ranges(region):
+    """
+    Return ``(ranges, face)`` for a surface `region`, where `ranges` is a
+    list of ``(start, stop)`` cell index ranges and `face` is 'i', 'j', or
+    'k' for a 3D (index space) surface, or None for a 2D surface.
+    """
+    if len(region) == 7:
+        zone_name, imin, imax, jmin, jmax, kmin, kmax = region
+        if imin == imax:
+            return ([(imin, imin+1), (jmin, jmax), (kmin, kmax)], 'i')
+        elif jmin == jmax:
+            return ([(imin, imax), (jmin, jmin+1), (kmin, kmax)], 'j')
+        else:
+            return ([(imin, imax), (jmin, jmax), (kmin, kmin+1)], 'k')
+    else:
+        zone_name, imin, imax, jmin, jmax = region
+        return ([(imin, imax), (jmin, jmax)], None)
 
-    if cylindrical:
-        r1 = (c2(i, j, kp1) + c2(i, jp1, k  )) / 2.
-        r2 = (c2(i, j, k  ) + c2(i, jp1, kp1)) / 2.
+
+def _curve_ranges(region):
+    """
+    Return ``(ranges, edge)`` for a curve `region`, where `ranges` is a
+    list of ``(start, stop)`` edge index ranges and `edge` is the index
+    direction ('i', 'j', or 'k') of the curve.
+    """
+    if len(region) == 7:
+        zone_name, imin, imax, jmin, jmax, kmin, kmax = region
+        if imin != imax:
+            return ([(imin, imax), (jmin, jmin+1), (kmin, kmin+1)], 'i')
+        elif jmin != jmax:
+            return ([(imin, imin+1), (jmin, jmax), (kmin, kmin+1)], 'j')
+        else:
+            return ([(imin, imin+1), (jmin, jmin+1), (kmin, kmax)], 'k')
+    elif len(region) == 5:
+        zone_name, imin, imax, jmin, jmax = region
+        if imin != imax:
+            return ([(imin, imax), (jmin, jmin+1)], 'i')
+        else:
+            return ([(imin, imin+1), (jmin, jmax)], 'j')
     else:
-        r1 = 1.
-        r2 = 1.
+        zone_name, imin, imax = region
+        return ([(imin, imax)], 'i')
 
-    sc1 = -0.5 * ( r2 * diag_c21 * diag_c32 - r1 * diag_c22 * diag_c31)
-    sc2 = -0.5 * (-r2 * diag_c11 * diag_c32 + r1 * diag_c12 * diag_c31)
-    sc3 = -0.5 * (      diag_c11 * diag_c22 -      diag_c12 * diag_c21)
 
-    return (sc1, sc2, sc3)
+def _slices(ranges, offset):
+    """ Return index slices for `ranges` shifted by `offset`. """
+    return tuple([slice(lo+delta, hi+delta)
+                  for (lo, hi), delta in zip(ranges, offset)])
+
 
+def _values(arr, ranges, offset):
+    """ Return float values of `arr` for `ranges` shifted by `offset`. """
+    return arr[_slices(ranges, offset)].astype(float)
 
-def _jface_normal(c1, c2, c3, i, j, k, cylindrical):
+
+def _difference(arr, ranges, upper, lower):
+    """ Return difference of `arr` values at `upper` and `lower` offsets. """
+    if arr is None:
+        return 0.
+    return _values(arr, ranges, upper) - _values(arr, ranges, lower)
+
+
+def _average(arr, ranges, offsets, scale):
     """
-    Return non-dimensional vector normal to J face with magnitude equal to area.
+    Return values of `arr` summed across `offsets` and multiplied by `scale`
+    (if not None). Returns zero if `arr` is None.
     """
-# FIXME: built-in ghosts
-    ip1 = i + 1
-    kp1 = k + 1
+    if arr is None:
+        return 0.
+    val = _values(arr, ranges, offsets[0])
+    for offset in offsets[1:]:
+        val += _values(arr, ranges, offset)
+    if scale is not None:
+        val *= scale
+    return val
 
-    # upper-left - lower-right.
-    diag_c11 = c1(ip1, j, k) - c1(i, j, kp1)
-    diag_c21 = c2(ip1, j, k) - c2(i, j, kp1)
-    diag_c31 = c3(ip1, j, k) - c3(i, j, kp1)
-
-    # upper-right - lower-left.
-    diag_c12 = c1(ip1, j, kp1) - c1(i, j, k)
-    diag_c22 = c2(ip1, j, kp1) - c2(i, j, k)
-    diag_c32 = c3(ip1, j, kp1) - c3(i, j, k)
 
-    if cylindrical:
-        r1 = (c2(i, j, kp1) + c2(ip1, j, k  )) / 2.
-        r2 = (c2(i, j, k  ) + c2(ip1, j, kp1)) / 2.
+def _components(zone, vector):
+    """
+    Return `vector` components in array indexing order for `zone`
+    (x,y,z for Cartesian or z,r,t for cylindrical coordinates).
+    """
+    if zone.coordinate_system == CYLINDRICAL:
+        return (vector.z, vector.r, vector.t)
     else:
-        r1 = 1.
-        r2 = 1.
+        return (vector.x, vector.y, vector.z)
 
-    sc1 = 0.5 * ( r2 * diag_c21 * diag_c32 - r1 * diag_c22 * diag_c31)
-    sc2 = 0.5 * (-r2 * diag_c11 * diag_c32 + r1 * diag_c12 * diag_c31)
-    sc3 = 0.5 * (      diag_c11 * diag_c22 -      diag_c12 * diag_c21)
 
-    return (sc1, sc2, sc3)
+# Cell offsets of the vertices of a hexahedral cell.
+_CELL_VERTICES = tuple(product((0, 1), repeat=3))
 
+# Maximum number of cells processed at once by _cell_volumes().
+_BLOCK_CELLS = 16384
 
-def _kface_normal(c1, c2, c3, i, j, k, cylindrical):
+# Gauss quadrature points for integrating over [0, 1].
+_GAUSS_POINTS = ((1. - 1./sqrt(3.)) / 2., (1. + 1./sqrt(3.)) / 2.)
+
+def _cell_volumes(zone, ranges):
     """
-    Return non-dimensional vector normal to K face with magnitude equal to area.
+    Return array of cell volumes. Each cell is treated as a trilinear map
+    from the unit cube, and the volume integrated with 2x2x2 Gauss
+    quadrature. This is exact for Cartesian cells, and since the
+    integrand is then only cubic in each direction, also for cylindrical
+    cells whose volume element includes the radius.
     """
 # FIXME: built-in ghosts
-    ip1 = i + 1
-    jp1 = j + 1
-
-    # upper-left - lower-right.
-    diag_c11 = c1(i, jp1, k) - c1(ip1, j, k)
-    diag_c21 = c2(i, jp1, k) - c2(ip1, j, k)
-    diag_c31 = c3(i, jp1, k) - c3(ip1, j, k)
-
-    # upper-right - lower-left.
-    diag_c12 = c1(ip1, jp1, k) - c1(i, j, k)
-    diag_c22 = c2(ip1, jp1, k) - c2(i, j, k)
-    diag_c32 = c3(ip1, jp1, k) - c3(i, j, k)
+    coords = _components(zone, zone.grid_coordinates)
+    cylindrical = zone.coordinate_system == CYLINDRICAL
 
+    # Process blocks of 'i' planes to keep the temporary arrays small.
+    (imin, imax), (jmin, jmax), (kmin, kmax) = ranges
+    step = max(1, _BLOCK_CELLS // ((jmax - jmin) * (kmax - kmin)))
+    volumes = empty((imax - imin, jmax - jmin, kmax - kmin))
+    for start in range(imin, imax, step):
+        stop = min(start + step, imax)
+        block = [(start, stop)] + ranges[1:]
+        volumes[start-imin:stop-imin] = _block_volumes(coords, cylindrical,
+                                                       block)
+    return volumes
+
+
+def _block_volumes(coords, cylindrical, ranges):
+    """ Return array of cell volumes for a block of cells. """
+    shape = tuple([hi - lo for lo, hi in ranges])
+    vertices = empty((len(_CELL_VERTICES), 3) + shape)
+    for i, offset in enumerate(_CELL_VERTICES):
+        for n, arr in enumerate(coords):
+            vertices[i, n] = arr[_slices(ranges, offset)]
+    vertices = vertices.reshape((len(_CELL_VERTICES), -1))
+
+    # Derivatives along 'i', 'j', and 'k' at each Gauss point.
+    derivs = dot(_GAUSS_DERIVATIVES, vertices)
+    derivs = derivs.reshape((3, len(_GAUSS_VALUES), 3, -1))
+    (a1, a2, a3), (b1, b2, b3), (d1, d2, d3) = \
+        [derivs[axis].swapaxes(0, 1) for axis in range(3)]
+    jacobian = a1 * (b2*d3 - b3*d2) + \
+               a2 * (b3*d1 - b1*d3) + \
+               a3 * (b1*d2 - b2*d1)
     if cylindrical:
-        r1 = (c2(i, jp1, k) + c2(ip1, j,   k)) / 2.
-        r2 = (c2(i, j,   k) + c2(ip1, jp1, k)) / 2.
-    else:
-        r1 = 1.
-        r2 = 1.
+        radius = vertices.reshape((len(_CELL_VERTICES), 3, -1))[:, 1]
+        jacobian *= dot(_GAUSS_VALUES, radius)
 
-    sc1 = 0.5 * ( r2 * diag_c21 * diag_c32 - r1 * diag_c22 * diag_c31)
-    sc2 = 0.5 * (-r2 * diag_c11 * diag_c32 + r1 * diag_c12 * diag_c31)
-    sc3 = 0.5 * (      diag_c11 * diag_c22 -      diag_c12 * diag_c21)
+    return (abs(jacobian.sum(axis=0)) / 8.).reshape(shape)
 
-    return (sc1, sc2, sc3)
 
+def _shape_weight(offset, point, skip=None):
+    """
+    Return trilinear weight of vertex `offset` at `point` in the unit cube,
+    ignoring direction `skip`.
+    """
+    weight = 1.
+    for i, (n, u) in enumerate(zip(offset, point)):
+        if i != skip:
+            weight *= u if n else 1. - u
+    return weight
 
-def _cell_normal(c1, c2, c3, i, j, cylindrical):
+
+def _gauss_weights():
+    """
+    Return ``(derivatives, values)`` matrices which map the coordinates of
+    the vertices of a cell to the derivatives along each index direction,
+    and to the value, at each Gauss point.
     """
-    Return non-dimensional vector normal with magnitude equal to area.
-    If there is no 'z' coordinate, `c1` will be None in cylindrical
-    coordinates, otherwise `c3` will be None.
+    points = list(product(_GAUSS_POINTS, repeat=3))
+    derivatives = zeros((3, len(points), len(_CELL_VERTICES)))
+    values = zeros((len(points), len(_CELL_VERTICES)))
+    for i, point in enumerate(points):
+        for j, offset in enumerate(_CELL_VERTICES):
+            values[i, j] = _shape_weight(offset, point)
+            for axis in range(3):
+                sign = 1. if offset[axis] else -1.
+                derivatives[axis, i, j] = \
+                    sign * _shape_weight(offset, point, axis)
+    return (derivatives.reshape((-1, len(_CELL_VERTICES))), values)
+
+_GAUSS_DERIVATIVES, _GAUSS_VALUES = _gauss_weights()
+
+
+# Cell offsets of the upper-left, lower-right, and upper-right vertices of
+# a face, along with the sign to apply to the normal (the lower-left vertex
+# is at the cell origin).
+_FACE_VERTICES = {
+    'i':  ((0, 1, 0), (0, 0, 1), (0, 1, 1), -0.5),
+    'j':  ((1, 0, 0), (0, 0, 1), (1, 0, 1), 0.5),
+    'k':  ((0, 1, 0), (1, 0, 0), (1, 1, 0), 0.5),
+    None: ((0, 1), (1, 0), (1, 1), 0.5),
+}
+
+def _face_normals(zone, ranges, face):
+    """
+    Return non-dimensional vectors normal to faces with magnitude equal to
+    area, as a tuple of component arrays. If there is no 'z' coordinate,
+    the first component will be zero in cylindrical coordinates, otherwise
+    the third component will be zero.
     """
 # FIXME: built-in ghosts
-    ip1 = i + 1
-    jp1 = j + 1
+    upper_left, lower_right, upper_right, sign = _FACE_VERTICES[face]
+    lower_left = (0,) * len(ranges)
+    c1, c2, c3 = _components(zone, zone.grid_coordinates)
 
     # upper-left - lower-right.
-    diag_c11 = 0. if c1 is None else c1(i, jp1) - c1(ip1, j)
-    diag_c21 = c2(i, jp1) - c2(ip1, j)
-    diag_c31 = 0. if c3 is None else c3(i, jp1) - c3(ip1, j)
+    diag_c11 = _difference(c1, ranges, upper_left, lower_right)
+    diag_c21 = _difference(c2, ranges, upper_left, lower_right)
+    diag_c31 = _difference(c3, ranges, upper_left, lower_right)
 
     # upper-right - lower-left.
-    diag_c12 = 0. if c1 is None else c1(ip1, jp1) - c1(i, j)
-    diag_c22 = c2(ip1, jp1) - c2(i, j)
-    diag_c32 = 0. if c3 is None else c3(ip1, jp1) - c3(i, j)
-
-    if cylindrical:
-        r1 = (c2(i, jp1) + c2(ip1, j)) / 2.
-        r2 = (c2(i, j) + c2(ip1, jp1)) / 2.
+    diag_c12 = _difference(c1, ranges, upper_right, lower_left)
+    diag_c22 = _difference(c2, ranges, upper_right, lower_left)
+    diag_c32 = _difference(c3, ranges, upper_right, lower_left)
+
+    if zone.coordinate_system == CYLINDRICAL:
+        r1 = (_values(c2, ranges, lower_right) +
+              _values(c2, ranges, upper_left)) / 2.
+        r2 = (_values(c2, ranges, lower_left) +
+              _values(c2, ranges, upper_right)) / 2.
     else:
         r1 = 1.
         r2 = 1.
 
-    sc1 = 0.5 * ( r2 * diag_c21 * diag_c32 - r1 * diag_c22 * diag_c31)
-    sc2 = 0.5 * (-r2 * diag_c11 * diag_c32 + r1 * diag_c12 * diag_c31)
-    sc3 = 0.5 * (      diag_c11 * diag_c22 -      diag_c12 * diag_c21)
+    sc1 = sign * ( r2 * diag_c21 * diag_c32 - r1 * diag_c22 * diag_c31)
+    sc2 = sign * (-r2 * diag_c11 * diag_c32 + r1 * diag_c12 * diag_c31)
+    sc3 = sign * (      diag_c11 * diag_c22 -      diag_c12 * diag_c21)
 
     return (sc1, sc2, sc3)
 
 
-def _iedge_length(c1, c2, c3, loc, cylindrical):
-    """ Return length of edge along 'i'. """
-    if cylindrical:
-        if len(loc) > 2:
-            i, j, k = loc
-            ip1 = i + 1
-            theta = c3(ip1, j, k) - c3(i, j, k)
-            dx = c2(ip1, j, k) * cos(theta) - c2(i, j, k)
-            dy = c2(ip1, j, k) * sin(theta)
-            dz = c1(ip1, j, k) - c1(i, j, k)
-        elif len(loc) > 1:
-            i, j = loc
-            ip1 = i + 1
-            theta = c3(ip1, j) - c3(i, j)
-            dx = c2(ip1, j) * cos(theta) - c2(i, j)
-            dy = c2(ip1, j) * sin(theta)
-            dz = 0. if c1 is None else c1(ip1, j) - c1(i, j)
-        else:
-            i, = loc
-            ip1 = i + 1
-            theta = c3(ip1) - c3(i)
-            dx = c2(ip1) * cos(theta) - c2(i)
-            dy = c2(ip1) * sin(theta)
-            dz = 0. if c1 is None else c1(ip1) - c1(i)
-    else:
-        if len(loc) > 2:
-            i, j, k = loc
-            ip1 = i + 1
-            dx = c1(ip1, j, k) - c1(i, j, k)
-            dy = c2(ip1, j, k) - c2(i, j, k)
-            dz = c3(ip1, j, k) - c3(i, j, k)
-        elif len(loc) > 1:
-            i, j = loc
-            ip1 = i + 1
-            dx = c1(ip1, j) - c1(i, j)
-            dy = c2(ip1, j) - c2(i, j)
-            dz = 0. if c3 is None else c3(ip1, j) - c3(i, j)
-        else:
-            i, = loc
-            ip1 = i + 1
-            dx = c1(ip1) - c1(i)
-            dy = 0. if c2 is None else c2(ip1) - c2(i)
-            dz = 0. if c3 is None else c3(ip1) - c3(i)
-
-    return sqrt(dx*dx + dy*dy + dz*dz)
-
-
-def _jedge_length(c1, c2, c3, loc, cylindrical):
-    """ Return length of edge along 'j'. """
-    if cylindrical:
-        if len(loc) > 2:
-            i, j, k = loc
-            jp1 = j + 1
-            theta = c3(i, jp1, k) - c3(i, j, k)
-            dx = c2(i, jp1, k) * cos(theta) - c2(i, j, k)
-            dy = c2(i, jp1, k) * sin(theta)
-            dz = c1(i, jp1, k) - c1(i, j, k)
-        else:
-            i, j = loc
-            jp1 = j + 1
-            theta = c3(i, jp1) - c3(i, j)
-            dx = c2(i, jp1) * cos(theta) - c2(i, j)
-            dy = c2(i, jp1) * sin(theta)
-            dz = 0. if c1 is None else c1(i, jp1) - c1(i, j)
-    else:
-        if len(loc) > 2:
-            i, j, k = loc
-            jp1 = j + 1
-            dx = c1(i, jp1, k) - c1(i, j, k)
-            dy = c2(i, jp1, k) - c2(i, j, k)
-            dz = c3(i, jp1, k) - c3(i, j, k)
-        else:
-            i, j = loc
-            jp1 = j + 1
-            dx = c1(i, jp1) - c1(i, j)
-            dy = c2(i, jp1) - c2(i, j)
-            dz = 0. if c3 is None else c3(i, jp1) - c3(i, j)
-
-    return sqrt(dx*dx + dy*dy + dz*dz)
-
+def _edge_lengths(zone, ranges, edge):
+    """ Return array of lengths of edges along `edge`. """
+    lower = (0,) * len(ranges)
+    upper = tuple([int(i == 'ijk'.index(edge)) for i in range(len(ranges))])
+    c1, c2, c3 = _components(zone, zone.grid_coordinates)
 
-def _kedge_length(c1, c2, c3, loc, cylindrical):
-    """ Return length of edge along 'k'. """
-    i, j, k = loc
-    kp1 = k + 1
-    if cylindrical:
-        theta = c3(i, j, kp1) - c3(i, j, k)
-        dx = c2(i, j, kp1) * cos(theta) - c2(i, j, k)
-        dy = c2(i, j, kp1) * sin(theta)
-        dz = c1(i, j, kp1) - c1(i, j, k)
+    if zone.coordinate_system == CYLINDRICAL:
+        theta = _difference(c3, ranges, upper, lower)
+        radius = _values(c2, ranges, upper)
+        dx = radius * cos(theta) - _values(c2, ranges, lower)
+        dy = radius * sin(theta)
+        dz = _difference(c1, ranges, upper, lower)
     else:
-        dx = c1(i, j, kp1) - c1(i, j, k)
-        dy = c2(i, j, kp1) - c2(i, j, k)
-        dz = c3(i, j, kp1) - c3(i, j, k)
+        dx = _difference(c1, ranges, upper, lower)
+        dy = _difference(c2, ranges, upper, lower)
+        dz = _difference(c3, ranges, upper, lower)
 
     return sqrt(dx*dx + dy*dy + dz*dz)
 
 
-def _iface_cell_value(arr, loc):
-    """ Returns I face value for cell-centered data. """
-    i, j, k = loc
+# Cell offsets of the values averaged for a cell, and the scale factor to
+# apply to their sum, keyed by ``cell_center``.
+_CELL_SAMPLES = {
 # FIXME: built-in ghosts
-    return 0.5 * (arr(i+1, j+1, k+1) + arr(i, j+1, k+1))
-
-def _jface_cell_value(arr, loc):
-    """ Returns J face value for cell-centered data. """
-    i, j, k = loc
+    # Cell value is value.
+    True:  ([(1, 1, 1)], None),
+    # Average across vertices.
+    False: ([(0, 0, 0), (0, 1, 0), (0, 1, 1), (0, 0, 1),
+             (1, 0, 0), (1, 1, 0), (1, 1, 1), (1, 0, 1)], 0.125),
+}
+
+# Cell offsets of the values averaged for a face, and the scale factor to
+# apply to their sum, keyed by ``(face, cell_center)``.
+_FACE_SAMPLES = {
 # FIXME: built-in ghosts
-    return 0.5 * (arr(i+1, j+1, k+1) + arr(i+1, j, k+1))
-
-def _kface_cell_value(arr, loc):
-    """ Returns K face value for cell-centered data. """
-    i, j, k = loc
+    # Average across cells sharing surface.
+    ('i', True):  ([(1, 1, 1), (0, 1, 1)], 0.5),
+    ('j', True):  ([(1, 1, 1), (1, 0, 1)], 0.5),
+    ('k', True):  ([(1, 1, 1), (1, 1, 0)], 0.5),
+    (None, True): ([(1, 1)], None),
+    # Average across vertices.
+    ('i', False):  ([(0, 0, 0), (0, 1, 0), (0, 1, 1), (0, 0, 1)], 0.25),
+    ('j', False):  ([(0, 0, 0), (1, 0, 0), (1, 0, 1), (0, 0, 1)], 0.25),
+    ('k', False):  ([(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)], 0.25),
+    (None, False): ([(0, 0), (0, 1), (1, 1), (1, 0)], 0.25),
+}
+
+# Cell offsets of the values averaged for an edge, and the scale factor to
+# apply to their sum, keyed by ``(ndim, edge, cell_center)``.
+_EDGE_SAMPLES = {
 # FIXME: built-in ghosts
-    return 0.5 * (arr(i+1, j+1, k+1) + arr(i+1, j+1, k))
-
-
-def _iface_node_value(arr, loc):
-    """ Returns I face value for vertex data. """
-    i, j, k = loc
-    return 0.25 * (arr(i, j+1, k+1) + arr(i, j, k+1) +
-                   arr(i, j+1, k) + arr(i, j, k))
-
-def _jface_node_value(arr, loc):
-    """ Returns J face value for vertex data. """
-    i, j, k = loc
-    return 0.25 * (arr(i+1, j, k+1) + arr(i, j, k+1) +
-                   arr(i+1, j, k) + arr(i, j, k))
-
-def _kface_node_value(arr, loc):
-    """ Returns K face value for vertex data. """
-    i, j, k = loc
-    return 0.25 * (arr(i+1, j+1, k) + arr(i, j+1, k) +
-                   arr(i+1, j, k) + arr(i, j, k))
-
+    # Average across cells sharing edge.
+    (3, 'i', True): ([(1, 1, 1), (1, 0, 1), (1, 1, 0), (1, 0, 0)], 0.25),
+    (3, 'j', True): ([(1, 1, 1), (0, 1, 1), (1, 1, 0), (0, 1, 0)], 0.25),
+    (3, 'k', True): ([(1, 1, 1), (0, 1, 1), (1, 0, 1), (0, 0, 1)], 0.25),
+    (2, 'i', True): ([(1, 1), (1, 0)], 0.5),
+    (2, 'j', True): ([(1, 1), (0, 1)], 0.5),
+    (1, 'i', True): ([(1,)], None),
+    # Average across vertices.
+    (3, 'i', False): ([(0, 0, 0), (1, 0, 0)], 0.5),
+    (3, 'j', False): ([(0, 0, 0), (0, 1, 0)], 0.5),
+    (3, 'k', False): ([(0, 0, 0), (0, 0, 1)], 0.5),
+    (2, 'i', False): ([(0, 0), (1, 0)], 0.5),
+    (2, 'j', False): ([(0, 0), (0, 1)], 0.5),
+    (1, 'i', False): ([(0,), (1,)], 0.5),
+}
@@ -0,0 +1,73 @@
+"""
+Report the memory used by extracting many sub-regions from a large zone
+and by extending it, along with the time taken.  Extracted zones are views
+of the original data, so only the bytes actually allocated are counted.
+"""
+
+import resource
+import sys
+import time
+
+from openmdao.lib.datatypes.domain.test.probeperf import create_zone
+
+
+def zone_arrays(zone):
+    """ Returns list of all arrays in `zone`. """
+    arrays = []
+    for vector in [zone.grid_coordinates] + zone.flow_solution.vectors:
+        for component in ('x', 'y', 'z', 'r', 't'):
+            arr = getattr(vector, component)
+            if arr is not None:
+                arrays.append(arr)
+    arrays.extend(zone.flow_solution.arrays)
+    return arrays
+
+
+def allocated(zones):
+    """ Returns (referenced, allocated) bytes of arrays in `zones`. """
+    referenced = 0
+    owned = 0
+    for zone in zones:
+        for arr in zone_arrays(zone):
+            referenced += arr.nbytes
+            if arr.flags.owndata:
+                owned += arr.nbytes
+    return (referenced, owned)
+
+
+def max_rss():
+    """ Returns maximum resident set size in MB. """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.
+
+
+def main():
+    """ Extract every i-plane and a set of sub-blocks, then extend. """
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    zone = create_zone((n, n, n)).zone
+    referenced, owned = allocated([zone])
+    print '%d x %d x %d zone: %.1f MB, max RSS %.1f MB' \
+          % (n, n, n, owned / 1e6, max_rss())
+
+    start = time.time()
+    regions = [zone.extract(i, i, 0, -1, 0, -1) for i in range(n)]
+    step = max(n // 4, 1)
+    for i in range(0, n-step, step):
+        regions.append(zone.extract(i, i+step, i, i+step, 0, -1))
+    elapsed = time.time() - start
+    referenced, owned = allocated(regions)
+    print '%d extracts: %.4f sec, %.1f MB referenced, %.1f MB allocated,' \
+          ' max RSS %.1f MB' % (len(regions), elapsed, referenced / 1e6,
+                                owned / 1e6, max_rss())
+
+    for axis in ('i', 'k'):
+        start = time.time()
+        extended = zone.extend(axis, 0.5, 10, 10)
+        elapsed = time.time() - start
+        referenced, owned = allocated([extended])
+        print 'extend %s by 10: %.4f sec, %.1f MB allocated, max RSS %.1f MB' \
+              % (axis, elapsed, owned / 1e6, max_rss())
+        del extended
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Compare the time needed by mesh_probe() to process the faces of a large
+zone using the whole-region metric calculations and using the per-point
+:meth:`calculate` fallback. Also time a mass averaged probe of the whole
+zone volume.
+"""
+
+import sys
+import time
+
+import numpy
+
+from openmdao.units import PhysicalQuantity
+from openmdao.lib.datatypes.domain import DomainObj, Vector, Zone, \
+                                          mesh_probe, get_metric
+from openmdao.lib.datatypes.domain.metrics import register_metric
+
+VARIABLES = [('area', 'inch**2'), ('mass_flow', 'lbm/s'),
+             ('pressure', 'psi'), ('temperature', 'degR')]
+
+REGIONS = [('zone', 2, 2, 0, -1, 0, -1),
+           ('zone', 0, -1, 2, 2, 0, -1),
+           ('zone', 0, -1, 0, -1, 2, 2)]
+
+
+def create_zone(shape):
+    """ Returns a domain with a single Cartesian zone of `shape`. """
+    dtype = numpy.float32
+    i, j, k = numpy.indices(shape, dtype=dtype)
+    x = i / shape[0]
+    y = j / shape[1] + 0.01 * numpy.sin(x)
+    z = k / shape[2]
+
+    momentum = Vector()
+    momentum.x = 1. + x
+    momentum.y = 0.1 * y
+    momentum.z = 0.1 * z
+
+    zone = Zone()
+    zone.grid_coordinates.x = x
+    zone.grid_coordinates.y = y
+    zone.grid_coordinates.z = z
+    zone.flow_solution.add_array('density', 1. + 0.1 * x)
+    zone.flow_solution.add_vector('momentum', momentum)
+    zone.flow_solution.add_array('pressure', 1. + 0.2 * y)
+
+    domain = DomainObj()
+    domain.reference_state = dict(
+        length_reference=PhysicalQuantity(1., 'ft'),
+        pressure_reference=PhysicalQuantity(2116., 'lbf/ft**2'),
+        ideal_gas_constant=PhysicalQuantity(1716., 'ft*lbf/(slug*degR)'),
+        temperature_reference=PhysicalQuantity(518.67, 'degR'),
+        specific_heat_ratio=PhysicalQuantity(1.4, 'unitless'))
+    domain.add_zone('zone', zone)
+    return domain
+
+
+class PerPoint(object):
+    """ Wraps a metric without exposing its :meth:`calculate_region`. """
+
+    cls = None
+
+    def __init__(self, zone, zone_name, reference_state):
+        self.metric = self.cls(zone, zone_name, reference_state)
+
+    def calculate(self, loc, geom):
+        """ Return metric value. """
+        return self.metric.calculate(loc, geom)
+
+    def dimensionalize(self, value):
+        """ Return dimensional `value`. """
+        return self.metric.dimensionalize(value)
+
+
+def per_point(name):
+    """ Register a per-point version of metric `name`, returning its name. """
+    cls, integrate, geometry = get_metric(name)
+    wrapper = type(cls.__name__+'PerPoint', (PerPoint,), dict(cls=cls))
+    register_metric(name+'_per_point', wrapper, integrate, geometry)
+    return name+'_per_point'
+
+
+def main():
+    """ Probe each face of the zone with both forms of each metric. """
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    domain = create_zone((n, n, n))
+    print '%d x %d x %d zone' % (n, n, n)
+    print '%-12s %10s %10s %8s' % ('metric', 'per-point', 'region', 'speedup')
+    for name, units in VARIABLES:
+        variables = [(per_point(name), units)]
+        start = time.time()
+        slow = mesh_probe(domain, REGIONS[:1], variables, 'mass')
+        slow_time = time.time() - start
+
+        start = time.time()
+        fast = mesh_probe(domain, REGIONS[:1], [(name, units)], 'mass')
+        fast_time = time.time() - start
+
+        assert abs(slow[0] - fast[0]) <= 1e-10 * abs(slow[0])
+        print '%-12s %10.4f %10.4f %8.1f' \
+              % (name, slow_time, fast_time, slow_time / fast_time)
+
+    start = time.time()
+    for region in REGIONS:
+        mesh_probe(domain, [region], VARIABLES, 'mass')
+    print 'all faces, all metrics: %.4f' % (time.time() - start)
+
+    start = time.time()
+    mesh_probe(domain, [('zone', 0, -1, 0, -1, 0, -1)],
+               [('volume', 'ft**3'), ('pressure', 'psi'),
+                ('temperature', 'degR')], 'mass')
+    print 'volume, mass averaged: %.4f' % (time.time() - start)
+
+
+if __name__ == '__main__':
+    main()
@@ -396,6 +396,24 @@ class TestCase(unittest.TestCase):
                          (1.116717, 1.6842105, 0.0, 0.84210527, 1.7241379, 3.4482758),
                          0.000001)
 
+        # Extracted data is a view, which is replaced rather than modified.
+        grid = wedge.xyzzy.grid_coordinates
+        flow = wedge.xyzzy.flow_solution
+        self.assertTrue(numpy.may_share_memory(volume.grid_coordinates.z,
+                                               grid.z))
+        self.assertTrue(numpy.may_share_memory(volume.flow_solution.density,
+                                               flow.density))
+        z = grid.z.copy()
+        momentum_z = flow.momentum.z.copy()
+        volume.grid_coordinates.translate(0., 0., 1.)
+        volume.flow_solution.flip_z()
+        self.assertTrue((grid.z == z).all())
+        self.assertTrue((flow.momentum.z == momentum_z).all())
+        self.assertTrue((volume.grid_coordinates.z ==
+                         z[10:21, 10:16, :] + 1.).all())
+        self.assertTrue((volume.flow_solution.momentum.z ==
+                         -momentum_z[10:21, 10:16, :]).all())
+
         surface = wedge.xyzzy.extract(0, -1, 10, 10, 0, -1)
         self.assertEqual(surface.shape, (30, 1, 10))
         self.assertEqual(surface.flow_solution.shape, (30, 1, 10))
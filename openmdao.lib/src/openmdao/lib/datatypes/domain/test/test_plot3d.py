@@ -6,13 +6,17 @@ import logging
 import os.path
 import unittest
 
+import numpy
+
 from openmdao.lib.datatypes.domain import read_plot3d_q, write_plot3d_q, \
                                           read_plot3d_f, write_plot3d_f, \
-                                          read_plot3d_shape, write_plot3d_grid
+                                          read_plot3d_grid, read_plot3d_shape, \
+                                          write_plot3d_grid
 
 from openmdao.lib.datatypes.domain.test.wedge import create_wedge_2d, \
                                                      create_wedge_3d
 
+from openmdao.util.stream import Stream
 from openmdao.util.testutil import assert_raises
 
 
@@ -64,14 +68,6 @@ class TestCase(unittest.TestCase):
         self.assertEqual(shape, [(30, 20, 10), (29, 19, 9)])
 
         # Errors.
-        try:
-            read_plot3d_q('unformatted.xyz', 'unformatted.q', blanking=True,
-                          logger=logger, multiblock=False)
-        except NotImplementedError as exc:
-            self.assertEqual(str(exc), 'blanking not supported yet')
-        else:
-            self.fail('Expected NotImplementedError')
-
         try:
             read_plot3d_q('unformatted.xyz', 'unformatted.q', planes=True,
                           logger=logger, multiblock=False)
@@ -196,6 +192,160 @@ class TestCase(unittest.TestCase):
         self.assertTrue((test_flow.f_3 == wedge_flow.momentum.y).all())
         self.assertTrue((test_flow.f_4 == wedge_flow.energy_stagnation_density).all())
 
+    def test_memmap(self):
+        logging.debug('')
+        logging.debug('test_memmap')
+
+        logger = logging.getLogger()
+        wedge = create_wedge_3d((30, 20, 10), 5., 0.5, 2., 30.)
+        wedge.add_domain(create_wedge_3d((29, 19, 9), 5., 2.5, 4., 30.))
+
+        # Big-endian binary.
+        write_plot3d_q(wedge, 'be-binary.xyz', 'be-binary.q', logger=logger,
+                       big_endian=True, unformatted=False)
+        domain = read_plot3d_q('be-binary.xyz', 'be-binary.q', logger=logger,
+                               big_endian=True, unformatted=False,
+                               memmap=True)
+        self.assertTrue(isinstance(domain.zone_2.grid_coordinates.x,
+                                   numpy.memmap))
+        self.assertTrue(isinstance(domain.zone_2.flow_solution.momentum.z,
+                                   numpy.memmap))
+        domain.rename_zone('xyzzy', domain.zone_1)
+        self.assertTrue(domain.is_equivalent(wedge, logger=logger))
+
+        # Little-endian unformatted, double precision.
+        write_plot3d_f(wedge, 'unformatted.xyz', 'unformatted.f',
+                       logger=logger, single_precision=False)
+        expected = read_plot3d_f('unformatted.xyz', 'unformatted.f',
+                                 logger=logger, single_precision=False)
+        domain = read_plot3d_f('unformatted.xyz', 'unformatted.f',
+                               logger=logger, single_precision=False,
+                               memmap=True)
+        self.assertTrue(isinstance(domain.zone_1.flow_solution.f_3,
+                                   numpy.memmap))
+        self.assertTrue(domain.is_equivalent(expected, logger=logger))
+
+        # Mapped data can be modified without changing the file.
+        domain.zone_1.grid_coordinates.x *= 2.
+        domain = read_plot3d_grid('unformatted.xyz', logger=logger,
+                                  single_precision=False, memmap=True)
+        self.assertTrue((domain.zone_1.grid_coordinates.x ==
+                         expected.zone_1.grid_coordinates.x).all())
+
+        # Text files are read normally.
+        write_plot3d_grid(wedge, 'unformatted.xyz', binary=False,
+                          logger=logger)
+        domain = read_plot3d_grid('unformatted.xyz', binary=False,
+                                  logger=logger, memmap=True)
+        self.assertFalse(isinstance(domain.zone_1.grid_coordinates.x,
+                                    numpy.memmap))
+        self.assertEqual(domain.zone_2.shape, (29, 19, 9))
+
+    def test_memmap_overwrite(self):
+        logging.debug('')
+        logging.debug('test_memmap_overwrite')
+
+        logger = logging.getLogger()
+        wedge = create_wedge_3d((30, 20, 10), 5., 0.5, 2., 30.)
+        wedge.add_domain(create_wedge_3d((29, 19, 9), 5., 2.5, 4., 30.))
+        write_plot3d_q(wedge, 'unformatted.xyz', 'unformatted.q',
+                       logger=logger)
+
+        # Writing a mapped domain back to the files it views.
+        for max_workers in (1, 2):
+            domain = read_plot3d_q('unformatted.xyz', 'unformatted.q',
+                                   logger=logger, memmap=True)
+            domain.zone_1.grid_coordinates.x *= 2.
+            write_plot3d_q(domain, 'unformatted.xyz', 'unformatted.q',
+                           logger=logger, max_workers=max_workers)
+            # The old maps are still valid.
+            self.assertTrue((domain.zone_2.flow_solution.density ==
+                             wedge.zone_2.flow_solution.density).all())
+            expected = read_plot3d_q('unformatted.xyz', 'unformatted.q',
+                                     logger=logger)
+            self.assertTrue(domain.is_equivalent(expected, logger=logger))
+
+        x = expected.zone_1.grid_coordinates.x
+        self.assertTrue((x == 4. * wedge.xyzzy.grid_coordinates.x).all())
+        leftovers = [name for name in os.listdir('.')
+                     if name.startswith('unformatted.xyz.') or
+                        name.startswith('unformatted.q.')]
+        self.assertEqual(leftovers, [])
+
+    def test_blanking(self):
+        logging.debug('')
+        logging.debug('test_blanking')
+
+        logger = logging.getLogger()
+        wedge = create_wedge_3d((30, 20, 10), 5., 0.5, 2., 30.)
+        grid = wedge.xyzzy.grid_coordinates
+        iblank = numpy.ones(grid.shape, dtype=numpy.int32)
+        iblank[0, :, :] = 0
+        with open('unformatted.xyz', 'wb') as out:
+            stream = Stream(out, binary=True, unformatted=True)
+            stream.write_recordmark(stream.reclen_ints(3))
+            stream.write_ints(numpy.array(grid.shape, dtype=numpy.int32))
+            stream.write_recordmark(stream.reclen_ints(3))
+            reclen = stream.reclen_floats(3 * iblank.size) \
+                   + stream.reclen_ints(iblank.size)
+            stream.write_recordmark(reclen)
+            for arr in (grid.x, grid.y, grid.z):
+                stream.write_floats(arr, order='Fortran')
+            stream.write_ints(iblank, order='Fortran')
+            stream.write_recordmark(reclen)
+
+        # Results don't depend on memmap.
+        for memmap in (False, True):
+            domain = read_plot3d_grid('unformatted.xyz', multiblock=False,
+                                      blanking=True, single_precision=False,
+                                      logger=logger, memmap=memmap)
+            coords = domain.zone_1.grid_coordinates
+            self.assertEqual(isinstance(coords.iblank, numpy.memmap), memmap)
+            self.assertTrue((coords.x == grid.x).all())
+            self.assertTrue((coords.z == grid.z).all())
+            self.assertTrue((coords.iblank == iblank).all())
+
+    def test_max_workers(self):
+        logging.debug('')
+        logging.debug('test_max_workers')
+
+        logger = logging.getLogger()
+        wedge = create_wedge_3d((30, 20, 10), 5., 0.5, 2., 30.)
+        for i in range(4):
+            wedge.add_domain(create_wedge_3d((29-i, 19, 9), 5., 2.5+i, 4.+i,
+                                             30.))
+        wedge.zone_2.grid_coordinates.ghosts = (1, 2, 0, 1, 2, 0)
+        wedge.zone_2.flow_solution.ghosts = (1, 2, 0, 1, 2, 0)
+
+        # Sequential and concurrent output are identical.
+        for unformatted in (True, False):
+            write_plot3d_q(wedge, 'be-binary.xyz', 'be-binary.q',
+                           logger=logger, unformatted=unformatted)
+            write_plot3d_q(wedge, 'unformatted.xyz', 'unformatted.q',
+                           logger=logger, unformatted=unformatted,
+                           max_workers=3)
+            for ext in ('xyz', 'q'):
+                with open('be-binary.'+ext, 'rb') as inp:
+                    expected = inp.read()
+                with open('unformatted.'+ext, 'rb') as inp:
+                    self.assertEqual(inp.read(), expected)
+
+        varnames = ('density', 'momentum')
+        write_plot3d_f(wedge, 'unformatted.xyz', 'unformatted.f', varnames,
+                       logger=logger, big_endian=True, single_precision=False,
+                       max_workers=8)
+        domain = read_plot3d_f('unformatted.xyz', 'unformatted.f',
+                               logger=logger, big_endian=True,
+                               single_precision=False)
+        self.assertEqual(len(domain.zones), 5)
+        self.assertEqual(domain.zone_2.shape, (26, 18, 7))
+        flow = wedge.zone_2.flow_solution
+        self.assertTrue((domain.zone_2.flow_solution.f_3 ==
+                         flow.momentum.y[1:-2, :-1, 2:]).all())
+        flow = wedge.zone_5.flow_solution
+        self.assertTrue((domain.zone_5.flow_solution.f_1 ==
+                         flow.density).all())
+
 
 if __name__ == '__main__':
     import nose
@@ -7,9 +7,10 @@ import os.path
 import pkg_resources
 import unittest
 
-from math import pi
+from math import pi, sqrt
 
 from openmdao.lib.datatypes.domain import mesh_probe
+from openmdao.lib.datatypes.domain.metrics import register_metric
 from openmdao.lib.datatypes.domain.test import restart, overflow
 from openmdao.lib.datatypes.domain.test.cube import create_cube
 from openmdao.lib.datatypes.domain.test.wedge import create_wedge_3d
@@ -19,6 +20,37 @@ from openmdao.util.testutil import assert_raises, assert_rel_error
 ORIG_DIR = os.getcwd()
 
 
+class PointDensity(object):
+    """ Density metric which can only be calculated one point at a time. """
+
+    def __init__(self, zone, zone_name, reference_state):
+        self.density = zone.flow_solution.density.item
+
+    def calculate(self, loc, geom):
+        return self.density(*loc)
+
+    def dimensionalize(self, value):
+        raise NotImplementedError('Dimensional point_density')
+
+register_metric('point_density', PointDensity, False)
+
+
+class PointArea(object):
+    """ Area metric which can only be calculated one point at a time. """
+
+    def __init__(self, zone, zone_name, reference_state):
+        pass
+
+    def calculate(self, loc, normal):
+        sc1, sc2, sc3 = normal
+        return sqrt(sc1*sc1 + sc2*sc2 + sc3*sc3)
+
+    def dimensionalize(self, value):
+        raise NotImplementedError('Dimensional point_area')
+
+register_metric('point_area', PointArea, True, 'surface')
+
+
 class TestCase(unittest.TestCase):
     """ Test :class:`Domain` mesh_probe() operations. """
 
@@ -167,6 +199,39 @@ class TestCase(unittest.TestCase):
                       area, area / 144., expected)
         assert_rel_error(self, area, expected, 0.000001)
 
+    def test_volume(self):
+        logging.debug('')
+        logging.debug('test_volume')
+
+        cube = create_cube((41, 17, 9), 5., 4., 3.)
+        regions = (('xyzzy', 0, -1, 0, -1, 0, -1),)
+        variables = (('volume', 'inch**3'), ('density', None))
+        volume, density = mesh_probe(cube, regions, variables)
+        assert_rel_error(self, volume, 5. * 4. * 3. * 1728., 1e-12)
+        assert_rel_error(self, density, 2.5, 1e-12)
+
+        # Mass averaging weights by density * volume.
+        density, = mesh_probe(cube, regions, (('density', None),), 'mass')
+        assert_rel_error(self, density, 3.3328125, 1e-12)
+
+        regions = (('xyzzy', 3, 7, 2, 5, 1, 4),)
+        volume, = mesh_probe(cube, regions, (('volume', None),))
+        assert_rel_error(self, volume, 0.5 * 0.75 * 1.125, 1e-12)
+
+        # Cartesian cells have flat faces.
+        wedge = create_wedge_3d((30, 20, 100), 5., 0.5, 2., 30.)
+        regions = (('xyzzy', 0, -1, 0, -1, 0, -1),)
+        variables = (('volume', None),)
+        expected = ((pi*2.**2.) - (pi*0.5**2.)) * 30./360. * 5.
+        volume, = mesh_probe(wedge, regions, variables)
+        assert_rel_error(self, volume, expected, 0.00001)
+
+        # Cylindrical cells follow the radius.
+        wedge = create_wedge_3d((5, 3, 4), 5., 0.5, 2., 30.)
+        wedge.make_cylindrical()
+        volume, = mesh_probe(wedge, regions, variables)
+        assert_rel_error(self, volume, expected, 0.0000001)
+
     def test_adpac(self):
         # Verify correct metric values for data from real scenario.
         logging.debug('')
@@ -237,6 +302,35 @@ class TestCase(unittest.TestCase):
         assert_rel_error(self, metrics[5], -149.525, 0.00001)
         assert_rel_error(self, metrics[6], -262.976, 0.00001)
 
+    def test_per_point(self):
+        # Verify metrics without calculate_region() match the built-ins.
+        logging.debug('')
+        logging.debug('test_per_point')
+
+        cube = create_cube((11, 7, 5), 5., 4., 3.)
+        adpac = restart.read('lpc-test', logging.getLogger())
+        surfaces = ((2, 2, 0, -1, 0, -1), (0, -1, 1, 1, 0, -1),
+                    (0, -1, 0, -1, 3, 3))
+        curves = ((0, -1, 2, 2, 3, 3), (1, 1, 0, -1, 2, 2),
+                  (1, 1, 2, 2, 0, -1))
+        volumes = ((1, 4, 0, -1, 1, 3),)
+        # Curve weights aren't supported in cylindrical coordinates.
+        for domain, zone_name, probes in \
+                ((cube, 'xyzzy', surfaces+curves+volumes),
+                 (adpac, 'zone_1', surfaces+volumes)):
+            for indices in probes:
+                regions = [(zone_name,) + indices]
+                expected, = mesh_probe(domain, regions, [('density', None)])
+                density, = mesh_probe(domain, regions,
+                                      [('point_density', None)])
+                assert_rel_error(self, density, expected, 1e-12)
+
+            for indices in surfaces:
+                regions = [(zone_name,) + indices]
+                expected, = mesh_probe(domain, regions, [('area', None)])
+                area, = mesh_probe(domain, regions, [('point_area', None)])
+                assert_rel_error(self, area, expected, 1e-12)
+
     def test_errors(self):
         logging.debug('')
         logging.debug('test_errors')
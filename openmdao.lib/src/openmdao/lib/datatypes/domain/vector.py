@@ -124,7 +124,7 @@ class Vector(object):
                 ghosts=None):
         """
         Construct a new :class:`Vector` from data extracted from the
-        specified region.
+        specified region.  The new arrays are views of this object's data.
 
         imin, imax, jmin, jmax, kmin, kmax: int
             Specifies the region to extract.
@@ -290,124 +290,26 @@ class Vector(object):
         if i == 3:
             if axis not in ('i', 'j', 'k'):
                 raise ValueError('axis must be i, j, or k')
-            return self._extend_3d(axis, delta, npoints)
+            return self._extend(axis, delta, npoints)
         elif i == 2:
             if axis not in ('i', 'j'):
                 raise ValueError('axis must be i or j')
-            return self._extend_2d(axis, delta, npoints)
+            return self._extend(axis, delta, npoints)
         elif i == 1:
             if axis != 'i':
                 raise ValueError('axis must be i')
-            return self._extend_1d(delta, npoints)
+            return self._extend(axis, delta, npoints)
         else:
             raise RuntimeError('Vector is empty!')
 
-    def _extend_3d(self, axis, delta, npoints):
-        """ 3D (index space) extension. """
-        imax, jmax, kmax = self.real_shape
-        if axis == 'i':
-            new_shape = (imax + npoints, jmax, kmax)
-            indx = imax if delta > 0 else npoints
-        elif axis == 'j':
-            new_shape = (imax, jmax + npoints, kmax)
-            indx = jmax if delta > 0 else npoints
-        else:
-            new_shape = (imax, jmax, kmax + npoints)
-            indx = kmax if delta > 0 else npoints
-
+    def _extend(self, axis, delta, npoints):
+        """ Extension along `axis` for any index dimension. """
+        index = 'ijk'.index(axis)
         vec = Vector()
         for component in ('x', 'y', 'z', 'r', 't'):
             arr = getattr(self, component)
             if arr is not None:
-                new_arr = numpy.zeros(new_shape)
-                if axis == 'i':
-                    if delta > 0:
-                        new_arr[0:indx, :, :] = arr
-                        for i in range(npoints):
-                            new_arr[indx+i, :, :] = arr[-1, :, :]
-                    else:
-                        new_arr[indx:, :, :] = arr
-                        for i in range(npoints):
-                            new_arr[i, :, :] = arr[0, :, :]
-                elif axis == 'j':
-                    if delta > 0:
-                        new_arr[:, 0:indx, :] = arr
-                        for j in range(npoints):
-                            new_arr[:, indx+j, :] = arr[:, -1, :]
-                    else:
-                        new_arr[:, indx:, :] = arr
-                        for j in range(npoints):
-                            new_arr[:, j, :] = arr[:, 0, :]
-                else:
-                    if delta > 0:
-                        new_arr[:, :, 0:indx] = arr
-                        for k in range(npoints):
-                            new_arr[:, :, indx+k] = arr[:, :, -1]
-                    else:
-                        new_arr[:, :, indx:] = arr
-                        for k in range(npoints):
-                            new_arr[:, :, k] = arr[:, :, 0]
-                setattr(vec, component, new_arr)
-        vec.ghosts = copy.copy(self._ghosts)
-        return vec
-
-    def _extend_2d(self, axis, delta, npoints):
-        """ 2D (index space) extension. """
-        imax, jmax = self.real_shape
-        if axis == 'i':
-            new_shape = (imax + npoints, jmax)
-            indx = imax if delta > 0 else npoints
-        else:
-            new_shape = (imax, jmax + npoints)
-            indx = jmax if delta > 0 else npoints
-
-        vec = Vector()
-        for component in ('x', 'y', 'z', 'r', 't'):
-            arr = getattr(self, component)
-            if arr is not None:
-                new_arr = numpy.zeros(new_shape)
-                if axis == 'i':
-                    if delta > 0:
-                        new_arr[0:indx, :] = arr
-                        for i in range(npoints):
-                            new_arr[indx+i, :] = arr[-1, :]
-                    else:
-                        new_arr[indx:, :] = arr
-                        for i in range(npoints):
-                            new_arr[i, :] = arr[0, :]
-                else:
-                    if delta > 0:
-                        new_arr[:, 0:indx] = arr
-                        for j in range(npoints):
-                            new_arr[:, indx+j] = arr[:, -1]
-                    else:
-                        new_arr[:, indx:] = arr
-                        for j in range(npoints):
-                            new_arr[:, j] = arr[:, 0]
-                setattr(vec, component, new_arr)
-        vec.ghosts = copy.copy(self._ghosts)
-        return vec
-
-    def _extend_1d(self, delta, npoints):
-        """ 1D (index space) extension. """
-        imax, = self.real_shape
-        new_shape = (imax + npoints,)
-        indx = imax if delta > 0 else npoints
-
-        vec = Vector()
-        for component in ('x', 'y', 'z', 'r', 't'):
-            arr = getattr(self, component)
-            if arr is not None:
-                new_arr = numpy.zeros(new_shape)
-                if delta > 0:
-                    new_arr[0:indx] = arr
-                    for i in range(npoints):
-                        new_arr[indx+i] = arr[-1]
-                else:
-                    new_arr[indx:] = arr
-                    for i in range(npoints):
-                        new_arr[i] = arr[0]
-                setattr(vec, component, new_arr)
+                setattr(vec, component, _replicate(arr, index, delta, npoints))
         vec.ghosts = copy.copy(self._ghosts)
         return vec
 
@@ -415,7 +317,7 @@ class Vector(object):
         """ Convert to other-handed coordinate system. """
         if self.z is None:
             raise AttributeError('flip_z: no Z component')
-        self.z *= -1.
+        self.z = -self.z
 
     def make_cartesian(self, grid, axis='z'):
         """
@@ -764,3 +666,29 @@ class Vector(object):
         else:
             raise RuntimeError('Vector is empty!')
 
+
+def _replicate(arr, index, delta, npoints):
+    """
+    Returns `arr` extended by `npoints` copies of its last (`delta` > 0) or
+    first plane in the `index` dimension.  The result is allocated once, with
+    the dtype of `arr`, and the new planes are filled by broadcasting.
+    """
+    size = arr.shape[index]
+    shape = list(arr.shape)
+    shape[index] += npoints
+    old = [slice(None)] * arr.ndim
+    new = [slice(None)] * arr.ndim
+    edge = [slice(None)] * arr.ndim
+    if delta > 0:
+        old[index] = slice(0, size)
+        new[index] = slice(size, None)
+        edge[index] = slice(size-1, size)
+    else:
+        old[index] = slice(npoints, None)
+        new[index] = slice(0, npoints)
+        edge[index] = slice(0, 1)
+
+    new_arr = numpy.empty(shape, dtype=arr.dtype)
+    new_arr[tuple(old)] = arr
+    new_arr[tuple(new)] = arr[tuple(edge)]
+    return new_arr
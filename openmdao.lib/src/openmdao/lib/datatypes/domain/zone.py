@@ -101,6 +101,9 @@ class Zone(object):
         """
         Construct a new :class:`Zone` from grid and flow data extracted
         from the specified region. Symmetry data is copied.
+        Grid and flow arrays are views of this zone's data rather than copies.
+        Methods such as :meth:`translate` and :meth:`make_left_handed` replace
+        arrays rather than modifying them, so they don't affect the other zone.
 
         imin, imax, jmin, jmax, kmin, kmax: int
             Specifies the region to extract neglecting ghost/rind planes.
@@ -6,13 +6,19 @@ from ordereddict import OrderedDict
 
 from enthought.traits.api import HasTraits
 
-from openmdao.lib.datatypes.api import Float
+from openmdao.lib.datatypes.api import Enum, Float
 from openmdao.main.interfaces import implements, IDifferentiator
 from openmdao.main.api import Driver, Assembly
 from openmdao.main.assembly import Run_Once
-from openmdao.main.numpy_fallback import array
+import re
+
+from numpy import array, dot, outer, prod, ravel_multi_index, zeros
 from openmdao.units import convert_units
 
+# Matches a reference to an array element, e.g., comp.x[2][0]
+_ELEMENT_RE = re.compile(r'^(.+?)((?:\[\d+\])+)$')
+_INDEX_RE = re.compile(r'\[(\d+)\]')
+
 class ChainRule(HasTraits):
     """ Differentiates a driver's workflow using the Chain Rule with Numerical
     Derivatives (CRND) method."""
@@ -22,6 +28,11 @@ class ChainRule(HasTraits):
     # Local FD might need a stepsize
     default_stepsize = Float(1.0e-6, iotype='in', desc='Default finite ' + \
                              'difference step size.')
+    
+    mode = Enum('auto', ['auto', 'forward', 'adjoint'], iotype='in',
+                desc='Accumulate the derivatives forward from the ' + \
+                'parameters or in reverse from the objectives and ' + \
+                'constraints. auto picks whichever are fewer.')
 
     def __init__(self):
 
@@ -35,6 +46,12 @@ class ChainRule(HasTraits):
         
         self.gradient = {}
         self.hessian = {}
+        
+        self.output_names = []
+        self.jacobian = None
+        
+        self._index = {}
+        self._rows = []
     
     def setup(self):
         """Sets some dimensions."""
@@ -89,8 +106,7 @@ class ChainRule(HasTraits):
             Name of the output in the local OpenMDAO hierarchy.
         """
         
-        return array([self.gradient[wrt][output_name] \
-                      for wrt in self.param_names])
+        return self.jacobian[self.output_names.index(output_name)]
         
         
     def get_Hessian(self, output_name=None):
@@ -107,73 +123,258 @@ class ChainRule(HasTraits):
 
     def calc_gradient(self):
         """Calculates the gradient vectors for all outputs in this Driver's
-        workflow."""
+        workflow.
+        
+        The workflow is linearized once: every variable whose derivative
+        depends on the parameters gets a sparse row holding the partial
+        derivatives with respect to the variables it's computed from
+        (component derivatives, connection expressions and unit
+        conversions). Array variables get a row per element, and the
+        derivative blocks declared by their components are used as they are.
+        The rows are then accumulated for all parameters at once, either
+        forward from the parameters or in reverse (adjoint) from the
+        objectives and constraints, depending on `mode`.
+        """
         
         self.setup()
-
-        # Create our 2D dictionary the first time we execute.
-        if not self.gradient:
-            for name in self.param_names:
-                self.gradient[name] = {}
         
-        # Determine gradient of model outputs wrt each parameter
-        for wrt in self.param_names:
-                    
-            derivs = { wrt: 1.0 }
+        # Sparse rows, in the order they're computed. The index maps
+        # variable names to their (first row, shape).
+        self._index = {}
+        self._rows = []
+        self._nrows = 0
+        
+        for name in self.param_names:
+            self._add_row(name, {}, ())
+        
+        # Find derivatives for all component outputs in the workflow
+        self._chain_workflow(self._parent, '')
+        
+        out_names = []
+        out_rows = []
+        
+        # Calculate derivative of the objectives.
+        for obj_name, expr in self._parent.get_objectives().iteritems():
+        
+            obj_grad = expr.evaluate_gradient(scope=self._parent.parent)
+            out_names.append(obj_name)
+            out_rows.append(self._make_row(obj_grad))
             
-            # Find derivatives for all component outputs in the workflow
-            self._chain_workflow(derivs, self._parent, wrt)
-
-            # Calculate derivative of the objectives.
-            for obj_name, expr in self._parent.get_objectives().iteritems():
+        # Calculate derivatives of the constraints.
+        for con_name, constraint in \
+            self._parent.get_constraints().iteritems():
+            
+            lhs, rhs, comparator, _ = \
+                constraint.evaluate_gradient(scope=self._parent.parent)
             
-                obj_grad = expr.evaluate_gradient(scope=self._parent.parent,
-                                                  wrt=derivs.keys())
-                obj_deriv = 0.0
-                for input_name, val in obj_grad.iteritems():
-                    obj_deriv += val*derivs[input_name]
+            con_vals = {}
+            if '>' in comparator:
+                for input_name, val in lhs.iteritems():
+                    con_vals[input_name] = -val
                     
-                self.gradient[wrt][obj_name] = obj_deriv
+                for input_name, val in rhs.iteritems():
+                    if input_name in con_vals:
+                        con_vals[input_name] += val
+                    else:
+                        con_vals[input_name] = val
+                        
+            else:
+                for input_name, val in lhs.iteritems():
+                    con_vals[input_name] = val
+                    
+                for input_name, val in rhs.iteritems():
+                    if input_name in con_vals:
+                        con_vals[input_name] -= val
+                    else:
+                        con_vals[input_name] = val
+
+            out_names.append(con_name)
+            out_rows.append(self._make_row(con_vals))
+            
+        mode = self.mode
+        if mode == 'auto':
+            if len(out_rows) < len(self.param_names):
+                mode = 'adjoint'
+            else:
+                mode = 'forward'
                 
-            # Calculate derivatives of the constraints.
-            for con_name, constraint in \
-                self._parent.get_constraints().iteritems():
+        if mode == 'adjoint':
+            self.jacobian = self._accumulate_adjoint(out_rows)
+        else:
+            self.jacobian = self._accumulate_forward(out_rows)
+            
+        self.output_names = out_names
+        self.gradient = {}
+        for j, wrt in enumerate(self.param_names):
+            self.gradient[wrt] = dict(zip(out_names, self.jacobian[:, j]))
+            
+    def _flat_index(self, name):
+        """Returns the row of the variable or array element referred to by
+        name, or None if we don't have its derivative."""
+        
+        if name in self._index:
+            start, shape = self._index[name]
+            if shape:
+                return None
+            return start
+        
+        match = _ELEMENT_RE.match(name)
+        if match and match.group(1) in self._index:
+            start, shape = self._index[match.group(1)]
+            indices = [int(i) for i in _INDEX_RE.findall(match.group(2))]
+            if len(indices) == len(shape):
+                return start + ravel_multi_index(indices, shape)
+        return None
+    
+    def _element_params(self, name, shape, derivs):
+        """Adds the derivatives of the array variable name with respect to
+        any parameters that are elements of it to derivs."""
+        
+        size = int(prod(shape))
+        for param in self.param_names:
+            match = _ELEMENT_RE.match(param)
+            if match and match.group(1) == name:
+                indices = [int(i) for i in _INDEX_RE.findall(match.group(2))]
+                block = zeros((size, 1))
+                block[ravel_multi_index(indices, shape), 0] = 1.0
+                derivs[param] = block
+    
+    def _make_row(self, derivs):
+        """Returns a sparse row (cols, vals) from a dict of partial
+        derivatives of a scalar keyed on variable name. Variables whose
+        derivatives we don't have are left out."""
+        
+        cols = []
+        vals = []
+        for name, deriv in derivs.iteritems():
+            col = self._flat_index(name)
+            if col is not None:
+                cols.append(col)
+                vals.append(deriv)
+        return (array(cols, dtype=int), array(vals, dtype=float))
+        
+    def _add_row(self, name, derivs, shape=None):
+        """Adds a variable whose derivative is the sum of the derivatives of
+        the variables in derivs times their partial derivatives. Each
+        partial derivative is either a scalar or a 2D block (a numpy array
+        or scipy.sparse matrix) of shape (size, source size). A scalar
+        multiplies each element of a source of the same shape. If shape
+        isn't given, it's taken from the sources."""
+        
+        derivs = [(self._index[src], deriv) for src, deriv in derivs.iteritems()
+                  if src in self._index]
+        
+        if shape is None:
+            shape = ()
+            for (src_start, src_shape), deriv in derivs:
+                if len(getattr(deriv, 'shape', ())) == 2:
+                    shape = (deriv.shape[0],)
+                elif src_shape:
+                    shape = src_shape
+        size = int(prod(shape))
+        
+        cols = []
+        vals = []
+        blocks = []
+        for (src_start, src_shape), deriv in derivs:
+            src_size = int(prod(src_shape))
+            if len(getattr(deriv, 'shape', ())) == 2:
+                if deriv.shape != (size, src_size):
+                    raise ValueError('derivative of %s should have shape %s, '
+                                     'not %s' % (name, (size, src_size),
+                                                 deriv.shape))
+                blocks.append((src_start, src_size, deriv))
+            elif src_size != size:
+                raise ValueError('scalar derivative of %s with respect to a '
+                                 'variable of a different size' % name)
+            elif size == 1:
+                cols.append(src_start)
+                vals.append(deriv)
+            else:
+                blocks.append((src_start, src_size, float(deriv)))
                 
-                lhs, rhs, comparator, _ = \
-                    constraint.evaluate_gradient(scope=self._parent.parent,
-                                                 wrt=derivs.keys())
+        self._index[name] = (self._nrows, shape)
+        self._rows.append((self._nrows, size, array(cols, dtype=int),
+                           array(vals, dtype=float), blocks))
+        self._nrows += size
+        
+    def _accumulate_forward(self, out_rows):
+        """Returns the Jacobian of the outputs with respect to all of the
+        parameters, accumulated forward from the parameters."""
+        
+        derivs = zeros((self._nrows, len(self.param_names)))
+        for j, name in enumerate(self.param_names):
+            derivs[self._index[name][0], j] = 1.0
+            
+        for start, size, cols, vals, blocks in self._rows:
+            if len(cols):
+                deriv = dot(vals, derivs[cols])
+            elif blocks:
+                deriv = 0.0
+            else:
+                continue
+            for src_start, src_size, block in blocks:
+                src = derivs[src_start:src_start+src_size]
+                if hasattr(block, 'dot'):
+                    deriv = deriv + block.dot(src)
+                else:
+                    deriv = deriv + block*src
+            derivs[start:start+size] = deriv
                 
-                con_deriv = 0.0
-                con_vals = {}
-                if '>' in comparator:
-                    for input_name, val in lhs.iteritems():
-                        con_vals[input_name] = -val
-                        
-                    for input_name, val in rhs.iteritems():
-                        if input_name in con_vals:
-                            con_vals[input_name] += val
-                        else:
-                            con_vals[input_name] = val
-                            
+        jacobian = zeros((len(out_rows), len(self.param_names)))
+        for k, (cols, vals) in enumerate(out_rows):
+            if len(cols):
+                jacobian[k] = dot(vals, derivs[cols])
+        return jacobian
+    
+    def _accumulate_adjoint(self, out_rows):
+        """Returns the Jacobian of the outputs with respect to all of the
+        parameters, accumulated in reverse from the outputs."""
+        
+        adjoints = zeros((self._nrows, len(out_rows)))
+        for k, (cols, vals) in enumerate(out_rows):
+            adjoints[cols, k] += vals
+            
+        for start, size, cols, vals, blocks in reversed(self._rows):
+            adjoint = adjoints[start:start+size]
+            if len(cols):
+                adjoints[cols] += outer(vals, adjoint[0])
+            for src_start, src_size, block in blocks:
+                if hasattr(block, 'dot'):
+                    adjoints[src_start:src_start+src_size] += block.T.dot(adjoint)
                 else:
-                    for input_name, val in lhs.iteritems():
-                        con_vals[input_name] = val
-                        
-                    for input_name, val in rhs.iteritems():
-                        if input_name in con_vals:
-                            con_vals[input_name] -= val
-                        else:
-                            con_vals[input_name] = val
+                    adjoints[src_start:src_start+src_size] += block*adjoint
+                
+        params = [self._index[name][0] for name in self.param_names]
+        return adjoints[params].T.copy()
 
-                for input_name, val in con_vals.iteritems():
-                    con_deriv += val*derivs[input_name]
-                    
-                self.gradient[wrt][con_name] = con_deriv
+    def _connection_derivative(self, scope, expr_txt, source, dest):
+        """Returns the derivative of the connection expression expr_txt
+        with respect to source, including the derivative of the unit
+        conversion factor to dest if there is one."""
+        
+        expr = scope._exprmapper.get_expr(expr_txt)
+        expr_deriv = expr.evaluate_gradient(scope=scope, wrt=source)
+        
+        # We also need the derivative of the unit
+        # conversion factor if there is one
+        metadata = expr.get_metadata('units')
+        source_unit = [x[1] for x in metadata if x[0]==source]
+        if source_unit and source_unit[0]:
+            dest_expr = scope._exprmapper.get_expr(dest)
+            metadata = dest_expr.get_metadata('units')
+            target_unit = [x[1] for x in metadata if x[0]==dest]
+
+            return expr_deriv[source] * \
+                convert_units(1.0, source_unit[0], target_unit[0])
+        
+        return expr_deriv[source]
 
-    def _chain_workflow(self, derivs, scope, param):
-        """Process a workflow calculating all intermediate derivatives
-        using the chain rule. This can be called recursively to handle
-        nested assemblies."""
+    def _chain_workflow(self, scope, prefix):
+        """Linearize a workflow, adding a row for each variable whose
+        derivative is needed for the chain rule. This can be called
+        recursively to handle nested assemblies, in which case prefix is
+        the path of the assembly, used to make variable names unique."""
 
         # Loop through each comp in the workflow
         for node in scope.workflow.__iter__():
@@ -182,7 +383,6 @@ class ChainRule(HasTraits):
             #print "processing ", node_name
     
             incoming_deriv_names = {}
-            incoming_derivs = {}
             
             # We don't handle nested drivers yet.
             if isinstance(node, Driver):
@@ -194,7 +394,7 @@ class ChainRule(HasTraits):
                 if not isinstance(node.driver, Run_Once):
                     raise NotImplementedError('Nested drivers')
                 
-                self._recurse_assy(node, derivs, param)
+                self._recurse_assy(node, prefix)
                                      
             # This component can determine its derivatives.
             elif hasattr(node, 'calculate_first_derivatives'):
@@ -210,11 +410,9 @@ class ChainRule(HasTraits):
                     full_name = '.'.join([node_name, input_name])
 
                     # Inputs who are hooked directly to the parameters
-                    if full_name == param and \
-                            full_name in derivs:
+                    if prefix+full_name in self.param_names:
                             
-                        incoming_deriv_names[input_name] = full_name
-                        incoming_derivs[full_name] = derivs[full_name]
+                        incoming_deriv_names[input_name] = prefix+full_name
                         
                     # Inputs who are connected to something with a derivative
                     else:
@@ -225,6 +423,7 @@ class ChainRule(HasTraits):
                         # are a biproduct of a connection to multiple inputs
                         # across a fake boundary node.
                         used_sources = []
+                        incoming_derivs = {}
                         
                         for source_tuple in sources:
                             
@@ -237,67 +436,72 @@ class ChainRule(HasTraits):
                             
                             # Only process inputs who are connected to outputs
                             # with derivatives in the chain
-                            if expr_txt and source in derivs and \
+                            if expr_txt and prefix+source in self._index and \
                                source not in used_sources:
                                 
                                 # Need derivative of the expression
-                                expr = node.parent._exprmapper.get_expr(expr_txt)
-                                expr_deriv = expr.evaluate_gradient(scope=node.parent,
-                                                                    wrt=source)
+                                expr_deriv = \
+                                    self._connection_derivative(node.parent,
+                                                                expr_txt, source,
+                                                                source_tuple[1])
                                 
-                                # We also need the derivative of the unit
-                                # conversion factor if there is one
-                                metadata = expr.get_metadata('units')
-                                source_unit = [x[1] for x in metadata if x[0]==source]
-                                if source_unit and source_unit[0]:
-                                    dest_expr = node.parent._exprmapper.get_expr(source_tuple[1])
-                                    metadata = dest_expr.get_metadata('units')
-                                    target_unit = [x[1] for x in metadata if x[0]==source_tuple[1]]
-
-                                    expr_deriv[source] = expr_deriv[source] * \
-                                        convert_units(1.0, source_unit[0], target_unit[0])
-
-                                incoming_deriv_names[input_name] = full_name
-                                if full_name in incoming_derivs:
-                                    incoming_derivs[full_name] += derivs[source] * \
-                                        expr_deriv[source]
+                                if prefix+source in incoming_derivs:
+                                    incoming_derivs[prefix+source] += expr_deriv
                                 else:
-                                    incoming_derivs[full_name] = derivs[source] * \
-                                        expr_deriv[source]
+                                    incoming_derivs[prefix+source] = expr_deriv
                                     
                                 used_sources.append(source)
                         
+                        shape = getattr(node.get(input_name), 'shape', ())
+                        
+                        # Elements of array inputs can also be parameters
+                        if shape:
+                            self._element_params(prefix+full_name, shape,
+                                                 incoming_derivs)
+                        
+                        if incoming_derivs:
+                            incoming_deriv_names[input_name] = prefix+full_name
+                            self._add_row(prefix+full_name, incoming_derivs,
+                                          shape)
                             
                 # CHAIN RULE
-                # Propagate derivatives wrt parameter through current component
+                # Propagate derivatives wrt parameters through current component
                 for output_name in local_outputs:
                     
                     full_output_name = '.'.join([node_name, output_name])
-                    derivs[full_output_name] = 0.0
+                    output_derivs = local_derivs.get(output_name, {})
+                    derivs = {}
                     
+                    # Undeclared derivatives are zero.
                     for input_name, full_input_name in incoming_deriv_names.iteritems():
-                        derivs[full_output_name] += \
-                            local_derivs[output_name][input_name] * \
-                            incoming_derivs[full_input_name]
+                        if input_name in output_derivs:
+                            derivs[full_input_name] = output_derivs[input_name]
+                            
+                    self._add_row(prefix+full_output_name, derivs,
+                                  getattr(node.get(output_name), 'shape', ()))
                             
             # This component must be finite differenced.
             else:
                 raise NotImplementedError('CRND cannot Finite Difference subblocks yet.')
             
 
-    def _recurse_assy(self, scope, upscope_derivs, upscope_param):
+    def _recurse_assy(self, scope, prefix):
         """Enables assembly recursion by scope translation."""
         
         # Find all assembly boundary connections, and propagate
         # derivatives through the expressions.
-        local_derivs = {}
         name = scope.name
+        local_prefix = '%s%s.' % (prefix, name)
+        boundary_derivs = {}
         
         for item in scope._depgraph.var_edges('@xin'):
             src = item[0].replace('@xin.','')
-            upscope_src = src.replace('parent.','')
+            upscope_src = prefix + src.replace('parent.','')
             dest = item[1]
             
+            if upscope_src not in self._index:
+                continue
+            
             # Real connections on boundary
             if dest.count('.') < 2:
                 dest = dest.split('.')[1]
@@ -305,45 +509,32 @@ class ChainRule(HasTraits):
             # Differentiate all expressions
             dest_txt = dest.replace('@bin.','')
             expr_txt = scope._depgraph.get_source(dest_txt)
-            expr = scope._exprmapper.get_expr(expr_txt)
-            expr_deriv = expr.evaluate_gradient(scope=scope,
-                                                wrt=src)
-            # We also need the derivative of the unit
-            # conversion factor if there is one
-            metadata = expr.get_metadata('units')
-            source_unit = [x[1] for x in metadata if x[0]==src]
-            if source_unit and source_unit[0]:
-                dest_expr = scope._exprmapper.get_expr(dest_txt)
-                metadata = dest_expr.get_metadata('units')
-                target_unit = [x[1] for x in metadata if x[0]==dest_txt]
+            expr_deriv = self._connection_derivative(scope, expr_txt, src,
+                                                     dest_txt)
 
-                expr_deriv[src] = expr_deriv[src] * \
-                              convert_units(1.0, source_unit[0], target_unit[0])
-
-            if dest in local_derivs:    
-                local_derivs[dest] += upscope_derivs[upscope_src]*expr_deriv[src]
+            derivs = boundary_derivs.setdefault(local_prefix+dest, {})
+            if upscope_src in derivs:    
+                derivs[upscope_src] += expr_deriv
             else:
-                local_derivs[dest] = upscope_derivs[upscope_src]*expr_deriv[src]
+                derivs[upscope_src] = expr_deriv
         
-        param = upscope_param.split('.')
-        if param[0] == name:
-            param = param[1:].join('.')
-        else:
-            param = ''
+        for dest, derivs in boundary_derivs.iteritems():
+            self._add_row(dest, derivs)
         
         # Find derivatives for this assembly's workflow
-        self._chain_workflow(local_derivs, scope.driver, param)
+        self._chain_workflow(scope.driver, local_prefix)
         
         # Convert scope and return gradient of connected components.
         for item in scope._depgraph.var_in_edges('@bout'):
             src = item[0]
-            upscope_src = '%s.%s' % (name, src)
             dest = item[1]
             
-            # Real connections on boundary need expressions differentiated
-            if dest.count('.') < 2:
+            # Real connections on boundary need expressions differentiated.
+            # Fake connections just use the source, which already has the
+            # right name in the enclosing scope.
+            if dest.count('.') < 2 and local_prefix+src in self._index:
                 
-                upscope_dest = dest.replace('@bout', name)
+                upscope_dest = prefix + dest.replace('@bout', name)
                 dest = dest.replace('@bout.','')
                 
                 expr_txt = scope._depgraph.get_source(dest)
@@ -351,22 +542,8 @@ class ChainRule(HasTraits):
                 expr_deriv = expr.evaluate_gradient(scope=scope,
                                                     wrt=src)
                 
-                upscope_derivs[upscope_dest] = local_derivs[src]*expr_deriv[src]
-                
-            # Fake connection, so just add source
-            else:
-                upscope_derivs[upscope_src] = local_derivs[src]
-                
-        # Finally, stuff in all our extra unconnected outputs because they may
-        # be referenced by an objective or constraint at the outer scope.
-        for key, value in local_derivs.iteritems():
-            
-            if key[0] == '@':
-                continue
-            
-            target = '%s.%s' % (name, key)
-            if target not in upscope_derivs:
-                upscope_derivs[target] = value
+                self._add_row(upscope_dest, 
+                              {local_prefix+src: expr_deriv[src]})
             
 
     def calc_hessian(self, reuse_first=False):
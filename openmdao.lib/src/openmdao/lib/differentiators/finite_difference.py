@@ -10,7 +10,10 @@ from itertools import product
 from openmdao.main.numpy_fallback import array
 
 from enthought.traits.api import HasTraits
-from openmdao.lib.datatypes.api import Enum, Float
+from openmdao.lib.datatypes.api import Bool, Enum, Float
+from openmdao.lib.casehandlers.api import ListCaseIterator
+from openmdao.lib.drivers.caseiterdriver import CaseIteratorDriver
+from openmdao.main.case import Case
 from openmdao.main.interfaces import implements, IDifferentiator
 from openmdao.main.container import find_name
 
@@ -50,6 +53,11 @@ class FiniteDifference(HasTraits):
     default_stepsize = Float(1.0e-6, iotype='in', desc='Default finite ' + \
                              'difference step size.')
     
+    sequential = Bool(True, iotype='in', desc='If True, evaluate the ' + \
+                      'points sequentially. Otherwise evaluate them ' + \
+                      'concurrently on servers obtained from the ' + \
+                      'ResourceAllocationManager.')
+    
     def __init__(self):
         
         # This gets set in the callback
@@ -158,12 +166,6 @@ class FiniteDifference(HasTraits):
             else:
                 stepsize[key] = self.default_stepsize
 
-        # For Forward or Backward diff, we want to save the baseline
-        # objective and constraints. These are also needed for the
-        # on-diagonal Hessian terms, so we will save them in the class
-        # later.
-        base_data = self._run_point(base_param)
-        
         # Set up problem based on Finite Difference type
         if self.form == 'central':
             deltas = [1, -1]
@@ -190,13 +192,24 @@ class FiniteDifference(HasTraits):
             self.gradient_case[param] = pcase
             
         # Run all "cases".
-        # TODO - Integrate OpenMDAO's concurrent processing capability once it
-        # is formalized. This operation is inherently paralellizable.
-        for key, case in self.gradient_case.iteritems():
+        # For Forward or Backward diff, we want to save the baseline
+        # objective and constraints. These are also needed for the
+        # on-diagonal Hessian terms, so we will save them in the class
+        # later.
+        pcases = []
+        for case in self.gradient_case.values():
             for ipcase, pcase in enumerate(case):
                 if deltas[ipcase]:
-                    pcase['data'] = self._run_point(pcase['param'])
-                else:
+                    pcases.append(pcase)
+        
+        results = self._run_points([base_param] + \
+                                   [pcase['param'] for pcase in pcases])
+        base_data = results[0]
+        for pcase, data in zip(pcases, results[1:]):
+            pcase['data'] = data
+        for case in self.gradient_case.values():
+            for ipcase, pcase in enumerate(case):
+                if not deltas[ipcase]:
                     pcase['data'] = base_data
                 
         
@@ -262,7 +275,7 @@ class FiniteDifference(HasTraits):
             for key, item in self._parent.get_parameters().iteritems():
                 base_param[key] = item.evaluate()
                     
-            base_data = self._run_point(base_param)
+            base_data = None
             
         # Assemble input data
         # Cases : ondiag [fp, fm]
@@ -301,8 +314,7 @@ class FiniteDifference(HasTraits):
             self.hessian_offdiag_case[param1] = offdiag
             
         # Run all "cases".
-        # TODO - Integrate OpenMDAO's concurrent processing capability once it
-        # is formalized. This operation is inherently paralellizable.
+        pcases = []
         
         # We don't need to re-run on-diag cases if the gradients were
         # calculated with Central Difference.
@@ -316,15 +328,21 @@ class FiniteDifference(HasTraits):
                     pcase['data'] = gradient_ipcase['data'] 
         else:
             for case in self.hessian_ondiag_case.values():
-                for pcase in case:
-                    data = self._run_point(pcase['param'])
-                    pcase['data'] = data
+                pcases.extend(case)
 
         # Off-diag cases must always be run.
         for cases in self.hessian_offdiag_case.values():
             for case in cases.values():
-                for pcase in case:
-                    pcase['data'] = self._run_point(pcase['param'])
+                pcases.extend(case)
+                
+        points = [pcase['param'] for pcase in pcases]
+        if base_data is None:
+            points.insert(0, base_param)
+        results = self._run_points(points)
+        if base_data is None:
+            base_data = results.pop(0)
+        for pcase, data in zip(pcases, results):
+            pcase['data'] = data
 
                     
         # Calculate Hessians - On Diagonal
@@ -364,6 +382,57 @@ class FiniteDifference(HasTraits):
                         self.hessian[key1][key2][name]
                     
     
+    def _run_points(self, points):
+        """Runs the model at each of the given points and returns a list of
+        the results. If `sequential` is False, the points are evaluated
+        concurrently by a CaseIteratorDriver that runs our driver's workflow
+        on servers from the ResourceAllocationManager."""
+        
+        if self.sequential or len(points) < 2:
+            return [self._run_point(point) for point in points]
+        
+        driver = self._parent
+        params = driver.get_parameters().values()
+        outputs = []
+        for item in self._get_exprs():
+            if item.text not in outputs:
+                outputs.append(item.text)
+                
+        cases = []
+        for point in points:
+            inputs = []
+            for val, param in zip(point.values(), params):
+                val = float(val)
+                if param.scaler is not None:  # parameter space -> var space
+                    val = (val+param.adder)*param.scaler
+                inputs.extend([(target, val) for target in param.targets])
+            cases.append(Case(inputs=inputs, outputs=outputs))
+            
+        runner = CaseIteratorDriver()
+        runner.sequential = False
+        runner.workflow.add(driver.workflow.get_names())
+        runner.iterator = ListCaseIterator(cases)
+        
+        # The runner saves our driver's parent to an egg for the servers to
+        # load, so it has to be in the same assembly for the duration.
+        assembly = driver.parent
+        name = '%s_fd' % driver.name
+        i = 1
+        while assembly.contains(name):
+            name = '%s_fd%d' % (driver.name, i)
+            i += 1
+        assembly.add(name, runner)
+        try:
+            runner.run()
+        finally:
+            assembly.remove(name)
+            
+        return [self._get_data(
+                    lambda expr: case[expr.text],
+                    lambda con: con.evaluate_values(case[con.lhs.text],
+                                                    case[con.rhs.text]))
+                for case in cases]
+    
     def _run_point(self, data_param):
         """Runs the model at a single point and captures the results. Note that 
         some differences require the baseline point."""
@@ -375,29 +444,48 @@ class FiniteDifference(HasTraits):
         # Run the model
         super(type(self._parent), self._parent).run_iteration()
         
+        scope = self._parent.parent
+        return self._get_data(lambda expr: expr.evaluate(scope),
+                              lambda con: con.evaluate(scope))
+    
+    def _get_exprs(self):
+        """Returns a list of the expressions needed to evaluate the objectives
+        and constraints."""
+        
+        exprs = self._parent.get_objectives().values()
+        if self.ineqconst_names:
+            for item in self._parent.get_ineq_constraints().values():
+                exprs.extend([item.lhs, item.rhs])
+        if self.eqconst_names:
+            for item in self._parent.get_eq_constraints().values():
+                exprs.extend([item.lhs, item.rhs])
+        return exprs
+    
+    def _get_data(self, evaluate, evaluate_constraint):
+        """Returns the values of the objectives and constraints at the 
+        current point, where evaluate(expr) returns the value of an objective
+        and evaluate_constraint(con) returns the evaluated constraint as a 
+        tuple of the form (lhs, rhs, comparator, is_violated)."""
+        
         data = {}
 
         # Get Objectives
         for key, item in self._parent.get_objectives().iteritems():
-            data[key] = item.evaluate(self._parent.parent)
+            data[key] = evaluate(item)
 
-        # Get Inequality Constraints
+        # Get Inequality and Equality Constraints
+        constraints = []
         if self.ineqconst_names:
-            for key, item in self._parent.get_ineq_constraints().iteritems():
-                val = item.evaluate(self._parent.parent)
-                if '>' in val[2]:
-                    data[key] = val[1]-val[0]
-                else:
-                    data[key] = val[0]-val[1]
-        
-        # Get Equality Constraints
+            constraints.extend(self._parent.get_ineq_constraints().items())
         if self.eqconst_names:
-            for key, item in self._parent.get_eq_constraints().iteritems():
-                val = item.evaluate(self._parent.parent)
-                if '>' in val[2]:
-                    data[key] = val[1]-val[0]
-                else:
-                    data[key] = val[0]-val[1]
+            constraints.extend(self._parent.get_eq_constraints().items())
+            
+        for key, item in constraints:
+            val = evaluate_constraint(item)
+            if '>' in val[2]:
+                data[key] = val[1]-val[0]
+            else:
+                data[key] = val[0]-val[1]
         
         return data
                     
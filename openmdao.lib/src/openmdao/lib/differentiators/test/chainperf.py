@@ -0,0 +1,71 @@
+"""
+Measure the time ChainRule.calc_gradient takes for a chain of components
+with one parameter per component and a single objective and constraint,
+in each accumulation mode.
+"""
+
+import sys
+import time
+
+from openmdao.lib.differentiators.chain_rule import ChainRule
+from openmdao.main.api import set_as_top, Assembly
+from openmdao.main.driver_uses_derivatives import DriverUsesDerivatives
+from openmdao.main.hasconstraints import HasConstraints
+from openmdao.main.hasobjective import HasObjectives
+from openmdao.main.hasparameters import HasParameters
+from openmdao.test.execcomp import ExecCompWithDerivatives
+from openmdao.util.decorators import add_delegate
+
+
+@add_delegate(HasParameters, HasObjectives, HasConstraints)
+class Driv(DriverUsesDerivatives):
+    """ Driver that just runs its workflow once. """
+
+    def execute(self):
+        """ Run the workflow. """
+        self.run_iteration()
+
+
+def create_model(ncomps):
+    """ Returns an assembly with `ncomps` components in a chain. """
+    top = set_as_top(Assembly())
+    top.add('driver', Driv())
+    top.driver.differentiator = ChainRule()
+
+    names = []
+    for i in range(ncomps):
+        name = 'comp%d' % i
+        top.add(name, ExecCompWithDerivatives(['y1 = x1 + 2.0*x2*x2'],
+                                              ['dy1_dx1 = 1.0',
+                                               'dy1_dx2 = 4.0*x2']))
+        top.driver.add_parameter('%s.x2' % name, low=-50., high=50.)
+        if i:
+            top.connect('comp%d.y1' % (i-1), '%s.x1' % name)
+        names.append(name)
+    top.driver.workflow.add(names)
+
+    last = names[-1]
+    top.driver.add_objective('%s.y1' % last)
+    top.driver.add_constraint('%s.y1 - comp0.y1 > 0' % last)
+    for name in names:
+        getattr(top, name).x2 = 1.0
+    top.run()
+    return top
+
+
+def main():
+    """ Time calc_gradient for each mode. """
+    ncomps = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    top = create_model(ncomps)
+    differentiator = top.driver.differentiator
+    print '%d components, %d parameters' % (ncomps, ncomps)
+    for mode in ('forward', 'adjoint'):
+        differentiator.mode = mode
+        start = time.time()
+        differentiator.calc_gradient()
+        elapsed = time.time() - start
+        print '%-8s %10.4f sec' % (mode, elapsed)
+
+
+if __name__ == '__main__':
+    main()
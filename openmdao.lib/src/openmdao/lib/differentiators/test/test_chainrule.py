@@ -6,7 +6,9 @@ import unittest
 from nose import SkipTest
 
 # pylint: disable-msg=E0611,F0401
-from openmdao.lib.datatypes.api import Float, Int
+from numpy import array, zeros
+
+from openmdao.lib.datatypes.api import Array, Float, Int
 from openmdao.lib.differentiators.chain_rule import ChainRule
 from openmdao.main.api import ComponentWithDerivatives, Assembly, set_as_top
 from openmdao.main.driver_uses_derivatives import DriverUsesDerivatives
@@ -111,6 +113,60 @@ class CompInch(ComponentWithDerivatives):
         self.derivatives.set_first_derivative('y', 'x', dy_dx)
         
         
+class CompSpread(ComponentWithDerivatives):
+    """ Evaluates y[i] = (i+1)*x^2 and z = sum(w) """
+    
+    x = Float(1.0, iotype='in')
+    w = Array(array([1.0, 2.0]), iotype='in')
+    y = Array(zeros(3), iotype='out')
+    z = Float(0.0, iotype='out')
+    
+    def __init__(self):
+        """ declare what derivatives that we can provide"""
+        
+        super(CompSpread, self).__init__()
+        
+        self.derivatives.declare_first_derivative('y', 'x')
+        self.derivatives.declare_first_derivative('z', 'w')
+        
+    def execute(self):
+        """ Executes it """
+        
+        self.y = array([1.0, 2.0, 3.0])*self.x**2
+        self.z = self.w.sum()
+        
+    def calculate_first_derivatives(self):
+        """Analytical first derivatives"""
+        
+        self.derivatives.set_first_derivative('y', 'x', 
+                                              array([[2.0], [4.0], [6.0]])*self.x)
+        self.derivatives.set_first_derivative('z', 'w', array([[1.0, 1.0]]))
+        
+        
+class CompSum(ComponentWithDerivatives):
+    """ Evaluates y = x[0] + 2*x[1] + 3*x[2] """
+    
+    x = Array(zeros(3), iotype='in')
+    y = Float(0.0, iotype='out')
+    
+    def __init__(self):
+        """ declare what derivatives that we can provide"""
+        
+        super(CompSum, self).__init__()
+        
+        self.derivatives.declare_first_derivative('y', 'x')
+        
+    def execute(self):
+        """ Executes it """
+        
+        self.y = self.x[0] + 2.0*self.x[1] + 3.0*self.x[2]
+        
+    def calculate_first_derivatives(self):
+        """Analytical first derivatives"""
+        
+        self.derivatives.set_first_derivative('y', 'x', array([[1.0, 2.0, 3.0]]))
+        
+
 @add_delegate(HasParameters, HasObjectives, HasConstraints)
 class Driv(DriverUsesDerivatives):
     """ Simple dummy driver"""
@@ -189,6 +245,39 @@ class ChainRuleTestCase(unittest.TestCase):
         assert_rel_error(self, grad[0], 7.0, .001)
         assert_rel_error(self, grad[1], 16.0, .001)
         
+    def test_modes(self):
+        
+        self.model.comp.x = 1.0
+        self.model.comp.u = 1.0
+        self.model.run()
+        
+        differentiator = self.model.driver.differentiator
+        differentiator.calc_gradient()
+        jacobian = differentiator.jacobian
+        self.assertEqual(jacobian.shape, (4, 2))
+        self.assertEqual(differentiator.output_names, 
+                         ['comp.y', 'comp.v', 'Con1', 'ConE'])
+        
+        differentiator.mode = 'adjoint'
+        differentiator.calc_gradient()
+        self.assertEqual(differentiator.jacobian.shape, (4, 2))
+        for i in range(4):
+            for j in range(2):
+                assert_rel_error(self, differentiator.jacobian[i, j],
+                                 jacobian[i, j], .00001)
+        assert_rel_error(self, differentiator.get_derivative('Con1', wrt='comp.u'),
+                               15.0, .001)
+        
+        # Fewer outputs than parameters, so auto uses adjoint mode.
+        self.model.driver.clear_objectives()
+        self.model.driver.clear_constraints()
+        self.model.driver.add_objective('comp.y')
+        differentiator.mode = 'auto'
+        differentiator.calc_gradient()
+        grad = differentiator.get_gradient('comp.y')
+        assert_rel_error(self, grad[0], 6.0, .001)
+        assert_rel_error(self, grad[1], 13.0, .001)
+        
     def test_large_dataflow(self):
         
         self.top = set_as_top(Assembly())
@@ -327,6 +416,15 @@ class ChainRuleTestCase(unittest.TestCase):
         
         grad = self.top.driver.differentiator.get_gradient('comp5.y1-nest1.comp3.y1>0')
         assert_rel_error(self, grad[0], -313.0+10.5, .001)
+        
+        self.top.driver.differentiator.mode = 'adjoint'
+        self.top.driver.differentiator.calc_gradient()
+        
+        grad = self.top.driver.differentiator.get_gradient(obj)
+        assert_rel_error(self, grad[0], 313.0, .001)
+        
+        grad = self.top.driver.differentiator.get_gradient('comp5.y1-nest1.comp3.y1>0')
+        assert_rel_error(self, grad[0], -313.0+10.5, .001)
     
         
     def test_simple_units(self):
@@ -387,6 +485,49 @@ class ChainRuleTestCase(unittest.TestCase):
         grad = self.top.driver.differentiator.get_gradient(con)
         assert_rel_error(self, grad[0], -48.0, .001)
         
+        self.top.driver.differentiator.mode = 'adjoint'
+        self.top.driver.differentiator.calc_gradient()
+        
+        grad = self.top.driver.differentiator.get_gradient(obj)
+        assert_rel_error(self, grad[0], 8.0, .001)
+        grad = self.top.driver.differentiator.get_gradient(con)
+        assert_rel_error(self, grad[0], -48.0, .001)
+        
+    def test_arrays(self):
+        
+        self.top = set_as_top(Assembly())
+        
+        self.top.add('comp1', CompSpread())
+        self.top.add('comp2', CompSum())
+        
+        self.top.connect('comp1.y', 'comp2.x')
+        
+        self.top.add('driver', Driv())
+        self.top.driver.workflow.add(['comp1', 'comp2'])
+        
+        self.top.driver.differentiator = ChainRule()
+        
+        self.top.driver.add_parameter('comp1.x', low=-50., high=50.)
+        self.top.driver.add_parameter('comp1.w[1]', low=-50., high=50.)
+        self.top.driver.add_objective('comp2.y')
+        self.top.driver.add_constraint('comp1.y[2] + comp1.z < 10.0')
+        
+        self.top.comp1.x = 2.0
+        self.top.run()
+        
+        for mode in ('forward', 'adjoint'):
+            self.top.driver.differentiator.mode = mode
+            self.top.driver.differentiator.calc_gradient()
+            
+            # d(14 x^2)/dx
+            grad = self.top.driver.differentiator.get_gradient('comp2.y')
+            assert_rel_error(self, grad[0], 56.0, .001)
+            assert_rel_error(self, grad[1], 0.0, .001)
+            
+            grad = self.top.driver.differentiator.get_gradient('comp1.y[2]+comp1.z<10.0')
+            assert_rel_error(self, grad[0], 12.0, .001)
+            assert_rel_error(self, grad[1], 1.0, .001)
+        
     #def test_reset_state(self):
         
         #raise SkipTest("Test not needed yet.")
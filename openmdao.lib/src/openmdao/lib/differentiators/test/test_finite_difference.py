@@ -2,19 +2,44 @@
 Test of the Finite Difference differentiator.
 """
 
+import cPickle
+import os
+import sys
+import threading
 import unittest
 
+from nose import SkipTest
+
 # pylint: disable-msg=E0611,F0401
-from openmdao.lib.datatypes.api import Float, Int
+from openmdao.lib.datatypes.api import Bool, Float, Int
+from openmdao.lib.differentiators import finite_difference
 from openmdao.lib.differentiators.finite_difference import FiniteDifference
+from openmdao.lib.drivers.caseiterdriver import CaseIteratorDriver
 from openmdao.main.api import Component, Assembly, set_as_top
 from openmdao.main.driver_uses_derivatives import DriverUsesDerivatives
 from openmdao.main.hasconstraints import HasConstraints
 from openmdao.main.hasparameters import HasParameters
 from openmdao.main.hasobjective import HasObjective, HasObjectives
+from openmdao.main.rbac import Credentials
+from openmdao.util.publickey import get_key_pair, pk_encrypt, pk_decrypt
 from openmdao.util.testutil import assert_rel_error
 from openmdao.util.decorators import add_delegate
 
+# Seconds to wait for the local servers before giving up.
+_SERVER_TIMEOUT = 600
+
+def _servers_usable():
+    """ Returns True if a key pair read back from the key cache file can
+    decrypt, as it must in a server process. Some versions of pycrypto
+    can't, and then server startup hangs. """
+    key_pair = get_key_pair(Credentials.user_host)
+    key_pair = cPickle.loads(cPickle.dumps(key_pair, cPickle.HIGHEST_PROTOCOL))
+    try:
+        pk_decrypt(pk_encrypt('test', key_pair.publickey()), key_pair)
+    except Exception:
+        return False
+    return True
+
 class Comp(Component):
     """ Evaluates the equation y=x^2"""
     
@@ -24,10 +49,13 @@ class Comp(Component):
     u = Float(0.0, iotype='in')
     y = Float(0.0, iotype='out')
     v = Float(0.0, iotype='out')
+    raise_error = Bool(False, iotype='in')
 
     def execute(self):
         """ Executes it """
         
+        if self.raise_error:
+            self.raise_exception('Forced error', RuntimeError)
         self.y = (self.x)**2 + 3.0*self.u**3 + 4*self.u*self.x
         self.v = (self.x)**3 * (self.u)**2
 
@@ -168,6 +196,111 @@ class FiniteDifferenceTestCase(unittest.TestCase):
         assert_rel_error(self, self.model.comp.u,
                               1.0, .0001)
 
+    def test_concurrent(self):
+        # Evaluate the points with a CaseIteratorDriver that runs them in
+        # this process so we can check the results against a sequential run.
+        batches = []
+        class LocalDriver(CaseIteratorDriver):
+            def execute(self):
+                batches.append(len(self.iterator))
+                self.sequential = True
+                super(LocalDriver, self).execute()
+                
+        self.model.driver.remove_parameter('comp.u')
+        self.model.driver.add_parameter('comp.u', low=-50., high=50., fd_step=.01,
+                                        scaler=2.0, adder=1.0)
+        self.model.comp.x = 1.0
+        self.model.comp.u = 1.0
+        self.model.run()
+        
+        results = []
+        for sequential in (True, False):
+            self.model.driver.differentiator.sequential = sequential
+            saved = finite_difference.CaseIteratorDriver
+            finite_difference.CaseIteratorDriver = LocalDriver
+            try:
+                self.model.driver.differentiator.calc_gradient()
+                self.model.driver.differentiator.calc_hessian(reuse_first=True)
+            finally:
+                finite_difference.CaseIteratorDriver = saved
+            self.model.driver.differentiator.reset_state()
+            results.append([list(self.model.driver.differentiator.get_gradient(name)) + 
+                            list(self.model.driver.differentiator.get_Hessian(name))
+                            for name in ['comp.y', 'comp.v', 'Con1', 'ConE']])
+            
+        self.assertEqual(results[0], results[1])
+        assert_rel_error(self, results[1][0][1], 26.0, .001)
+        # base point plus 4 gradient points, then the 4 off-diagonal points
+        self.assertEqual(batches, [5, 4])
+        self.assertEqual(sorted(self.model.list_containers()), ['comp', 'driver'])
+        
+    def test_concurrent_servers(self):
+        # Evaluate the points on local servers with a real CaseIteratorDriver.
+        if not _servers_usable():
+            raise SkipTest("local servers can't decrypt with a cached key pair")
+        
+        # The servers load the model from an egg, so run from this directory.
+        # A hung server would block forever, so run in a thread we can
+        # stop waiting for.
+        errors = []
+        def run():
+            try:
+                self._run_concurrent_servers()
+            except BaseException:
+                errors.append(sys.exc_info())
+        worker = threading.Thread(target=run)
+        worker.daemon = True
+        orig_dir = os.getcwd()
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+        try:
+            worker.start()
+            worker.join(_SERVER_TIMEOUT)
+        finally:
+            os.chdir(orig_dir)
+        if worker.is_alive():
+            self.fail('Timed out after %d seconds' % _SERVER_TIMEOUT)
+        if errors:
+            raise errors[0][0], errors[0][1], errors[0][2]
+            
+    def _run_concurrent_servers(self):
+        # a child with the name the temporary driver would use must be kept
+        self.model.add('driver_fd', Comp())
+        other = self.model.driver_fd
+        self.model.comp.x = 1.0
+        self.model.comp.u = 1.0
+        self.model.run()
+        
+        differentiator = self.model.driver.differentiator
+        results = []
+        for sequential in (True, False):
+            differentiator.sequential = sequential
+            differentiator.calc_gradient()
+            differentiator.calc_hessian(reuse_first=True)
+            differentiator.reset_state()
+            results.append([list(differentiator.get_gradient(name)) + 
+                            list(differentiator.get_Hessian(name))
+                            for name in ['comp.y', 'comp.v', 'Con1', 'ConE']])
+            
+        for seq_values, values in zip(results[0], results[1]):
+            for seq_value, value in zip(seq_values, values):
+                assert_rel_error(self, value, seq_value, 1e-12)
+        assert_rel_error(self, results[1][0][1], 13.0, .001)
+        self.assertEqual(sorted(self.model.list_containers()), 
+                         ['comp', 'driver', 'driver_fd'])
+        self.assertTrue(self.model.driver_fd is other)
+        
+        # the temporary driver is also removed when a point fails
+        self.model.comp.raise_error = True
+        try:
+            differentiator.calc_gradient()
+        except Exception as err:
+            self.assertTrue('Forced error' in str(err))
+        else:
+            self.fail('Exception expected')
+        self.assertEqual(sorted(self.model.list_containers()), 
+                         ['comp', 'driver', 'driver_fd'])
+        self.assertTrue(self.model.driver_fd is other)
+
 if __name__ == '__main__':
     unittest.main()
 
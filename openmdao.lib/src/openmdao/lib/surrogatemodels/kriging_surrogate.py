@@ -1,31 +1,36 @@
 """ Surrogate model based on Kriging. """
 
-from math import log, e, sqrt
+from math import log, e
 import logging
 
 # pylint: disable-msg=E0611,F0401
 try:
-    from numpy import array, zeros, dot, ones, arange, eye, abs, vstack, exp, diag
+    from numpy import array, zeros, dot, ones, arange, eye, abs, vstack, exp, diag, \
+                      sqrt, newaxis, empty, concatenate, triu, subtract, \
+                      multiply, negative
     from numpy.linalg import det, linalg, lstsq
-    from scipy.linalg import cho_factor, cho_solve
+    from scipy.linalg import cho_factor, cho_solve, cholesky, solve_triangular
     from scipy.optimize import fmin
 except ImportError as err:
     logging.warn("In %s: %r" % (__file__, err))
 
 import zope.interface
 
-from openmdao.main.interfaces import implements, ISurrogate
+from openmdao.main.interfaces import implements, IIncrementalSurrogate
 from openmdao.main.uncertain_distributions import NormalDistribution
 from openmdao.util.decorators import stub_if_missing_deps
 
 @stub_if_missing_deps('numpy', 'scipy')
 class KrigingSurrogate(object): 
-    implements(ISurrogate)
+    implements(IIncrementalSurrogate)
     
-    def __init__(self,X=None,Y=None):
+    def __init__(self,X=None,Y=None,update_thetas=True):
         self.m = None #number of independent
         self.n = None #number of training points
         self.thetas = None
+        # if False, add_training_points keeps the thetas and extends the
+        # Cholesky factor of R instead of searching for new thetas
+        self.update_thetas = update_thetas
         self.nugget = 0 #nugget smoothing parameter from [Sasena, 2002]
         
         self.R = None
@@ -33,6 +38,7 @@ class KrigingSurrogate(object):
         self.mu = None
         self.sig2 = None
         self.log_likelihood = None
+        self._pred_cache = None
 
         self.X = X
         self.Y = Y
@@ -49,55 +55,71 @@ class KrigingSurrogate(object):
         """Calculates a predicted value of the response based on the current
         trained model for the supplied list of inputs.
         """
+        f, RMSE = self.predict_many([new_x])
+        return NormalDistribution(f[0], RMSE[0])
+        
+    def predict_many(self,new_X):
+        """Calculates predicted values of the response based on the current
+        trained model for each of the supplied lists of inputs. Returns
+        a tuple of the form (means, RMSEs), where each is an array with one
+        entry per input point.
+        """
         if self.m == None: #untrained surrogate
             raise RuntimeError("KrigingSurrogate has not been trained, so no "
                                "prediction can be made")
-        r = zeros(self.n)
-        X, Y = self.X, self.Y
-        thetas = 10.**self.thetas
-        XX = array(X)
-        new_x = array(new_x)
-        for i in range(self.n):
-            r[i] = sum(thetas*(XX[i]-new_x)**2.)
-        r = exp(-r)
-            
-        one = ones(self.n)
+        if self._pred_cache is None:
+            self._pred_cache = self._calculate_pred_cache()
+        alpha, Rinv_one, one_Rinv_one = self._pred_cache
+        
+        # r[k,i] is the correlation between new_X[k] and training point i
+        new_X = array(new_X, dtype=float).reshape(-1, self.m)
+        r = self._correlation(new_X, self._XX)
+        
         if self.R_fact is not None: 
             #---CHOLESKY DECOMPOSTION ---
-            #f = self.mu+dot(r,cho_solve(self.R_fact,Y-dot(one,self.mu)))
-            #term1 = dot(r,cho_solve(self.R_fact,r))
-            #term2 = (1.0-dot(one,cho_solve(self.R_fact,r)))**2./dot(one,cho_solve(self.R_fact,one))
-            
-            rhs = vstack([(Y-dot(one, self.mu)), r, one]).T
             R_fact = (self.R_fact[0].T,not self.R_fact[1])
-            cho = cho_solve(R_fact, rhs).T
-            
-            f = self.mu + dot(r, cho[0])
-            term1 = dot(r, cho[1])
-            term2 = (1.0 - dot(one, cho[1]))**2./dot(one, cho[2])
-            
+            Rinv_r = cho_solve(R_fact, r.T).T
         else: 
             #-----LSTSQ-------
-            rhs = vstack([(Y-dot(one, self.mu)), r, one]).T
-            lsq = lstsq(self.R.T, rhs)[0].T
+            Rinv_r = lstsq(self.R.T, r.T)[0].T
             
-            f = self.mu + dot(r, lsq[0])
-            term1 = dot(r, lsq[1])
-            term2 = (1.0 - dot(one, lsq[1]))**2./dot(one, lsq[2])
-            """
-      #-----LSTSQ-------
-      rhs = vstack([(Y-dot(one, self.mu)), r, one]).T
-      lsq = lstsq(self.R.T, rhs)[0].T
-      
-      f = self.mu + dot(r, lsq[0])
-      term1 = dot(r, lsq[1])
-      term2 = (1.0 - dot(one, lsq[1]))**2./dot(one, lsq[2])
-      """
+        f = self.mu + dot(r, alpha)
+        term1 = (r*Rinv_r).sum(axis=1)
+        term2 = (1.0 - dot(r, Rinv_one))**2./one_Rinv_one
         MSE = self.sig2*(1.0-term1+term2)
         RMSE = sqrt(abs(MSE))
         
-        return NormalDistribution(f, RMSE)
+        return (f, RMSE)
         
+    def _calculate_pred_cache(self):
+        """Return a tuple of the form (alpha, Rinv_one, one_Rinv_one) containing
+        the parts of the prediction that don't depend on the new point, where
+        alpha is R^-1*(Y-mu).
+        """
+        one = ones(self.n)
+        rhs = vstack([self._YY-dot(one, self.mu), one]).T
+        if self.R_fact is not None: 
+            R_fact = (self.R_fact[0].T,not self.R_fact[1])
+            sol = cho_solve(R_fact, rhs).T
+        else: 
+            sol = lstsq(self.R.T, rhs)[0].T
+        return (sol[0], sol[1], dot(one, sol[1]))
+
+    def _correlation(self, A, B):
+        """Returns the matrix of the correlations between the points in A
+        (rows) and the points in B (columns) for the current thetas. The
+        weighted distances are summed one dimension at a time, so only
+        len(A)*len(B) floats are needed however many dimensions there are.
+        """
+        scale = sqrt(10.**self.thetas)
+        dist = zeros((len(A), len(B)))
+        diff = empty((len(A), len(B)))
+        for k in range(self.m):
+            subtract(A[:,k,newaxis]*scale[k], B[newaxis,:,k]*scale[k], out=diff)
+            multiply(diff, diff, out=diff)
+            dist += diff
+        negative(dist, out=dist)
+        return exp(dist, out=dist)
 
     def train(self,X,Y):
         """Train the surrogate model with the given set of inputs and outputs."""
@@ -113,8 +135,59 @@ class KrigingSurrogate(object):
         self.Y = Y
         self.m = len(X[0])
         self.n = len(X)
-                
-        thetas = zeros(self.m)
+        self._XX = array(X, dtype=float)
+        self._YY = array(Y, dtype=float)
+        self._find_thetas(zeros(self.m))
+        
+    def add_training_points(self, X, Y):
+        """Adds the points in X and Y to the training data. The search for
+        the thetas starts from the current ones, or if `update_thetas` is
+        False, the thetas are kept and the Cholesky factor of R is extended
+        with the rows for the new points, which is O(n^2) rather than O(n^3).
+        """
+        new_XX = array(X, dtype=float).reshape(-1, self.m)
+        new_YY = array(Y, dtype=float).ravel()
+        n = self.n
+        k = new_XX.shape[0]
+        
+        R_fact = self.R_fact
+        self._XX = vstack((self._XX, new_XX))
+        self._YY = concatenate((self._YY, new_YY))
+        self.X = self._XX
+        self.Y = self._YY
+        self.n = n+k
+        
+        if self.update_thetas:
+            self._find_thetas(self.thetas)
+            return
+        if R_fact is None:
+            self._calculate_log_likelihood()
+            return
+        
+        # only the correlations involving the new points are computed
+        self._pred_cache = None
+        R = empty((n+k, n+k))
+        R[:n,:n] = self.R
+        R[n:,:] = (1-self.nugget)*self._correlation(new_XX, self._XX)
+        R[n:,n:][arange(k), arange(k)] = 1.
+        R[:n,n:] = R[n:,:n].T
+        self.R = R
+        
+        # bordered Cholesky update of the upper triangular factor U of R
+        U = zeros((n+k, n+k))
+        U[:n,:n] = triu(R_fact[0])
+        try:
+            U[:n,n:] = solve_triangular(U[:n,:n], R[:n,n:], trans='T')
+            S = U[:n,n:]
+            U[n:,n:] = cholesky(R[n:,n:]-dot(S.T, S))
+            self.R_fact = (U, False)
+            self._calculate_statistics(diag(U).prod()**2.)
+        except (linalg.LinAlgError,ValueError):
+            self._calculate_log_likelihood()
+            
+    def _find_thetas(self, thetas):
+        """Searches for the thetas that maximize the log likelihood, starting
+        from the given ones."""
         def _calcll(thetas):
             self.thetas = thetas
             self._calculate_log_likelihood()
@@ -123,28 +196,33 @@ class KrigingSurrogate(object):
         self.thetas = fmin(_calcll, thetas, disp=False, ftol = 0.0001)
         self._calculate_log_likelihood()
         
+    def _calculate_statistics(self, detR):
+        """Calculates mu, sig2 and the log likelihood from the Cholesky
+        factor of R, given the determinant of R."""
+        Y = self._YY
+        one = ones(self.n)
+        rhs = vstack([Y, one]).T
+        R_fact = (self.R_fact[0].T,not self.R_fact[1])
+        cho = cho_solve(R_fact, rhs).T
+        
+        self.mu = dot(one,cho[0])/dot(one,cho[1])
+        # R^-1*(Y-mu) is R^-1*Y - mu*R^-1*one, so no further solve is needed
+        self.sig2 = dot(Y-dot(one,self.mu),cho[0]-self.mu*cho[1])/self.n
+        #self.log_likelihood = -self.n/2.*log(self.sig2)-1./2.*log(abs(det(self.R)+1.e-16))-sum(thetas)
+        self.log_likelihood = -self.n/2.*log(self.sig2)-1./2.*log(abs(detR+1.e-16))
+        
     def _calculate_log_likelihood(self):
         #if self.m == None:
         #    Give error message
-        R = zeros((self.n, self.n))
-        X,Y = array(self.X), array(self.Y)
-        thetas = 10.**self.thetas
-        for i in range(self.n):
-            for j in arange(i+1,self.n):
-                R[i,j] = (1-self.nugget)*e**(-sum(thetas*(X[i]-X[j])**2.)) #weighted distance formula
-        R = R + R.T + eye(self.n)
+        self._pred_cache = None
+        Y = self._YY
+        R = (1-self.nugget)*self._correlation(self._XX, self._XX) #weighted distance formula
+        R[arange(self.n), arange(self.n)] = 1.
         self.R = R
         one = ones(self.n)
         try:
             self.R_fact = cho_factor(R)
-            rhs = vstack([Y, one]).T
-            R_fact = (self.R_fact[0].T,not self.R_fact[1])
-            cho = cho_solve(R_fact, rhs).T
-            
-            self.mu = dot(one,cho[0])/dot(one,cho[1])
-            self.sig2 = dot(Y-dot(one,self.mu),cho_solve(self.R_fact,(Y-dot(one,self.mu))))/self.n
-            #self.log_likelihood = -self.n/2.*log(self.sig2)-1./2.*log(abs(det(self.R)+1.e-16))-sum(thetas)
-            self.log_likelihood = -self.n/2.*log(self.sig2)-1./2.*log(abs(det(self.R)+1.e-16))
+            self._calculate_statistics(det(self.R))
         except (linalg.LinAlgError,ValueError):
             #------LSTSQ---------
             self.R_fact = None #reset this to none, so we know not to use cholesky
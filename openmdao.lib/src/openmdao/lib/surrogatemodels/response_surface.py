@@ -1,14 +1,15 @@
 """Surrogate Model based on second order response surface equations."""
 
-from numpy import matrix, linalg, power, multiply, concatenate, ones
+from numpy import array, asarray, array_equal, concatenate, empty, \
+                  linalg, triu_indices, vstack
 
 from enthought.traits.api import HasTraits
 
-from openmdao.main.interfaces import implements,ISurrogate
+from openmdao.main.interfaces import implements,IIncrementalSurrogate
 from openmdao.lib.datatypes.api import Float, Bool
 
 class ResponseSurface(HasTraits): 
-    implements(ISurrogate) 
+    implements(IIncrementalSurrogate) 
     
     def __init__(self,X=None,Y=None): 
         # must call HasTraits init to set up Traits stuff 
@@ -18,6 +19,11 @@ class ResponseSurface(HasTraits):
         self.n = None #number of independents
         self.betas = None #vector of response surface equation coefficients
         
+        self._X = None #training data from the last call to train
+        self._Y = None
+        self._R = None #triangular factor of the design matrix, if m >= terms
+        self._QtY = None #Q.T*Y for the same factorization
+        
         if X is not None and Y is not None: 
             self.train(X,Y)
             
@@ -25,42 +31,110 @@ class ResponseSurface(HasTraits):
         """Returns the value iself. Response surface equations don't have uncertainty.""" 
         return value
 
+    def _expand(self, X):
+        """Returns the design matrix for the points in X: a constant column,
+        then the inputs, their squares and the products of each pair."""
+        
+        n = X.shape[1]
+        rows, cols = triu_indices(n, 1)
+        
+        A = empty((X.shape[0], 1+2*n+len(rows)))
+        A[:,0] = 1.0
+        A[:,1:n+1] = X
+        A[:,n+1:2*n+1] = X*X
+        A[:,2*n+1:] = X[:,rows]*X[:,cols]
+        return A
+        
     def train(self,X,Y): 
-        """ Calculate response surface equation coefficients using least squares regression. """ 
+        """ Calculate response surface equation coefficients using least squares regression. 
+        
+        If X and Y start with the data from the previous call, e.g., when
+        a MetaModel adds a training point, the QR factorization of the
+        previous design matrix is updated with the new points rather than
+        recomputed.
+        """ 
         
-        X = matrix(X)
-        Y = matrix(Y).T
+        X = array(X, dtype=float, ndmin=2)
+        Y = array(Y, dtype=float).ravel()
         
+        m = self.m
+        if self._R is not None and X.shape[1] == self.n and X.shape[0] > m \
+           and array_equal(X[:m], self._X) and array_equal(Y[:m], self._Y):
+            self._update(X[m:], Y[m:])
+        else:
+            self.n = X.shape[1]
+            self._factor(self._expand(X), Y)
+            
         self.m = X.shape[0]
-        self.n = X.shape[1]
+        self._X = X
+        self._Y = Y
+        self._solve()
+        
+    def add_training_points(self, X, Y):
+        """Adds the points in X and Y to the training data, updating the QR
+        factorization of the design matrix with the new rows."""
+        
+        X = array(X, dtype=float, ndmin=2)
+        Y = array(Y, dtype=float).ravel()
+        
+        if self._R is None:
+            self.train(vstack((self._X, X)), concatenate((self._Y, Y)))
+            return
         
-        # Modify X to include constant, squared terms and cross terms
-        X = concatenate((matrix(ones((self.m,1))),X),1) 
-        for i in range(1,self.n+1):
-            X = concatenate((X,power(X[:,i],2)),1)
-        for i in range(1,self.n):
-            for j in range(i+1,self.n+1):
-                X = concatenate((X,multiply(X[:,i],X[:,j])),1)
+        self._update(X, Y)
+        self.m += X.shape[0]
+        self._X = vstack((self._X, X))
+        self._Y = concatenate((self._Y, Y))
+        self._solve()
         
-        # Determine response surface equation coefficients (betas) using least squares
-        self.betas, rs, r, s = linalg.lstsq(X,Y)
+    def _solve(self):
+        """Determines the response surface equation coefficients (betas)
+        using least squares."""
+        if self._R is not None:
+            self.betas = linalg.solve(self._R, self._QtY)
+        else:
+            self.betas = linalg.lstsq(self._expand(self._X), self._Y)[0]
         
+    def _factor(self, A, Y):
+        """Computes the QR factorization of the design matrix A, if it has
+        full column rank."""
+        
+        self._R = self._QtY = None
+        if A.shape[0] >= A.shape[1]:
+            Q, R = linalg.qr(A)
+            self._set_factors(R, Q.T.dot(Y))
+            
+    def _update(self, X_new, Y_new):
+        """Updates the QR factorization for new training points. Only the
+        triangular factor and Q.T*Y are kept, so this costs the same no
+        matter how many points there are already."""
+        
+        Q, R = linalg.qr(vstack((self._R, self._expand(X_new))))
+        self._set_factors(R, Q.T.dot(concatenate((self._QtY, Y_new))))
+        
+    def _set_factors(self, R, QtY):
+        """Keeps the given factors unless R is (nearly) singular, in which
+        case the least squares solution is found directly."""
+        
+        diag = abs(R.diagonal())
+        if diag.min() > 1e-12*diag.max():
+            self._R = R
+            self._QtY = QtY
+        else:
+            self._R = self._QtY = None
+            
     def predict(self,new_x): 
         """Calculates a predicted value of the response based on the current response surface model for the supplied list of inputs. """ 
         
-        new_x = matrix(new_x)
-        
-        # Modify new_x to include constant, squared terms and cross terms
-        new_x = concatenate((matrix(ones((1,1))),new_x),1) 
-        for i in range(1,self.n+1):
-            new_x = concatenate((new_x,power(new_x[:,i],2)),1)
-        for i in range(1,self.n):
-            for j in range(i+1,self.n+1):
-                new_x = concatenate((new_x,multiply(new_x[:,i],new_x[:,j])),1)
+        return self.predict_many([new_x])[0]
+    
+    def predict_many(self, X):
+        """Calculates predicted values of the response for each of the
+        points in X (a list of lists of inputs, or a 2D array with a row per
+        point). Returns an array.
+        """
         
-        # Predict new_y using new_x and betas
-        new_y = new_x*self.betas
-        return new_y[0,0]
+        return self._expand(asarray(X, dtype=float)).dot(self.betas)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,42 @@
+"""
+Measure the time ResponseSurface takes to be retrained after each new
+training point is added, the way MetaModel does it, and to predict a set
+of points one at a time and all at once.
+"""
+
+import random
+import sys
+import time
+
+from openmdao.lib.surrogatemodels.response_surface import ResponseSurface
+
+
+def main():
+    """ Train on a growing set of random points, then predict. """
+    npoints = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    ninputs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    random.seed(10)
+    X = [[random.uniform(-1., 1.) for j in range(ninputs)]
+         for i in range(npoints)]
+    Y = [sum([(j+1)*x*x for j, x in enumerate(inputs)]) for inputs in X]
+
+    surrogate = ResponseSurface()
+    start = time.time()
+    for i in range(2, npoints+1):
+        surrogate.train(X[:i], Y[:i])
+    print '%d inputs, %d points' % (ninputs, npoints)
+    print 'retrain after each point: %10.4f sec' % (time.time() - start)
+
+    start = time.time()
+    values = [surrogate.predict(inputs) for inputs in X]
+    print 'predict each point:       %10.4f sec' % (time.time() - start)
+
+    if hasattr(surrogate, 'predict_many'):
+        start = time.time()
+        surrogate.predict_many(X)
+        print 'predict_many:             %10.4f sec' % (time.time() - start)
+
+
+if __name__ == '__main__':
+    main()
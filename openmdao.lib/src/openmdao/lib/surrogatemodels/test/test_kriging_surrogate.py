@@ -72,7 +72,62 @@ class KrigingSurrogateTests(unittest.TestCase):
         self.assertAlmostEqual(14.513550,pred.sigma,places=2)
         self.assertAlmostEqual(18.759264,pred.mu,places=2)
         
-    def test_get_uncertain_value(self): 
+    def test_predict_many(self):
+        x = array([[0.05], [.25], [0.61], [0.95]])
+        y = array([0.738513784857542,-0.210367746201974,-0.489015457891476,12.3033138316612])
+        krig1 = KrigingSurrogate(x,y)
+
+        new_x = array([[0.5], [0.25], [0.8]])
+        mu, sigma = krig1.predict_many(new_x)
+        self.assertEqual(mu.shape, (3,))
+        self.assertEqual(sigma.shape, (3,))
+        self.assertAlmostEqual(2.5086,sigma[0],places=3)
+        self.assertAlmostEqual(-1.37201,mu[0],places=3)
+        self.assertAlmostEqual(y[1],mu[1],places=5)
+        for i, point in enumerate(new_x):
+            pred = krig1.predict(point)
+            self.assertAlmostEqual(pred.mu,mu[i],places=10)
+            self.assertAlmostEqual(pred.sigma,sigma[i],places=10)
+
+        # the cached solves are discarded when we retrain
+        krig1.train(x,2.*y)
+        mu2, sigma2 = krig1.predict_many(new_x)
+        self.assertAlmostEqual(2.*mu[0],mu2[0],places=5)
+
+    def test_add_training_points(self):
+        numpy_random.seed(3)
+        x = numpy_random.uniform(-1., 1., (20, 3))
+        y = (x**2).sum(axis=1) + sin(3.*x[:,0])
+        
+        # extending the Cholesky factor gives the same model as factoring
+        # R for all of the points with the same thetas
+        krig1 = KrigingSurrogate(x[:12], y[:12], update_thetas=False)
+        for i in range(12, 20, 4):
+            krig1.add_training_points(x[i:i+4], y[i:i+4])
+        self.assertEqual(krig1.n, 20)
+        krig2 = KrigingSurrogate(x[:12], y[:12])
+        krig2.X, krig2.Y, krig2.n = x, y, 20
+        krig2._XX, krig2._YY = x, y
+        krig2.thetas = krig1.thetas
+        krig2._calculate_log_likelihood()
+        self.assertTrue(abs(krig1.R-krig2.R).max() < 1e-12)
+        self.assertAlmostEqual(krig1.mu, krig2.mu, places=10)
+        self.assertAlmostEqual(krig1.sig2, krig2.sig2, places=10)
+        self.assertAlmostEqual(krig1.log_likelihood, krig2.log_likelihood,
+                               places=8)
+        new_x = x[:5]+0.05
+        mu1, sigma1 = krig1.predict_many(new_x)
+        mu2, sigma2 = krig2.predict_many(new_x)
+        self.assertTrue(abs(mu1-mu2).max() < 1e-10)
+        self.assertTrue(abs(sigma1-sigma2).max() < 1e-8)
+        
+        # with update_thetas, the search continues from the current thetas
+        krig3 = KrigingSurrogate(x[:12], y[:12])
+        krig3.add_training_points(x[12:], y[12:])
+        self.assertEqual(krig3.R.shape, (20, 20))
+        self.assertAlmostEqual(y[15], krig3.predict(x[15]).mu, places=4)
+        
+    def test_get_uncertain_value(self):
         x = array([[0.05], [.25], [0.61], [0.95]])
         y = array([0.738513784857542,-0.210367746201974,-0.489015457891476,12.3033138316612])
         krig1 = KrigingSurrogate(x,y)
@@ -5,6 +5,7 @@ from numpy import array,round,linspace,sin,cos,pi
 import numpy as np
 
 from openmdao.lib.surrogatemodels.logistic_regression import LogisticRegression
+from openmdao.lib.surrogatemodels.response_surface import ResponseSurface
 
 
 class LogisticRegressionTest(unittest.TestCase):
@@ -42,4 +43,47 @@ class LogisticRegressionTest(unittest.TestCase):
     def test_uncertain_value(self): 
         lr = LogisticRegression()
         
-        self.assertEqual(lr.get_uncertain_value(1.0),1.0)
\ No newline at end of file
+        self.assertEqual(lr.get_uncertain_value(1.0),1.0)
+
+
+class ResponseSurfaceTest(unittest.TestCase):
+    
+    def setUp(self):
+        random.seed(10)
+        self.X = [[random.uniform(-2., 2.) for j in range(3)] for i in range(20)]
+        self.Y = [self.func(x) for x in self.X]
+        
+    def func(self, x):
+        return 1.0 + 2.0*x[0] - x[1]*x[2] + 3.0*x[2]**2
+        
+    def test_training(self):
+        rs = ResponseSurface(self.X, self.Y)
+        
+        for x in ([0.5, -1.0, 0.25], [2.5, 1.5, -3.0]):
+            self.assertAlmostEqual(rs.predict(x), self.func(x), 8)
+            
+        X = array([[0.5, -1.0, 0.25], [2.5, 1.5, -3.0], [0., 0., 0.]])
+        Y = rs.predict_many(X)
+        self.assertEqual(Y.shape, (3,))
+        for x, y in zip(X, Y):
+            self.assertAlmostEqual(y, rs.predict(x), 10)
+            self.assertAlmostEqual(y, self.func(x), 8)
+        
+    def test_incremental(self):
+        rs = ResponseSurface()
+        
+        # fewer points than terms, then one point at a time, the way
+        # MetaModel retrains
+        for i in range(2, len(self.X)+1):
+            rs.train(self.X[:i], self.Y[:i])
+            self.assertEqual(rs.m, i)
+        self.assertTrue(rs._R is not None)
+        
+        batch = ResponseSurface(self.X, self.Y)
+        for a, b in zip(rs.betas, batch.betas):
+            self.assertAlmostEqual(a, b, 8)
+            
+        # different data, so the factorization starts over
+        rs.train(self.X[1:], self.Y[1:])
+        self.assertEqual(rs.m, len(self.X)-1)
+        self.assertAlmostEqual(rs.predict([1., 1., 1.]), self.func([1., 1., 1.]), 8)
@@ -20,6 +20,7 @@ from openmdao.main.assembly import Assembly, set_as_top, dump_iteration_tree
 from openmdao.main.driver import Driver
 from openmdao.main.workflow import Workflow
 from openmdao.main.dataflow import Dataflow
+from openmdao.main.parallel_dataflow import ParallelDataflow
 from openmdao.main.seqentialflow import SequentialWorkflow
 from openmdao.main.variable import Variable
 
@@ -17,7 +17,7 @@ from networkx.algorithms.components import strongly_connected_components
 from openmdao.main.interfaces import implements, IAssembly, IDriver, IArchitecture, IComponent, IContainer,\
                                      ICaseIterator, ICaseRecorder, IDOEgenerator
 from openmdao.main.mp_support import has_interface
-from openmdao.main.container import find_trait_and_value
+from openmdao.main.container import find_trait_and_value, _copydict
 from openmdao.main.component import Component
 from openmdao.main.variable import Variable
 from openmdao.main.datatypes.slot import Slot
@@ -28,6 +28,9 @@ from openmdao.main.expreval import ConnectedExprEvaluator
 from openmdao.main.printexpr import eliminate_expr_ws, ExprNameTransformer
 from openmdao.util.nameutil import partition_names_by_comp
 from openmdao.main.depgraph import DependencyGraph
+from openmdao.main.datatypes.float import Float
+from openmdao.main.datatypes.array import Array
+from openmdao.units import get_conversion_tuple
 
 _iodict = { 'out': 'output', 'in': 'input' }
 
@@ -281,6 +284,12 @@ class Assembly (Component):
         
         set_as_top(self, first_only=True) # we're the top Assembly only if we're the first instantiated
         
+    def __getstate__(self):
+        """Return dict representing this container's state."""
+        state = super(Assembly, self).__getstate__()
+        state['_transfer_plans'] = None
+        return state
+
     @rbac(('owner', 'user'))
     def set_itername(self, itername, seqno=0):
         """
@@ -595,6 +604,7 @@ class Assembly (Component):
         or removed, etc.
         """
         super(Assembly, self).config_changed(update_parent)
+        self._transfer_plans = None
         # driver must tell workflow that config has changed because
         # dependencies may have changed
         if self.driver is not None:
@@ -645,18 +655,26 @@ class Assembly (Component):
         component variables relative to the component, e.g., 'abc[3][1]' rather
         than 'comp1.abc[3][1]'.
         """
-        parent = self.parent
-        expr_info = []
-        invalids = []
+        plans = self._transfer_plans
+        if plans is None:
+            plans = self._transfer_plans = self._build_transfer_plans()
+        plan = plans.get(compname)
+        if not plan:
+            return
         
         if compname is not None:
             exprs = ['.'.join([compname, n]) for n in exprs]
-        for expr in exprs:
-            srctxt = self._exprmapper.get_source(expr)
-            if srctxt:
-                srcexpr = self._exprmapper.get_expr(srctxt)
-                invalids.extend(srcexpr.invalid_refs())
-                expr_info.append((srcexpr, self._exprmapper.get_expr(expr)))
+        transfers = [plan[expr] for expr in exprs if expr in plan]
+        if not transfers:
+            return
+        
+        # check the validity of all of the sources at once
+        srcvars = set()
+        for transfer in transfers:
+            srcvars.update(transfer[1])
+        srcvars = list(srcvars)
+        invalids = [n for n,v in zip(srcvars, self.get_valid(srcvars)) 
+                                              if v is False]
             
         # if source exprs reference invalid vars, request an update
         if invalids:
@@ -668,13 +686,105 @@ class Assembly (Component):
                     getattr(self, cname).update_outputs(vnames)
                     #self.set_valid(vnames, True)
             
-        for srcexpr, destexpr in expr_info:
+        for srcexpr, srcvars, destexpr, getter, setter in transfers:
             try:
-                destexpr.set(srcexpr.evaluate(), src=srcexpr.text)
+                if getter is None:
+                    val = srcexpr.evaluate()
+                else:
+                    val = getter()
+                if setter is None:
+                    destexpr.set(val, src=srcexpr.text)
+                else:
+                    setter(val)
             except Exception as err:
                 self.raise_exception("cannot set '%s' from '%s': %s" % 
                                      (destexpr.text, srcexpr.text, str(err)), type(err))
         
+    def _build_transfer_plans(self):
+        """Return a dict containing the transfer plan for the inputs of
+        each of our components, keyed on component name, with the plan for
+        our boundary outputs under None. Each plan is a dict keyed on
+        destination expression, containing tuples of the form
+        (srcexpr, srcvars, destexpr, getter, setter).
+        """
+        plans = {}
+        graph = self._exprmapper._exprgraph
+        for src, dest in graph.edges_iter():
+            srcexpr = graph.node[src]['expr']
+            destexpr = graph.node[dest]['expr']
+            cnames = destexpr.get_referenced_compnames()
+            compname = cnames.pop() if cnames else None
+            getter, setter = self._get_transfer_funcs(srcexpr, destexpr)
+            plans.setdefault(compname, {})[dest] = \
+                (srcexpr, list(srcexpr.get_referenced_varpaths(copy=False)), 
+                 destexpr, getter, setter)
+        return plans
+    
+    def _get_transfer_funcs(self, srcexpr, destexpr):
+        """Return a tuple of the form (getter, setter) of functions that
+        transfer data directly between the variables of a connection. 
+        This is only possible if both ends of the connection are simple 
+        variables. The source check and the units compatibility checks were
+        done when the connection was made, so they are not repeated. If the
+        variables need a unit conversion, the conversion factors are computed
+        here once. (None, None) is returned for connections that must go
+        through their ExprEvaluators.
+        """
+        src = srcexpr.text
+        dest = destexpr.text
+        if src.startswith('parent.') or src.count('.') > 1 or \
+           dest.startswith('parent.') or dest.count('.') != 1 or \
+           src not in srcexpr.get_referenced_varpaths(copy=False) or \
+           dest not in destexpr.get_referenced_varpaths(copy=False):
+            return (None, None)
+        
+        destcname, destname = dest.split('.')
+        destcomp = getattr(self, destcname, None)
+        if '.' in src:
+            srccname, srcname = src.split('.')
+            srccomp = getattr(self, srccname, None)
+        else:
+            srcname = src
+            srccomp = self
+        if not (isinstance(srccomp, Component) and isinstance(destcomp, Component)):
+            return (None, None)
+        srctrait = srccomp.get_trait(srcname)
+        desttrait = destcomp.get_trait(destname)
+        if srctrait is None or desttrait is None or desttrait.iotype != 'in' or \
+           srctrait.trait_type is None or desttrait.trait_type is None:
+            return (None, None)
+        srctype = srctrait.trait_type
+        desttype = desttrait.trait_type
+        
+        factor = None
+        srcunits = srctype.units
+        destunits = desttype.units
+        if srcunits:
+            if not (isinstance(srctype, (Float, Array)) and 
+                    isinstance(desttype, (Float, Array))):
+                return (None, None)
+            if destunits and destunits != srcunits:
+                try:
+                    factor, offset = get_conversion_tuple(srcunits, destunits)
+                except Exception:
+                    return (None, None)
+        
+        copy = _copydict.get(srctype.copy)
+        if factor is not None:
+            def getter():
+                return (getattr(srccomp, srcname) + offset) * factor
+        elif copy is not None:
+            def getter():
+                return copy(getattr(srccomp, srcname))
+        else:
+            def getter():
+                return getattr(srccomp, srcname)
+            
+        def setter(val):
+            destcomp.set(destname, val, force=True)
+            
+        return (getter, setter)
+        
     def update_outputs(self, outnames):
         """Execute any necessary internal or predecessor components in order
         to make the specified output variables valid.
@@ -20,7 +20,7 @@ from enthought.traits.trait_base import not_event
 from enthought.traits.api import Bool, List, Str, Int, Property
 
 from openmdao.main.container import Container
-from openmdao.main.expreval import ConnectedExprEvaluator
+from openmdao.main.expreval import ConnectedExprEvaluator, _config_changed
 from openmdao.main.interfaces import implements, obj_has_interface, \
                                      IAssembly, IComponent, IDriver, \
                                      ICaseIterator, ICaseRecorder
@@ -657,6 +657,7 @@ class Component (Container):
         """
         if update_parent and hasattr(self, 'parent') and self.parent:
             self.parent.config_changed(update_parent)
+        _config_changed()
         self._input_names = None
         self._output_names = None
         self._connected_inputs = None
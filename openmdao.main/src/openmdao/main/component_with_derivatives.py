@@ -28,9 +28,10 @@ class ComponentWithDerivatives (Component):
             Order of the derivatives to be used (typically 1 or 2).
         """
         
+        deltas = self.derivatives.input_deltas()
         for name in self.derivatives.out_names:
             setattr(self, name,
-                     self.derivatives.calculate_output(name, ffd_order))
+                     self.derivatives.calculate_output(name, ffd_order, deltas))
 
             
     def calc_derivatives(self, first=False, second=False):
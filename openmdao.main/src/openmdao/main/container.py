@@ -44,7 +44,7 @@ from openmdao.main.attrwrapper import AttrWrapper, UnitsAttrWrapper
 from openmdao.main.mp_support import ObjectManager, OpenMDAO_Proxy, is_instance, has_interface, CLASSES_TO_PROXY
 from openmdao.main.rbac import rbac
 from openmdao.main.interfaces import ICaseIterator, IResourceAllocator, IContainer
-from openmdao.main.expreval import ExprEvaluator, ConnectedExprEvaluator
+from openmdao.main.expreval import ExprEvaluator, ConnectedExprEvaluator, _config_changed
 from openmdao.main.index import process_index_entry, get_indexed_value, INDEX, ATTR, CALL, SLICE
 
 from openmdao.util.log import Logger, logger, LOG_DEBUG
@@ -522,6 +522,7 @@ class Container(SafeHasTraits):
             pass
         
         super(Container, self).remove_trait(name)
+        _config_changed()
             
     @rbac(('owner', 'user'))
     def get_wrapped_attr(self, name, index=None):
@@ -578,6 +579,7 @@ class Container(SafeHasTraits):
             self.raise_exception(
                 'add does not allow dotted path names like %s' %
                 name, ValueError)
+        _config_changed()
         if is_instance(obj, Container):
             self._check_recursion(obj)
             if isinstance(obj, OpenMDAO_Proxy):
@@ -1,4 +1,3 @@
-
 import networkx as nx
 from networkx.algorithms.components import strongly_connected_components
 
@@ -10,13 +9,21 @@ __all__ = ['Dataflow']
 
 class Dataflow(SequentialWorkflow):
     """
-    A Dataflow consists of a collection of Components which are executed in 
+    A Dataflow consists of a collection of Components which are executed in
     data flow order.
+
+    The collapsed dependency graph and the topological ordering of the
+    workflow are cached. Component level edges that are added to or removed
+    from the dependency graph of our scope are applied to the cached graph
+    and ordering incrementally, so the cost of making a connection doesn't
+    depend on the size of the model. Changes to workflow membership, to the
+    iteration sets of Drivers in the workflow, or to the dependencies
+    introduced by ExprEvaluators cause the collapsed graph to be rebuilt.
     """
     def __init__(self, parent=None, scope=None, members=None):
         """ Create an empty flow. """
         super(Dataflow, self).__init__(parent, scope, members)
-        self.config_changed()
+        self._reset()
 
     def __iter__(self):
         """Iterate through the nodes in dataflow order."""
@@ -28,21 +35,35 @@ class Dataflow(SequentialWorkflow):
     def add(self, compnames, index=None):
         """ Add new component(s) to the workflow by name. """
         super(Dataflow, self).add(compnames, index)
-        self.config_changed()
+        self._reset()
 
     def remove(self, compname):
         """Remove a component from this Workflow by name."""
         super(Dataflow, self).remove(compname)
-        self.config_changed()
+        self._reset()
+
+    def clear(self):
+        """Remove all components from this workflow."""
+        super(Dataflow, self).clear()
+        self._reset()
 
     def config_changed(self):
         """Notifies the Workflow that its configuration (dependencies, etc.)
         has changed.
         """
+        self._stale = True
+
+    def _reset(self):
+        """Discard our collapsed graph and ordering so that they will
+        be rebuilt from scratch the next time they're needed.
+        """
         self._collapsed_graph = None
         self._topsort = None
+        self._toppos = None
+        self._stale = True
 
     def _get_topsort(self):
+        self._update()
         if self._topsort is None:
             graph = self._get_collapsed_graph()
             try:
@@ -52,75 +73,324 @@ class Dataflow(SequentialWorkflow):
                 strcon = strongly_connected_components(graph)
                 self.scope.raise_exception('circular dependency found between the following: %s' % str(strcon[0]),
                                            RuntimeError)
+            self._toppos = dict([(n,i) for i,n in enumerate(self._topsort)])
         return self._topsort
-            
+
     def _get_collapsed_graph(self):
         """Get a dependency graph with only our workflow components
         in it, with additional edges added to it from sub-workflows
         of any Driver components in our workflow, and from any ExprEvaluators
         in any components in our workflow.
         """
-        if self._collapsed_graph:
-            return self._collapsed_graph
+        self._update()
+        if self._collapsed_graph is None:
+            self._build_collapsed_graph()
+        return self._collapsed_graph
+
+    def _get_dependency_graph(self):
+        """Return a tuple of the form (graph, external), where graph is a
+        DiGraph of our collapsed graph with only the real dependencies, i.e.,
+        without the fake edges that impose sequence order on unconnected
+        components, and external is a dict of the names of the components
+        outside of this workflow that each node depends on, for those nodes
+        that depend on any.
+        """
+        self._get_collapsed_graph()
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self._collapsed_graph.nodes_iter())
+        graph.add_edges_from(self._edge_counts.keys())
         
-        to_add = []
+        external = {}
+        base_graph = self._base_graph
+        reps = self._reps
+        for name, reps_of in reps.items():
+            if name in base_graph:
+                preds = [pred for pred in base_graph.predecessors_iter(name)
+                              if pred not in reps]
+                if preds:
+                    for rep in reps_of:
+                        external.setdefault(rep, set()).update(preds)
+        return (graph, external)
+
+    def _get_expr_info(self, comps):
+        """Return a tuple of the form (itersets, expr_edges), where itersets
+        is a dict of the names of the components in the iteration set of each
+        Driver in comps, keyed on Driver name, and expr_edges is the set of
+        dependencies introduced by ExprEvaluators in comps.
+        """
+        itersets = {}
+        expr_edges = set()
+        for comp in comps:
+            expr_edges.update(comp.get_expr_depends())
+            if has_interface(comp, IDriver):
+                itersets[comp.name] = set([c.name for c in comp.iteration_set()])
+        return (itersets, expr_edges)
+
+    def _build_collapsed_graph(self):
+        """Build our collapsed graph from scratch.
+
+        Each component in our scope is mapped onto the node(s) that represent
+        it in the collapsed graph. A component in the iteration set of a Driver
+        in our workflow is represented by that Driver, and other components
+        in our workflow represent themselves. Each edge in the full graph
+        then results in an edge between the representatives of its endpoints,
+        and we keep a count of the full graph edges responsible for each
+        collapsed edge so that edges can later be added and removed
+        incrementally.
+        """
         scope = self.scope
-        graph = scope._depgraph.copy_graph()
-        
+        depgraph = scope._depgraph
+        self._depgraph = depgraph
+        self._change_pos = depgraph.get_change_position()
+        graph = depgraph.copy_graph()
+
         contents = self.get_components()
-        
-        # add any dependencies due to ExprEvaluators
-        for comp in contents:
-            graph.add_edges_from([tup for tup in comp.get_expr_depends()])
-            
-        collapsed_graph = nx.DiGraph(graph)  # this way avoids a deep copy of edge/node data
-
-        # find all of the incoming and outgoing edges to/from all of the components
-        # in each driver's iteration set so we can add edges to/from the driver
-        # in our collapsed graph
-        cnames = set(self._names)
+        itersets, expr_edges = self._get_expr_info(contents)
+        graph.add_edges_from(expr_edges)
+
+        # only Drivers and components with delegates can introduce
+        # dependencies via ExprEvaluators, so keep track of those in
+        # order to check for changes later without looking at all of
+        # our components
+        self._expr_comps = [c.name for c in contents
+                              if has_interface(c, IDriver) or
+                                 hasattr(c, '_delegates_')]
+        self._itersets = itersets
+        self._expr_edges = expr_edges
+        self._base_graph = graph
+
         removes = set()
-        itersets = {}
-        for comp in contents:
-            cname = comp.name
-            if has_interface(comp, IDriver):
-                iterset = [c.name for c in comp.iteration_set()]
-                itersets[cname] = iterset
-                removes.update(iterset)
-                for u,v in graph.edges_iter(nbunch=iterset): # outgoing edges
-                    if v != cname and v not in iterset:
-                        collapsed_graph.add_edge(cname, v)
-                for u,v in graph.in_edges_iter(nbunch=iterset): # incoming edges
-                    if u != cname and u not in iterset:
-                        collapsed_graph.add_edge(u, cname)
-        # connect all of the edges from each driver's iterset members to itself
-        to_add = []
-        for drv,iterset in itersets.items():
-            for cname in iterset:
-                for u,v in collapsed_graph.edges_iter(cname):
-                    if v != drv:
-                        to_add.append((drv, v))
-                for u,v in collapsed_graph.in_edges_iter(cname):
-                    if u != drv:
-                        to_add.append((u, drv))
-        collapsed_graph.add_edges_from(to_add)
-        
+        for iterset in itersets.values():
+            removes.update(iterset)
+        cnames = set(self._names)
+        nodes = cnames - removes
+
+        reps = {}
+        for cname in nodes:
+            reps[cname] = [cname]
+        for drv, iterset in itersets.items():
+            if drv in nodes:
+                for name in iterset:
+                    reps.setdefault(name, []).append(drv)
+        self._reps = reps
+
+        # the number of edge endpoints touching each collapsed node or any
+        # member of its iteration set
+        degrees = dict([(n,0) for n in nodes])
+        counts = {}
+        for u,v in graph.edges_iter():
+            for ru in reps.get(u, ()):
+                degrees[ru] += 1
+            for rv in reps.get(v, ()):
+                degrees[rv] += 1
+            for ru in reps.get(u, ()):
+                for rv in reps.get(v, ()):
+                    if ru != rv:
+                        counts[(ru,rv)] = counts.get((ru,rv), 0) + 1
+        self._degrees = degrees
+        self._edge_counts = counts
+        self._fake_counts = {}
+
+        self._collapsed_graph = nx.DiGraph()
+        self._collapsed_graph.add_nodes_from([n for n in self._names if n in nodes])
+        self._collapsed_graph.add_edges_from(counts.keys())
+        self._topsort = None
+
         # now add some fake dependencies for degree 0 nodes in an attempt to
         # mimic a SequentialWorkflow in cases where nodes aren't connected.
         # Edges are added from each degree 0 node to all nodes after it in
-        # sequence order.
-        last = len(self._names)-1
-        if last > 0:
-            to_add = []
-            for i,cname in enumerate(self._names):
-                if collapsed_graph.degree(cname) == 0:
-                    if i < last:
-                        for n in self._names[i+1:]:
-                            to_add.append((cname, n))
+        # sequence order.  A node has degree 0 if neither it nor any member
+        # of its iteration set is connected to anything.
+        for i,cname in enumerate(self._names):
+            if cname in nodes and degrees[cname] == 0:
+                self._update_fake_edges(i, cname, 1)
+
+        self._stale = False
+
+    def _get_fake_edges(self, i, cname):
+        """Return the list of fake edges for the degree 0 node at index i
+        of our sequence.
+        """
+        names = self._names
+        nodes = self._degrees
+        last = len(names)-1
+        if last <= 0:
+            return []
+        if i < last:
+            return [(cname, n) for n in names[i+1:] if n in nodes]
+        else:
+            return [(n, cname) for n in names[0:i] if n in nodes]
+
+    def _update_fake_edges(self, i, cname, incr):
+        """Add (incr=1) or remove (incr=-1) the fake edges for the degree 0
+        node at index i of our sequence. Returns False if the ordering can't
+        be updated incrementally.
+        """
+        counts = self._fake_counts
+        for edge in self._get_fake_edges(i, cname):
+            count = counts.get(edge, 0) + incr
+            if count:
+                counts[edge] = count
+                if count == 1 and incr > 0:
+                    if not self._add_ordered_edge(*edge):
+                        return False
+            else:
+                del counts[edge]
+                self._collapsed_graph.remove_edge(*edge)
+        return True
+
+    def _update_degree(self, name, incr):
+        """Update the degree count of every collapsed node representing
+        the named component, adding or removing fake edges for any node whose
+        degree 0 status changes. Returns False if the ordering can't be
+        updated incrementally.
+        """
+        degrees = self._degrees
+        for rep in self._reps.get(name, ()):
+            old = degrees[rep]
+            degrees[rep] = old + incr
+            if old == 0 or degrees[rep] == 0:
+                for i,cname in enumerate(self._names):
+                    if cname == rep:
+                        if not self._update_fake_edges(i, rep, -incr):
+                            return False
+        return True
+
+    def _update(self):
+        """Bring our collapsed graph and ordering up to date with any
+        changes made to the dependency graph of our scope since they were
+        built, falling back to a full rebuild if the changes can't be
+        applied incrementally.
+        """
+        if self._collapsed_graph is None:
+            return
+        depgraph = self.scope._depgraph
+        if depgraph is not self._depgraph:
+            self._reset()
+            return
+        pos = depgraph.get_change_position()
+        if pos == self._change_pos and not self._stale:
+            return
+        pos, changes = depgraph.get_changes(self._change_pos)
+        if changes is None:
+            self._reset()
+            return
+        for op, u, v in changes:
+            if op == 'x':
+                self._reset()
+                return
+
+        # if iteration sets or ExprEvaluator dependencies have changed,
+        # start over
+        scope = self.scope
+        itersets, expr_edges = \
+            self._get_expr_info([getattr(scope, n) for n in self._expr_comps])
+        if itersets != self._itersets or expr_edges != self._expr_edges:
+            self._reset()
+            return
+
+        for op, u, v in changes:
+            if op == '+':
+                ok = self._add_edge(u, v)
+            else:
+                ok = self._remove_edge(u, v)
+            if not ok:
+                self._reset()
+                return
+        self._change_pos = pos
+        self._stale = False
+
+    def _add_edge(self, u, v):
+        """Add an edge between two components in our scope. Returns False
+        if the edge can't be added incrementally.
+        """
+        graph = self._base_graph
+        if graph.has_edge(u, v):
+            return True
+        graph.add_edge(u, v)
+        # remove any fake edges before adding the real ones
+        if not (self._update_degree(u, 1) and self._update_degree(v, 1)):
+            return False
+        counts = self._edge_counts
+        for ru in self._reps.get(u, ()):
+            for rv in self._reps.get(v, ()):
+                if ru != rv:
+                    if (ru,rv) in counts:
+                        counts[(ru,rv)] += 1
                     else:
-                        for n in self._names[0:i]:
-                            to_add.append((n, cname))
-            collapsed_graph.add_edges_from(to_add)
-        
-        self._collapsed_graph = collapsed_graph.subgraph(cnames-removes)
-        return self._collapsed_graph
+                        counts[(ru,rv)] = 1
+                        if not self._add_ordered_edge(ru, rv):
+                            return False
+        return True
+
+    def _remove_edge(self, u, v):
+        """Remove an edge between two components in our scope. Returns False
+        if the edge can't be removed incrementally.
+        """
+        graph = self._base_graph
+        if (u,v) in self._expr_edges or not graph.has_edge(u, v):
+            return True
+        graph.remove_edge(u, v)
+        counts = self._edge_counts
+        for ru in self._reps.get(u, ()):
+            for rv in self._reps.get(v, ()):
+                if ru != rv:
+                    counts[(ru,rv)] -= 1
+                    if counts[(ru,rv)] == 0:
+                        # removing an edge never invalidates the ordering
+                        del counts[(ru,rv)]
+                        self._collapsed_graph.remove_edge(ru, rv)
+        return self._update_degree(u, -1) and self._update_degree(v, -1)
+
+    def _add_ordered_edge(self, u, v):
+        """Add an edge to our collapsed graph and, if the current ordering
+        places v before u, reorder only the nodes between them that have to
+        move (Pearce & Kelly, 2006). Returns False if the new edge creates a
+        cycle.
+        """
+        graph = self._collapsed_graph
+        graph.add_edge(u, v)
+        if self._topsort is None:
+            return True
+        pos = self._toppos
+        lower, upper = pos[v], pos[u]
+        if lower > upper:
+            return True
+
+        # find everything downstream of v that is currently ordered before u
+        fwd = []
+        visited = set([v])
+        stack = [v]
+        while stack:
+            node = stack.pop()
+            fwd.append(node)
+            for succ in graph.successors_iter(node):
+                if succ == u:
+                    return False
+                if succ not in visited and pos[succ] < upper:
+                    visited.add(succ)
+                    stack.append(succ)
+
+        # find everything upstream of u that is currently ordered after v
+        back = []
+        visited = set([u])
+        stack = [u]
+        while stack:
+            node = stack.pop()
+            back.append(node)
+            for pred in graph.predecessors_iter(node):
+                if pred not in visited and pos[pred] > lower:
+                    visited.add(pred)
+                    stack.append(pred)
+
+        # move the upstream nodes ahead of the downstream ones, reusing
+        # the positions that the affected nodes already occupy
+        back.sort(key=pos.get)
+        fwd.sort(key=pos.get)
+        moved = back + fwd
+        slots = sorted([pos[n] for n in moved])
+        order = self._topsort
+        for node, i in zip(moved, slots):
+            order[i] = node
+            pos[node] = i
+        return True
@@ -7,7 +7,7 @@ __all__ = ["Array"]
 
 import logging
 
-from openmdao.units import PhysicalQuantity
+from openmdao.units import PhysicalQuantity, get_conversion_tuple
 
 from openmdao.main.attrwrapper import AttrWrapper, UnitsAttrWrapper
 from openmdao.main.index import get_indexed_value
@@ -165,23 +165,29 @@ class Array(TraitArray):
         dst_units = self.units
 
         try:
-            pq = PhysicalQuantity(1.0, src_units)
-        except NameError:
-            raise NameError("while setting value of %s: undefined unit '%s'" %
-                            (src_units, name))
-        
-        try:
-            pq.convert_to_unit(dst_units)
-        except NameError:
-            raise NameError("undefined unit '%s' for variable '%s'" %
-                            (dst_units, name))
+            factor, offset = get_conversion_tuple(src_units, dst_units)
+        except (NameError, ValueError):
+            # find out which of the units is undefined
+            try:
+                PhysicalQuantity(1.0, src_units)
+            except (NameError, ValueError):
+                raise NameError("while setting value of %s: undefined unit '%s'" %
+                                (name, src_units))
+            try:
+                PhysicalQuantity(1.0, dst_units)
+            except (NameError, ValueError):
+                raise NameError("undefined unit '%s' for variable '%s'" %
+                                (dst_units, name))
+            raise
         except TypeError:
             msg = "%s: units '%s' are incompatible " % (name, src_units) + \
                    "with assigning units of '%s'" % (dst_units)
             raise TypeError(msg)
         
         try:
-            value *= pq.value
+            if offset:
+                value = value + offset
+            value = value * factor
             return super(Array, self).validate(obj, name, value)
         except Exception:
             self.error(obj, name, value)
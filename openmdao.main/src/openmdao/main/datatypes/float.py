@@ -11,7 +11,7 @@ from sys import float_info
 # pylint: disable-msg=E0611,F0401
 from enthought.traits.api import Range
 from enthought.traits.api import Float as TraitFloat
-from openmdao.units import PhysicalQuantity
+from openmdao.units import PhysicalQuantity, get_conversion_tuple
 
 from openmdao.main.variable import Variable
 from openmdao.main.attrwrapper import AttrWrapper, UnitsAttrWrapper
@@ -191,23 +191,28 @@ class Float(Variable):
                 self.error(obj, name, value)
 
         try:
-            pq = PhysicalQuantity(value, src_units)
-        except NameError:
-            raise NameError("while setting value of %s: undefined unit '%s'" %
-                             (src_units, name))
-        
-        try:
-            pq.convert_to_unit(dst_units)
-        except NameError:
-            raise NameError("undefined unit '%s' for variable '%s'" %
-                             (dst_units, name))
+            factor, offset = get_conversion_tuple(src_units, dst_units)
+        except (NameError, ValueError):
+            # find out which of the units is undefined
+            try:
+                PhysicalQuantity(1.0, src_units)
+            except (NameError, ValueError):
+                raise NameError("while setting value of %s: undefined unit '%s'" %
+                                (name, src_units))
+            try:
+                PhysicalQuantity(1.0, dst_units)
+            except (NameError, ValueError):
+                raise NameError("undefined unit '%s' for variable '%s'" %
+                                (dst_units, name))
+            raise
         except TypeError:
             msg = "%s: units '%s' are incompatible " % (name, src_units) + \
                    "with assigning units of '%s'" % (dst_units)
             raise TypeError(msg)
         
         try:
-            return self._validator.validate(obj, name, pq.value)
+            value = (value + offset) * factor
+            return self._validator.validate(obj, name, value)
         except Exception:
-            self.error(obj, name, pq.value)
+            self.error(obj, name, value)
 
@@ -22,6 +22,7 @@ import zope.interface
 from openmdao.main.variable import Variable
 from openmdao.main.mp_support import has_interface
 from openmdao.main.interfaces import IContainer
+from openmdao.main.expreval import _config_changed
 
 class Slot(Variable):
     """A trait for an object of a particular type or implementing a particular
@@ -87,6 +88,7 @@ class Slot(Variable):
     def post_setattr ( self, obj, name, value ):
         # Containers must know their place within the hierarchy, so set their
         # parent here.  This keeps side effects out of validate()
+        _config_changed()
         if self._is_container and value is not None:
             if value.parent is not obj:
                 value.parent = obj
@@ -6,6 +6,7 @@ from openmdao.main.numpy_fallback import array
 
 from openmdao.main.api import Component
 from openmdao.main.datatypes.array import Array
+from openmdao.main.attrwrapper import AttrWrapper
 from openmdao.units import convert_units
 from openmdao.main.case import flatten_obj
 
@@ -57,6 +58,15 @@ class ArrayTestCase(unittest.TestCase):
         self.assertAlmostEqual(12., self.hobj.arr2[0])
         self.assertAlmostEqual(24., self.hobj.arr2[1])
         self.assertAlmostEqual(36., self.hobj.arr2[2])
+        # the source isn't changed by the conversion
+        self.assertEqual([1.,2.,3.], list(self.hobj.arr1))
+        
+        # units with an offset
+        self.hobj.add('tempF', Array(array([32., 212.]), iotype='in', units='degF'))
+        self.hobj.add('tempC', Array(iotype='in', units='degC'))
+        self.hobj.tempC = self.hobj.get_wrapped_attr('tempF')
+        self.assertAlmostEqual(0., self.hobj.tempC[0])
+        self.assertAlmostEqual(100., self.hobj.tempC[1])
         
         # unit to unitless
         self.hobj.add('arr5', Array(iotype='in'))
@@ -99,6 +109,25 @@ class ArrayTestCase(unittest.TestCase):
         else:
             self.fail('Exception expected')
 
+    def test_undefined_units(self):
+        try:
+            self.hobj.arr3 = AttrWrapper(array([1.0]), units='bogus')
+        except NameError, err:
+            self.assertEqual(str(err), 
+                "while setting value of arr3: undefined unit 'bogus'")
+        else:
+            self.fail('NameError expected')
+            
+        # units are checked when the trait is created, so fake a bad one
+        self.hobj.get_trait('arr3').trait_type.units = 'bogus'
+        try:
+            self.hobj.arr3 = AttrWrapper(array([1.0]), units='kg')
+        except NameError, err:
+            self.assertEqual(str(err), 
+                "undefined unit 'bogus' for variable 'arr3'")
+        else:
+            self.fail('NameError expected')
+
     def test_constructor_defaults(self):
         
         self.hobj.add('arr_nodefault3',
@@ -4,6 +4,7 @@ import unittest
 
 from openmdao.main.api import Container
 from openmdao.main.datatypes.float import Float
+from openmdao.main.attrwrapper import AttrWrapper
 from openmdao.units import convert_units
 
 class FloatTestCase(unittest.TestCase):
@@ -133,6 +134,25 @@ class FloatTestCase(unittest.TestCase):
         else:
             self.fail('Exception expected')
 
+    def test_undefined_units(self):
+        try:
+            self.hobj.float3 = AttrWrapper(1.0, units='bogus')
+        except NameError, err:
+            self.assertEqual(str(err), 
+                "while setting value of float3: undefined unit 'bogus'")
+        else:
+            self.fail('NameError expected')
+            
+        # units are checked when the trait is created, so fake a bad one
+        self.hobj.get_trait('float3').trait_type.units = 'bogus'
+        try:
+            self.hobj.float3 = AttrWrapper(1.0, units='kg')
+        except NameError, err:
+            self.assertEqual(str(err), 
+                "undefined unit 'bogus' for variable 'float3'")
+        else:
+            self.fail('NameError expected')
+
     def test_constructor_defaults(self):
         
         self.hobj.add('float_nodefault1',
@@ -3,6 +3,7 @@
 import sys
 import StringIO
 import re
+from heapq import heappush, heappop
 
 import networkx as nx
 from networkx.algorithms.dag import topological_sort_recursive,is_directed_acyclic_graph
@@ -62,6 +63,9 @@ _fakes = ['@xin', '@xout', '@bin', '@bout']
 
 _exprset = set('+-/*[]()&| %<>!') # to use as a quick check for exprs to avoid overhead of constructing an ExprEvaluator
 
+# max number of entries kept in the DependencyGraph change journal
+_MAX_CHANGES = 10000
+
 class DependencyGraph(object):
     """
     A dependency graph for Components.  Each edge contains a _Link object, which 
@@ -82,6 +86,9 @@ class DependencyGraph(object):
         self._graph = nx.DiGraph()
         self._graph.add_nodes_from(_fakes)
         self._allsrcs = {}
+        self._changes = []   # journal of component edge additions/removals
+        self._change_base = 0  # journal position of self._changes[0]
+        self._plan = None  # cached invalidation plan
         
     def __contains__(self, compname):
         """Return True if this graph contains the given component."""
@@ -105,9 +112,42 @@ class DependencyGraph(object):
     def get_source(self, destpath):
         return self._allsrcs.get(destpath)
 
+    def _log_change(self, op, src, dest=None):
+        """Record a change to the component level graph in our journal.
+        Changes involving boundary nodes are not recorded.
+        """
+        if src in _fakes or dest in _fakes:
+            return
+        changes = self._changes
+        changes.append((op, src, dest))
+        if len(changes) > _MAX_CHANGES:
+            half = len(changes)//2
+            del changes[:half]
+            self._change_base += half
+
+    def get_change_position(self):
+        """Return the current position in our journal of component edge
+        changes.
+        """
+        return self._change_base + len(self._changes)
+    
+    def get_changes(self, since):
+        """Return a tuple of the form (position, changes), where position is
+        the current journal position and changes is a list of tuples of the 
+        form (op, srccompname, destcompname) for each component edge added
+        (op is '+') or removed (op is '-') since journal position *since*.
+        A removed component is reported as ('x', compname, None). If the
+        journal no longer contains changes that far back, changes will be None.
+        """
+        pos = self.get_change_position()
+        if since < self._change_base:
+            return (pos, None)
+        return (pos, self._changes[since-self._change_base:])
+
     def add(self, name):
         """Add the name of a Component to the graph."""
         self._graph.add_node(name)
+        self._plan = None
 
     def remove(self, name):
         """Remove the name of a Component from the graph. It is not
@@ -115,10 +155,47 @@ class DependencyGraph(object):
         """
         self.disconnect(name)
         self._graph.remove_node(name)
+        self._log_change('x', name)
+        self._plan = None
+                                    
+    def _add_link(self, srcnode, destnode):
+        """Add an edge with a new _Link from *srcnode* to *destnode* and
+        return the link.
+        """
+        link = _Link(srcnode, destnode)
+        self._graph.add_edge(srcnode, destnode, link=link)
+        self._plan = None
+        return link
+    
+    def _remove_link(self, srcnode, destnode):
+        """Remove the edge from *srcnode* to *destnode*."""
+        self._graph.remove_edge(srcnode, destnode)
+        self._plan = None
+                                    
+    def _get_plan(self):
+        """Return a tuple of the form (names, index, succs) that is used
+        to walk the graph during invalidation. Nodes are numbered in
+        topological order, names is a list of node names, index maps
+        node names to their numbers, and succs[i] is a list of tuples of the
+        form (j, link) for each outgoing edge of node i. The plan is rebuilt 
+        whenever nodes or edges are added to or removed from the graph.
+        """
+        if self._plan is None:
+            graph = self._graph
+            names = nx.topological_sort(graph)
+            index = dict([(name,i) for i,name in enumerate(names)])
+            succs = [[(index[v], data['link']) 
+                          for u,v,data in graph.edges_iter(name, data=True)]
+                        for name in names]
+            self._plan = (names, index, succs)
+        return self._plan
                                     
     def invalidate_deps(self, scope, cnames, varsets, force=False):
         """Walk through all dependent nodes in the graph, invalidating all
         variables that depend on output sets for the given component names.
+        Dependent components are visited in topological order, so each
+        of them is invalidated only once, with the full set of its inputs 
+        that depend on the starting outputs.
         
         scope: Component
             Scoping object containing this dependency graph.
@@ -133,27 +210,35 @@ class DependencyGraph(object):
             If True, force invalidation to continue even if a component in
             the dependency chain was already invalid.
         """
-        graph = self._graph
-        stack = zip(cnames, varsets)
+        names, index, succs = self._get_plan()
         outset = set()  # set of changed boundary outputs
-        while(stack):
-            src, varset = stack.pop()
-            for dest,link in self.out_links(src):
-                if varset is None:
-                    srcvars = set(link._srcs.keys())
-                else:
-                    srcvars = varset
-                if dest == '@bout':
-                    bouts = link.get_dests(varset)
-                    outset.update(bouts)
-                    scope.set_valid(bouts, False)
+        pending = {}  # dest vars to invalidate, keyed on node number
+        heap = []
+        
+        def _propagate(src, varset):
+            for dest, link in succs[src]:
+                if dest in pending:
+                    pending[dest].extend(link.get_dests(varset))
+                    continue
+                dests = link.get_dests(varset)
+                if not dests:
+                    continue
+                if names[dest] == '@bout':
+                    outset.update(dests)
+                    scope.set_valid(dests, False)
                 else:
-                    dests = link.get_dests(varset)
-                    if dests:
-                        comp = getattr(scope, dest)
-                        outs = comp.invalidate_deps(varnames=dests, force=force)
-                        if (outs is None) or outs:
-                            stack.append((dest, outs))
+                    pending[dest] = list(dests)
+                    heappush(heap, dest)
+
+        for cname, varset in zip(cnames, varsets):
+            _propagate(index[cname], varset)
+            
+        while heap:
+            dest = heappop(heap)
+            comp = getattr(scope, names[dest])
+            outs = comp.invalidate_deps(varnames=pending.pop(dest), force=force)
+            if (outs is None) or outs:
+                _propagate(dest, outs)
         return outset
 
     def list_connections(self, show_passthrough=True):
@@ -267,28 +352,24 @@ class DependencyGraph(object):
         if srccompname == '@xin' and destcompname != '@bin':
             # this is an auto-passthrough input so we need 2 links
             if '@bin' not in graph['@xin']:
-                link = _Link('@xin', '@bin')
-                graph.add_edge('@xin', '@bin', link=link)
+                link = self._add_link('@xin', '@bin')
             else:
                 link = graph['@xin']['@bin']['link']
             link.connect(srcvarname, '.'.join([destcompname,destvarname]))
             if destcompname not in graph['@bin']:
-                link = _Link('@bin', destcompname)
-                graph.add_edge('@bin', destcompname, link=link)
+                link = self._add_link('@bin', destcompname)
             else:
                 link = graph['@bin'][destcompname]['link']
             link.connect('.'.join([destcompname,destvarname]), destvarname)
         elif destcompname == '@xout' and srccompname != '@bout':
             # this is an auto-passthrough output so we need 2 links
             if '@xout' not in graph['@bout']:
-                link = _Link('@bout', '@xout')
-                graph.add_edge('@bout', '@xout', link=link)
+                link = self._add_link('@bout', '@xout')
             else:
                 link = graph['@bout']['@xout']['link']
             link.connect('.'.join([srccompname,srcvarname]), destvarname)
             if srccompname not in graph or '@bout' not in graph[srccompname]:
-                link = _Link(srccompname, '@bout')
-                graph.add_edge(srccompname, '@bout', link=link)
+                link = self._add_link(srccompname, '@bout')
             else:
                 link = graph[srccompname]['@bout']['link']
             link.connect(srcvarname, '.'.join([srccompname,srcvarname]))
@@ -296,16 +377,17 @@ class DependencyGraph(object):
             try:
                 link = graph[srccompname][destcompname]['link']
             except KeyError:
-                link=_Link(srccompname, destcompname)
-                graph.add_edge(srccompname, destcompname, link=link)
+                link = self._add_link(srccompname, destcompname)
             
             if is_directed_acyclic_graph(graph):
+                if len(link) == 0:
+                    self._log_change('+', srccompname, destcompname)
                 link.connect(srcvarname, destvarname)
             else:   # cycle found
                 # do a little extra work here to give more info to the user in the error message
                 strongly_connected = strongly_connected_components(graph)
                 if len(link) == 0:
-                    graph.remove_edge(srccompname, destcompname)
+                    self._remove_link(srccompname, destcompname)
                 for strcon in strongly_connected:
                     if len(strcon) > 1:
                         raise RuntimeError(
@@ -376,11 +458,11 @@ class DependencyGraph(object):
             link = graph['@xin']['@bin']['link']
             link.disconnect(srcvarname, '.'.join([destcompname,destvarname]))
             if len(link) == 0:
-                self._graph.remove_edge('@xin', '@bin')
+                self._remove_link('@xin', '@bin')
             link = graph['@bin'][destcompname]['link']
             link.disconnect('.'.join([destcompname,destvarname]), destvarname)
             if len(link) == 0:
-                self._graph.remove_edge('@bin', destcompname)
+                self._remove_link('@bin', destcompname)
         elif destcompname == '@xout' and srccompname != '@bout':
             # this is an auto-passthrough output, so there are two connections
             # that must be removed (@bout to @xout and some internal component to @bout)
@@ -388,18 +470,19 @@ class DependencyGraph(object):
                 link = graph['@bout']['@xout']['link']
                 link.disconnect('.'.join([srccompname,srcvarname]), destvarname)
                 if len(link) == 0:
-                    self._graph.remove_edge('@bout', '@xout')
+                    self._remove_link('@bout', '@xout')
             if graph[srccompname].get('@bout'):
                 link = graph[srccompname]['@bout']['link']
                 link.disconnect(srcvarname,'.'.join([srccompname,srcvarname]))
                 if len(link) == 0:
-                    self._graph.remove_edge(srccompname, '@bout')
+                    self._remove_link(srccompname, '@bout')
         else:
             link = self.get_link(srccompname, destcompname)
             if link:
                 link.disconnect(srcvarname, destvarname)
                 if len(link) == 0:
-                    self._graph.remove_edge(srccompname, destcompname)
+                    self._remove_link(srccompname, destcompname)
+                    self._log_change('-', srccompname, destcompname)
         
         try:
             del self._allsrcs[destpath]
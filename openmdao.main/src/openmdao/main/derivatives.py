@@ -1,13 +1,20 @@
 """ Class definition for Derivatives.
 This object is used by Component to store derivative information and to
 perform calculations during a Fake Finite Difference.
+
+First derivatives can also be declared between array inputs and outputs. Each
+one is stored as a 2D block (a numpy array or a scipy.sparse matrix) whose rows
+are the flattened output and whose columns are the flattened input.
 """
 
 #public symbols
 __all__ = ['Derivatives', 'derivative_name']
 
-def _check_var(comp, var_name, iotype):
-    """ Checks a variable to make sure it's the proper type and iotype."""
+from openmdao.main.numpy_fallback import array, ndarray, zeros
+
+def _check_var(comp, var_name, iotype, allow_arrays=False):
+    """ Checks a variable to make sure it's the proper type and iotype.
+    Returns the size of the variable, which is 1 for a float."""
     
     if iotype == 'input':
         conns = comp.list_inputs()
@@ -22,11 +29,14 @@ def _check_var(comp, var_name, iotype):
         raise RuntimeError(msg)
     
     value = comp.get(var_name)
+    if allow_arrays and isinstance(value, ndarray) and value.dtype.kind == 'f':
+        return value.size
     if not isinstance(value, float):
         msg = 'At present, derivatives can only be declared for float-' + \
               'valued variables. Variable %s ' % var_name + \
               'is of type %s.' % type(var_name)
         raise RuntimeError(msg)
+    return 1
 
     
 def derivative_name(input_name, output_name):
@@ -56,6 +66,9 @@ class Derivatives(object):
         self.first_derivatives = {}
         self.second_derivatives = {}
         
+        # Shapes of the declared array blocks, keyed by (out_name, in_name).
+        self._block_shapes = {}
+        
         # Baseline variables are saved in a dict.
         self.inputs = {}
         self.outputs = {}
@@ -67,7 +80,8 @@ class Derivatives(object):
 
     def declare_first_derivative(self, out_name, in_name):
         """ Declares that a component can calculate a first derivative
-        between the given input and output.
+        between the given input and output. If either of them is an array,
+        the derivative is a block of shape (output size, input size).
         
         out_name: str
             Name of component's output variable.
@@ -76,13 +90,20 @@ class Derivatives(object):
             Name of component's first input variable for derivative.
         """
         
-        _check_var(self.parent, in_name, "input")
-        _check_var(self.parent, out_name, "output")
+        in_size = _check_var(self.parent, in_name, "input", True)
+        out_size = _check_var(self.parent, out_name, "output", True)
         
         if out_name not in self.first_derivatives:
             self.first_derivatives[out_name] = {}
             
-        self.first_derivatives[out_name][in_name] = 0.0
+        if isinstance(self.parent.get(in_name), ndarray) or \
+           isinstance(self.parent.get(out_name), ndarray):
+            self.first_derivatives[out_name][in_name] = \
+                zeros((out_size, in_size))
+            self._block_shapes[(out_name, in_name)] = (out_size, in_size)
+        else:
+            self.first_derivatives[out_name][in_name] = 0.0
+            self._block_shapes.pop((out_name, in_name), None)
         
         if in_name not in self.in_names:
             self.in_names.append(in_name)
@@ -93,7 +114,8 @@ class Derivatives(object):
             
     def set_first_derivative(self, out_name, in_name, value):
         """
-        Stores a single first derivative value.
+        Stores a single first derivative value, or a block of them if the
+        input or output is an array.
         
         out_name: str
             Name of component's output variable.
@@ -101,20 +123,29 @@ class Derivatives(object):
         in_name: str
             Name of component's input variable.
             
-        value: float
-            Value of derivative.
+        value: float, or 2D numpy array or scipy.sparse matrix
+            Value of derivative. A block must have a row for each element
+            of the (flattened) output and a column for each element of the
+            (flattened) input.
         """
         
         try:
             if in_name not in self.first_derivatives[out_name]:
                 raise KeyError()
-            self.first_derivatives[out_name][in_name] = value
         except KeyError:
             msg = "Derivative of %s " % out_name + \
                   "with repect to %s " % in_name + \
                   "must be declared before being set."
             raise KeyError(msg)
         
+        shape = self._block_shapes.get((out_name, in_name))
+        if shape is not None and getattr(value, 'shape', None) != shape:
+            msg = "Derivative of %s " % out_name + \
+                  "with repect to %s " % in_name + \
+                  "must have shape %s." % (shape,)
+            raise ValueError(msg)
+        self.first_derivatives[out_name][in_name] = value
+        
 
     def declare_second_derivative(self, out_name, in_name1, in_name2):
         """ Declares that a component can calculate a second derivative
@@ -201,35 +232,72 @@ class Derivatives(object):
         have been specified.
         """
         
+        # Arrays are copied, because they may be modified in place.
         for name in self.in_names:
-            self.inputs[name] = self.parent.get(name)
+            value = self.parent.get(name)
+            if isinstance(value, ndarray):
+                value = value.copy()
+            self.inputs[name] = value
 
         for name in self.out_names:
-            self.outputs[name] = self.parent.get(name)
+            value = self.parent.get(name)
+            if isinstance(value, ndarray):
+                value = value.copy()
+            self.outputs[name] = value
 
+            
+    def input_deltas(self):
+        """Returns a dict containing the difference between the current value
+        of each input and its baseline value. Array differences are
+        flattened.
+        """
+        
+        deltas = {}
+        for name in self.in_names:
+            delta = self.parent.get(name) - self.inputs[name]
+            if isinstance(delta, ndarray):
+                delta = delta.ravel()
+            deltas[name] = delta
+        return deltas
+        
 
-    def calculate_output(self, out_name, order):
+    def calculate_output(self, out_name, order, deltas=None):
         """Returns the Fake Finite Difference output for the given output
         name using the stored baseline and derivatives along with the
         new inputs in the component.
+        
+        deltas: dict
+            Changes in the inputs, as returned by input_deltas. They are
+            computed here if not given.
         """
         
+        if deltas is None:
+            deltas = self.input_deltas()
+        
         y = self.outputs[out_name]
             
         # First order derivatives
         if order == 1:
             
             for in_name, dx in self.first_derivatives[out_name].iteritems():
-                y += dx*(self.parent.get(in_name) - self.inputs[in_name])
+                delta = deltas[in_name]
+                if hasattr(dx, 'shape'):
+                    if not isinstance(delta, ndarray):
+                        delta = array([delta])
+                    dy = dx.dot(delta)
+                    if isinstance(y, ndarray):
+                        y = y + dy.reshape(y.shape)
+                    else:
+                        y = y + dy[0]
+                else:
+                    y = y + dx*delta
         
         # Second order derivatives
         elif order == 2:
             
             for in_name1, item in self.second_derivatives[out_name].iteritems():
                 for in_name2, dx in item.iteritems():
-                    y += 0.5*dx* \
-                      (self.parent.get(in_name1) - self.inputs[in_name1])* \
-                      (self.parent.get(in_name2) - self.inputs[in_name2])
+                    y += 0.5*dx*deltas[in_name1]*deltas[in_name2]
         
         else:
             msg = 'Fake Finite Difference does not currently support an ' + \
@@ -51,6 +51,51 @@ else:
 
 _Missing = object()
 
+# This is incremented whenever objects are added to or removed from a
+# Container, so that an ExprEvaluator can tell when the objects it has bound
+# its variable references to may no longer be the right ones.
+_config_gen = 0
+
+def _config_changed():
+    """Notify all ExprEvaluators that the structure of some Container
+    hierarchy may have changed.
+    """
+    global _config_gen
+    _config_gen += 1
+
+def _make_accessor(scope, path, getter):
+    """Return a function of the form f(index=None) that returns the same
+    thing as getattr(scope, getter)(path, index) would. The lookup of the
+    Container that owns the variable is done here, once, rather than each
+    time the function is called.
+    """
+    from openmdao.main.container import Container
+    
+    owner = scope
+    parts = path.split('.')
+    for i, name in enumerate(parts[:-1]):
+        obj = getattr(owner, name, _Missing)
+        if not isinstance(obj, Container):
+            # let the generic lookup deal with this
+            rest = '.'.join(parts[i:])
+            break
+        owner = obj
+    else:
+        rest = parts[-1]
+        
+    get = getattr(owner, getter)
+    if getter != 'get' or '.' in rest:
+        return lambda index=None: get(rest, index)
+    
+    def accessor(index=None):
+        if index is None:
+            try:
+                return getattr(owner, rest)
+            except AttributeError:
+                pass # get() will raise the proper exception
+        return get(rest, index)
+    return accessor
+
 class ExprTransformer(ast.NodeTransformer):
     """Transforms dotted name references, e.g., abc.d.g in an expression AST
     into scope.get('abc.d.g') and turns assignments into the appropriate
@@ -58,10 +103,15 @@ class ExprTransformer(ast.NodeTransformer):
     accesses into a form that can be passed to a downstream object and
     executed there. For example, abc.d[xyz](1, pdq-10).value would translate
     to, e.g., scope.get('abc.d', [(0,xyz), (0,[1,pdq-10]), (1,'value')]).
+    
+    If an *accessors* dict is supplied, references are instead translated
+    into calls to local functions, e.g., _a0_([(0,xyz)]), and the name of
+    the function for each referenced variable is stored in the dict.
     """
-    def __init__(self, expreval, rhs=None, getter='get'):
+    def __init__(self, expreval, rhs=None, getter='get', accessors=None):
         self.expreval = expreval
         self.rhs = rhs
+        self.accessors = accessors
         self._stack = []  # use this to see if we're inside of parens or brackets so
                           # that we always translate to 'get' even if we're on the lhs
         self.getter = getter
@@ -102,6 +152,13 @@ class ExprTransformer(ast.NodeTransformer):
                                                     lineno=node.lineno,
                                                     col_offset=1,
                                                     ctx=ast.Load()))]
+        elif self.accessors is not None:
+            fname = self.accessors.get(name)
+            if fname is None:
+                fname = self.accessors[name] = '_a%d_' % len(self.accessors)
+            args = [ast.List(elts=subs, ctx=ast.Load())] if subs else []
+            return ast.copy_location(ast.Call(func=ast.Name(id=fname, ctx=ast.Load()),
+                                              args=args, keywords=[]), node)
         else:
             fname = self.getter
             keywords = []
@@ -363,6 +420,26 @@ class ExprExaminer(ast.NodeVisitor):
         super(ExprExaminer, self).generic_visit(node)
     
 
+class _RefReplacer(ast.NodeTransformer):
+    """Replaces each reference to the given variable (which may include
+    array indices) in an expression AST with a reference to a local name.
+    """
+    def __init__(self, ref, name):
+        super(_RefReplacer, self).__init__()
+        self.ref = ref
+        self.name = name
+        
+    def _replace(self, node):
+        ep = ExprPrinter()
+        ep.visit(node)
+        if ep.get_text() == self.ref:
+            return ast.copy_location(ast.Name(id=self.name, ctx=ast.Load()), 
+                                     node)
+        return self.generic_visit(node)
+    
+    visit_Name = visit_Attribute = visit_Subscript = _replace
+    
+
 class ExprEvaluator(object):
     """A class that translates an expression string into a new string
     containing any necessary framework access functions, e.g., set, get. The
@@ -377,6 +454,10 @@ class ExprEvaluator(object):
     
     def __init__(self, text, scope=None, getter='get'):
         self._scope = None
+        self._func = None
+        self._func_gen = -1
+        self._grad_funcs = None
+        self._grad_gen = -1
         self.scope = scope
         self.text = text
         self.getter = getter
@@ -389,8 +470,8 @@ class ExprEvaluator(object):
     
     @text.setter
     def text(self, value):
-        self._code = self._assignment_code = None
-        self._examiner = self.cached_grad_eq = None
+        self._code = self._assignment_code = self._func = None
+        self._examiner = self.cached_grad_eq = self._grad_funcs = None
         self._text = value
 
     @property
@@ -406,8 +487,8 @@ class ExprEvaluator(object):
     @scope.setter
     def scope(self, value):
         if value is not self.scope:
-            self._code = self._assignment_code = None
-            self._examiner = self.cached_grad_eq = None
+            self._code = self._assignment_code = self._func = None
+            self._examiner = self.cached_grad_eq = self._grad_funcs = None
             if value is not None:
                 self._scope = weakref.ref(value)
             else:
@@ -440,6 +521,8 @@ class ExprEvaluator(object):
         # remove weakref to scope because it won't pickle
         state['_scope'] = self.scope
         state['_code'] = None  # <type 'code'> won't pickle either.
+        state['_func'] = None
+        state['_grad_funcs'] = None
         if state.get('_assignment_code'):
             state['_assignment_code'] = None # more unpicklable <type 'code'>
         return state
@@ -459,7 +542,8 @@ class ExprEvaluator(object):
         global _expr_dict
         if hasattr(self.scope, name):
             return False
-        if hasattr(__builtin__, name) or name=='_local_setter_':
+        if hasattr(__builtin__, name) or name in ('_local_setter_',
+                                                  '_local_fd_'):
             return True
         parts = name.split('.')
         obj = _expr_dict.get(parts[0], _Missing)
@@ -500,6 +584,32 @@ class ExprEvaluator(object):
         code = compile(assign_ast,'<string>','exec')
         return (assign_ast, code)
     
+    def _parse_func(self, scope, root=None, argnames=()):
+        """Return a function that evaluates our expression in the given
+        scope, with each variable reference bound to an accessor function
+        for that variable, or None if our expression isn't a simple expression.
+        If *root* is given, it's the AST of the expression to compile instead
+        of our own, and *argnames* are the names of any local names in it
+        that become arguments of the function.
+        """
+        if root is None:
+            root = self._pre_parse()
+        if not isinstance(root, ast.Expression):
+            return None
+        accessors = {}
+        new_ast = ExprTransformer(self, getter=self.getter, 
+                                  accessors=accessors).visit(root)
+        args = ast.arguments(args=[ast.Name(id=name, ctx=ast.Param())
+                                   for name in argnames],
+                             vararg=None, kwarg=None, defaults=[])
+        func_ast = ast.Expression(body=ast.Lambda(args=args, body=new_ast.body))
+        ast.fix_missing_locations(func_ast)
+        
+        namespace = _expr_dict.copy()
+        for path, fname in accessors.items():
+            namespace[fname] = _make_accessor(scope, path, self.getter)
+        return eval(compile(func_ast, '<string>', 'eval'), namespace)
+    
     def _parse(self):
         self.var_names = set()
         try:
@@ -518,12 +628,24 @@ class ExprEvaluator(object):
     def evaluate(self, scope=None):
         """Return the value of the scoped string, evaluated 
         using the eval() function.
+        
+        The Containers that own the variables referenced by the expression
+        are looked up the first time it's evaluated in a given scope, and
+        the expression is compiled into a function that accesses them
+        directly. The lookups are repeated only after objects have been added
+        to or removed from a Container.
         """
         global _expr_dict
         scope = self._get_updated_scope(scope)
         try:
             if self._code is None:
                 self._parse()
+            if scope is not None:
+                if self._func is None or self._func_gen != _config_gen:
+                    self._func_gen = _config_gen
+                    self._func = self._parse_func(scope) or False
+                if self._func:
+                    return self._func()
             return eval(self._code, _expr_dict, locals())
         except Exception, err:
             raise type(err)("can't evaluate expression "+
@@ -544,8 +666,11 @@ class ExprEvaluator(object):
     
     def evaluate_gradient(self, stepsize=1.0e-6, wrt=None, scope=None):
         """Return a dict containing the gradient of the expression with respect to 
-        each of the referenced varpaths. The gradient is calculated by 1st order central
-        difference for now. 
+        each of the referenced varpaths. The gradient is calculated
+        symbolically if possible, otherwise by 1st order central difference.
+        Either way, the expression for each derivative is compiled into a
+        function of bound variable accessors the first time it's needed, so
+        later calls don't reparse anything (see *evaluate*).
         
         stepsize: float
             Step size for finite difference.
@@ -553,8 +678,6 @@ class ExprEvaluator(object):
         wrt: list of varpaths
             Varpaths for which we want to calculate the gradient.
         """
-        global _expr_dict
-        
         scope = self._get_updated_scope(scope)
         inputs = list(self.refs(copy=False))
 
@@ -566,6 +689,9 @@ class ExprEvaluator(object):
         gradient = {}
         if self.cached_grad_eq is None:
             self.cached_grad_eq = {}
+        if self._grad_funcs is None or self._grad_gen != _config_gen:
+            self._grad_gen = _config_gen
+            self._grad_funcs = {}
 
         for var in wrt:
 
@@ -583,68 +709,57 @@ class ExprEvaluator(object):
                 continue
             
             # First time, try to differentiate symbolically
-            if (var not in self.cached_grad_eq) or self._code is None:
+            if var not in self.cached_grad_eq:
                 
                 #Take symbolic gradient of all inputs using sympy
                 try:
                     for varname, expression in zip(inputs, SymGrad(self.text, inputs)):
                         self.cached_grad_eq[varname] = expression
 
-                except SymbolicDerivativeError, NameError:
-                    self.cached_grad_eq[var] = False
+                except (SymbolicDerivativeError, NameError):
+                    for varname in inputs:
+                        self.cached_grad_eq[varname] = False
 
-            # If we have a cached gradient expression:
-            if self.cached_grad_eq[var]:
-                
-                # This is not the way I wanted to do it, but I didn't want
-                # to mess with everything that's is in self._parse
-                grad_text = self.cached_grad_eq[var]
-                for name in inputs:
-                    if '[' in name:
-                        new_expr = ExprEvaluator(name, scope)
-                        replace_val = new_expr.evaluate()
-                    else:
-                        replace_val = scope.get(name)
-                    grad_text = grad_text.replace(name, str(replace_val))
-                
-                grad_root = ast.parse(grad_text, mode='eval')
-                grad_code = compile(grad_root, '<string>', 'eval')
-                gradient[var] = eval(grad_code, _expr_dict, locals())
-                
-            # Otherwise resort to finite difference (1st order central)
-            else:
-                # Always need to assemble list of constant inputs, for
-                # replacement in the gradient expression text
-                var_dict = {}
-                grad_text = self.text
-                for name in inputs:
-                    if '[' in name:
-                        new_expr = ExprEvaluator(name, scope)
-                        replace_val = new_expr.evaluate()
-                    else:
-                        replace_val = scope.get(name)
-                        
-                    if name==var:
-                        var_dict[name] = replace_val
-                        new_name = "var_dict['%s']" % name
-                        grad_text = grad_text.replace(name, new_name)
-                    else:
-                        # If we don't need derivative of a var, replace with its value
-                        grad_text = grad_text.replace(name, str(replace_val))
-
-                grad_root = ast.parse(grad_text, mode='eval')
-                grad_code = compile(grad_root, '<string>', 'eval')
-
-                # Finite difference (Central difference)
-                var_dict[var] += 0.5*stepsize
-                yp = eval(grad_code, _expr_dict, locals())
-                var_dict[var] -= stepsize
-                ym = eval(grad_code, _expr_dict, locals())
+            funcs = self._grad_funcs.get(var)
+            if funcs is None:
+                funcs = self._grad_funcs[var] = self._parse_grad_func(scope, var)
+            func, getval = funcs
+            
+            try:
+                # If we have a cached gradient expression:
+                if self.cached_grad_eq[var]:
+                    gradient[var] = func()
                     
-                gradient[var] = (yp-ym)/stepsize
+                # Otherwise resort to finite difference (1st order central)
+                else:
+                    value = getval()
+                    yp = func(value + 0.5*stepsize)
+                    ym = func(value - 0.5*stepsize)
+                    gradient[var] = (yp-ym)/stepsize
+            except Exception, err:
+                raise type(err)("can't evaluate gradient of expression "+
+                                "'%s': %s" %(self.text,str(err)))
                 
         return gradient
     
+    def _parse_grad_func(self, scope, var):
+        """Return a tuple of the form (func, getval) for taking the derivative
+        of our expression with respect to *var* in the given scope. If there's
+        a symbolic derivative, func() returns its value and getval is None.
+        Otherwise func(val) evaluates our expression with *var* replaced by
+        val, and getval() returns the current value of *var*.
+        """
+        grad_text = self.cached_grad_eq[var]
+        if grad_text:
+            return (self._parse_func(scope, ast.parse(grad_text, mode='eval')),
+                    None)
+        
+        root = _RefReplacer(var, '_local_fd_').visit(self._pre_parse())
+        func = self._parse_func(scope, root, argnames=['_local_fd_'])
+        if func is None:
+            raise SyntaxError("can't take derivative of '%s'" % self.text)
+        return (func, self._parse_func(scope, ast.parse(var, mode='eval')))
+    
     def set(self, val, scope=None, src=None):
         """Set the value of the referenced object to the specified value."""
         global _expr_dict
@@ -54,8 +54,16 @@ class Constraint(object):
     def evaluate(self, scope):
         """Returns a tuple of the form (lhs, rhs, comparator, is_violated)."""
         
-        lhs = (self.lhs.evaluate(scope) + self.adder)*self.scaler
-        rhs = (self.rhs.evaluate(scope) + self.adder)*self.scaler
+        return self.evaluate_values(self.lhs.evaluate(scope),
+                                    self.rhs.evaluate(scope))
+        
+    def evaluate_values(self, lhs, rhs):
+        """Returns a tuple of the form (lhs, rhs, comparator, is_violated)
+        for the given unscaled values of the two sides, e.g., values that
+        were evaluated on a remote server."""
+        
+        lhs = (lhs + self.adder)*self.scaler
+        rhs = (rhs + self.adder)*self.scaler
         return (lhs, rhs, self.comparator, not _ops[self.comparator](lhs, rhs))
         
     def evaluate_gradient(self, scope, stepsize=1.0e-6, wrt=None):
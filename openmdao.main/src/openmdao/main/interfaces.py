@@ -521,7 +521,20 @@ class ISurrogate(Interface):
             Training case output history for this surrogate's output,
             which corresponds to the training case input history given by X.
         """
-    
+
+class IIncrementalSurrogate(ISurrogate):
+
+    def add_training_points(X, Y):
+        """Adds new points to the training data of a trained surrogate model
+        and updates the model, without starting over from the full data set.
+
+        X: iterator of lists
+            Input values of the new training cases.
+        Y: iterator
+            Output values of the new training cases for this surrogate's
+            output, which correspond to the inputs given by X.
+        """
+
 class IHasParameters(Interface):
     
     def add_parameter(param_name,low=None,high=None):
@@ -0,0 +1,133 @@
+""" ParallelDataflow class definition """
+
+import sys
+import threading
+import Queue
+from multiprocessing import cpu_count
+
+from openmdao.main.dataflow import Dataflow
+from openmdao.main.exceptions import RunStopped
+from openmdao.main.rbac import get_credentials, set_credentials
+
+__all__ = ['ParallelDataflow']
+
+
+class ParallelDataflow(Dataflow):
+    """
+    A Dataflow that runs independent components concurrently.
+
+    Each component is started as soon as all of the components it depends
+    on in the collapsed dependency graph have finished, using up to
+    *max_workers* threads. Only real dependencies are used, so components
+    that aren't connected to each other are free to run at the same time
+    rather than in sequence order as they would in a Dataflow. Because the
+    components share our scope, they run in threads of this process, which
+    pays off when they spend their time in external codes or in extension
+    modules that release the GIL.
+
+    A component that has a *directory* changes the working directory of the
+    process while it runs, and a component with inputs connected to
+    components outside of this workflow may cause those components to
+    run, so either kind of component is run by itself.
+    """
+
+    def __init__(self, parent=None, scope=None, members=None, max_workers=None):
+        """ Create an empty flow.
+
+        max_workers: int (optional)
+            Maximum number of components to run at once. Defaults to the
+            number of CPUs.
+        """
+        super(ParallelDataflow, self).__init__(parent, scope, members)
+        if max_workers is None:
+            max_workers = cpu_count()
+        self.max_workers = max_workers
+
+    def _get_schedule(self):
+        """Return a tuple of the form (order, npreds, succs, exclusive), where
+        order is our topological ordering, npreds is a dict containing the
+        number of predecessors of each component, succs is a dict containing
+        a list of successors of each component, and exclusive is the set of
+        names of components that must run by themselves.
+        """
+        order = self._get_topsort()
+        graph, external = self._get_dependency_graph()
+        npreds = dict([(name, graph.in_degree(name)) for name in order])
+        succs = dict([(name, graph.successors(name)) for name in order])
+
+        scope = self.scope
+        exclusive = set(external)
+        for name in order:
+            if getattr(scope, name).directory:
+                exclusive.add(name)
+        return (order, npreds, succs, exclusive)
+
+    def run(self, ffd_order=0, case_id=''):
+        """ Run the Components in this Workflow. """
+        if self.max_workers <= 1:
+            return super(ParallelDataflow, self).run(ffd_order, case_id)
+
+        self._stop = False
+        self._exec_count += 1
+        self._comp_count = 0
+        iterbase = self._iterbase(case_id)
+
+        order, npreds, succs, exclusive = self._get_schedule()
+        position = dict([(name,i) for i,name in enumerate(order)])
+        scope = self.scope
+        comps = dict([(name, getattr(scope, name)) for name in order])
+
+        credentials = get_credentials()
+        done = Queue.Queue()
+
+        def _run_comp(name):
+            set_credentials(credentials)
+            try:
+                comps[name].run(ffd_order=ffd_order, case_id=case_id)
+            except Exception:
+                done.put((name, sys.exc_info()))
+            else:
+                done.put((name, None))
+
+        ready = [name for name in order if npreds[name] == 0]
+        running = set()
+        error = None
+        while ready or running:
+            # start as many ready components as we can, in dataflow order
+            while ready and error is None and not self._stop:
+                name = ready[0]
+                if running & exclusive:
+                    break
+                if name in exclusive:
+                    if running:
+                        break
+                elif len(running) >= self.max_workers:
+                    break
+                ready.pop(0)
+                running.add(name)
+                comps[name].set_itername('%s-%d' % (iterbase, position[name]+1))
+                thread = threading.Thread(target=_run_comp, args=(name,),
+                                          name='%s-%s' % (threading.current_thread().name, name))
+                thread.daemon = True
+                thread.start()
+
+            if not running:
+                break
+
+            name, exc_info = done.get()
+            running.remove(name)
+            self._comp_count += 1
+            if exc_info is not None:
+                if error is None:
+                    error = exc_info
+                continue
+            for succ in succs[name]:
+                npreds[succ] -= 1
+                if npreds[succ] == 0:
+                    ready.append(succ)
+            ready.sort(key=position.get)
+
+        if error is not None:
+            raise error[0], error[1], error[2]
+        if self._stop:
+            raise RunStopped('Stop requested')
@@ -0,0 +1,87 @@
+"""
+Measure the cost of a configuration change (a single new connection) on the
+ordering of a Dataflow as a function of model size.
+
+For each model size, a chain of components is built and ordered once. Then
+a number of extra connections are made one at a time, and the time to bring
+the workflow's ordering up to date after each one is measured, both with the
+incremental update and with a full rebuild of the collapsed graph. The time
+spent making the connection itself is not included.
+"""
+
+import sys
+import time
+
+from openmdao.main.api import Assembly, Component, set_as_top
+from openmdao.lib.datatypes.api import Float
+
+
+class Simple(Component):
+    """ Component with two inputs and two outputs. """
+
+    a = Float(iotype='in')
+    b = Float(iotype='in')
+    c = Float(iotype='out')
+    d = Float(iotype='out')
+
+    def execute(self):
+        self.c = self.a + self.b
+        self.d = self.a - self.b
+
+
+def build_model(size):
+    """ Return a top Assembly containing a chain of `size` components. """
+    top = set_as_top(Assembly())
+    names = ['comp%d' % i for i in range(size)]
+    for name in names:
+        top.add(name, Simple())
+    top.driver.workflow.add(names)
+    for i in range(size-1):
+        top.connect('comp%d.c' % i, 'comp%d.a' % (i+1))
+    top.driver.workflow._get_topsort()
+    return top
+
+
+def run_test(size, nconns=20):
+    """ Return average (incremental, rebuild) times for one new connection. """
+    top = build_model(size)
+    wflow = top.driver.workflow
+    step = max(1, (size-1) // nconns)
+
+    incremental = 0.
+    count = 0
+    for i in range(0, size-step, step):
+        top.connect('comp%d.d' % i, 'comp%d.b' % (i+step))
+        start = time.time()
+        wflow._get_topsort()
+        incremental += time.time() - start
+        count += 1
+    incremental /= count
+
+    for i in range(0, size-step, step):
+        top.disconnect('comp%d.d' % i, 'comp%d.b' % (i+step))
+    wflow._get_topsort()
+
+    rebuild = 0.
+    for i in range(0, size-step, step):
+        top.connect('comp%d.d' % i, 'comp%d.b' % (i+step))
+        start = time.time()
+        wflow._reset()
+        wflow._get_topsort()
+        rebuild += time.time() - start
+    rebuild /= count
+
+    return (incremental, rebuild)
+
+
+def main():
+    """ Run the tests for increasing model sizes. """
+    sizes = [int(arg) for arg in sys.argv[1:]] or [50, 100, 200, 400, 800]
+    print '%8s %15s %15s' % ('comps', 'incremental', 'rebuild')
+    for size in sizes:
+        incremental, rebuild = run_test(size)
+        print '%8d %15.6f %15.6f' % (size, incremental, rebuild)
+
+
+if __name__ == '__main__':
+    main()
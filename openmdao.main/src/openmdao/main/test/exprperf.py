@@ -0,0 +1,101 @@
+"""
+Measure the time needed to evaluate some typical parameter, objective and
+constraint expressions with ExprEvaluator, both with the bound accessor
+functions that ExprEvaluator.evaluate uses and with the translated
+scope.get() form of the expression, and the time needed to evaluate their
+gradients.
+"""
+
+import sys
+import time
+
+from openmdao.main.api import Assembly, Component, set_as_top
+from openmdao.main.expreval import ExprEvaluator, _expr_dict
+from openmdao.lib.datatypes.api import Float, Array
+
+from numpy import array
+
+
+class Sub(Component):
+    """ Component with a scalar and an array output. """
+
+    x = Float(1.5, iotype='out')
+    y = Array(array([1., 2., 3.]), iotype='out')
+
+
+class Top(Assembly):
+    """ Assembly with nested components. """
+
+    def configure(self):
+        self.add('comp', Assembly())
+        self.comp.add('sub', Sub())
+        self.add('sub', Sub())
+
+
+EXPRS = [
+    'sub.x',
+    'comp.sub.x',
+    'sub.y[1]',
+    '2.*sub.x**2 - comp.sub.y[2]',
+    'sin(sub.x) + 3.*comp.sub.x*sub.y[0] > 1.',
+]
+
+GRAD_EXPRS = [
+    '2.*sub.x**2 - comp.sub.y[2]',
+    'sin(sub.x) + 3.*comp.sub.x*sub.y[0]',
+    'abs(sub.x)*comp.sub.y[2]',  # finite difference
+]
+
+
+def run_test(text, count):
+    """ Return (bound, get) times for `count` evaluations of `text`. """
+    top = set_as_top(Top())
+    expr = ExprEvaluator(text, top)
+    value = expr.evaluate()
+
+    start = time.time()
+    for i in xrange(count):
+        expr.evaluate()
+    bound = time.time() - start
+
+    code = expr._code
+    scope = top
+    start = time.time()
+    for i in xrange(count):
+        eval(code, _expr_dict, locals())
+    get = time.time() - start
+
+    assert eval(code, _expr_dict, locals()) == value
+    return (bound, get)
+
+
+def run_gradient(text, count):
+    """ Return time for `count` gradient evaluations of `text`. """
+    top = set_as_top(Top())
+    expr = ExprEvaluator(text, top)
+    expr.evaluate_gradient()
+
+    start = time.time()
+    for i in xrange(count):
+        expr.evaluate_gradient()
+    return time.time() - start
+
+
+def main():
+    """ Run the tests for each expression. """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print '%d evaluations' % count
+    print '%-45s %10s %10s %8s' % ('expression', 'bound', 'get', 'speedup')
+    for text in EXPRS:
+        bound, get = run_test(text, count)
+        print '%-45s %10.4f %10.4f %8.2f' % (text, bound, get, get/bound)
+
+    count //= 10
+    print
+    print '%d gradient evaluations' % count
+    for text in GRAD_EXPRS:
+        print '%-45s %10.4f' % (text, run_gradient(text, count))
+
+
+if __name__ == '__main__':
+    main()
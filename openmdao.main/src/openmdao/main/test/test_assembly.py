@@ -67,6 +67,21 @@ class SimpleListComp(Component):
         self.d = [a-b for a,b in zip(self.a, self.b)]
 
 
+class UnitsComp(Component):
+    
+    x = Float(iotype='in', units='inch', low=0.)
+    y = Float(iotype='out', units='ft')
+    arr_in = Array(iotype='in', units='m')
+    arr_out = Array(iotype='out', units='cm')
+    t_in = Float(iotype='in', units='degC')
+    t_out = Float(iotype='out', units='degF')
+    
+    def execute(self):
+        self.y = self.x
+        self.arr_out = self.arr_in
+        self.t_out = self.t_in
+
+
 class DummyComp(Component):
     
     r = Float(iotype='in')
@@ -895,6 +910,48 @@ subassy.comp3: ReRun.2-3.2-2.2-1"""
         self.assertEqual([c.name for c in asm.sub.driver.workflow],
                          ['newcomp2', 'newcomp3'])
         
+    def test_transfer_plan(self):
+        top = set_as_top(Assembly())
+        top.add('comp1', UnitsComp())
+        top.add('comp2', UnitsComp())
+        top.driver.workflow.add(['comp1', 'comp2'])
+        top.connect('comp1.y', 'comp2.x')
+        top.connect('comp1.arr_out', 'comp2.arr_in')
+        top.connect('comp1.t_out', 'comp2.t_in')
+        top.comp1.x = 2.
+        top.comp1.arr_in = [1., 2.]
+        top.comp1.t_in = 100.
+        top.run()
+        
+        # simple connections transfer directly, with any unit conversion
+        plan = top._transfer_plans['comp2']
+        self.assertTrue(plan['comp2.x'][3] is not None)
+        self.assertAlmostEqual(top.comp2.x, 24., 10)
+        self.assertAlmostEqual(top.comp2.arr_in[0], 0.01, 10)
+        self.assertAlmostEqual(top.comp2.arr_in[1], 0.02, 10)
+        self.assertAlmostEqual(top.comp2.t_in, (100.-32.)/1.8, 10)
+        top.comp2.arr_in[0] = 5.
+        self.assertEqual(list(top.comp1.arr_out), [1., 2.])
+        
+        # the plan is rebuilt when connections change
+        top.disconnect('comp1.y', 'comp2.x')
+        top.comp1.x = 0.
+        top.run()
+        top.connect('comp1.y*-2.', 'comp2.x')
+        self.assertEqual(top._transfer_plans, None)
+        top.run()
+        self.assertEqual(top._transfer_plans['comp2']['comp2.x'][3], None)
+        self.assertEqual(top.comp2.x, 0.)
+        
+        # values are still validated
+        top.comp1.x = 1.
+        try:
+            top.run()
+        except ValueError as err:
+            self.assertEqual(str(err), ": cannot set 'comp2.x' from 'comp1.y*-2.0': comp2 (1-2): Variable 'x' must be a float in the range [0.0, 1.79769313486e+308], but a value of -24.0 <type 'float'> was specified.")
+        else:
+            self.fail("ValueError expected")
+        
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,199 @@
+# pylint: disable-msg=C0111,C0103
+
+import unittest
+import random
+
+from openmdao.main.api import Assembly, Component, Driver, set_as_top
+from openmdao.main.dataflow import Dataflow
+from openmdao.main.hasparameters import HasParameters
+from openmdao.main.hasobjective import HasObjectives
+from openmdao.util.decorators import add_delegate
+from openmdao.lib.datatypes.api import Float
+
+
+class Simple(Component):
+    a = Float(iotype='in')
+    b = Float(iotype='in')
+    c = Float(iotype='out')
+    d = Float(iotype='out')
+
+    def execute(self):
+        self.c = self.a + self.b
+        self.d = self.a - self.b
+
+
+@add_delegate(HasParameters, HasObjectives)
+class DumbDriver(Driver):
+    pass
+
+
+def _check_order(test, wflow):
+    """Verify that the incrementally maintained ordering of wflow is a
+    valid ordering of a collapsed graph that is built from scratch.
+    """
+    order = wflow._get_topsort()
+    graph = wflow._get_collapsed_graph()
+    fresh = Dataflow(scope=wflow.scope)
+    fresh.add(wflow.get_names())
+    fresh_graph = fresh._get_collapsed_graph()
+    test.assertEqual(sorted(graph.nodes()), sorted(fresh_graph.nodes()))
+    test.assertEqual(sorted(graph.edges()), sorted(fresh_graph.edges()))
+    pos = dict([(n,i) for i,n in enumerate(order)])
+    test.assertEqual(len(pos), len(fresh_graph))
+    for u,v in fresh_graph.edges():
+        test.assertTrue(pos[u] < pos[v],
+                        "'%s' should come before '%s'" % (u, v))
+
+
+class DataflowTestCase(unittest.TestCase):
+
+    def setUp(self):
+        top = self.top = set_as_top(Assembly())
+        self.names = ['comp%d' % i for i in range(10)]
+        for name in self.names:
+            top.add(name, Simple())
+        top.driver.workflow.add(self.names)
+
+    def test_incremental_reorder(self):
+        top = self.top
+        wflow = top.driver.workflow
+        top.connect('comp0.c', 'comp1.a')
+        self.assertEqual(wflow._get_topsort()[0], 'comp0')
+        graph = wflow._collapsed_graph
+
+        # this edge goes against the current order, so some nodes
+        # must be moved, but the graph shouldn't be rebuilt
+        top.connect('comp9.c', 'comp0.a')
+        order = wflow._get_topsort()
+        self.assertTrue(wflow._collapsed_graph is graph)
+        self.assertTrue(order.index('comp9') < order.index('comp0'))
+        self.assertTrue(order.index('comp0') < order.index('comp1'))
+        _check_order(self, wflow)
+
+        top.disconnect('comp9.c', 'comp0.a')
+        wflow._get_topsort()
+        _check_order(self, wflow)
+
+    def test_random_connections(self):
+        top = self.top
+        wflow = top.driver.workflow
+        rand = random.Random(42)
+        rank = self.names[:]
+        rand.shuffle(rank)
+        conns = []
+        for i in range(len(rank)-1):
+            for j in range(i+1, len(rank)):
+                for src, dest in [('c', 'a'), ('d', 'b')]:
+                    conns.append(('%s.%s' % (rank[i], src),
+                                  '%s.%s' % (rank[j], dest)))
+        rand.shuffle(conns)
+        wflow._get_topsort()
+        graph = wflow._collapsed_graph
+        connected = set()
+        for src, dest in conns:
+            if dest in connected:
+                continue
+            connected.add(dest)
+            top.connect(src, dest)
+            _check_order(self, wflow)
+        self.assertTrue(wflow._collapsed_graph is graph)
+
+        for src, dest in conns[:20]:
+            if dest in connected:
+                connected.remove(dest)
+                top.disconnect(src, dest)
+        _check_order(self, wflow)
+        top.run()
+
+    def test_driver_collapse(self):
+        top = self.top
+        top.add('driver2', DumbDriver())
+        for name in self.names[3:6]:
+            top.driver.workflow.remove(name)
+        top.driver2.workflow.add(self.names[3:6])
+        top.driver.workflow.add('driver2')
+        wflow = top.driver.workflow
+
+        top.connect('comp8.c', 'comp4.a')
+        order = wflow._get_topsort()
+        self.assertTrue('comp4' not in order)
+        self.assertTrue(order.index('comp8') < order.index('driver2'))
+        _check_order(self, wflow)
+
+        top.connect('comp5.c', 'comp1.a')
+        order = wflow._get_topsort()
+        self.assertTrue(order.index('driver2') < order.index('comp1'))
+        _check_order(self, wflow)
+
+        # this would create a cycle between driver2 and comp1
+        top.connect('comp1.c', 'comp3.a')
+        try:
+            wflow._get_topsort()
+        except RuntimeError as err:
+            self.assertTrue(str(err).startswith(
+                ': circular dependency found between the following: '))
+        else:
+            self.fail("RuntimeError expected")
+        top.disconnect('comp1.c', 'comp3.a')
+        _check_order(self, wflow)
+
+    def test_dependency_graph(self):
+        top = self.top
+        top.add('driver2', DumbDriver())
+        for name in self.names[3:6]:
+            top.driver.workflow.remove(name)
+        top.driver2.workflow.add(self.names[3:6])
+        top.driver.workflow.add('driver2')
+        top.driver.workflow.remove('comp9')
+        wflow = top.driver.workflow
+
+        top.connect('comp0.c', 'comp1.a')
+        top.connect('comp8.c', 'comp4.a')
+        top.connect('comp9.c', 'comp2.a')
+        graph, external = wflow._get_dependency_graph()
+        self.assertEqual(sorted(graph.nodes()), sorted(wflow._get_topsort()))
+        # only the real dependencies, not the ones that keep unconnected
+        # components in sequence order
+        self.assertEqual(sorted(graph.edges()), 
+                         [('comp0', 'comp1'), ('comp8', 'driver2')])
+        self.assertEqual(external, {'comp2': set(['comp9'])})
+
+    def test_expr_depends(self):
+        top = self.top
+        top.add('driver2', DumbDriver())
+        top.driver2.workflow.add(self.names[3:6])
+        for name in self.names[3:6]:
+            top.driver.workflow.remove(name)
+        top.driver.workflow.add('driver2')
+        wflow = top.driver.workflow
+        top.connect('comp0.c', 'comp1.a')
+        wflow._get_topsort()
+
+        # adding a parameter doesn't change our depgraph, but it
+        # does change the collapsed graph
+        top.driver2.add_parameter('comp9.a', low=-1., high=1.)
+        top.connect('comp0.d', 'comp1.b')
+        order = wflow._get_topsort()
+        self.assertTrue(order.index('driver2') < order.index('comp9'))
+        _check_order(self, wflow)
+
+    def test_journal(self):
+        depgraph = self.top._depgraph
+        pos = depgraph.get_change_position()
+        self.top.connect('comp0.c', 'comp1.a')
+        self.top.connect('comp0.d', 'comp1.b')
+        self.top.connect('comp1.c', 'comp2.a')
+        self.top.disconnect('comp1.c', 'comp2.a')
+        newpos, changes = depgraph.get_changes(pos)
+        self.assertEqual(newpos, depgraph.get_change_position())
+        self.assertEqual(changes, [('+', 'comp0', 'comp1'),
+                                   ('+', 'comp1', 'comp2'),
+                                   ('-', 'comp1', 'comp2')])
+        self.top.remove('comp1')
+        newpos, changes = depgraph.get_changes(newpos)
+        self.assertEqual(changes, [('-', 'comp0', 'comp1'),
+                                   ('x', 'comp1', None)])
+
+
+if __name__ == "__main__":
+    unittest.main()
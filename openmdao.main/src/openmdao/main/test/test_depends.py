@@ -759,8 +759,73 @@ class ExprDependsTestCase(unittest.TestCase):
             self.assertEqual(str(err), "sub: Can't connect 'comp1.c' to 'comp4.a(5)': bad destination expression 'comp4.a(5)': not assignable")
         else:
             self.fail("Exception expected")
-                    
-                           
+
+
+class CountingComp(Simple):
+    def __init__(self):
+        self.invalidations = []
+        super(CountingComp, self).__init__()
+        
+    def invalidate_deps(self, varnames=None, force=False):
+        self.invalidations.append(sorted(varnames))
+        return super(CountingComp, self).invalidate_deps(varnames, force)
+    
+    
+class InvalidationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # a stack of diamonds: comp0 feeds comp1 and comp2, which both
+        # feed comp3, which feeds comp4 and comp5, and so on.
+        self.top = top = set_as_top(Assembly())
+        self.ndiamonds = 8
+        top.add('comp0', CountingComp())
+        for i in range(self.ndiamonds):
+            base = 3*i
+            for j in range(1, 4):
+                top.add('comp%d' % (base+j), CountingComp())
+            top.connect('comp%d.c' % base, 'comp%d.a' % (base+1))
+            top.connect('comp%d.d' % base, 'comp%d.a' % (base+2))
+            top.connect('comp%d.c' % (base+1), 'comp%d.a' % (base+3))
+            top.connect('comp%d.c' % (base+2), 'comp%d.b' % (base+3))
+        top.driver.workflow.add(['comp%d' % i for i in range(3*self.ndiamonds+1)])
+        top.run()
+        for i in range(3*self.ndiamonds+1):
+            getattr(top, 'comp%d' % i).invalidations = []
+            
+    def test_single_visit(self):
+        top = self.top
+        # force would follow every path through the diamonds if components
+        # were visited once per incoming edge
+        top.child_invalidated('comp0', None, force=True)
+        for i in range(1, 3*self.ndiamonds+1):
+            comp = getattr(top, 'comp%d' % i)
+            if i % 3:
+                self.assertEqual(comp.invalidations, [['a']])
+            else:
+                self.assertEqual(comp.invalidations, [['a', 'b']])
+            self.assertEqual(comp.get_valid(['c', 'd']), [False, False])
+        self.assertEqual(top.comp0.invalidations, [])
+        self.assertEqual(top.comp0.get_valid(['c', 'd']), [True, True])
+        
+        top.run()
+        comp = getattr(top, 'comp%d' % (3*self.ndiamonds))
+        self.assertEqual(comp.get_valid(['c']), [True])
+        
+    def test_partial(self):
+        top = self.top
+        top.comp2.b = 5.
+        self.assertEqual(top.comp2.invalidations, [['b']])
+        self.assertEqual(top.comp1.invalidations, [])
+        self.assertEqual(top.comp3.invalidations, [['b']])
+        self.assertEqual(top.comp4.invalidations, [['a']])
+        self.assertEqual(top.comp6.invalidations, [['a', 'b']])
+        
+        # nothing downstream of comp3 changes status, so no need to go on
+        top.comp1.b = 7.
+        self.assertEqual(top.comp1.invalidations, [['b']])
+        self.assertEqual(top.comp3.invalidations, [['b'], ['a']])
+        self.assertEqual(top.comp4.invalidations, [['a']])
+        
         
 if __name__ == "__main__":
     
@@ -209,6 +209,28 @@ class DepGraphTestCase(unittest.TestCase):
         self.assertEqual(set(link.get_dests('c')), set(['a']))
         self.assertEqual(link.get_dests('foo'), [])
         
+    def test_plan_reuse(self):
+        plan = self.dep._get_plan()
+        # a new connection on an existing edge keeps the plan
+        self.dep.connect('A.d', 'B.a2')
+        self.assertTrue(self.dep._get_plan() is plan)
+        names, index, succs = plan
+        link = self.dep.get_link('A', 'B')
+        self.assertTrue((index['B'], link) in succs[index['A']])
+        self.assertEqual(set(link.get_dests(['d'])), set(['a2']))
+        self.dep.disconnect('A.d', 'B.a2')
+        self.assertTrue(self.dep._get_plan() is plan)
+        
+        # adding or removing an edge rebuilds it
+        self.dep.connect('A.d', 'C.a')
+        plan = self.dep._get_plan()
+        names, index, succs = plan
+        self.assertTrue(index['C'] in [dest for dest,link in succs[index['A']]])
+        self.dep.disconnect('A.d', 'C.a')
+        self.assertFalse(self.dep._get_plan() is plan)
+        names, index, succs = self.dep._get_plan()
+        self.assertFalse(index['C'] in [dest for dest,link in succs[index['A']]])
+        
     def test_find_all_connecting(self):
         dep = DependencyGraph()
         for node in ['A','B','C','D','E','F']:
@@ -4,10 +4,13 @@ Test of the derivatives capability.
 
 import unittest
 
+import numpy
+
 # pylint: disable-msg=E0611,F0401
 from openmdao.main.api import Component, Assembly, ComponentWithDerivatives, \
                               SequentialWorkflow, DriverUsesDerivatives, set_as_top
-from openmdao.lib.datatypes.api import Float, Int
+from openmdao.lib.datatypes.api import Array, Float, Int
+from openmdao.main.numpy_fallback import array, zeros
 from openmdao.util.testutil import assert_rel_error
 from openmdao.main.hasparameters import HasParameters
 from openmdao.main.hasobjective import HasObjective
@@ -71,6 +74,42 @@ class Paraboloid_Derivative(ComponentWithDerivatives):
         self.derivatives.set_second_derivative('f_xy', 'x', 'y', df_dxdy)
         self.derivatives.set_second_derivative('f_xy', 'y', 'y', df_dydy)
 
+class ArrayComp(ComponentWithDerivatives):
+    """ Evaluates y = A*x + b*u, f = sum(x) """
+    
+    x = Array(zeros(3), iotype='in')
+    u = Float(0.0, iotype='in')
+    y = Array(zeros(2), iotype='out')
+    f = Float(iotype='out')
+    
+    A = array([[1.0, 2.0, 0.0], [0.0, 3.0, 4.0]])
+    b = array([[5.0], [6.0]])
+    
+    def __init__(self):
+        """ declare what derivatives that we can provide"""
+        
+        super(ArrayComp, self).__init__()
+        
+        self.derivatives.declare_first_derivative('y', 'x')
+        self.derivatives.declare_first_derivative('y', 'u')
+        self.derivatives.declare_first_derivative('f', 'x')
+        self.ran_real = False
+        
+    def execute(self):
+        """ Executes it """
+        
+        self.y = self.A.dot(self.x) + self.b[:, 0]*self.u
+        self.f = self.x.sum()
+        self.ran_real = True
+        
+    def calculate_first_derivatives(self):
+        """Analytical first derivatives"""
+        
+        self.derivatives.set_first_derivative('y', 'x', self.A)
+        self.derivatives.set_first_derivative('y', 'u', self.b)
+        self.derivatives.set_first_derivative('f', 'x', array([[1.0, 1.0, 1.0]]))
+
+
 class SimpleAssembly(Assembly):
     """ Simple assembly"""
     
@@ -387,6 +426,52 @@ class DerivativesTestCase(unittest.TestCase):
         else:
             self.fail('NotImplementedError expected')
         
+    def test_array_blocks(self):
+        
+        comp = ArrayComp()
+        comp.x = array([1.0, 2.0, 3.0])
+        comp.u = 1.0
+        comp.run()
+        comp.ran_real = False
+        comp.calc_derivatives(first=True)
+        self.assertEqual(comp.derivatives.first_derivatives['y']['x'].shape,
+                         (2, 3))
+        
+        # FFD is exact for a linear component, even with in-place changes.
+        comp.x[1] += 1.0
+        comp.u = 3.0
+        comp.run(ffd_order=1)
+        self.assertEqual(comp.ran_real, False)
+        self.assertEqual(list(comp.y), [7.0+15.0, 21.0+18.0])
+        self.assertEqual(comp.f, 7.0)
+        
+        try:
+            from scipy.sparse import csr_matrix
+        except ImportError:
+            pass
+        else:
+            comp.derivatives.set_first_derivative('y', 'x', csr_matrix(comp.A))
+            comp.run(ffd_order=1)
+            self.assertEqual(list(comp.y), [22.0, 39.0])
+        
+        try:
+            comp.derivatives.set_first_derivative('y', 'x', zeros((3, 2)))
+        except ValueError, err:
+            msg = 'Derivative of y with repect to x must have shape (2, 3).'
+            self.assertEqual(str(err), msg)
+        else:
+            self.fail('ValueError expected')
+        
+    def test_scalar_value_types(self):
+        
+        # A scalar derivative can be set to any float type in any order.
+        derivs = self.comp.derivatives
+        derivs.set_first_derivative('f_xy', 'x', numpy.cos(0.0))
+        derivs.set_first_derivative('f_xy', 'x', 2.0)
+        self.assertEqual(derivs.first_derivatives['f_xy']['x'], 2.0)
+        derivs.set_first_derivative('f_xy', 'x', numpy.float64(3.0))
+        self.assertEqual(derivs.first_derivatives['f_xy']['x'], 3.0)
+        
     def test_validate_simple(self):
 
         # Just making sure it works.
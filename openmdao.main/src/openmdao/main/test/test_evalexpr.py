@@ -287,7 +287,37 @@ class ExprEvalTestCase(unittest.TestCase):
     def test_property(self):
         ex = ExprEvaluator('some_prop', self.top.a)
         self.assertEqual(ex.evaluate(), 7)
-        
+
+    def test_bound_refs(self):
+        self.top.comp.cont = A()
+        self.top.comp.cont.f = 2.
+        ex = ExprEvaluator('comp.x + comp.cont.f + a.a1d[1]', self.top)
+        self.assertEqual(ex.evaluate(), 3.14+2.+2.)
+        self.assertTrue(ex._func)
+        self.top.comp.x = 1.
+        self.assertEqual(ex.evaluate(), 1.+2.+2.)
+
+        # replace objects that references were bound to
+        self.top.comp.cont = A()
+        self.top.comp.cont.f = 5.
+        self.assertEqual(ex.evaluate(), 1.+5.+2.)
+        comp = Comp()
+        comp.x = 7.
+        comp.cont = self.top.comp.cont
+        self.top.add('comp', comp)
+        self.assertEqual(ex.evaluate(), 7.+5.+2.)
+
+        self.top.rename('comp', 'comp2')
+        try:
+            ex.evaluate()
+        except AttributeError as err:
+            self.assertEqual(str(err), "can't evaluate expression 'comp.x + comp.cont.f + a.a1d[1]': : 'Assembly' object has no attribute 'comp'")
+        else:
+            self.fail("AttributeError expected")
+        self.top.rename('comp2', 'comp')
+        self.assertEqual(ex.evaluate(), 7.+5.+2.)
+
+
     def test_assignee(self):
         ex = ExprEvaluator('a1d[3]*a1d[2 ]', self.top.a)
         self.assertEqual(ex.is_valid_assignee(), False)
@@ -528,6 +558,42 @@ class ExprEvalTestCase(unittest.TestCase):
         assert_rel_error(self, grad['comp1.b2d[0][1]'], 12.0, 0.00001)
         assert_rel_error(self, grad['comp1.b2d[1][1]'], 4.0, 0.00001)
 
+    def test_eval_gradient_compiled(self):
+        top = set_as_top(Assembly())
+        top.add('comp1', Simple())
+        top.add('comp2', A())
+        top.run()
+
+        # symbolic derivatives are compiled once, but see new values
+        exp = ExprEvaluator('comp1.b*comp1.c**2', top.driver)
+        grad = exp.evaluate_gradient(scope=top)
+        assert_rel_error(self, grad['comp1.c'], 70.0, 0.00001)
+        funcs = exp._grad_funcs.copy()
+        top.comp1.b = 2.0
+        top.comp1.c = 3.0
+        grad = exp.evaluate_gradient(scope=top)
+        self.assertEqual(exp._grad_funcs, funcs)
+        assert_rel_error(self, grad['comp1.c'], 12.0, 0.00001)
+        assert_rel_error(self, grad['comp1.b'], 9.0, 0.00001)
+
+        # sympy can't differentiate abs(), so these use finite difference
+        exp = ExprEvaluator('abs(comp1.b)*comp1.c', top.driver)
+        grad = exp.evaluate_gradient(scope=top)
+        self.assertEqual(exp.cached_grad_eq['comp1.b'], False)
+        assert_rel_error(self, grad['comp1.b'], 3.0, 0.00001)
+        assert_rel_error(self, grad['comp1.c'], 2.0, 0.00001)
+        top.comp1.b = -4.0
+        grad = exp.evaluate_gradient(scope=top)
+        assert_rel_error(self, grad['comp1.b'], -3.0, 0.00001)
+        assert_rel_error(self, grad['comp1.c'], 4.0, 0.00001)
+        self.assertEqual(top.comp1.b, -4.0)
+
+        exp = ExprEvaluator('abs(comp2.b2d[0][1])*comp2.b2d[1][1]', top.driver)
+        grad = exp.evaluate_gradient(scope=top)
+        assert_rel_error(self, grad['comp2.b2d[0][1]'], 3.0, 0.00001)
+        assert_rel_error(self, grad['comp2.b2d[1][1]'], 1.0, 0.00001)
+        self.assertEqual(top.comp2.b2d[0][1], 1.0)
+
     def test_scope_transform(self):
         exp = ExprEvaluator('myvar+abs(comp.x)*a.a1d[2]', self.top)
         self.assertEqual(new_text(exp), "scope.get('myvar')+abs(scope.get('comp.x'))*scope.get('a.a1d',[(0,2)])")
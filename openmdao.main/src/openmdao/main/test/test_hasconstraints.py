@@ -217,6 +217,13 @@ class HasConstraintsTestCase(unittest.TestCase):
         self.assertEqual(result[0][0], -1.0)
         self.assertEqual(result[0][1], 1.0)
         
+        # the same scaling applies to values evaluated elsewhere
+        con = drv.get_ineq_constraints()['comp1.a<comp1.b']
+        self.assertEqual(con.evaluate_values(3000, 5000),
+                         (-1.0, 1.0, '<', False))
+        self.assertEqual(con.evaluate_values(6000, 5000),
+                         (2.0, 1.0, '<', True))
+        
         drv.remove_constraint('comp1.a < comp1.b') #cant add constraints that are already there
         try:
             drv.add_constraint('comp1.a < comp1.b', scaler=-5.0)
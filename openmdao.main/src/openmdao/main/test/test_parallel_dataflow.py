@@ -0,0 +1,151 @@
+# pylint: disable-msg=C0111,C0103
+
+import unittest
+import threading
+import time
+
+from openmdao.main.api import Assembly, Component, ParallelDataflow, set_as_top
+from openmdao.main.exceptions import RunStopped
+from openmdao.lib.datatypes.api import Float
+
+
+class Sleeper(Component):
+    a = Float(iotype='in')
+    b = Float(iotype='in')
+    c = Float(iotype='out')
+    d = Float(iotype='out')
+
+    def __init__(self, delay=0.2):
+        super(Sleeper, self).__init__()
+        self.delay = delay
+        self.start = self.finish = None
+
+    def execute(self):
+        self.start = time.time()
+        time.sleep(self.delay)
+        self.c = self.a + self.b
+        self.d = self.a - self.b
+        self.finish = time.time()
+
+
+class Failer(Sleeper):
+    def execute(self):
+        raise ValueError('bad input')
+
+
+class Stopper(Sleeper):
+    def execute(self):
+        self.parent.driver.workflow.stop()
+        super(Stopper, self).execute()
+
+
+class ParallelDataflowTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # comp0 feeds two independent branches that are joined by comp5
+        top = self.top = set_as_top(Assembly())
+        top.driver.workflow = ParallelDataflow(top.driver, max_workers=4)
+        for i in range(6):
+            top.add('comp%d' % i, Sleeper())
+        top.driver.workflow.add(['comp%d' % i for i in range(6)])
+        top.connect('comp0.c', 'comp1.a')
+        top.connect('comp1.c', 'comp2.a')
+        top.connect('comp0.d', 'comp3.a')
+        top.connect('comp3.c', 'comp4.a')
+        top.connect('comp2.c', 'comp5.a')
+        top.connect('comp4.c', 'comp5.b')
+        top.comp0.a = 3.
+        top.comp0.b = 1.
+
+    def _check_order(self):
+        top = self.top
+        for src, dest in [(0,1), (1,2), (0,3), (3,4), (2,5), (4,5)]:
+            self.assertTrue(getattr(top, 'comp%d' % src).finish <=
+                            getattr(top, 'comp%d' % dest).start)
+
+    def test_branches(self):
+        top = self.top
+        start = time.time()
+        top.run()
+        elapsed = time.time() - start
+        self._check_order()
+        self.assertEqual(top.comp5.c, 6.)
+        # the branches overlap, so it takes 4 delays rather than 6
+        self.assertTrue(elapsed < 5*0.2, elapsed)
+        self.assertTrue(top.comp1.start < top.comp3.finish)
+        self.assertTrue(top.comp3.start < top.comp1.finish)
+        self.assertEqual(top.comp5.get_itername(), '1-6')
+
+        # results match a sequential run
+        top.comp0.b = 2.
+        top.driver.workflow.max_workers = 1
+        top.run()
+        seq = top.comp5.c
+        top.comp0.b = 3.
+        top.run()
+        top.comp0.b = 2.
+        top.driver.workflow.max_workers = 4
+        top.run()
+        self.assertEqual(top.comp5.c, seq)
+
+    def test_unconnected(self):
+        top = self.top
+        top.add('comp6', Sleeper())
+        top.add('comp7', Sleeper())
+        top.driver.workflow.add(['comp6', 'comp7'])
+        top.run()
+        self.assertTrue(top.comp6.start < top.comp7.finish)
+        self.assertTrue(top.comp7.start < top.comp6.finish)
+
+    def test_exclusive(self):
+        top = self.top
+        top.comp3.directory = '.'
+        top.run()
+        self._check_order()
+        self.assertTrue(top.comp1.finish <= top.comp3.start)
+        self.assertTrue(top.comp3.finish <= top.comp2.start)
+
+    def test_error(self):
+        top = self.top
+        top.add('comp3', Failer())
+        top.driver.workflow.add('comp3')
+        top.connect('comp0.d', 'comp3.a')
+        top.connect('comp3.c', 'comp4.a')
+        try:
+            top.run()
+        except ValueError as err:
+            self.assertEqual(str(err), 'bad input')
+        else:
+            self.fail('ValueError expected')
+        self.assertTrue(top.comp1.finish is not None)
+        self.assertEqual(top.comp4.start, None)
+        self.assertEqual(top.comp5.start, None)
+
+    def test_stop(self):
+        top = self.top
+        top.add('comp1', Stopper())
+        top.driver.workflow.add('comp1')
+        top.connect('comp0.c', 'comp1.a')
+        top.connect('comp1.c', 'comp2.a')
+        self.assertRaises(RunStopped, top.run)
+        self.assertEqual(top.comp2.start, None)
+        self.assertEqual(top.comp5.start, None)
+
+    def test_threads(self):
+        names = []
+        class Recorder(Sleeper):
+            def execute(self):
+                names.append(threading.current_thread().name)
+                super(Recorder, self).execute()
+        top = set_as_top(Assembly())
+        top.driver.workflow = ParallelDataflow(top.driver, max_workers=2)
+        for i in range(4):
+            top.add('comp%d' % i, Recorder(0.05))
+        top.driver.workflow.add(['comp%d' % i for i in range(4)])
+        top.run()
+        self.assertEqual(len(names), 4)
+        self.assertTrue(threading.current_thread().name not in names)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+"""
+Compare the time needed to convert and combine arrays of values with
+units using a PhysicalQuantity per element and using a single
+PhysicalQuantityArray.
+"""
+
+import sys
+import time
+
+from numpy import linspace
+
+from openmdao.units import PhysicalQuantity, PhysicalQuantityArray
+
+
+def per_element(values):
+    """ Convert and combine using a PhysicalQuantity per element. """
+    pqs = [PhysicalQuantity(value, 'degF') for value in values]
+    temps = [pq.in_units_of('degK') for pq in pqs]
+    pqs = [PhysicalQuantity(value, 'ft/s') for value in values]
+    speeds = [pq.in_units_of('m/s') for pq in pqs]
+    return [speed*speed/temp for speed, temp in zip(speeds, temps)]
+
+
+def vectorized(values):
+    """ Convert and combine using PhysicalQuantityArrays. """
+    temps = PhysicalQuantityArray(values, 'degF').in_units_of('degK')
+    speeds = PhysicalQuantityArray(values, 'ft/s').in_units_of('m/s')
+    return speeds*speeds/temps
+
+
+def main():
+    """ Run both versions for each size. """
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+    print '%10s %12s %12s %8s' % ('size', 'per element', 'array', 'speedup')
+    for size in sizes:
+        values = linspace(100., 1000., size)
+
+        start = time.time()
+        expected = per_element(values)
+        elem = time.time() - start
+
+        start = time.time()
+        result = vectorized(values)
+        vect = time.time() - start
+
+        assert result.unit.name() == expected[0].unit.name()
+        assert abs(result.value[-1] - expected[-1].value) < 1e-9
+        print '%10d %12.4f %12.4f %8.1f' % (size, elem, vect, elem/vect)
+
+
+if __name__ == '__main__':
+    main()
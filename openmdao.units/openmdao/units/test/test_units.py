@@ -791,6 +791,71 @@ class test__PhysicalUnit(unittest.TestCase):
         self.assertEqual(y.unit.name(),'kg/m**2')
 
 
+class test__PhysicalQuantityArray(unittest.TestCase):
+
+    def test_convert(self):
+        x = units.PhysicalQuantityArray([32., 212.], 'degF')
+        y = x.in_units_of('degC')
+        self.assertTrue(isinstance(y, units.PhysicalQuantityArray))
+        self.assertEqual(y.get_unit_name(), 'degC')
+        self.assertAlmostEqual(y.value[0], 0., 10)
+        self.assertAlmostEqual(y.value[1], 100., 10)
+        # same as converting each element
+        for val, pq in zip(y.value, x):
+            self.assertAlmostEqual(val, pq.in_units_of('degC').value, 10)
+        x.convert_to_unit('degK')
+        self.assertAlmostEqual(x.value[1], 373.15, 10)
+        
+        x = units.PhysicalQuantityArray.from_quantities(
+                [units.PhysicalQuantity('1m'), units.PhysicalQuantity('50cm')])
+        self.assertEqual(list(x.value), [1., .5])
+        self.assertEqual(x.get_unit_name(), 'm')
+
+    def test_arithmetic(self):
+        x = units.PhysicalQuantityArray([1., 2., 3.], 'm')
+        y = units.PhysicalQuantity('50cm')
+        
+        z = x + y
+        self.assertEqual(list(z.value), [1.5, 2.5, 3.5])
+        self.assertEqual(z.get_unit_name(), 'm')
+        z = y - x
+        self.assertTrue(isinstance(z, units.PhysicalQuantityArray))
+        self.assertEqual(list(z.value), [-50., -150., -250.])
+        self.assertEqual(z.get_unit_name(), 'cm')
+        
+        z = x / units.PhysicalQuantityArray([1., 2., 4.], 's')
+        self.assertEqual(list(z.value), [1., 1., .75])
+        self.assertEqual(z.get_unit_name(), 'm/s')
+        z = x**2
+        self.assertEqual(list(z.value), [1., 4., 9.])
+        self.assertEqual(z.get_unit_name(), 'm**2')
+        z = 2.*x
+        self.assertEqual(list(z.value), [2., 4., 6.])
+        
+        # dimensionless results are plain arrays
+        z = x / y
+        self.assertEqual(list(z), [2., 4., 6.])
+        
+        self.assertEqual(list(x > y), [True, True, True])
+        self.assertEqual(list(x == units.PhysicalQuantity('200cm')),
+                         [False, True, False])
+        try:
+            x + 1.
+        except TypeError,err:
+            self.assertEqual(str(err), "Incompatible types")
+        else:
+            self.fail("Expecting TypeError")
+
+    def test_indexing(self):
+        x = units.PhysicalQuantityArray([1., 2., 3.], 'm')
+        self.assertEqual(len(x), 3)
+        self.assertEqual(x.shape, (3,))
+        self.assertEqual(repr(x[1]), "PhysicalQuantity(2.0,'m')")
+        self.assertEqual(list(x[1:].value), [2., 3.])
+        x[0] = units.PhysicalQuantity('50cm')
+        self.assertEqual(x.value[0], .5)
+
+
 class test__moduleFunctions(unittest.TestCase):        
     def test_add_unit(self):
         try:
@@ -807,5 +872,22 @@ class test__moduleFunctions(unittest.TestCase):
         else:
             self.fail("Expecting Key Error")            
 
+    def test_get_conversion_tuple(self):
+        self.assertEqual(units.get_conversion_tuple('cm', 'm'), (1/100.0, 0))
+        factor, offset = units.get_conversion_tuple('degF', 'degC')
+        self.assertAlmostEqual(factor, 0.556, 3)
+        self.assertAlmostEqual(offset, -32.0, 3)
+        # cached
+        self.assertTrue(units.get_conversion_tuple('degF', 'degC') is
+                        units.get_conversion_tuple('degF', 'degC'))
+        self.assertAlmostEqual(units.convert_units(212., 'degF', 'degC'), 100.)
+        
+        try:
+            units.get_conversion_tuple('m', 'degC')
+        except TypeError,err: 
+            self.assertEqual(str(err),"Incompatible units")
+        else:
+            self.fail("Expecting TypeError")
+
 if __name__ == "__main__":
     unittest.main()
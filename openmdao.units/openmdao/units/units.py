@@ -27,6 +27,11 @@ try:
 except ImportError: 
     pass
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 #Class definitions
 
 class NumberDict(dict):
@@ -332,6 +337,189 @@ class PhysicalQuantity(object):
         else:
             raise TypeError('Argument of tan must be an angle')
 
+class PhysicalQuantityArray(PhysicalQuantity):
+    """ Array of physical quantities that share one unit
+    
+    The values are held in a numpy array, so arithmetic and unit
+    conversion are done on the whole array at once and the resulting unit
+    is only computed once per operation. Any operation with a scalar
+    PhysicalQuantity or a numpy array gives a PhysicalQuantityArray.
+    Indexing with an integer returns a PhysicalQuantity, and indexing with
+    a slice returns a PhysicalQuantityArray. Comparisons return boolean
+    arrays.
+    """
+    
+    # make numpy arrays defer to our reflected operators
+    __array_priority__ = 100
+    __array_ufunc__ = None
+    
+    def __init__(self, value, unit):
+        """
+        @param value: anything that can be converted to a numpy array
+        @param unit: a unit
+        @type unit: C{str} or L{PhysicalUnit}
+        """
+        if numpy is None:
+            raise RuntimeError('PhysicalQuantityArray requires numpy')
+        if isinstance(value, PhysicalQuantity):
+            value = value.convert_value(_find_unit(unit))
+        self.value = numpy.asarray(value, dtype=float)
+        self.unit = _find_unit(unit)
+    
+    @classmethod
+    def from_quantities(cls, quantities, unit=None):
+        """Returns a PhysicalQuantityArray holding the values of a sequence
+        of PhysicalQuantities, converted to `unit`, which defaults to the
+        unit of the first quantity.
+        """
+        if unit is None:
+            unit = quantities[0].unit
+        unit = _find_unit(unit)
+        return cls([pq.convert_value(unit) for pq in quantities], unit)
+    
+    def __repr__(self):
+        return (self.__class__.__name__ + '(' + repr(self.value) + ',' +
+                `self.unit.name()` + ')')
+    
+    def __len__(self):
+        return len(self.value)
+    
+    def __iter__(self):
+        for value in self.value:
+            yield PhysicalQuantity(value, self.unit)
+    
+    def __getitem__(self, index):
+        value = self.value[index]
+        if isinstance(value, numpy.ndarray):
+            return self.__class__(value, self.unit)
+        return PhysicalQuantity(value, self.unit)
+    
+    def __setitem__(self, index, value):
+        if isinstance(value, PhysicalQuantity):
+            value = value.convert_value(self.unit)
+        self.value[index] = value
+    
+    @property
+    def shape(self):
+        """Shape of the value array."""
+        return self.value.shape
+    
+    def _sum(self, other, sign1, sign2):
+        """sums units"""
+        if not isinstance(other, PhysicalQuantity):
+            raise TypeError('Incompatible types')
+        new_value = sign1*self.value + \
+                  sign2*other.value*other.unit.conversion_factor_to(self.unit)
+        return self.__class__(new_value, self.unit)
+    
+    def _rsum(self, other, sign):
+        """sums units, giving the result in the units of `other`"""
+        if not isinstance(other, PhysicalQuantity):
+            raise TypeError('Incompatible types')
+        new_value = other.value + \
+                  sign*self.value*self.unit.conversion_factor_to(other.unit)
+        return self.__class__(new_value, other.unit)
+    
+    def __add__(self, other):
+        return self._sum(other, 1, 1)
+    
+    def __radd__(self, other):
+        return self._rsum(other, 1)
+    
+    def __sub__(self, other):
+        return self._sum(other, 1, -1)
+    
+    def __rsub__(self, other):
+        return self._rsum(other, -1)
+    
+    def _compare(self, other):
+        """Returns the values of self - other, in our units."""
+        return self._sum(other, 1, -1).value
+    
+    def __eq__(self, other):
+        return self._compare(other) == 0
+    
+    def __ne__(self, other):
+        return self._compare(other) != 0
+    
+    def __lt__(self, other):
+        return self._compare(other) < 0
+    
+    def __le__(self, other):
+        return self._compare(other) <= 0
+    
+    def __gt__(self, other):
+        return self._compare(other) > 0
+    
+    def __ge__(self, other):
+        return self._compare(other) >= 0
+    
+    def __mul__(self, other):
+        if not isinstance(other, PhysicalQuantity):
+            return self.__class__(self.value*other, self.unit)
+        value = self.value*other.value
+        unit = self.unit*other.unit
+        if unit.is_dimensionless():
+            return value*unit.factor
+        else:
+            return self.__class__(value, unit)
+    
+    def __rmul__(self, other):
+        return self.__mul__(other)
+    
+    def __div__(self, other):
+        if not isinstance(other, PhysicalQuantity):
+            return self.__class__(self.value/other, self.unit)
+        value = self.value/other.value
+        unit = self.unit/other.unit
+        if unit.is_dimensionless():
+            return value*unit.factor
+        else:
+            return self.__class__(value, unit)
+    
+    __truediv__ = __div__
+    
+    def __rdiv__(self, other):
+        if not isinstance(other, PhysicalQuantity):
+            return self.__class__(other/self.value, pow(self.unit, -1))
+        value = other.value/self.value
+        unit = other.unit/self.unit
+        if unit.is_dimensionless():
+            return value*unit.factor
+        else:
+            return self.__class__(value, unit)
+    
+    __rtruediv__ = __rdiv__
+    
+    def __nonzero__(self):
+        raise ValueError('The truth value of a PhysicalQuantityArray is '
+                         'ambiguous')
+    
+    def sin(self):
+        """Parsing Sine."""
+        if self.unit.is_angle():
+            return numpy.sin(self.value * \
+                self.unit.conversion_factor_to(PhysicalQuantity('1rad').unit))
+        else:
+            raise TypeError('Argument of sin must be an angle')
+
+    def cos(self):
+        """Parsing Cosine."""
+        if self.unit.is_angle():
+            return numpy.cos(self.value * \
+                self.unit.conversion_factor_to(PhysicalQuantity('1rad').unit))
+        else:
+            raise TypeError('Argument of cos must be an angle')
+
+    def tan(self):
+        """Parsing tangent."""
+        if self.unit.is_angle():
+            return numpy.tan(self.value * \
+                self.unit.conversion_factor_to(PhysicalQuantity('1rad').unit))
+        else:
+            raise TypeError('Argument of tan must be an angle')
+
+
 class PhysicalUnit(object):
     """
     Physical unit.
@@ -590,6 +778,22 @@ def _find_unit(unit):
     return unit
 
 
+_CONVERSION_CACHE = {}
+
+def get_conversion_tuple(src_units, target_units):
+    """Return a tuple of the form (factor, offset) such that a value x in
+    `src_units` is converted to `target_units` by ``(x + offset) * factor``.
+    The result is cached, so looking up the same pair of units again is
+    just a dict lookup.
+    """
+    try:
+        return _CONVERSION_CACHE[(src_units, target_units)]
+    except KeyError:
+        conv = _find_unit(src_units).conversion_tuple_to(_find_unit(target_units))
+        _CONVERSION_CACHE[(src_units, target_units)] = conv
+        return conv
+
+
 def _new_unit(name, factor, powers):
     """create new Unit"""
     _UNIT_LIB.unit_table[name] = PhysicalUnit(name, factor, powers)
@@ -646,7 +850,9 @@ def import_library(libfilepointer):
     """Imports a units library, replacing any existing definitions."""
     global _UNIT_LIB 
     global _UNIT_CACHE
+    global _CONVERSION_CACHE
     _UNIT_CACHE = {}
+    _CONVERSION_CACHE = {}
     _UNIT_LIB = ConfigParser.ConfigParser()
     _UNIT_LIB.optionxform = _do_nothing
     _UNIT_LIB.readfp(libfilepointer)
@@ -760,9 +966,8 @@ def convert_units(value, units, convunits):
     """Return the given value (given in units) converted 
     to convunits.
     """
-    pq = PhysicalQuantity(value, units)
-    pq.convert_to_unit(convunits)
-    return pq.value
+    factor, offset = get_conversion_tuple(units, convunits)
+    return (value + offset) * factor
     
 
 try:
@@ -5,7 +5,10 @@ Note: This is a work in progress.
 """
 
 import re
+import os
+import mmap
 import logging
+from bisect import bisect_left
 
 from pyparsing import CaselessLiteral, Combine, OneOrMore, Optional, \
                       TokenConverter, Word, nums, oneOf, printables, \
@@ -15,7 +18,8 @@ from openmdao.util.decorators import stub_if_missing_deps
 
 # pylint: disable-msg=E0611,F0401
 try:
-    from numpy import append, array, zeros
+    from numpy import array, zeros, concatenate, frombuffer, nonzero, \
+                      searchsorted, uint8
 except ImportError as err:
     logging.warn("In %s: %r" % (__file__, err))
 
@@ -30,6 +34,17 @@ def _getformat(val):
     else:
         return "%.16g"
 
+def _format_field(val):
+    # Returns the text that replaces a field in a template.
+    
+    if isinstance(val, float):
+        return _getformat(val) % val
+    else:
+        return str(val)
+
+# Marks the location of a value in a compiled template.
+_MARKER = re.compile('\x00([0-9]+)\x00')
+
 
 class _SubHelper(object):
     """Replaces file text at the correct word location in a line. This
@@ -68,10 +83,7 @@ class _SubHelper(object):
         self.current_location += 1
         
         if self.current_location == self.replace_location:
-            if isinstance(self.newtext, float):
-                return _getformat(self.newtext) % self.newtext
-            else:
-                return str(self.newtext)
+            return _format_field(self.newtext)
         else:
             return text.group()
         
@@ -86,11 +98,7 @@ class _SubHelper(object):
         if self.current_location >= self.start_location and \
            self.current_location <= self.end_location and \
            self.counter < end:
-            if isinstance(self.newtext[self.counter], float):
-                val = self.newtext[self.counter]
-                newval = _getformat(val) % val
-            else:
-                newval = str(self.newtext[self.counter])
+            newval = _format_field(self.newtext[self.counter])
             self.counter += 1
             return newval
         else:
@@ -122,10 +130,9 @@ class ToInf(TokenConverter):
         return float('inf')
     
     
-def _parse_line(delimiters=' \t'):
-    """Parse a single data line that may contain string or numerical data.
-    Float and Int 'words' are converted to their appropriate type. 
-    Exponentiation is supported, as are NaN and Inf."""
+def _get_textchars(delimiters):
+    """Return the characters that can be part of a string field for the
+    given delimiters."""
     
     # Somewhat of a hack, but we can only use printables if the delimiter is
     # just whitespace. Otherwise, some seprators (like ',' or '=') potentially
@@ -145,7 +152,15 @@ def _parse_line(delimiters=' \t'):
             if symbol not in delimiters:
                 textchars = textchars + symbol
                 
-    string_text = Word(textchars)
+    return textchars
+    
+
+def _parse_line(delimiters=' \t'):
+    """Parse a single data line that may contain string or numerical data.
+    Float and Int 'words' are converted to their appropriate type. 
+    Exponentiation is supported, as are NaN and Inf."""
+    
+    string_text = Word(_get_textchars(delimiters))
         
     digits = Word(nums)
     dot = "."
@@ -175,12 +190,137 @@ def _parse_line(delimiters=' \t'):
     return data
 
 
+# Fields that _parse_line converts to an int or a float.
+_INT_RE = re.compile(r'[+-]?[0-9]+\Z')
+_FLOAT_RE = re.compile(r'([+-]?([0-9]+\.[0-9]*|\.[0-9]+)([eEdD][+-]?[0-9]+)?'
+                       r'|[0-9]+[eEdD][+-]?[0-9]+)\Z')
+
+# String fields starting with one of these are split up by _parse_line.
+_SPECIAL_PREFIXES = ('Inf', 'NaN', 'nan', 'qNaN', 'sNaN', 
+                     '+', '-', '.', '0', '1', '2', '3', '4', '5', '6', '7', 
+                     '8', '9')
+
+_TOKENIZERS = {}
+
+def _tokenize_line(line, delimiters=' \t'):
+    """Return the list of fields in a data line, converted the same way as
+    by _parse_line. Lines that only contain plain numbers and words are
+    split with a regular expression. Anything else (NaN, Inf, or fields
+    that pyparsing would split further) is handed to _parse_line."""
+    
+    # pyparsing splits on its current default whitespace
+    white = ParserElement.DEFAULT_WHITE_CHARS
+    try:
+        split, is_word = _TOKENIZERS[(delimiters, white)]
+    except KeyError:
+        split = re.compile('[%s]+' % re.escape(white)).split
+        is_word = re.compile('[%s]+\Z' % 
+                             re.escape(_get_textchars(delimiters))).match
+        _TOKENIZERS[(delimiters, white)] = (split, is_word)
+    
+    fields = []
+    for token in split(line.rstrip('\r\n').expandtabs()):
+        if not token:
+            continue
+        if _INT_RE.match(token):
+            fields.append(int(token))
+        elif _FLOAT_RE.match(token):
+            fields.append(float(token.replace('d', 'E').replace('D', 'E')))
+        elif is_word(token) and not token.startswith(_SPECIAL_PREFIXES):
+            fields.append(token)
+        else:
+            fields = None
+            break
+        
+    if not fields:
+        fields = _parse_line(delimiters).parseString(line)[:]
+    return fields
+
+
+class _FileLines(object):
+    """Read-only sequence of the lines of a file. The file is memory mapped
+    rather than read into a list of lines, and each line is only made into a
+    string when it's accessed. As with ``readlines``, lines include their 
+    newline."""
+    
+    # size of the blocks that are scanned for newlines
+    _blocksize = 1 << 24
+    
+    def __init__(self, filename):
+        
+        with open(filename, 'rb') as inp:
+            self.size = os.fstat(inp.fileno()).st_size
+            # Windows won't let a file be replaced while it's mapped, which
+            # would stop an external code from writing it again, so there
+            # the file is read into a single string instead.
+            if self.size and os.name != 'nt':
+                self._map = mmap.mmap(inp.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._map = inp.read()
+            
+        starts = [array([0])]
+        if self.size:
+            buf = frombuffer(self._map, dtype=uint8)
+            for i in range(0, self.size, self._blocksize):
+                block = buf[i:i+self._blocksize]
+                starts.append(nonzero(block == 10)[0] + (i+1))
+        starts = concatenate(starts)
+        if starts[-1] == self.size:
+            starts = starts[:-1]
+        self._starts = starts
+        self._ends = concatenate((starts[1:], [self.size]))
+        
+    def __len__(self):
+        return len(self._starts)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if not -len(self) <= index < len(self):
+            raise IndexError('list index out of range')
+        line = self._map[self._starts[index]:self._ends[index]]
+        # match the newline translation of a file opened in text mode
+        if os.linesep == '\r\n' and line.endswith('\r\n'):
+            line = line[:-2] + '\n'
+        return line
+        
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+            
+    def find(self, text):
+        """Return a list of the numbers of the lines that contain text."""
+        
+        rows = []
+        size = len(text)
+        pos = self._map.find(text)
+        while pos >= 0:
+            row = int(searchsorted(self._starts, pos, 'right')) - 1
+            end = self._ends[row]
+            if pos + size <= end:
+                rows.append(row)
+                pos = end
+            else:  # match spans more than one line
+                pos += 1
+            pos = self._map.find(text, pos)
+        return rows
+
+
 class InputFileGenerator(object):
     """Utility to generate an input file from a template.
     Substitution of values is supported. Data is located with
-    a simple API."""
+    a simple API.
     
-    def __init__(self):
+    If `compiled` is True, the generator records where each transferred
+    value ends up in the file the first time ``generate()`` is called.
+    After that, the same generator can be reused for the same template
+    by repeating the same sequence of calls with new values: anchors are
+    looked up from the first pass, the template isn't read again, and
+    ``generate()`` just joins the new values with the unchanged text.
+    Arrays must keep the same size, and every transfer must have been made
+    in the first pass."""
+    
+    def __init__(self, compiled=False):
         
         self.template_filename = []
         self.output_filename = []
@@ -191,6 +331,20 @@ class InputFileGenerator(object):
         self.data = []
         self.current_row = 0
         self.anchored = False
+        
+        self.compiled = compiled
+        self._reset_compiled()
+        
+    def _reset_compiled(self):
+        """Forget any compiled template."""
+        
+        self._template_mtime = None
+        self._anchors = {}
+        self._slots = {}
+        self._texts = []
+        self._formats = []
+        self._pieces = None
+        self._piece_index = None
     
     def set_template_file(self, filename):
         """Set the name of the template file to be used The template
@@ -199,6 +353,14 @@ class InputFileGenerator(object):
         filename: str
             Name of the template file to be used."""
         
+        if self.compiled:
+            mtime = os.path.getmtime(filename)
+            if self._pieces is not None and filename == self.template_filename \
+               and mtime == self._template_mtime:
+                return
+            self._reset_compiled()
+            self._template_mtime = mtime
+        
         self.template_filename = filename
         
         templatefile = open(filename, 'r')
@@ -240,6 +402,13 @@ class InputFileGenerator(object):
         if not isinstance(occurrence, int):
             raise ValueError("The value for occurrence must be an integer")
         
+        if self.compiled:
+            key = (anchor, occurrence, self.current_row, self.anchored)
+            if key in self._anchors:
+                self.current_row = self._anchors[key]
+                self.anchored = True
+                return
+        
         instance = 0
         if occurrence > 0:
             count = 0
@@ -257,6 +426,8 @@ class InputFileGenerator(object):
                     if instance == occurrence:
                         self.current_row += count
                         self.anchored = True
+                        if self.compiled:
+                            self._anchors[key] = self.current_row
                         return
             
                 count += 1
@@ -276,6 +447,8 @@ class InputFileGenerator(object):
                     if instance == occurrence:
                         self.current_row = count
                         self.anchored = True
+                        if self.compiled:
+                            self._anchors[key] = self.current_row
                         return
             
                 count -= 1
@@ -301,6 +474,13 @@ class InputFileGenerator(object):
         field - which word in line to replace, as denoted by delimiter(s)"""
 
         j = self.current_row + row
+        if self.compiled:
+            key = ('var', j, field)
+            if self._pieces is not None:
+                self._update_slot(key, [value])
+                return
+            value = self._add_slot(key, [value])[0]
+            
         line = self.data[j]
         
         sub = _SubHelper()
@@ -340,6 +520,15 @@ class InputFileGenerator(object):
         if row_end == None:
             row_end = row_start
             
+        if self.compiled:
+            key = ('array', self.current_row + row_start, field_start, 
+                   field_end, self.current_row + row_end, sep)
+            if self._pieces is not None:
+                self._update_slot(key, value)
+                return
+            values = value
+            value = self._add_slot(key, values)
+            
         sub = _SubHelper()
         for row in range(row_start, row_end+1):
             
@@ -364,6 +553,12 @@ class InputFileGenerator(object):
         
             self.data[j] = newline
             
+            if self.compiled:
+                ids = self._slots[key]
+                for i in range(sub.counter, len(value)):
+                    self._formats[ids[i]] = str
+                    self._texts[ids[i]] = str(values[i])
+            
         # Sometimes an array is too small for the template
         # This is resolved by removing fields
         elif sub.counter > len(value):
@@ -401,6 +596,21 @@ class InputFileGenerator(object):
         sep: str (optional) (currently unsupported)
             Separator to append between values if we go beyond the template."""
 
+        if self.compiled:
+            key = ('2Darray', self.current_row + row_start, 
+                   self.current_row + row_end, field_start, field_end)
+            rows = [list(value[i, :]) for i in range(row_end-row_start+1)]
+            values = [val for row in rows for val in row]
+            if self._pieces is not None:
+                self._update_slot(key, values)
+                return
+            markers = self._add_slot(key, values)
+            value = []
+            for row in rows:
+                value.append(markers[:len(row)])
+                markers = markers[len(row):]
+            value = array(value, dtype=object)
+            
         sub = _SubHelper()
         i = 0
         for row in range(row_start, row_end+1):
@@ -426,24 +636,91 @@ class InputFileGenerator(object):
         row: integer
             row number to clear, relative to current anchor."""
 
+        if self.compiled:
+            key = ('clear', self.current_row + row)
+            if self._pieces is not None:
+                self._update_slot(key, [])
+                return
+            self._add_slot(key, [])
+            
         self.data[self.current_row + row] = "\n"
         
     def generate(self):
         """Use the template file to generate the input file."""
 
+        if self.compiled and self._pieces is None:
+            self._compile()
+            
         infile = open(self.output_filename, 'w')
-        infile.writelines(self.data)
+        if self._pieces is None:
+            infile.writelines(self.data)
+        else:
+            infile.write(''.join(self._pieces))
         infile.close()
+        
+    def _add_slot(self, key, values):
+        """Record a transfer of the given values in the first pass of a
+        compiled template. Returns a list of the markers to put in the
+        template in place of the values."""
+        
+        start = len(self._texts)
+        ids = range(start, start+len(values))
+        self._slots[key] = ids
+        self._formats.extend([_format_field]*len(values))
+        self._texts.extend([_format_field(val) for val in values])
+        return ['\x00%d\x00' % i for i in ids]
+    
+    def _update_slot(self, key, values):
+        """Replace the values of a transfer in a compiled template."""
+        
+        try:
+            ids = self._slots[key]
+        except KeyError:
+            raise RuntimeError("%s at row %d is not in the compiled template "
+                               "for %s" % (key[0], key[1], self.template_filename))
+        if len(ids) != len(values):
+            raise ValueError("Array size %d doesn't match the compiled "
+                             "template size %d" % (len(values), len(ids)))
+        pieces = self._pieces
+        piece_index = self._piece_index
+        formats = self._formats
+        for i, val in zip(ids, values):
+            index = piece_index[i]
+            if index is not None:
+                pieces[index] = formats[i](val)
+    
+    def _compile(self):
+        """Split the text from the first pass of a compiled template into
+        pieces of fixed text and transferred values."""
+        
+        pieces = _MARKER.split(''.join(self.data))
+        
+        # values that were overwritten or fell outside the template
+        # don't have a piece
+        self._piece_index = [None]*len(self._texts)
+        for index in range(1, len(pieces), 2):
+            i = int(pieces[index])
+            self._piece_index[i] = index
+            pieces[index] = self._texts[i]
+        self._pieces = pieces
 
 
 @stub_if_missing_deps('numpy')
 class FileParser(object):
-    """Utility to locate and read data from a file."""
+    """Utility to locate and read data from a file.
+    
+    Unless comment characters are given, the file is memory mapped rather
+    than read into memory. The lines containing each anchor or key that is
+    searched for are found in a single pass over the file the first time
+    it's used, so later searches for the same text don't have to scan the
+    file again."""
     
     def __init__(self, end_of_line_comment_char=None, full_line_comment_char=None):
         
         self.filename = []
         self.data = []
+        self._index = {}
+        self._index_data = None
         
         self.delimiter = " \t"
         self.end_of_line_comment_char = end_of_line_comment_char
@@ -460,15 +737,17 @@ class FileParser(object):
         
         self.filename = filename
         
-        inputfile = open(filename, 'r')
         if not self.end_of_line_comment_char and not self.full_line_comment_char:
-            self.data = inputfile.readlines()
+            self.data = _FileLines(filename)
         else:
+            inputfile = open(filename, 'r')
             self.data = []
             for line in inputfile :
                 if line[0] == self.full_line_comment_char : continue
                 self.data.append( line.split( self.end_of_line_comment_char )[0] )
-        inputfile.close()
+            inputfile.close()
+        self._index = {}
+        self._index_data = self.data
 
     def set_delimiters(self, delimiter):
         """Lets you change the delimiter that is used to identify field
@@ -502,51 +781,57 @@ class FileParser(object):
         if not isinstance(occurrence, int):
             raise ValueError("The value for occurrence must be an integer")
         
-        instance = 0
+        rows = self._find_rows(anchor)
         if occurrence > 0:
-            count = 0
-            for line in self.data[self.current_row:]:
-                
-                # If we are marking a new anchor from an existing anchor, and
-                # the anchor is mid-line, then we still search the line, but
-                # only after the anchor.
-                if count == 0 and self.anchored:
-                    line = line.split(anchor)[-1]
-
-                if line.find(anchor) > -1:
-                    
-                    instance += 1
-                    if instance == occurrence:
-                        self.current_row += count
-                        self.anchored = True
-                        return
             
-                count += 1
+            # If we are marking a new anchor from an existing anchor, then
+            # the search starts after the anchor line.
+            start = self.current_row
+            if self.anchored:
+                start += 1
+            
+            i = bisect_left(rows, start) + occurrence - 1
+            if i < len(rows):
+                self.current_row = rows[i]
+                self.anchored = True
+                return
                 
         elif occurrence < 0:
-            count = len(self.data)-1
-            for line in reversed(self.data):
-                
-                # If we are marking a new anchor from an existing anchor, and
-                # the anchor is mid-line, then we still search the line, but
-                # only before the anchor.
-                if count == len(self.data)-1 and self.anchored:
-                    line = line.split(anchor)[0]
-
-                if line.find(anchor) > -1:
-                    instance += -1
-                    if instance == occurrence:
-                        self.current_row = count
-                        self.anchored = True
-                        return
             
+            # If we are marking a new anchor from an existing anchor, then
+            # the last line of the file isn't searched.
+            count = len(rows)
+            if self.anchored and count and rows[-1] == len(self.data)-1:
                 count -= 1
+                
+            if -occurrence <= count:
+                self.current_row = rows[count + occurrence]
+                self.anchored = True
+                return
         else:
             raise ValueError("0 is not valid for an anchor occurrence.")
             
         raise RuntimeError("Could not find pattern %s in output file %s" % \
                            (anchor, self.filename))
         
+    def _find_rows(self, text):
+        """Returns a sorted list of the numbers of all lines that contain
+        `text`. The list is built once for each text and file."""
+        
+        if self._index_data is not self.data:
+            self._index = {}
+            self._index_data = self.data
+            
+        try:
+            return self._index[text]
+        except KeyError:
+            if isinstance(self.data, _FileLines):
+                rows = self.data.find(text)
+            else:
+                rows = [i for i, line in enumerate(self.data) if text in line]
+            self._index[text] = rows
+            return rows
+        
     def reset_anchor(self):
         """Resets anchor to the beginning of the file."""
         
@@ -601,7 +886,7 @@ class FileParser(object):
             
             # Let pyparsing figure out if this is a number, and return it
             # as a float or int as appropriate
-            data = _parse_line().parseString(line)
+            data = _tokenize_line(line)
             
             # data might have been split if it contains whitespace. If so,
             # just return the whole string
@@ -610,7 +895,7 @@ class FileParser(object):
             else:
                 return data[0]
         else:
-            data = _parse_line(self.delimiter).parseString(line)
+            data = _tokenize_line(line, self.delimiter)
             return data[field-1]
 
     def transfer_keyvar(self, key, field, occurrence=1, rowoffset=0):
@@ -636,31 +921,27 @@ class FileParser(object):
             msg = "The value for occurrence must be a nonzero integer"
             raise ValueError(msg)
         
-        instance = 0
+        rows = self._find_rows(key)
+        first = bisect_left(rows, self.current_row)
+        nlines = len(self.data)
         if occurrence > 0:
-            row = 0
-            for line in self.data[self.current_row:]:
-                if line.find(key) > -1:
-                    instance += 1
-                    if instance == occurrence:
-                        break
-            
-                row += 1
+            i = first + occurrence - 1
+            if i < len(rows):
+                row = rows[i] - self.current_row
+            else:
+                row = nlines - self.current_row
                 
         elif occurrence < 0:
-            row = -1
-            for line in reversed(self.data[self.current_row:]):
-                if line.find(key) > -1:
-                    instance += -1
-                    if instance == occurrence:
-                        break
-            
-                row -= 1
+            i = len(rows) + occurrence
+            if i >= first:
+                row = rows[i] - nlines
+            else:
+                row = self.current_row - nlines - 1
         
         j = self.current_row + row + rowoffset
         line = self.data[j]
         
-        fields = _parse_line(self.delimiter).parseString(line.replace(key,"KeyField"))
+        fields = _tokenize_line(line.replace(key,"KeyField"), self.delimiter)
         
         return fields[field]
 
@@ -697,7 +978,7 @@ class FileParser(object):
             
         lines = self.data[j1:j2]
 
-        data = zeros(shape=(0, 0))
+        data = [zeros(shape=(0, ))]
 
         for i, line in enumerate(lines):
             if self.delimiter == "columns":
@@ -708,25 +989,25 @@ class FileParser(object):
                 
                 # Let pyparsing figure out if this is a number, and return it
                 # as a float or int as appropriate
-                parsed = _parse_line().parseString(line)
+                parsed = _tokenize_line(line)
                 
                 newdata = array(parsed[:])
                 # data might have been split if it contains whitespace. If the
                 # data is string, we probably didn't want this.
                 if '|S' in str(newdata.dtype):
-                    newdata = array(line)
+                    newdata = array([line])
                     
-                data = append(data, newdata)
+                data.append(newdata)
                 
             else:
-                parsed = _parse_line(self.delimiter).parseString(line)
+                parsed = _tokenize_line(line, self.delimiter)
                 if i == j2-j1-1:
-                    data = append(data, array(parsed[(fieldstart-1):fieldend]))
+                    data.append(array(parsed[(fieldstart-1):fieldend]))
                 else:
-                    data = append(data, array(parsed[(fieldstart-1):]))
+                    data.append(array(parsed[(fieldstart-1):]))
                 fieldstart = 1
                 
-        return data
+        return concatenate(data)
         
     def transfer_2Darray(self, rowstart, fieldstart, rowend, fieldend=None):
         """Grabs a 2D array of variables relative to the current anchor. Each
@@ -769,7 +1050,7 @@ class FileParser(object):
             else:
                 line = lines[0][(fieldstart-1):]
                 
-            parsed = _parse_line().parseString(line)
+            parsed = _tokenize_line(line)
             row = array(parsed[:])
             data = zeros(shape=(abs(j2-j1), len(row)))
             data[0, :] = row
@@ -780,11 +1061,11 @@ class FileParser(object):
                 else:
                     line = line[(fieldstart-1):]
                 
-                parsed = _parse_line().parseString(line)
+                parsed = _tokenize_line(line)
                 data[i+1, :] = array(parsed[:])
                 
         else:
-            parsed = _parse_line(self.delimiter).parseString(lines[0])
+            parsed = _tokenize_line(lines[0], self.delimiter)
             if fieldend:
                 row = array(parsed[(fieldstart-1):fieldend])
             else:
@@ -794,7 +1075,7 @@ class FileParser(object):
             data[0, :] = row
     
             for i, line in enumerate(list(lines[1:])):
-                parsed = _parse_line(self.delimiter).parseString(line)
+                parsed = _tokenize_line(line, self.delimiter)
                 
                 if fieldend:
                     try:
@@ -12,6 +12,8 @@ _SZ_LONG = 8
 _SZ_FLOAT = 4
 _SZ_DOUBLE = 8
 
+_CHUNK = 65536  # Items per chunk when iterating or converting.
+
 from openmdao.util.decorators import stub_if_missing_deps
 
 @stub_if_missing_deps('numpy')
@@ -235,6 +237,216 @@ class Stream(object):
 
         return data.reshape(shape, order=order) if reshape else data
 
+    def readinto_ints(self, data, order='C', full_record=False):
+        """
+        Reads integers into existing :mod:`numpy` array `data` and returns it.
+        If `data` has the file's integer type and is contiguous in `order`,
+        then the file is read directly into it.  Otherwise the data is read
+        and converted in chunks.
+
+        data: :class:`numpy.ndarray`
+            Array to be filled.
+
+        order: string
+            If 'C', the data is in row-major order.
+            If 'Fortran', the data is in column-major order.
+
+        full_record: bool
+            If True, then read surrounding recordmarks.
+            Only meaningful if `unformatted`.
+        """
+        dtype = numpy.int64 if self.integer_8 else numpy.int32
+        return self._readinto(data, dtype, self.reclen_ints(data.size),
+                              order, full_record)
+
+    def readinto_floats(self, data, order='C', full_record=False):
+        """
+        Reads floats into existing :mod:`numpy` array `data` and returns it.
+        If `data` has the file's float type and is contiguous in `order`,
+        then the file is read directly into it.  Otherwise the data is read
+        and converted in chunks.
+
+        data: :class:`numpy.ndarray`
+            Array to be filled.
+
+        order: string
+            If 'C', the data is in row-major order.
+            If 'Fortran', the data is in column-major order.
+
+        full_record: bool
+            If True, then read surrounding recordmarks.
+            Only meaningful if `unformatted`.
+        """
+        dtype = numpy.float32 if self.single_precision else numpy.float64
+        return self._readinto(data, dtype, self.reclen_floats(data.size),
+                              order, full_record)
+
+    def _readinto(self, data, dtype, expected, order, full_record):
+        """ Reads items of `dtype` into `data`. """
+        if full_record and self.unformatted:
+            reclen = self.read_recordmark()
+            if reclen != expected:
+                raise RuntimeError('unexpected recordlength %d' % reclen)
+
+        # C-order iteration of the transpose is Fortran-order iteration.
+        target = data.T if order == 'Fortran' else data
+        if self.binary and target.dtype == dtype and \
+           target.flags.c_contiguous:
+            nbytes = self.file.readinto(target)
+            if nbytes != target.nbytes:
+                raise RuntimeError('read %d bytes, expected %d'
+                                   % (nbytes, target.nbytes))
+            if self.need_byteswap:
+                target.byteswap(True)
+        else:
+            start = 0
+            for chunk in self._iter_items(dtype, target.size, _CHUNK, None):
+                target.flat[start:start+chunk.size] = chunk
+                start += chunk.size
+
+        if full_record and self.unformatted:
+            reclen2 = self.read_recordmark()
+            if reclen2 != reclen:
+                raise RuntimeError('mismatched recordlength %d vs. %d'
+                                   % (reclen2, reclen))
+        return data
+
+    def iter_ints(self, count=None, chunk=_CHUNK, full_record=False):
+        """
+        Returns an iterator over the next `count` integers, which returns
+        :mod:`numpy` arrays of at most `chunk` items.  If `full_record`,
+        the leading recordmark is read now, and the trailing recordmark is
+        verified after the last chunk.
+
+        count: int
+            Number of integers to read.  May be omitted if `full_record`
+            and `unformatted`, in which case the whole record is read.
+
+        chunk: int
+            Maximum number of integers returned at a time.
+
+        full_record: bool
+            If True, then read surrounding recordmarks.
+            Only meaningful if `unformatted`.
+        """
+        dtype = numpy.int64 if self.integer_8 else numpy.int32
+        return self._iter_record(dtype, self.reclen_ints(1), count, chunk,
+                                 full_record)
+
+    def iter_floats(self, count=None, chunk=_CHUNK, full_record=False):
+        """
+        Returns an iterator over the next `count` floats, which returns
+        :mod:`numpy` arrays of at most `chunk` items.  If `full_record`,
+        the leading recordmark is read now, and the trailing recordmark is
+        verified after the last chunk.
+
+        count: int
+            Number of floats to read.  May be omitted if `full_record`
+            and `unformatted`, in which case the whole record is read.
+
+        chunk: int
+            Maximum number of floats returned at a time.
+
+        full_record: bool
+            If True, then read surrounding recordmarks.
+            Only meaningful if `unformatted`.
+        """
+        dtype = numpy.float32 if self.single_precision else numpy.float64
+        return self._iter_record(dtype, self.reclen_floats(1), count, chunk,
+                                 full_record)
+
+    def _iter_record(self, dtype, itemsize, count, chunk, full_record):
+        """ Returns iterator over `count` items of `dtype`. """
+        reclen = None
+        if full_record and self.unformatted:
+            reclen = self.read_recordmark()
+            if count is None:
+                if reclen % itemsize:
+                    raise RuntimeError('unexpected recordlength %d' % reclen)
+                count = reclen // itemsize
+            elif reclen != count * itemsize:
+                raise RuntimeError('unexpected recordlength %d' % reclen)
+        elif count is None:
+            raise ValueError('count must be specified unless reading'
+                             ' a full unformatted record')
+        return self._iter_items(dtype, count, chunk, reclen)
+
+    def _iter_items(self, dtype, count, chunk, reclen):
+        """
+        Generator returning `count` items of `dtype` in arrays of at most
+        `chunk` items.  If `reclen` is not None, the trailing recordmark is
+        then checked against it.
+        """
+        sep = '' if self.binary else ' '
+        while count > 0:
+            size = min(chunk, count)
+            data = numpy.fromfile(self.file, dtype=dtype, count=size, sep=sep)
+            if data.size != size:
+                raise RuntimeError('read %d items, expected %d'
+                                   % (data.size, size))
+            if self.need_byteswap:
+                data.byteswap(True)
+            count -= size
+            yield data
+
+        if reclen is not None:
+            reclen2 = self.read_recordmark()
+            if reclen2 != reclen:
+                raise RuntimeError('mismatched recordlength %d vs. %d'
+                                   % (reclen2, reclen))
+
+    def map_ints(self, shape, order='C'):
+        """
+        Returns integers as a :class:`numpy.memmap` of `shape` viewing the
+        file at the current position, which is then advanced past the data.
+        Data is not read until it is accessed. Changes to the returned array
+        are not written to the file. The file must not be truncated while the
+        array is in use, otherwise accessing it raises SIGBUS; replace the
+        file (write a new one and rename it) instead. Only meaningful if
+        `binary`.
+
+        shape: tuple(int)
+            Dimensions of returned array.
+
+        order: string
+            If 'C', the data is in row-major order.
+            If 'Fortran', the data is in column-major order.
+        """
+        dtype = numpy.int64 if self.integer_8 else numpy.int32
+        return self._map(dtype, shape, order)
+
+    def map_floats(self, shape, order='C'):
+        """
+        Returns floats as a :class:`numpy.memmap` of `shape` viewing the
+        file at the current position, which is then advanced past the data.
+        Data is not read until it is accessed. Changes to the returned array
+        are not written to the file. The file must not be truncated while the
+        array is in use, otherwise accessing it raises SIGBUS; replace the
+        file (write a new one and rename it) instead. Only meaningful if
+        `binary`.
+
+        shape: tuple(int)
+            Dimensions of returned array.
+
+        order: string
+            If 'C', the data is in row-major order.
+            If 'Fortran', the data is in column-major order.
+        """
+        dtype = numpy.float32 if self.single_precision else numpy.float64
+        return self._map(dtype, shape, order)
+
+    def _map(self, dtype, shape, order):
+        """ Returns memory map of `shape` items of `dtype` at current position. """
+        if not self.binary:
+            raise RuntimeError('memory mapping requires binary data')
+
+        dtype = numpy.dtype(dtype).newbyteorder('>' if self.big_endian else '<')
+        offset = self.file.tell()
+        data = numpy.memmap(self.file, dtype=dtype, mode='c', offset=offset,
+                            shape=shape, order='F' if order == 'Fortran' else 'C')
+        self.file.seek(offset + data.nbytes)
+        return data
+
     def read_recordmark(self):
         """ Returns value of next recordmark. """
         fmt = '>' if self.big_endian else '<'
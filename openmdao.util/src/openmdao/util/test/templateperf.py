@@ -0,0 +1,84 @@
+"""
+Measure the time needed to generate an input file from a template many
+times with new values, as in an optimization loop, using a new
+InputFileGenerator for each file and using one compiled InputFileGenerator.
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import shutil
+
+from numpy import array
+
+from openmdao.util.filewrap import InputFileGenerator
+
+NSECTIONS = 20
+
+
+def write_template(filename):
+    """ Write a template with some sections of name/value lines. """
+    with open(filename, 'w') as out:
+        out.write('Example solver input\n')
+        for i in range(NSECTIONS):
+            out.write('$SECTION%d\n' % i)
+            for j in range(5):
+                out.write('  VAR%d = 0.0  ! comment\n' % j)
+            out.write('  ARRAY = 0 0 0 0 0 0 0 0\n')
+            for j in range(40):
+                out.write('  ! unchanged text %d\n' % j)
+            out.write('$END\n')
+
+
+def generate(gen, template, output, values):
+    """ Transfer one set of values and generate the input file. """
+    gen.set_template_file(template)
+    gen.set_generated_file(output)
+    gen.reset_anchor()
+    for i in range(NSECTIONS):
+        gen.mark_anchor('$SECTION%d' % i)
+        for j in range(5):
+            gen.transfer_var(values[i, j], j+1, 3)
+        gen.transfer_array(values[i], 6, 3, 10)
+    gen.generate()
+
+
+def main():
+    """ Generate the file with and without compiling the template. """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    tdir = tempfile.mkdtemp()
+    try:
+        template = os.path.join(tdir, 'template.inp')
+        output = os.path.join(tdir, 'solver.inp')
+        write_template(template)
+        random.seed(10)
+        values = [array([[random.random() for j in range(8)]
+                         for i in range(NSECTIONS)]) for k in range(count)]
+
+        start = time.time()
+        for vals in values:
+            generate(InputFileGenerator(), template, output, vals)
+        plain = time.time() - start
+        with open(output) as inp:
+            expected = inp.read()
+
+        start = time.time()
+        gen = InputFileGenerator(compiled=True)
+        for vals in values:
+            generate(gen, template, output, vals)
+        compiled = time.time() - start
+        with open(output) as inp:
+            assert inp.read() == expected
+
+        print '%d generations' % count
+        print '%-10s %10.3f' % ('plain', plain)
+        print '%-10s %10.3f' % ('compiled', compiled)
+        print '%-10s %10.1f' % ('speedup', plain/compiled)
+    finally:
+        shutil.rmtree(tdir)
+
+
+if __name__ == '__main__':
+    main()
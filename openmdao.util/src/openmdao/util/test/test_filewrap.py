@@ -190,6 +190,65 @@ class TestCase(unittest.TestCase):
     
         self.assertEqual(answer, result)
 
+    def test_templated_input_compiled(self):
+        
+        template = "Anchor\n" + \
+                   " A 1, 2 34, Test 1e65\n" + \
+                   "Array\n" + \
+                   "0 0 0 0 0\n" + \
+                   "0 0 0 0 0\n" + \
+                   "0 0 0 0 0\n"
+        
+        outfile = open(self.templatename, 'w')
+        outfile.write(template)
+        outfile.close()
+        
+        def generate(gen, x, arr, arr2):
+            gen.set_template_file(self.templatename)
+            gen.set_generated_file(self.filename)
+            gen.reset_anchor()
+            gen.mark_anchor('Anchor')
+            gen.set_delimiters(', ')
+            gen.transfer_var(x, 1, 3)
+            gen.transfer_var('B', 1, 1)
+            gen.mark_anchor('Array')
+            gen.set_delimiters(' ')
+            gen.transfer_array(arr, 1, 3, 5, sep=' ')
+            gen.transfer_2Darray(arr2, 2, 3, 2, 4)
+            gen.generate()
+            
+            infile = open(self.filename, 'r')
+            result = infile.read()
+            infile.close()
+            return result
+        
+        gen = InputFileGenerator(compiled=True)
+        for x, arr, arr2 in [(3.5, array([1, 2, 3, 4.75]), 
+                              array([[1, 2, 3], [4, 5, 6]])),
+                             (7, array([9., 8.5, 7, 6]), 
+                              array([[-1, -2, -3], [-4, -5, -6]]))]:
+            answer = generate(InputFileGenerator(), x, arr, arr2)
+            self.assertEqual(generate(gen, x, arr, arr2), answer)
+            self.assertTrue(str(x) in answer)
+        
+        try:
+            gen.transfer_var(1.0, 4, 4)
+        except RuntimeError, err:
+            msg = "var at row 6 is not in the compiled template for template.dat"
+            self.assertEqual(str(err), msg)
+        else:
+            self.fail('RuntimeError expected')  
+            
+        gen.reset_anchor()
+        gen.mark_anchor('Array')
+        try:
+            gen.transfer_array(array([1, 2]), 1, 3, 5, sep=' ')
+        except ValueError, err:
+            msg = "Array size 2 doesn't match the compiled template size 4"
+            self.assertEqual(str(err), msg)
+        else:
+            self.fail('ValueError expected')  
+            
     def test_output_parse(self):
         
         data = "Junk\n" + \
@@ -495,6 +554,59 @@ class TestCase(unittest.TestCase):
         else:
             self.fail('ValueError expected')  
 
+    def test_anchor_index(self):
+        
+        data = "".join(["Anchor %d\n" % i + 
+                        " key %d 1.5 -2 3e5 .5D-1\n" % i +
+                        " %d 2.5 -3 4e5 .6d-1\n" % i for i in range(5)])
+        data += "Anchor Anchor\n end"
+        
+        outfile = open(self.filename, 'w')
+        outfile.write(data)
+        outfile.close()
+        
+        gen = FileParser()
+        gen.set_file(self.filename)
+        self.assertEqual(len(gen.data), 17)
+        self.assertEqual(gen.data[-1], ' end')
+        
+        # the same anchor is found from the index each time
+        gen.mark_anchor('Anchor', 2)
+        self.assertEqual(gen.transfer_var(0, 2), 1)
+        gen.mark_anchor('Anchor')
+        self.assertEqual(gen.transfer_var(0, 2), 2)
+        gen.mark_anchor('Anchor', -1)
+        self.assertEqual(gen.transfer_line(0), 'Anchor Anchor')
+        gen.mark_anchor('Anchor', -2)
+        self.assertEqual(gen.transfer_var(0, 2), 4)
+        self.assertEqual(gen.transfer_keyvar('key', 1, 1), 4)
+        gen.reset_anchor()
+        self.assertEqual(gen.transfer_keyvar('key', 1, 3), 2)
+        
+        try:
+            gen.mark_anchor('Anchor', 7)
+        except RuntimeError, err:
+            msg = "Could not find pattern Anchor in output file filename.dat"
+            self.assertEqual(str(err), msg)
+        else:
+            self.fail('RuntimeError expected')  
+        
+        gen.mark_anchor('key', 2)
+        val = gen.transfer_array(0, 3, 1, 5)
+        self.assertEqual(list(val), [1.5, -2, 3e5, .05, 1, 2.5, -3, 4e5, .06])
+        val = gen.transfer_2Darray(0, 3, 1, 5)
+        self.assertEqual(val.shape, (2, 3))
+        self.assertEqual(list(val[1]), [-3, 4e5, .06])
+        
+        # the index is rebuilt for a new file
+        outfile = open(self.templatename, 'w')
+        outfile.write("Junk\nAnchor 9\n")
+        outfile.close()
+        gen.set_file(self.templatename)
+        gen.reset_anchor()
+        gen.mark_anchor('Anchor')
+        self.assertEqual(gen.transfer_var(0, 2), 9)
+        
     def test_comment_char(self):
 
         # Check to see if the use of the comment
@@ -560,6 +560,102 @@ class TestCase(unittest.TestCase):
             new_data = stream.read_floats((5, 2), order='Fortran')
         numpy.testing.assert_array_equal(new_data, arr2d)
 
+    def test_chunked(self):
+        logging.debug('')
+        logging.debug('test_chunked')
+
+        # Unformatted record, iterated without knowing its length.
+        data = numpy.arange(0, 1000, dtype=numpy.float64)
+        with open(self.filename, 'wb') as out:
+            stream = Stream(out, binary=True, unformatted=True)
+            stream.write_floats(data, full_record=True)
+            stream.write_int(42, full_record=True)
+        with open(self.filename, 'rb') as inp:
+            stream = Stream(inp, binary=True, unformatted=True)
+            chunks = list(stream.iter_floats(chunk=300, full_record=True))
+            self.assertEqual([len(chunk) for chunk in chunks],
+                             [300, 300, 300, 100])
+            numpy.testing.assert_array_equal(numpy.concatenate(chunks), data)
+            self.assertEqual(stream.read_int(full_record=True), 42)
+
+        with open(self.filename, 'rb') as inp:
+            stream = Stream(inp, binary=True, unformatted=True)
+            assert_raises(self, 'stream.iter_floats(999, full_record=True)',
+                          globals(), locals(), RuntimeError,
+                          'unexpected recordlength 8000')
+        with open(self.filename, 'rb') as inp:
+            stream = Stream(inp, binary=True)
+            assert_raises(self, 'stream.iter_floats()',
+                          globals(), locals(), ValueError,
+                          'count must be specified unless reading'
+                          ' a full unformatted record')
+
+        # Byteswapped ints read into an existing array.
+        swap_endian = sys.byteorder == 'little'
+        arr2d = numpy.arange(0, 10, dtype=numpy.int32).reshape((5, 2))
+        with open(self.filename, 'wb') as out:
+            stream = Stream(out, binary=True, big_endian=swap_endian,
+                            unformatted=True)
+            stream.write_ints(arr2d, order='Fortran', full_record=True)
+            stream.write_ints(arr2d, order='Fortran', full_record=True)
+        with open(self.filename, 'rb') as inp:
+            stream = Stream(inp, binary=True, big_endian=swap_endian,
+                            unformatted=True)
+            new_data = numpy.zeros((5, 2), dtype=numpy.int32, order='F')
+            result = stream.readinto_ints(new_data, order='Fortran',
+                                          full_record=True)
+            self.assertTrue(result is new_data)
+            numpy.testing.assert_array_equal(new_data, arr2d)
+
+            # Converted in chunks since dtype and order don't match.
+            new_data = numpy.zeros((5, 2))
+            stream.readinto_ints(new_data, order='Fortran', full_record=True)
+            numpy.testing.assert_array_equal(new_data, arr2d)
+
+        # Floats into a strided view of existing storage.
+        data = numpy.arange(0, 10, dtype=numpy.float32)
+        with open(self.filename, 'wb') as out:
+            stream = Stream(out, binary=True, single_precision=True)
+            stream.write_floats(data)
+        storage = numpy.zeros((10, 2))
+        with open(self.filename, 'rb') as inp:
+            stream = Stream(inp, binary=True, single_precision=True)
+            stream.readinto_floats(storage[:, 1])
+            assert_raises(self, 'stream.readinto_floats(storage[:, 0])',
+                          globals(), locals(), RuntimeError,
+                          'read 0 items, expected 10')
+        numpy.testing.assert_array_equal(storage[:, 1], data)
+        numpy.testing.assert_array_equal(storage[:, 0], numpy.zeros(10))
+
+        # Text.
+        with open(self.filename, 'w') as out:
+            stream = Stream(out)
+            stream.write_floats(data, linecount=4)
+        with open(self.filename, 'r') as inp:
+            stream = Stream(inp)
+            chunks = list(stream.iter_floats(10, chunk=4))
+        self.assertEqual([len(chunk) for chunk in chunks], [4, 4, 2])
+        numpy.testing.assert_array_equal(numpy.concatenate(chunks), data)
+
+        # Mismatched trailing recordmark is found after the last chunk.
+        data = UNF_R8A[:-1]+'\x42'
+        with open(self.filename, 'wb') as out:
+            out.write(data)
+        with open(self.filename, 'rb') as inp:
+            stream = Stream(inp, binary=True, unformatted=True)
+            chunks = stream.iter_floats(chunk=3, full_record=True)
+            assert_raises(self, 'list(chunks)', globals(), locals(),
+                          RuntimeError,
+                          'mismatched recordlength 1107296320 vs. 64')
+        with open(self.filename, 'rb') as inp:
+            stream = Stream(inp, binary=True, unformatted=True)
+            new_data = numpy.zeros(8)
+            assert_raises(self,
+                          'stream.readinto_floats(new_data, full_record=True)',
+                          globals(), locals(), RuntimeError,
+                          'mismatched recordlength 1107296320 vs. 64')
+        numpy.testing.assert_array_equal(new_data, numpy.arange(1, 9))
+
     def test_misc(self):
         logging.debug('')
         logging.debug('test_misc')